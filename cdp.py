@@ -0,0 +1,435 @@
+"""
+Cliente del protocolo DevTools de Chrome (CDP) sobre asyncio, sin dependencias externas.
+
+Cada sesión se lanza con --remote-debugging-port; este módulo mantiene una conexión websocket
+persistente con el navegador de cada sesión, multiplexa sobre ella comandos (por id) y eventos
+(también los de las pestañas adjuntas en modo "flatten", por sessionId) y se reconecta sola si
+la conexión se pierde. CdpPool reparte un mismo comando entre muchas sesiones a la vez y
+CdpRunner lo ejecuta en un bucle propio para usarlo desde código síncrono.
+
+No importa nada del resto del gestor: solo necesita {sesión: puerto}, de modo que puede
+probarse contra cualquier servidor CDP local.
+"""
+
+import os
+import json
+import base64
+import struct
+import asyncio
+import threading
+
+
+class CdpError(ValueError):
+    """
+    Chrome respondió al comando con un error.
+    """
+
+class CdpConnectionClosed(ConnectionError):
+    """
+    La conexión con el navegador se cerró antes de la respuesta.
+    """
+
+
+def _enmascarar(datos, mascara):
+    # XOR con la máscara repetida, de una vez sobre enteros grandes (RFC 6455, 5.3)
+    repetida = (mascara * (len(datos) // 4 + 1))[:len(datos)]
+    return (int.from_bytes(datos, 'big') ^ int.from_bytes(repetida, 'big')).to_bytes(len(datos), 'big')
+
+def trama_texto(texto):
+    """
+    Codifica un mensaje de texto del cliente como una trama websocket enmascarada.
+    """
+    datos = texto.encode()
+    mascara = os.urandom(4)
+    if len(datos) < 126:
+        cabecera = struct.pack('!BB', 0x81, 0x80 | len(datos))
+    elif len(datos) < 65536:
+        cabecera = struct.pack('!BBH', 0x81, 0x80 | 126, len(datos))
+    else:
+        cabecera = struct.pack('!BBQ', 0x81, 0x80 | 127, len(datos))
+    return cabecera + mascara + _enmascarar(datos, mascara)
+
+async def _con_plazo(esperable, timeout, puerto):
+    """
+    asyncio.wait_for que, si vence el plazo, lanza TimeoutError (subclase de OSError, como el
+    resto de fallos de red) en lugar de asyncio.TimeoutError, que no lo es antes de Python 3.11.
+    """
+    try:
+        return await asyncio.wait_for(esperable, timeout)
+    except asyncio.TimeoutError:
+        raise TimeoutError(f"DevTools no respondió en {timeout} s en el puerto {puerto}.") from None
+
+async def _peticion_http(host, puerto, ruta, timeout):
+    """
+    GET mínimo al servidor HTTP de DevTools. Retorna el cuerpo decodificado como JSON.
+    """
+    lector, escritor = await _con_plazo(asyncio.open_connection(host, puerto), timeout, puerto)
+    try:
+        escritor.write(f"GET {ruta} HTTP/1.1\r\nHost: {host}:{puerto}\r\nConnection: close\r\n\r\n".encode())
+        await escritor.drain()
+        cabecera = await _con_plazo(lector.readuntil(b'\r\n\r\n'), timeout, puerto)
+        lineas = cabecera.decode('latin-1').split('\r\n')
+        if ' 200 ' not in lineas[0] + ' ':
+            raise OSError(f"DevTools respondió {lineas[0]!r} a {ruta}")
+        longitud = next((int(linea.split(':', 1)[1]) for linea in lineas[1:]
+                         if linea.lower().startswith('content-length:')), None)
+        cuerpo = await _con_plazo(lector.readexactly(longitud) if longitud is not None else lector.read(),
+                                  timeout, puerto)
+        return json.loads(cuerpo)
+    finally:
+        escritor.close()
+
+
+class CdpConnection:
+    """
+    Conexión websocket persistente con el navegador de una sesión.
+
+    Los comandos se envían sin esperar a los anteriores y cada respuesta despierta a quien la
+    pidió por su id, así que muchos comandos pueden estar en vuelo a la vez. Los eventos se
+    entregan a los oyentes registrados con `escuchar`. Si la conexión se pierde, los comandos
+    pendientes fallan con CdpConnectionClosed y el siguiente comando reconecta (con
+    `reconectar`), reintentando `intentos` veces con espera creciente.
+    """
+
+    def __init__(self, puerto, host='127.0.0.1', timeout=10, reconectar=True, intentos=3):
+        self.puerto = puerto
+        self.host = host
+        self.timeout = timeout
+        self.reconectar = reconectar
+        self.intentos = intentos
+        self._lector = None
+        self._escritor = None
+        self._tarea = None
+        self._pendientes = {}  # id -> Future de la respuesta
+        self._oyentes = {}  # evento -> [callback(parámetros, sessionId)]
+        self._siguiente = 0
+        self._conexiones = 0
+        self._cerrada = False
+        self._lock = None
+
+    @property
+    def conectada(self):
+        return self._tarea is not None and not self._tarea.done()
+
+    async def conectar(self):
+        """
+        Abre la conexión si no lo está. Lanza OSError si el navegador no responde.
+        """
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            if self.conectada:
+                return
+            if self._cerrada or (self._conexiones and not self.reconectar):
+                raise CdpConnectionClosed(f"La conexión con el puerto {self.puerto} está cerrada.")
+            for intento in range(self.intentos):
+                try:
+                    await self._abrir()
+                    break
+                except (OSError, asyncio.IncompleteReadError, ValueError, KeyError):
+                    if intento == self.intentos - 1:
+                        raise OSError(f"DevTools no responde en el puerto {self.puerto}.")
+                    await asyncio.sleep(0.2 * 2 ** intento)
+            self._conexiones += 1
+
+    async def _abrir(self):
+        version = await _peticion_http(self.host, self.puerto, '/json/version', self.timeout)
+        ruta = '/' + version['webSocketDebuggerUrl'].split('/', 3)[3]
+        lector, escritor = await _con_plazo(asyncio.open_connection(self.host, self.puerto), self.timeout, self.puerto)
+        try:
+            clave = base64.b64encode(os.urandom(16)).decode()
+            escritor.write((f"GET {ruta} HTTP/1.1\r\nHost: {self.host}:{self.puerto}\r\nUpgrade: websocket\r\n"
+                            f"Connection: Upgrade\r\nSec-WebSocket-Key: {clave}\r\n"
+                            f"Sec-WebSocket-Version: 13\r\n\r\n").encode())
+            await escritor.drain()
+            cabecera = await _con_plazo(lector.readuntil(b'\r\n\r\n'), self.timeout, self.puerto)
+            if b' 101 ' not in cabecera.split(b'\r\n', 1)[0]:
+                raise OSError("El navegador rechazó la conexión websocket.")
+        except BaseException:
+            escritor.close()
+            raise
+        self._lector, self._escritor = lector, escritor
+        self._tarea = asyncio.ensure_future(self._recibir())
+
+    async def _leer_mensaje(self):
+        """
+        Retorna (código de operación, datos) del siguiente mensaje, uniendo fragmentos.
+        """
+        partes = []
+        codigo = None
+        while True:
+            primero, segundo = await self._lector.readexactly(2)
+            longitud = segundo & 0x7F
+            if longitud == 126:
+                longitud = struct.unpack('!H', await self._lector.readexactly(2))[0]
+            elif longitud == 127:
+                longitud = struct.unpack('!Q', await self._lector.readexactly(8))[0]
+            mascara = await self._lector.readexactly(4) if segundo & 0x80 else None
+            datos = await self._lector.readexactly(longitud)
+            if mascara:
+                datos = _enmascarar(datos, mascara)
+            operacion = primero & 0x0F
+            if operacion >= 0x8:  # Control: pueden llegar entre fragmentos
+                if operacion == 0x9:  # Ping
+                    self._escritor.write(struct.pack('!BB', 0x8A, 0x80 | len(datos)) + b'\0\0\0\0' + datos)
+                    continue
+                if operacion == 0xA:  # Pong
+                    continue
+                return operacion, datos
+            if operacion:
+                codigo = operacion
+            partes.append(datos)
+            if primero & 0x80:  # FIN
+                return codigo, b''.join(partes)
+
+    async def _recibir(self):
+        try:
+            while True:
+                operacion, datos = await self._leer_mensaje()
+                if operacion == 0x8:  # Cierre
+                    break
+                if operacion != 0x1:
+                    continue
+                mensaje = json.loads(datos)
+                if 'id' in mensaje:
+                    futuro = self._pendientes.pop(mensaje['id'], None)
+                    if futuro is None or futuro.done():
+                        continue
+                    if 'error' in mensaje:
+                        futuro.set_exception(CdpError(mensaje['error'].get('message', 'Error de DevTools')))
+                    else:
+                        futuro.set_result(mensaje.get('result', {}))
+                else:
+                    for oyente in list(self._oyentes.get(mensaje.get('method'), ())):
+                        oyente(mensaje.get('params', {}), mensaje.get('sessionId'))
+        except (OSError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            self._escritor.close()
+            pendientes, self._pendientes = self._pendientes, {}
+            for futuro in pendientes.values():
+                if not futuro.done():
+                    futuro.set_exception(CdpConnectionClosed(f"Se perdió la conexión con el puerto {self.puerto}."))
+
+    def escuchar(self, evento, oyente):
+        """
+        Registra `oyente(parámetros, sessionId)` para un evento (p. ej. 'Target.targetCreated').
+        """
+        self._oyentes.setdefault(evento, []).append(oyente)
+
+    async def comando(self, metodo, parametros=None, sesion=None, timeout=None):
+        """
+        Envía un comando (a una pestaña adjunta si se indica su `sesion`) y retorna su resultado.
+        Lanza CdpError si Chrome lo rechaza, CdpConnectionClosed si la conexión se cierra antes
+        de responder y TimeoutError si vence el plazo.
+        """
+        if not self.conectada:
+            await self.conectar()
+        self._siguiente += 1
+        identificador = self._siguiente
+        mensaje = {'id': identificador, 'method': metodo, 'params': parametros or {}}
+        if sesion is not None:
+            mensaje['sessionId'] = sesion
+        futuro = asyncio.get_running_loop().create_future()
+        self._pendientes[identificador] = futuro
+        try:
+            self._escritor.write(trama_texto(json.dumps(mensaje)))
+            await self._escritor.drain()
+            return await _con_plazo(futuro, timeout or self.timeout, self.puerto)
+        except (ConnectionError, RuntimeError) as e:
+            raise CdpConnectionClosed(str(e)) from e
+        finally:
+            self._pendientes.pop(identificador, None)
+
+    async def cerrar(self):
+        """
+        Cierra la conexión sin cerrar el navegador.
+        """
+        self._cerrada = True
+        if self._tarea is not None:
+            self._tarea.cancel()
+            try:
+                await self._tarea
+            except asyncio.CancelledError:
+                pass
+
+
+async def esperar_carga(conexion, timeout, intervalo=0.1, cancelado=None):
+    """
+    Espera a que la primera pestaña de una sesión recién lanzada termine de cargar su página
+    (document.readyState == 'complete' fuera de about:blank). Retorna True si carga antes de
+    `timeout` segundos y False si vence el plazo, si se activa `cancelado` (un threading.Event)
+    o si el navegador no tiene pestañas.
+    """
+    loop = asyncio.get_running_loop()
+    limite = loop.time() + timeout
+    sesion = None
+    expresion = "document.readyState === 'complete' && location.href !== 'about:blank'"
+    while loop.time() < limite and not (cancelado is not None and cancelado.is_set()):
+        if sesion is None:
+            destinos = await conexion.comando('Target.getTargets')
+            pagina = next((t for t in destinos['targetInfos'] if t['type'] == 'page'), None)
+            if pagina is not None:
+                adjunta = await conexion.comando('Target.attachToTarget', {'targetId': pagina['targetId'], 'flatten': True})
+                sesion = adjunta['sessionId']
+        if sesion is not None:
+            evaluada = await conexion.comando('Runtime.evaluate', {'expression': expresion, 'returnByValue': True}, sesion=sesion)
+            if evaluada.get('result', {}).get('value') is True:
+                await conexion.comando('Target.detachFromTarget', {'sessionId': sesion})
+                return True
+        await asyncio.sleep(intervalo)
+    return False
+
+
+class CdpPool:
+    """
+    Conexiones persistentes con las sesiones en ejecución, una por sesión.
+
+    Las operaciones reciben {sesión: puerto}, abren las conexiones que falten (o las sustituyen si
+    el puerto cambió) y lanzan el comando en todas a la vez. Retornan {sesión: resultado}, donde
+    el resultado de una sesión que falló es la excepción correspondiente.
+    """
+
+    ERRORES = (OSError, CdpError, asyncio.IncompleteReadError, asyncio.TimeoutError)
+
+    def __init__(self, timeout=10):
+        self.timeout = timeout
+        self.conexiones = {}  # sesión -> CdpConnection
+        self._oyentes = []  # (evento, callback(sesión, parámetros))
+
+    def conexion(self, nombre, puerto):
+        conexion = self.conexiones.get(nombre)
+        if conexion is None or conexion.puerto != puerto or conexion._cerrada:
+            if conexion is not None:
+                asyncio.ensure_future(conexion.cerrar())
+            conexion = self.conexiones[nombre] = CdpConnection(puerto, timeout=self.timeout)
+            for evento, oyente in self._oyentes:
+                conexion.escuchar(evento, lambda parametros, sesion, nombre=nombre, oyente=oyente: oyente(nombre, parametros))
+        return conexion
+
+    def escuchar(self, evento, oyente):
+        """
+        Registra `oyente(sesión, parámetros)` para un evento en todas las conexiones.
+        """
+        self._oyentes.append((evento, oyente))
+        for nombre, conexion in self.conexiones.items():
+            conexion.escuchar(evento, lambda parametros, sesion, nombre=nombre: oyente(nombre, parametros))
+
+    async def podar(self, activas):
+        """
+        Cierra las conexiones de las sesiones que ya no están en `activas`.
+        """
+        sobrantes = [nombre for nombre in self.conexiones if nombre not in activas]
+        await asyncio.gather(*(self.conexiones.pop(nombre).cerrar() for nombre in sobrantes), return_exceptions=True)
+
+    async def _en_todas(self, puertos, operacion):
+        nombres = list(puertos)
+
+        async def ejecutar(nombre):
+            try:
+                return await operacion(self.conexion(nombre, puertos[nombre]))
+            except self.ERRORES as e:
+                return e
+
+        resultados = await asyncio.gather(*(ejecutar(nombre) for nombre in nombres), return_exceptions=True)
+        return dict(zip(nombres, resultados))
+
+    async def ejecutar(self, puertos, metodo, parametros=None):
+        """
+        Envía el mismo comando al navegador de cada sesión.
+        """
+        return await self._en_todas(puertos, lambda conexion: conexion.comando(metodo, parametros))
+
+    async def pestanas(self, puertos):
+        """
+        Retorna {sesión: [{'id', 'url', 'titulo'}]} con las pestañas abiertas.
+        """
+        async def listar(conexion):
+            resultado = await conexion.comando('Target.getTargets')
+            return [{'id': t['targetId'], 'url': t['url'], 'titulo': t['title']}
+                    for t in resultado['targetInfos'] if t['type'] == 'page']
+        return await self._en_todas(puertos, listar)
+
+    async def abrir(self, puertos, urls):
+        """
+        Abre cada URL en una pestaña nueva de cada sesión. Retorna {sesión: [ids de pestaña]}.
+        """
+        async def abrir(conexion):
+            resultados = await asyncio.gather(*(conexion.comando('Target.createTarget', {'url': url}) for url in urls),
+                                              return_exceptions=True)
+            errores = [resultado for resultado in resultados if isinstance(resultado, BaseException)]
+            if errores:
+                raise errores[0]
+            return [resultado['targetId'] for resultado in resultados]
+        return await self._en_todas(puertos, abrir)
+
+    async def limpiar_cache(self, puertos):
+        """
+        Vacía la caché HTTP de cada sesión (Network.clearBrowserCache sobre una pestaña adjunta).
+        Retorna {sesión: True, o False si no tiene pestañas}.
+        """
+        async def limpiar(conexion):
+            destinos = await conexion.comando('Target.getTargets')
+            pagina = next((t for t in destinos['targetInfos'] if t['type'] == 'page'), None)
+            if pagina is None:
+                return False
+            adjunta = await conexion.comando('Target.attachToTarget', {'targetId': pagina['targetId'], 'flatten': True})
+            try:
+                await conexion.comando('Network.clearBrowserCache', sesion=adjunta['sessionId'])
+            finally:
+                await conexion.comando('Target.detachFromTarget', {'sessionId': adjunta['sessionId']})
+            return True
+        return await self._en_todas(puertos, limpiar)
+
+    async def cerrar(self, puertos):
+        """
+        Cierra el Chrome de cada sesión con Browser.close. Retorna {sesión: True}.
+        """
+        async def cerrar(conexion):
+            try:
+                await conexion.comando('Browser.close')
+            except CdpConnectionClosed:
+                pass  # Chrome suele cerrar la conexión antes de responder
+            await conexion.cerrar()
+            return True
+        resultados = await self._en_todas(puertos, cerrar)
+        for nombre in puertos:
+            self.conexiones.pop(nombre, None)
+        return resultados
+
+    async def cerrar_conexiones(self):
+        await self.podar(())
+
+
+class CdpRunner:
+    """
+    Ejecuta un CdpPool en un bucle asyncio propio, en un hilo en segundo plano, para usarlo
+    desde código síncrono (hilos de la interfaz, línea de comandos). Las conexiones persisten
+    entre llamadas.
+    """
+
+    def __init__(self, timeout=10):
+        self.pool = CdpPool(timeout)
+        self.loop = asyncio.new_event_loop()
+        self.hilo = threading.Thread(target=self.loop.run_forever, name='cdp', daemon=True)
+        self.hilo.start()
+
+    def ejecutar(self, operacion, puertos, activas=None, **parametros):
+        """
+        Ejecuta la operación `operacion` del pool ('pestanas', 'abrir', 'limpiar_cache',
+        'cerrar' o 'ejecutar') sobre {sesión: puerto} y retorna su resultado. Con `activas`,
+        cierra antes las conexiones de las sesiones que ya no están en ejecución.
+        """
+        async def tarea():
+            if activas is not None:
+                await self.pool.podar(activas)
+            return await getattr(self.pool, operacion)(puertos, **parametros)
+        return asyncio.run_coroutine_threadsafe(tarea(), self.loop).result()
+
+    def cerrar(self):
+        if not self.loop.is_running():
+            return
+        asyncio.run_coroutine_threadsafe(self.pool.cerrar_conexiones(), self.loop).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.hilo.join()
+        self.loop.close()
@@ -0,0 +1,846 @@
+"""
+Línea de comandos del gestor de sesiones para servidores sin pantalla y scripts.
+
+Usa solo el núcleo (core.py) y no importa PyQt5. Ejemplos:
+
+    python3 cli.py list
+    python3 cli.py create trabajo --launch
+    python3 cli.py template save base --from trabajo
+    python3 cli.py create s1 s2 s3 --template base
+    python3 cli.py launch trabajo pruebas --concurrency 2
+    python3 cli.py delete pruebas
+    python3 cli.py du --json
+    python3 cli.py dedup --dry-run
+    python3 cli.py cache prune -c cache -c code_cache
+    python3 cli.py compact --workers 2
+    python3 cli.py archive antigua
+    python3 cli.py export trabajo -o /media/copias
+    python3 cli.py import /media/copias/trabajo.tar.zst --name trabajo2
+    python3 cli.py evict --dry-run --min 20 --target 40
+    python3 cli.py roots add /mnt/ssd2/sesiones
+    python3 cli.py move trabajo --to /mnt/ssd2/sesiones
+    python3 cli.py launch scraper --ram
+    python3 cli.py sync
+    python3 cli.py top -n 3 --interval 2
+    python3 cli.py cdp open s1 s2 --url https://example.com/
+    python3 cli.py cdp tabs
+    python3 cli.py latency --phase devtools
+    python3 cli.py create lote1 lote2 --preset headless-batch --url https://example.com/
+    python3 cli.py preset set trabajo --preset low-memory
+"""
+
+import os
+import sys
+import time
+import json
+import sqlite3
+import argparse
+import multiprocessing
+
+from core import (
+    RUTA_STORAGE, ETIQUETAS_FASES, PRESETS_LANZAMIENTO, PRESET_PREDETERMINADO, SessionManager, SessionRunningError, CachePruner, espacio_libre, format_size
+)
+
+
+
+
+
+def imprimir_json(datos):
+    print(json.dumps(datos, indent=2, ensure_ascii=False))
+
+def resolver_raiz(manager, ruta):
+    """
+    Raíz configurada que corresponde a `ruta`, escrita como relativa o absoluta.
+    """
+    if ruta is None:
+        return None
+    return next((raiz for raiz in manager.raices() if os.path.abspath(raiz) == os.path.abspath(ruta)), ruta)
+
+def cmd_list(manager, args):
+    manager.reconciliar(adoptar=True)
+    sesiones = manager.listar()
+    if args.json:
+        imprimir_json(sesiones)
+        return 0
+    varias_raices = len(manager.raices()) > 1
+    for sesion in sesiones:
+        tamano = format_size(sesion['tamano']) if sesion['tamano'] is not None else '-'
+        if sesion['en_ejecucion']:
+            estado = "Precalentada" if sesion['precalentada'] else "En ejecución"
+            estado += f" (puerto {sesion['puerto']}{', en RAM' if sesion['en_ram'] else ''})"
+        else:
+            estado = 'Archivada' if sesion['archivada'] else 'Suspendida' if sesion['suspendida'] else 'Detenida'
+        if sesion['preset'] != PRESET_PREDETERMINADO:
+            estado += f" [{sesion['preset']}]"
+        ubicacion = f"\t{sesion['raiz']}" if varias_raices else ""
+        print(f"{sesion['nombre']}\t{sesion['creada']}\t{tamano}\t{estado}{ubicacion}")
+    return 0
+
+def cmd_create(manager, args):
+    try:
+        creadas = manager.crear_varias(args.nombres, plantilla=args.template,
+                                       raiz=resolver_raiz(manager, args.root),
+                                       preset=args.preset, urls=args.url)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    except (OSError, sqlite3.Error) as e:
+        print(f"Error al guardar la sesión: {e}", file=sys.stderr)
+        return 1
+    if args.json and not args.launch:
+        imprimir_json([{'nombre': nombre, 'creada': creada} for nombre, creada in creadas])
+    elif not args.json:
+        for nombre, creada in creadas:
+            print(f"Sesión '{nombre}' creada ({creada}).")
+    if args.launch:
+        args.nombres = [nombre for nombre, _ in creadas]
+        return cmd_launch(manager, args)
+    return 0
+
+def cmd_launch(manager, args):
+    def al_terminar(resultado):
+        if args.json:
+            return
+        detalle = f"puerto {resultado['puerto']}" if resultado['estado'] == 'ok' else resultado['error'] or resultado['estado']
+        if resultado['precalentada']:
+            detalle += ", precalentada"
+        if resultado['segundos'] is not None:  # No se mide si no llegó a lanzarse
+            detalle += f", {resultado['segundos']:.1f}s"
+        print(f"{resultado['sesion']}: {resultado['estado']} ({detalle})")
+
+    try:
+        resultados = manager.lanzar(
+            args.nombres,
+            al_terminar=al_terminar,
+            chrome_ruta=args.chrome,
+            concurrencia=args.concurrency,
+            intervalo=args.interval,
+            timeout=args.timeout,
+            en_ram=args.ram
+        )
+    except KeyError as e:
+        print(f"Error: {e.args[0]}", file=sys.stderr)
+        return 1
+    if args.json:
+        imprimir_json(resultados)
+    return 0 if all(r['estado'] in ('ok', 'en_ejecucion') for r in resultados) else 1
+
+def cmd_top(manager, args):
+    if not manager.monitor.disponible:
+        print("Error: La medición de consumo solo está disponible en Linux.", file=sys.stderr)
+        return 1
+    manager.reconciliar(adoptar=True)
+    manager.muestrear()  # Referencia para calcular CPU y E/S
+    for vuelta in range(args.iterations):
+        time.sleep(args.interval)
+        manager.reconciliar()
+        muestras = manager.muestrear()
+        if args.nombres:
+            muestras = {nombre: m for nombre, m in muestras.items() if nombre in args.nombres}
+        if args.json:
+            imprimir_json(muestras)
+            continue
+        if vuelta:
+            print()
+        con_cgroup = any(m.get('cgroup') for m in muestras.values())
+        print("SESIÓN\tCPU\tMEMORIA\tLECTURA\tESCRITURA\tPROCESOS" + ("\tCGROUP" if con_cgroup else ""))
+        for nombre, m in sorted(muestras.items(), key=lambda item: item[1]['cpu'], reverse=True):
+            memoria = format_size(m['pss']) if m['pss'] is not None else f"{format_size(m['rss'])} RSS"
+            linea = (f"{nombre}\t{m['cpu']:.1f}%\t{memoria}\t{format_size(m['lectura'])}/s\t"
+                     f"{format_size(m['escritura'])}/s\t{m['procesos']}")
+            if con_cgroup:
+                cgroup = m.get('cgroup')
+                if cgroup:
+                    maximo = format_size(cgroup['memoria_max']) if cgroup['memoria_max'] else "max"
+                    linea += (f"\t{format_size(cgroup['memoria'])}/{maximo} max={cgroup['eventos']['max']} "
+                              f"oom_kill={cgroup['eventos']['oom_kill']} "
+                              f"throttled={cgroup['throttled']['nr_throttled']}")
+                else:
+                    linea += "\t-"
+            print(linea)
+        if not muestras:
+            print("No hay sesiones en ejecución.")
+    return 0
+
+def cmd_warm(manager, args):
+    manager.reconciliar(adoptar=True)
+    if args.stop:
+        resultados = manager.cerrar_precalentadas()
+        if args.json:
+            imprimir_json(sorted(resultados))
+        else:
+            for nombre in sorted(resultados, key=str.casefold):
+                print(f"{nombre}\tcerrada")
+        return 0
+    try:
+        informe = manager.precalentar(chrome_ruta=args.chrome, simular=args.dry_run)
+    except (OSError, sqlite3.Error) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    if args.json:
+        imprimir_json(dict(informe, precalentadas=sorted(manager.precalentadas())))
+        return 0 if not informe['errores'] else 1
+    verbo = "se precalentaría" if args.dry_run else "precalentada"
+    for nombre in informe['lanzadas']:
+        print(f"{nombre}\t{verbo}")
+    for nombre in informe['cerradas']:
+        print(f"{nombre}\t{'se cerraría' if args.dry_run else 'cerrada'} (sobra en la reserva)")
+    for nombre, error in informe['errores'].items():
+        print(f"{nombre}\terror: {error}")
+    print(f"Reserva: {len(manager.precalentadas())} de {informe['objetivo']} sesiones precalentadas.")
+    return 0 if not informe['errores'] else 1
+
+def cmd_preset(manager, args):
+    if args.accion == 'list':
+        if args.json:
+            imprimir_json(PRESETS_LANZAMIENTO)
+            return 0
+        for nombre, preset in PRESETS_LANZAMIENTO.items():
+            predeterminado = " (predeterminado)" if nombre == PRESET_PREDETERMINADO else ""
+            print(f"{nombre}{predeterminado}: {preset['descripcion']}")
+            if preset['flags']:
+                print(f"    {' '.join(preset['flags'])}")
+        return 0
+
+    nombres = args.nombres or sorted(manager.store.listar(), key=str.casefold)
+    try:
+        if args.accion == 'set':
+            manager.configurar_arranque(
+                nombres, preset=args.preset,
+                urls=[] if args.no_urls else args.url,
+                flags=[] if args.no_flags else args.flag
+            )
+        configuraciones = {nombre: manager.arranque(nombre) for nombre in nombres}
+    except KeyError as e:
+        print(f"Error: {e.args[0]}", file=sys.stderr)
+        return 1
+    except (ValueError, sqlite3.Error) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    if args.json:
+        imprimir_json(configuraciones)
+        return 0
+    for nombre, arranque in configuraciones.items():
+        detalles = [arranque['preset']]
+        if arranque['urls']:
+            detalles.append(f"URLs: {' '.join(arranque['urls'])}")
+        if arranque['flags']:
+            detalles.append(f"opciones: {' '.join(arranque['flags'])}")
+        print(f"{nombre}\t{' · '.join(detalles)}")
+    return 0
+
+def cmd_latency(manager, args):
+    try:
+        latencias = manager.latencias(args.nombres or None, ocultas=not args.no_warm)
+    except sqlite3.Error as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    if args.json:
+        imprimir_json(latencias)
+        return 0
+
+    def segundos(resumen, clave='p50'):
+        return f"{resumen[clave]:.2f}s" if resumen else "-"
+
+    fases = [fase for fase in ETIQUETAS_FASES if fase != 'total']
+    print("\t".join(["SESIÓN", "ARRANQUES", f"{ETIQUETAS_FASES[args.phase].upper()} P50", "P95", "P99"]
+                    + [f"{ETIQUETAS_FASES[fase].upper()} P50" for fase in fases]))
+    filas = [("(todas)", latencias['global'])] + list(latencias['sesiones'].items())
+    for nombre, resumen in filas:
+        print("\t".join([nombre, str(resumen['n'])]
+                        + [segundos(resumen[args.phase], clave) for clave in ('p50', 'p95', 'p99')]
+                        + [segundos(resumen[fase]) for fase in fases]))
+    if not latencias['sesiones']:
+        print("No hay arranques registrados.")
+    return 0
+
+def cmd_reap(manager, args):
+    manager.reconciliar(adoptar=True)
+    if args.nombres:
+        desconocidas = [nombre for nombre in args.nombres if not manager.store.existe(nombre)]
+        if desconocidas:
+            print(f"Error: No existe la sesión: {', '.join(desconocidas)}", file=sys.stderr)
+            return 1
+        abiertas = [nombre for nombre in args.nombres if manager.process_registry.en_ejecucion(nombre)]
+        resultados = {} if args.dry_run else manager.suspender(abiertas)
+    else:
+        if not manager.monitor.disponible:
+            print("Error: La detección de inactividad solo está disponible en Linux.", file=sys.stderr)
+            return 1
+        # Se observa la ventana completa muestreando cada `interval` segundos
+        manager.muestrear()
+        inicio = time.monotonic()
+        while time.monotonic() - inicio < args.window:
+            time.sleep(min(args.interval, max(args.window - (time.monotonic() - inicio), 0)))
+            manager.reconciliar()
+            manager.muestrear()
+        resultados = manager.cerrar_inactivas(args.window, simular=args.dry_run)
+        abiertas = sorted(resultados, key=str.casefold)
+    if args.json:
+        imprimir_json(abiertas if args.dry_run else resultados)
+        return 0
+    if not abiertas:
+        print("No hay sesiones que cerrar.")
+    for nombre in abiertas:
+        if args.dry_run:
+            print(f"{nombre}\tse cerraría")
+        elif resultados.get(nombre) is None:
+            print(f"{nombre}\tno respondió y sigue abierta")
+        else:
+            cierre = "cerrada" if resultados[nombre] == 'cdp' else "terminada con SIGTERM"
+            print(f"{nombre}\t{cierre}; se reabrirá con sus pestañas al lanzarla")
+    return 0 if args.dry_run or all(resultados.get(nombre) for nombre in abiertas) else 1
+
+def cmd_cdp(manager, args):
+    desconocidas = [nombre for nombre in args.nombres if not manager.store.existe(nombre)]
+    if desconocidas:
+        print(f"Error: No existe la sesión: {', '.join(desconocidas)}", file=sys.stderr)
+        return 1
+    operacion = {'tabs': 'pestanas', 'open': 'abrir', 'clear-cache': 'limpiar_cache', 'close': 'cerrar'}[args.accion]
+    parametros = {'urls': args.url} if args.accion == 'open' else {}
+    manager.reconciliar(adoptar=True)
+    resultados = manager.cdp(operacion, args.nombres or None, **parametros)
+    for nombre in args.nombres:
+        if nombre not in resultados:
+            print(f"{nombre}: no está en ejecución", file=sys.stderr)
+    fallidas = {nombre: r for nombre, r in resultados.items() if isinstance(r, Exception)}
+    codigo = 1 if fallidas or len(resultados) < len(args.nombres) else 0
+    if args.json:
+        imprimir_json({nombre: {'error': str(r)} if nombre in fallidas else r for nombre, r in resultados.items()})
+        return codigo
+    for nombre, r in sorted(resultados.items(), key=lambda item: item[0].casefold()):
+        if nombre in fallidas:
+            print(f"{nombre}\terror: {r}")
+        elif args.accion == 'tabs':
+            for pestana in r:
+                print(f"{nombre}\t{pestana['id']}\t{pestana['url']}")
+        elif args.accion == 'open':
+            print(f"{nombre}\t{len(r)} pestañas abiertas")
+        elif args.accion == 'clear-cache':
+            print(f"{nombre}\t{'caché vaciada' if r else 'sin pestañas abiertas'}")
+        else:
+            print(f"{nombre}\tcerrada")
+    if not resultados:
+        print("No hay sesiones en ejecución.")
+    return codigo
+
+def cmd_sync(manager, args):
+    desconocidas = [nombre for nombre in args.nombres if not manager.store.existe(nombre)]
+    if desconocidas:
+        print(f"Error: No existe la sesión: {', '.join(desconocidas)}", file=sys.stderr)
+        return 1
+    try:
+        informe = manager.sincronizar_ram(args.nombres or None, forzar=True)
+    except OSError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    if args.json:
+        imprimir_json(informe)
+        return 0
+    for nombre, r in informe['sincronizadas'].items():
+        omitidos = f", {r['omitidos']} bases de datos en uso para el cierre" if r['omitidos'] else ""
+        print(f"{nombre}\tpunto de control: {r['copiados']} ficheros ({format_size(r['bytes'])}), "
+              f"{r['borrados']} borrados{omitidos}")
+    for nombre, r in informe['devueltas'].items():
+        if r['perdida']:
+            print(f"{nombre}\tla copia en RAM se perdió; se conserva el último punto de control")
+        else:
+            print(f"{nombre}\tdevuelta a disco: {r['copiados']} ficheros ({format_size(r['bytes'])}), "
+                  f"{r['borrados']} borrados")
+    if not informe['sincronizadas'] and not informe['devueltas']:
+        print("No hay sesiones en RAM.")
+    return 0
+
+def cmd_delete(manager, args):
+    manager.reconciliar(adoptar=True)
+    codigo = 0
+    for nombre in args.nombres:
+        if not manager.store.existe(nombre):
+            print(f"Error: No existe la sesión: {nombre}", file=sys.stderr)
+            codigo = 1
+            continue
+        try:
+            manager.borrar(nombre)
+        except SessionRunningError as e:
+            print(f"Error: {e} Ciérrela antes de borrarla.", file=sys.stderr)
+            codigo = 1
+            continue
+        except (OSError, sqlite3.Error) as e:
+            print(f"Error al borrar '{nombre}': {e}", file=sys.stderr)
+            codigo = 1
+            continue
+        if not args.json:
+            print(f"Sesión '{nombre}' borrada.")
+    if not args.no_purge:
+        liberado = manager.purgar()
+        if not args.json and liberado:
+            print(f"Espacio liberado: {format_size(liberado)}")
+    return codigo
+
+def cmd_du(manager, args):
+    desconocidas = [nombre for nombre in args.nombres if not manager.store.existe(nombre)]
+    if desconocidas:
+        print(f"Error: No existe la sesión: {', '.join(desconocidas)}", file=sys.stderr)
+        return 1
+    tamanos = manager.medir(args.nombres or None)
+    total, real = manager.uso(list(tamanos))
+    libre = espacio_libre(RUTA_STORAGE)
+    if args.json:
+        imprimir_json({'sesiones': tamanos, 'total': total, 'real': real, 'libre': libre})
+        return 0
+    for nombre in sorted(tamanos, key=str.casefold):
+        print(f"{format_size(tamanos[nombre])}\t{nombre}")
+    print(f"{format_size(total)}\tTotal")
+    if real != total:
+        print(f"{format_size(real)}\tTotal real (ficheros compartidos entre sesiones contados una vez)")
+    print(f"{format_size(libre)}\tEspacio libre")
+    return 0
+
+def cmd_cache(manager, args):
+    desconocidas = [nombre for nombre in args.nombres if not manager.store.existe(nombre)]
+    if desconocidas:
+        print(f"Error: No existe la sesión: {', '.join(desconocidas)}", file=sys.stderr)
+        return 1
+    nombres = args.nombres or list(manager.store.listar())
+
+    if args.accion == 'show':
+        manager.medir(nombres)  # Sin escaneo en segundo plano, el índice puede estar desfasado
+        desglose = manager.desglose_cache(nombres)
+        if args.json:
+            imprimir_json(desglose)
+            return 0
+        etiquetas = {categoria: etiqueta for categoria, (etiqueta, _) in CachePruner.CATEGORIAS.items()}
+        etiquetas['otros'] = "Resto del perfil"
+        for categoria, tamano in desglose.items():
+            print(f"{format_size(tamano)}\t{etiquetas[categoria]} ({categoria})")
+        print(f"{format_size(sum(desglose.values()))}\tTotal")
+        return 0
+
+    liberados, omitidas = manager.limpiar_cache(nombres, args.categorias)
+    if args.json:
+        imprimir_json({'liberado': liberados, 'omitidas': omitidas})
+    else:
+        for nombre in sorted(liberados, key=str.casefold):
+            if liberados[nombre]:
+                print(f"{format_size(liberados[nombre])}\t{nombre}")
+        print(f"{format_size(sum(liberados.values()))}\tTotal liberado")
+        if omitidas:
+            print(f"Sesiones en ejecución omitidas: {', '.join(omitidas)}")
+    return 0
+
+def cmd_dedup(manager, args):
+    try:
+        resultado = manager.deduplicar(simular=args.dry_run, enlaces_duros=args.hardlinks or None)
+    except OSError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    if args.json:
+        imprimir_json(resultado)
+        return 0
+    print(f"Duplicados encontrados: {resultado['duplicados']} en {resultado['grupos']} grupos")
+    if args.dry_run:
+        print(f"Espacio recuperable: {format_size(resultado['recuperado'])}")
+    else:
+        print(f"Compartidos por reflink: {resultado['reflink']}")
+        print(f"Sustituidos por enlaces duros: {resultado['enlaces']}")
+        print(f"Espacio recuperado: {format_size(resultado['recuperado'])}")
+    if resultado['omitidas']:
+        print(f"Sesiones en ejecución omitidas: {', '.join(resultado['omitidas'])}")
+    return 0
+
+def cmd_compact(manager, args):
+    desconocidas = [nombre for nombre in args.nombres if not manager.store.existe(nombre)]
+    if desconocidas:
+        print(f"Error: No existe la sesión: {', '.join(desconocidas)}", file=sys.stderr)
+        return 1
+    resultados, omitidas = manager.compactar(args.nombres or None, max_workers=args.workers)
+    if args.json:
+        imprimir_json({'bases': resultados, 'omitidas': omitidas})
+    else:
+        for r in resultados:
+            relativa = os.path.relpath(r['ruta'], manager.ruta(r['sesion'])) if r['ruta'] is not None else '-'
+            detalle = (f"{format_size(r['antes'])} → {format_size(r['despues'])}" if r['estado'] == 'ok'
+                       else f"{r['estado']}: {r['error']}")
+            print(f"{r['sesion']}\t{relativa}\t{detalle}")
+        compactadas = [r for r in resultados if r['estado'] == 'ok']
+        antes = sum(r['antes'] for r in compactadas)
+        despues = sum(r['despues'] for r in compactadas)
+        print(f"Total: {format_size(antes)} → {format_size(despues)} ({len(compactadas)} bases)")
+        if omitidas:
+            print(f"Sesiones en ejecución omitidas: {', '.join(omitidas)}")
+    return 0 if all(r['estado'] != 'error' for r in resultados) else 1
+
+def cmd_archive(manager, args):
+    desconocidas = [nombre for nombre in args.nombres if not manager.store.existe(nombre)]
+    if desconocidas:
+        print(f"Error: No existe la sesión: {', '.join(desconocidas)}", file=sys.stderr)
+        return 1
+    try:
+        if args.accion == 'restore':
+            restauradas = manager.restaurar(args.nombres)
+            if args.json:
+                imprimir_json(restauradas)
+            else:
+                for nombre in restauradas:
+                    print(f"Sesión '{nombre}' restaurada.")
+            return 0
+        archivadas, omitidas = manager.archivar(args.nombres)
+    except (ValueError, OSError, sqlite3.Error) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    manager.purgar()
+    if args.json:
+        imprimir_json({'archivadas': archivadas, 'omitidas': omitidas})
+    else:
+        for nombre, (antes, despues) in archivadas.items():
+            print(f"{nombre}\t{format_size(antes)} → {format_size(despues)}")
+        if omitidas:
+            print(f"Sesiones en ejecución omitidas: {', '.join(omitidas)}")
+    return 0 if not omitidas else 1
+
+def cmd_export(manager, args):
+    try:
+        exportadas, omitidas = manager.exportar(args.nombres, args.output)
+    except KeyError as e:
+        print(f"Error: {e.args[0]}", file=sys.stderr)
+        return 1
+    except (ValueError, OSError) as e:
+        print(f"Error al exportar: {e}", file=sys.stderr)
+        return 1
+    if args.json:
+        imprimir_json({'exportadas': exportadas, 'omitidas': omitidas})
+    else:
+        for nombre, ruta in exportadas.items():
+            print(f"{nombre}\t{ruta}")
+        if omitidas:
+            print(f"Sesiones en ejecución omitidas: {', '.join(omitidas)}")
+    return 0 if not omitidas else 1
+
+def cmd_import(manager, args):
+    if args.name and len(args.archivos) > 1:
+        print("Error: --name solo se puede usar con un único archivo.", file=sys.stderr)
+        return 1
+    codigo, importadas = 0, []
+    for archivo in args.archivos:
+        try:
+            nombre, creada = manager.importar(archivo, args.name)
+        except (ValueError, OSError, sqlite3.Error) as e:
+            print(f"Error al importar '{archivo}': {e}", file=sys.stderr)
+            codigo = 1
+            continue
+        importadas.append({'nombre': nombre, 'creada': creada})
+        if not args.json:
+            print(f"Sesión '{nombre}' importada.")
+    if args.json:
+        imprimir_json(importadas)
+    return codigo
+
+def cmd_evict(manager, args):
+    gb = 1024 ** 3
+    minimo = int(args.min * gb) if args.min is not None else None
+    objetivo = int(args.target * gb) if args.target is not None else None
+    try:
+        informe = manager.liberar_espacio(simular=args.dry_run, minimo=minimo, objetivo=objetivo)
+    except (ValueError, OSError, sqlite3.Error) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    if args.json:
+        imprimir_json(informe)
+        return 0
+    if not informe['minimo']:
+        print("El archivado automático está desactivado: indique --min o configure archivado_libre_minimo_gb.")
+        return 0
+    print(f"Espacio libre: {format_size(informe['libre'])} "
+          f"(mínimo {format_size(informe['minimo'])}, objetivo {format_size(informe['objetivo'])})")
+    if len(informe['volumenes']) > 1:  # Cada volumen se libera por separado
+        for volumen in informe['volumenes']:
+            aviso = " (por debajo del mínimo)" if volumen['activado'] else ""
+            print(f"  {', '.join(volumen['raices'])}: {format_size(volumen['libre'])}{aviso}")
+    if not informe['activado'] and not args.dry_run:
+        print("Hay espacio suficiente; no se archiva nada.")
+        return 0
+    for sesion in informe['sesiones']:
+        detalle = f" → {format_size(sesion['archivo'])}" if 'archivo' in sesion else ""
+        print(f"{sesion['nombre']}\t{sesion['ultimo_uso']}\t{format_size(sesion['tamano'])}{detalle}")
+    if args.dry_run:
+        if not informe['activado']:
+            print("El espacio libre está por encima del mínimo: ahora no se archivaría nada.")
+        print(f"Se archivarían {len(informe['sesiones'])} sesiones.")
+    else:
+        print(f"Sesiones archivadas: {len(informe['sesiones'])}. "
+              f"Espacio libre: {format_size(informe['libre_final'])}")
+        if len(informe['volumenes']) > 1:
+            for volumen in informe['volumenes']:
+                print(f"  {', '.join(volumen['raices'])}: {format_size(volumen['libre_final'])}")
+    return 0
+
+def cmd_roots(manager, args):
+    try:
+        if args.accion == 'add':
+            raiz = manager.agregar_raiz(args.ruta)
+            if not args.json:
+                print(f"Raíz '{raiz}' añadida.")
+            return 0
+        if args.accion == 'remove':
+            raiz = resolver_raiz(manager, args.ruta)
+            manager.quitar_raiz(raiz)
+            if not args.json:
+                print(f"Raíz '{raiz}' quitada.")
+            return 0
+    except (ValueError, OSError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    volumenes = manager.volumenes(carga=True)
+    if args.json:
+        imprimir_json(volumenes)
+        return 0
+    for v in volumenes:
+        if v['libre'] is None:
+            print(f"{v['raiz']}\tno disponible\t{v['sesiones']} sesiones")
+            continue
+        print(f"{v['raiz']}\t{format_size(v['libre'])} libres de {format_size(v['capacidad'])}\t"
+              f"E/S {v['carga'] * 100:.0f}%\t{v['sesiones']} sesiones")
+    return 0
+
+def cmd_move(manager, args):
+    desconocidas = [nombre for nombre in args.nombres if not manager.store.existe(nombre)]
+    if desconocidas:
+        print(f"Error: No existe la sesión: {', '.join(desconocidas)}", file=sys.stderr)
+        return 1
+    try:
+        movidas, omitidas = manager.mover(args.nombres, resolver_raiz(manager, args.to))
+    except (ValueError, OSError, sqlite3.Error) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    manager.purgar()
+    if args.json:
+        imprimir_json({'movidas': movidas, 'omitidas': omitidas})
+    else:
+        for nombre, raiz in movidas.items():
+            print(f"{nombre}\t{raiz}")
+        if omitidas:
+            print(f"Sesiones en ejecución omitidas: {', '.join(omitidas)}")
+    return 0 if not omitidas else 1
+
+def cmd_template(manager, args):
+    try:
+        if args.accion == 'save':
+            manager.crear_plantilla(args.nombre, args.sesion)
+            if not args.json:
+                print(f"Plantilla '{args.nombre}' creada desde la sesión '{args.sesion}'.")
+        elif args.accion == 'delete':
+            manager.borrar_plantilla(args.nombre)
+            if not args.json:
+                print(f"Plantilla '{args.nombre}' borrada.")
+            manager.purgar()
+        else:
+            plantillas = manager.plantillas()
+            if args.json:
+                imprimir_json(plantillas)
+            else:
+                for nombre in plantillas:
+                    print(nombre)
+    except (ValueError, SessionRunningError, OSError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+def crear_parser():
+    parser = argparse.ArgumentParser(
+        prog='cli.py',
+        description="Gestiona sesiones de Chrome sin interfaz gráfica."
+    )
+    parser.add_argument('-C', '--base', metavar='DIR',
+                        help="Directorio que contiene Storage/ (por defecto, el actual)")
+    parser.add_argument('--json', action='store_true', help="Salida en formato JSON")
+    subparsers = parser.add_subparsers(dest='comando', required=True)
+
+    p = subparsers.add_parser('list', help="Lista las sesiones y su estado")
+    p.set_defaults(func=cmd_list)
+
+    p = subparsers.add_parser('create', help="Crea una o varias sesiones")
+    p.add_argument('nombres', nargs='+', metavar='nombre')
+    p.add_argument('--template', metavar='PLANTILLA', help="Clona las sesiones desde una plantilla")
+    p.add_argument('--launch', action='store_true', help="Lanza las sesiones después de crearlas")
+    p.add_argument('--root', metavar='RAIZ',
+                   help="Raíz de almacenamiento (por defecto, la de más espacio libre y menos carga)")
+    p.add_argument('--preset', choices=list(PRESETS_LANZAMIENTO),
+                   help=f"Preset de lanzamiento (por defecto, {PRESET_PREDETERMINADO})")
+    p.add_argument('--url', action='append', help="URL de inicio (se puede repetir)")
+    p.set_defaults(func=cmd_create)
+
+    p = subparsers.add_parser('launch', help="Lanza una o varias sesiones")
+    p.add_argument('nombres', nargs='+', metavar='nombre')
+    p.set_defaults(func=cmd_launch)
+
+    p = subparsers.add_parser('top', help="Muestra el consumo de CPU, memoria y disco de las sesiones abiertas")
+    p.add_argument('nombres', nargs='*', metavar='nombre')
+    p.add_argument('-n', '--iterations', type=int, default=1, help="Número de muestras (por defecto, 1)")
+    p.add_argument('--interval', type=float, default=2.0, help="Segundos entre muestras (por defecto, 2)")
+    p.set_defaults(func=cmd_top)
+
+    p = subparsers.add_parser('warm', help="Ajusta la reserva de sesiones precalentadas sin ventana")
+    p.add_argument('--dry-run', action='store_true', help="Solo muestra qué sesiones se precalentarían o cerrarían")
+    p.add_argument('--stop', action='store_true', help="Cierra todas las sesiones precalentadas")
+    p.add_argument('--chrome', help="Ruta del ejecutable de Chrome")
+    p.set_defaults(func=cmd_warm)
+
+    p = subparsers.add_parser('preset', help="Presets de lanzamiento y URLs de inicio de las sesiones")
+    acciones = p.add_subparsers(dest='accion', required=True)
+    acciones.add_parser('list', help="Lista los presets disponibles y sus opciones de Chrome")
+    a = acciones.add_parser('show', help="Muestra la configuración de arranque de las sesiones")
+    a.add_argument('nombres', nargs='*', metavar='nombre', help="Sesiones (por defecto, todas)")
+    a = acciones.add_parser('set', help="Cambia la configuración de arranque (se aplica al siguiente lanzamiento)")
+    a.add_argument('nombres', nargs='+', metavar='nombre')
+    a.add_argument('--preset', choices=list(PRESETS_LANZAMIENTO), help="Preset de lanzamiento")
+    a.add_argument('--url', action='append', help="URL de inicio (se puede repetir; sustituye a las anteriores)")
+    a.add_argument('--no-urls', action='store_true', help="Vuelve a la página de inicio predeterminada")
+    a.add_argument('--flag', action='append',
+                   help="Opción adicional de Chrome, p. ej. --flag=--lang=es (se puede repetir; sustituye a las anteriores)")
+    a.add_argument('--no-flags', action='store_true', help="Quita las opciones adicionales")
+    p.set_defaults(func=cmd_preset)
+
+    p = subparsers.add_parser('latency', help="Muestra los percentiles del tiempo de arranque de las sesiones")
+    p.add_argument('nombres', nargs='*', metavar='nombre', help="Sesiones (por defecto, todas)")
+    p.add_argument('--phase', choices=list(ETIQUETAS_FASES), default='total',
+                   help="Fase cuyos percentiles p50/p95/p99 se muestran (por defecto, total)")
+    p.add_argument('--no-warm', action='store_true', help="No cuenta los arranques de la reserva precalentada")
+    p.set_defaults(func=cmd_latency)
+
+    p = subparsers.add_parser('reap', help="Cierra las sesiones inactivas para liberar memoria")
+    p.add_argument('nombres', nargs='*', metavar='nombre',
+                   help="Sesiones que cerrar directamente (por defecto, las que estén inactivas)")
+    p.add_argument('--window', type=float, default=60.0,
+                   help="Segundos de observación sin actividad (por defecto, 60)")
+    p.add_argument('--interval', type=float, default=5.0, help="Segundos entre muestras (por defecto, 5)")
+    p.add_argument('--dry-run', action='store_true', help="Solo muestra qué sesiones se cerrarían")
+    p.set_defaults(func=cmd_reap)
+
+    p = subparsers.add_parser('cdp', help="Opera a la vez sobre las sesiones abiertas por su puerto de depuración")
+    acciones = p.add_subparsers(dest='accion', required=True)
+    a = acciones.add_parser('tabs', help="Lista las pestañas abiertas")
+    a.add_argument('nombres', nargs='*', metavar='nombre', help="Sesiones (por defecto, todas las abiertas)")
+    a = acciones.add_parser('open', help="Abre URLs en pestañas nuevas")
+    a.add_argument('nombres', nargs='*', metavar='nombre', help="Sesiones (por defecto, todas las abiertas)")
+    a.add_argument('--url', action='append', required=True, help="URL que abrir (se puede repetir)")
+    a = acciones.add_parser('clear-cache', help="Vacía la caché HTTP sin cerrar Chrome")
+    a.add_argument('nombres', nargs='*', metavar='nombre', help="Sesiones (por defecto, todas las abiertas)")
+    a = acciones.add_parser('close', help="Cierra Chrome de forma ordenada")
+    a.add_argument('nombres', nargs='+', metavar='nombre')
+    p.set_defaults(func=cmd_cdp)
+
+    p = subparsers.add_parser('sync', help="Guarda en disco los cambios de las sesiones ejecutadas en RAM")
+    p.add_argument('nombres', nargs='*', metavar='nombre')
+    p.set_defaults(func=cmd_sync)
+
+    p = subparsers.add_parser('delete', help="Borra una o varias sesiones")
+    p.add_argument('nombres', nargs='+', metavar='nombre')
+    p.add_argument('--no-purge', action='store_true',
+                   help="Deja los perfiles en la papelera sin liberar el espacio")
+    p.set_defaults(func=cmd_delete)
+
+    p = subparsers.add_parser('template', help="Gestiona las plantillas de perfil")
+    acciones = p.add_subparsers(dest='accion', required=True)
+    acciones.add_parser('list', help="Lista las plantillas")
+    a = acciones.add_parser('save', help="Guarda el perfil de una sesión como plantilla")
+    a.add_argument('nombre')
+    a.add_argument('--from', dest='sesion', required=True, metavar='SESION',
+                   help="Sesión ya configurada que se copia")
+    a = acciones.add_parser('delete', help="Borra una plantilla")
+    a.add_argument('nombre')
+    p.set_defaults(func=cmd_template)
+
+    p = subparsers.add_parser('du', help="Muestra el uso de almacenamiento")
+    p.add_argument('nombres', nargs='*', metavar='nombre')
+    p.set_defaults(func=cmd_du)
+
+    p = subparsers.add_parser('cache', help="Desglose y limpieza de las cachés de Chrome")
+    acciones = p.add_subparsers(dest='accion', required=True)
+    a = acciones.add_parser('show', help="Muestra el espacio de cada categoría de caché")
+    a.add_argument('nombres', nargs='*', metavar='nombre')
+    a = acciones.add_parser('prune', help="Vacía las cachés de las sesiones detenidas")
+    a.add_argument('nombres', nargs='*', metavar='nombre')
+    a.add_argument('-c', '--category', dest='categorias', action='append',
+                   choices=list(CachePruner.CATEGORIAS), help="Categoría a vaciar (por defecto, todas)")
+    p.set_defaults(func=cmd_cache)
+
+    p = subparsers.add_parser('dedup', help="Deduplica ficheros idénticos entre sesiones detenidas")
+    p.add_argument('--dry-run', action='store_true', help="Solo informa del espacio recuperable")
+    p.add_argument('--hardlinks', action='store_true',
+                   help="Sin reflink, enlaza los ficheros de extensiones y componentes")
+    p.set_defaults(func=cmd_dedup)
+
+    p = subparsers.add_parser('compact', help="Compacta las bases de datos de Chrome de las sesiones detenidas")
+    p.add_argument('nombres', nargs='*', metavar='nombre')
+    p.add_argument('--workers', type=int, help="Procesos simultáneos (por defecto, según los núcleos)")
+    p.set_defaults(func=cmd_compact)
+
+    p = subparsers.add_parser('archive', help="Pasa sesiones detenidas a almacenamiento en frío")
+    p.add_argument('nombres', nargs='+', metavar='nombre')
+    p.set_defaults(func=cmd_archive, accion='archive')
+
+    p = subparsers.add_parser('restore', help="Devuelve al disco el perfil de sesiones archivadas")
+    p.add_argument('nombres', nargs='+', metavar='nombre')
+    p.set_defaults(func=cmd_archive, accion='restore')
+
+    p = subparsers.add_parser('export', help="Exporta sesiones a archivos comprimidos")
+    p.add_argument('nombres', nargs='+', metavar='nombre')
+    p.add_argument('-o', '--output', required=True, metavar='DIR', help="Directorio de destino")
+    p.set_defaults(func=cmd_export)
+
+    p = subparsers.add_parser('import', help="Importa sesiones exportadas")
+    p.add_argument('archivos', nargs='+', metavar='archivo')
+    p.add_argument('--name', help="Nombre de la sesión importada (por defecto, el guardado en el archivo)")
+    p.set_defaults(func=cmd_import)
+
+    p = subparsers.add_parser('evict', help="Archiva las sesiones menos usadas si queda poco espacio libre")
+    p.add_argument('--dry-run', action='store_true', help="Solo muestra qué sesiones se archivarían")
+    p.add_argument('--min', type=float, metavar='GB', help="Espacio libre mínimo que activa el archivado")
+    p.add_argument('--target', type=float, metavar='GB', help="Espacio libre que se quiere recuperar")
+    p.set_defaults(func=cmd_evict)
+
+    p = subparsers.add_parser('roots', help="Gestiona las raíces de almacenamiento de sesiones")
+    acciones = p.add_subparsers(dest='accion')
+    acciones.add_parser('list', help="Muestra el espacio libre, la carga y las sesiones de cada raíz")
+    a = acciones.add_parser('add', help="Añade una raíz (p. ej. en otro disco)")
+    a.add_argument('ruta')
+    a = acciones.add_parser('remove', help="Quita una raíz sin sesiones")
+    a.add_argument('ruta')
+    p.set_defaults(func=cmd_roots, accion='list')
+
+    p = subparsers.add_parser('move', help="Mueve sesiones detenidas a otra raíz de almacenamiento")
+    p.add_argument('nombres', nargs='+', metavar='nombre')
+    p.add_argument('--to', required=True, metavar='RAIZ', help="Raíz de destino")
+    p.set_defaults(func=cmd_move)
+
+    # Opciones de lanzamiento compartidas por 'create --launch' y 'launch'
+    for nombre in ('create', 'launch'):
+        p = subparsers.choices[nombre]
+        p.add_argument('--chrome', help="Ruta del ejecutable de Chrome")
+        p.add_argument('--concurrency', type=int, help="Lanzamientos simultáneos")
+        p.add_argument('--interval', type=float, help="Segundos entre lanzamientos")
+        p.add_argument('--timeout', type=float, help="Segundos de espera por sesión")
+        p.add_argument('--ram', action='store_true',
+                       help="Ejecuta con el perfil en RAM (tmpfs); los cambios se guardan con 'sync' o al reconciliar")
+    return parser
+
+def main(argv=None):
+    args = crear_parser().parse_args(argv)
+    if args.base:
+        os.chdir(args.base)
+    try:
+        manager = SessionManager()
+    except (OSError, sqlite3.Error) as e:
+        print(f"Error al abrir el almacén de sesiones: {e}", file=sys.stderr)
+        return 2
+    try:
+        return args.func(manager, args)
+    except KeyboardInterrupt:
+        return 130
+    finally:
+        manager.cerrar()
+
+
+if __name__ == '__main__':
+    multiprocessing.freeze_support()
+    sys.exit(main())
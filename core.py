@@ -0,0 +1,4463 @@
+"""
+Núcleo del gestor de sesiones: almacenamiento, tamaños, procesos y lanzamiento de Chrome.
+
+No importa PyQt5, de modo que lo pueden usar tanto la interfaz gráfica (main.py) como la
+línea de comandos (cli.py) en servidores sin pantalla. Los módulos que solo necesitan algunas
+operaciones (urllib, asyncio, tarfile, cdp...) se importan dentro de las funciones que los usan,
+para que la línea de comandos arranque rápido.
+"""
+
+import os
+import sys
+import json
+import sqlite3
+import socket
+import time
+import shutil
+import struct
+import errno
+import signal
+import hashlib
+import threading
+import subprocess
+from datetime import datetime
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+
+
+
+
+'''
+>>> Rutas de almacenamiento (relativas al directorio de trabajo)
+'''
+RUTA_STORAGE = 'Storage'
+RUTA_AJUSTES = os.path.join(RUTA_STORAGE, 'Settings')
+RUTA_SESIONES = os.path.join(RUTA_STORAGE, 'Sessions')
+RUTA_PAPELERA = os.path.join(RUTA_STORAGE, 'Trash')
+RUTA_PLANTILLAS = os.path.join(RUTA_STORAGE, 'Templates')
+RUTA_ARCHIVO = os.path.join(RUTA_STORAGE, 'Archive')
+
+FORMATO_FECHA = "%Y-%m-%d %H:%M:%S"
+
+
+
+
+
+def ruta_sesion(nombre_sesion, raiz=None):
+    """
+    Carpeta del perfil de Chrome de una sesión dentro de su raíz de almacenamiento (por
+    defecto, Storage/Sessions).
+    """
+    return os.path.join(raiz or RUTA_SESIONES, nombre_sesion)
+
+def ruta_plantilla(nombre_plantilla):
+    """
+    Carpeta del perfil de Chrome de una plantilla.
+    """
+    return os.path.join(RUTA_PLANTILLAS, nombre_plantilla)
+
+def ruta_archivo(fichero):
+    """
+    Ruta de un archivo comprimido de sesión en el almacenamiento en frío.
+    """
+    return os.path.join(RUTA_ARCHIVO, fichero)
+
+def validar_nombre_sesion(nombre_sesion):
+    """
+    Retorna el nombre limpio o lanza ValueError si no sirve como nombre de carpeta.
+    """
+    nombre_sesion = (nombre_sesion or '').strip()
+    if not nombre_sesion:
+        raise ValueError("Debe ingresar un nombre para la sesión.")
+    if nombre_sesion in ('.', '..') or any(c in nombre_sesion for c in '/\\:*?"<>|'):
+        raise ValueError("El nombre de la sesión no puede contener / \\ : * ? \" < > |.")
+    return nombre_sesion
+
+def escribir_json_atomico(ruta, datos, **kwargs):
+    """
+    Escribe un JSON en un fichero temporal y lo renombra sobre el destino, de modo que una
+    interrupción nunca deja el fichero a medio escribir.
+    """
+    os.makedirs(os.path.dirname(ruta), exist_ok=True)
+    temporal = f"{ruta}.tmp"
+    with open(temporal, 'w', encoding='utf-8') as f:
+        json.dump(datos, f, **kwargs)
+    os.replace(temporal, ruta)
+
+class SessionStore:
+    """
+    Almacén transaccional de sesiones sobre SQLite (Storage/Settings/sessions.db).
+
+    Cada alta, baja o cambio de metadatos es una transacción propia sobre una fila, confirmada
+    de forma duradera (WAL + synchronous=FULL), así que un fallo a mitad de escritura no puede
+    perder el resto de sesiones. La primera vez importa el antiguo sessions.json y lo conserva
+    renombrado como sessions.json.migrated.
+    """
+
+    # Cada entrada lleva el esquema a la versión indicada por su posición (PRAGMA user_version)
+    MIGRACIONES = [
+        """
+        CREATE TABLE sessions (
+            name TEXT PRIMARY KEY,
+            created TEXT NOT NULL,
+            last_used TEXT,
+            tags TEXT NOT NULL DEFAULT '[]',
+            launch_flags TEXT NOT NULL DEFAULT '[]'
+        )
+        """,
+        "ALTER TABLE sessions ADD COLUMN template TEXT",
+        "ALTER TABLE sessions ADD COLUMN archive TEXT",
+        "ALTER TABLE sessions ADD COLUMN root TEXT",
+        "ALTER TABLE sessions ADD COLUMN suspended TEXT",
+        """
+        CREATE TABLE launches (
+            id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL,
+            started TEXT NOT NULL,
+            hidden INTEGER NOT NULL DEFAULT 0,
+            port REAL, profile REAL, popen REAL, devtools REAL, load REAL, total REAL
+        )
+        """,
+        "CREATE INDEX launches_name ON launches (name, id)",
+        "ALTER TABLE sessions ADD COLUMN preset TEXT",
+        "ALTER TABLE sessions ADD COLUMN start_urls TEXT",
+    ]
+
+    FASES_LANZAMIENTO = ('port', 'profile', 'popen', 'devtools', 'load', 'total')
+
+    CAMPOS_JSON = ('tags', 'launch_flags', 'suspended', 'start_urls')
+
+    def __init__(self, ruta=None, ruta_json=None):
+        self.ruta = ruta or os.path.join(RUTA_AJUSTES, 'sessions.db')
+        self.ruta_json = ruta_json or os.path.join(RUTA_AJUSTES, 'sessions.json')
+        self.conexion = None
+        self.lock = threading.RLock()
+
+    def abrir(self):
+        os.makedirs(os.path.dirname(self.ruta), exist_ok=True)
+        self.conexion = sqlite3.connect(self.ruta, check_same_thread=False, isolation_level=None)
+        self.conexion.row_factory = sqlite3.Row
+        self.conexion.execute("PRAGMA journal_mode=WAL")
+        self.conexion.execute("PRAGMA synchronous=FULL")
+        self._migrar_esquema()
+        self._importar_json()
+        return self
+
+    def cerrar(self):
+        with self.lock:
+            if self.conexion is not None:
+                self.conexion.close()
+                self.conexion = None
+
+    def _transaccion(self, sentencias):
+        """
+        Ejecuta [(sql, parámetros), ...] en una única transacción y retorna las filas afectadas.
+        """
+        with self.lock:
+            cursor = self.conexion.cursor()
+            cursor.execute("BEGIN IMMEDIATE")
+            filas = 0
+            try:
+                for sql, parametros in sentencias:
+                    cursor.execute(sql, parametros)
+                    filas += max(cursor.rowcount, 0)
+                cursor.execute("COMMIT")
+            except BaseException:
+                cursor.execute("ROLLBACK")
+                raise
+            return filas
+
+    def _migrar_esquema(self):
+        with self.lock:
+            version = self.conexion.execute("PRAGMA user_version").fetchone()[0]
+            for numero, sql in enumerate(self.MIGRACIONES[version:], start=version + 1):
+                self._transaccion([(sql, ()), (f"PRAGMA user_version = {numero}", ())])
+
+    def _importar_json(self):
+        """
+        Migración única desde sessions.json ({nombre: fecha de creación}).
+        """
+        if not os.path.exists(self.ruta_json):
+            return
+        try:
+            with open(self.ruta_json, 'r', encoding='utf-8') as f:
+                antiguas = json.load(f)
+        except (OSError, ValueError):
+            antiguas = {}
+        if isinstance(antiguas, dict) and antiguas:
+            self._transaccion([
+                ("INSERT OR IGNORE INTO sessions (name, created) VALUES (?, ?)", (nombre, str(creada)))
+                for nombre, creada in antiguas.items()
+            ])
+        os.replace(self.ruta_json, f"{self.ruta_json}.migrated")
+
+    def _fila(self, fila):
+        datos = dict(fila)
+        for campo in self.CAMPOS_JSON:
+            if datos[campo] is not None:
+                datos[campo] = json.loads(datos[campo])
+        return datos
+
+    def listar(self):
+        """
+        Retorna {nombre: fecha de creación} de todas las sesiones.
+        """
+        with self.lock:
+            return dict(self.conexion.execute("SELECT name, created FROM sessions").fetchall())
+
+    def archivadas(self):
+        """
+        Retorna {nombre: fichero de Storage/Archive} de las sesiones archivadas.
+        """
+        with self.lock:
+            return dict(self.conexion.execute(
+                "SELECT name, archive FROM sessions WHERE archive IS NOT NULL").fetchall())
+
+    def raiz(self, nombre):
+        """
+        Raíz de almacenamiento de una sesión, o None si está en la predeterminada.
+        """
+        with self.lock:
+            fila = self.conexion.execute("SELECT root FROM sessions WHERE name = ?", (nombre,)).fetchone()
+        return fila[0] if fila else None
+
+    def raices(self):
+        """
+        Retorna {nombre: raíz} de las sesiones que no están en la raíz predeterminada.
+        """
+        with self.lock:
+            return dict(self.conexion.execute(
+                "SELECT name, root FROM sessions WHERE root IS NOT NULL").fetchall())
+
+    def presets(self):
+        """
+        Retorna {nombre: preset} de las sesiones que no usan el preset predeterminado.
+        """
+        with self.lock:
+            return dict(self.conexion.execute(
+                "SELECT name, preset FROM sessions WHERE preset IS NOT NULL").fetchall())
+
+    def suspendidas(self):
+        """
+        Retorna {nombre: {'fecha', 'pestanas'}} de las sesiones cerradas por inactividad que aún
+        no se han vuelto a lanzar.
+        """
+        with self.lock:
+            filas = self.conexion.execute(
+                "SELECT name, suspended FROM sessions WHERE suspended IS NOT NULL").fetchall()
+        return {nombre: json.loads(datos) for nombre, datos in filas}
+
+    def ultimos_usos(self):
+        """
+        Retorna {nombre: fecha del último lanzamiento} de las sesiones no archivadas; las que
+        nunca se lanzaron cuentan desde su creación.
+        """
+        with self.lock:
+            return dict(self.conexion.execute(
+                "SELECT name, COALESCE(last_used, created) FROM sessions WHERE archive IS NULL").fetchall())
+
+    def obtener(self, nombre):
+        """
+        Retorna todos los datos de una sesión, o None si no existe.
+        """
+        with self.lock:
+            fila = self.conexion.execute("SELECT * FROM sessions WHERE name = ?", (nombre,)).fetchone()
+        return self._fila(fila) if fila else None
+
+    def existe(self, nombre):
+        with self.lock:
+            return self.conexion.execute("SELECT 1 FROM sessions WHERE name = ?", (nombre,)).fetchone() is not None
+
+    def agregar(self, nombre, creada=None, **campos):
+        """
+        Da de alta una sesión. Lanza ValueError si ya existe.
+        """
+        return self.agregar_varias([nombre], creada, **campos)
+
+    def agregar_varias(self, nombres, creada=None, raices=None, **campos):
+        """
+        Da de alta varias sesiones con los mismos metadatos en una sola transacción: o se
+        crean todas o ninguna. `raices` ({nombre: raíz}) indica las que no van en la raíz
+        predeterminada. Lanza ValueError si alguna ya existe.
+        """
+        creada = creada or datetime.now().strftime(FORMATO_FECHA)
+        raices = raices or {}
+        columnas = ['name', 'created', 'root']
+        valores = [creada]
+        for campo, valor in campos.items():
+            columnas.append(campo)
+            valores.append(json.dumps(valor) if campo in self.CAMPOS_JSON and valor is not None else valor)
+        sql = f"INSERT INTO sessions ({', '.join(columnas)}) VALUES ({', '.join('?' * len(columnas))})"
+        try:
+            self._transaccion([(sql, [nombre, creada, raices.get(nombre)] + valores[1:]) for nombre in nombres])
+        except sqlite3.IntegrityError:
+            raise ValueError("La sesión ya existe.")
+        return creada
+
+    def eliminar(self, nombre):
+        return self._transaccion([("DELETE FROM sessions WHERE name = ?", (nombre,)),
+                                  ("DELETE FROM launches WHERE name = ?", (nombre,))]) > 0
+
+    def registrar_lanzamiento(self, nombre, fases, oculta=False, maximo=200):
+        """
+        Guarda la duración en segundos de cada fase de un arranque ({fase: segundos o None},
+        ver FASES_LANZAMIENTO) y conserva solo los `maximo` arranques más recientes de la sesión.
+        """
+        columnas = ', '.join(self.FASES_LANZAMIENTO)
+        marcadores = ', '.join('?' * (len(self.FASES_LANZAMIENTO) + 3))
+        valores = [nombre, datetime.now().strftime(FORMATO_FECHA), int(oculta)]
+        self._transaccion([
+            (f"INSERT INTO launches (name, started, hidden, {columnas}) VALUES ({marcadores})",
+             valores + [fases.get(fase) for fase in self.FASES_LANZAMIENTO]),
+            ("DELETE FROM launches WHERE name = ? AND id NOT IN "
+             "(SELECT id FROM launches WHERE name = ? ORDER BY id DESC LIMIT ?)", (nombre, nombre, maximo)),
+        ])
+
+    def lanzamientos(self, nombres=None):
+        """
+        Retorna {nombre: [{'started', 'hidden', fase: segundos...}]} con los arranques guardados,
+        del más antiguo al más reciente.
+        """
+        with self.lock:
+            filas = self.conexion.execute("SELECT * FROM launches ORDER BY id").fetchall()
+        resultado = {}
+        for fila in filas:
+            if nombres is None or fila['name'] in nombres:
+                datos = dict(fila)
+                del datos['id']
+                resultado.setdefault(datos.pop('name'), []).append(datos)
+        return resultado
+
+    def actualizar(self, nombre, **campos):
+        """
+        Modifica metadatos de una sesión (tags, last_used, launch_flags, preset, start_urls,
+        template, archive, root, suspended, ...). None deja el campo vacío (NULL).
+        """
+        if not campos:
+            return False
+        asignaciones = ', '.join(f"{campo} = ?" for campo in campos)
+        valores = [json.dumps(valor) if campo in self.CAMPOS_JSON and valor is not None else valor
+                   for campo, valor in campos.items()]
+        return self._transaccion([(f"UPDATE sessions SET {asignaciones} WHERE name = ?", valores + [nombre])]) > 0
+
+class SizeIndex:
+    """
+    Índice persistente de tamaños por directorio.
+
+    Para cada directorio raíz (una sesión) guarda, por subdirectorio, su mtime, el tamaño de
+    sus propios ficheros, el tamaño agregado y la lista de subdirectorios. Un reescaneo solo
+    lista los directorios cuyo mtime cambió; del resto se reutilizan los datos guardados.
+    Como Chrome modifica ficheros en sitio sin cambiar el mtime del directorio, cada raíz se
+    verifica por completo cuando su último escaneo completo supera `max_edad` segundos.
+
+    Aparte guarda los ficheros que la deduplicación dejó compartiendo bloques (reflink) con
+    otro de otra sesión, que el escaneo no puede distinguir de una copia.
+    """
+
+    VERSION = 1
+
+    def __init__(self, ruta=None, max_edad=6 * 3600):
+        self.ruta = ruta or os.path.join(RUTA_AJUSTES, 'size_index.json')
+        self.max_edad = max_edad
+        self.raices = {}
+        # raíz -> {ruta del duplicado: [tamaño, mtime_ns, raíz del original, ruta del original, mtime_ns]}
+        self.compartidos = {}
+        self.lock = threading.Lock()
+
+    def cargar(self):
+        """
+        Carga el índice desde disco. Un fichero ausente o dañado equivale a un índice vacío.
+        """
+        try:
+            with open(self.ruta, 'r', encoding='utf-8') as f:
+                datos = json.load(f)
+            if datos.get('version') == self.VERSION:
+                self.raices = datos.get('raices', {})
+                self.compartidos = datos.get('compartidos', {})
+        except (OSError, ValueError):
+            self.raices = {}
+            self.compartidos = {}
+        return self
+
+    def guardar(self):
+        """
+        Guarda el índice de forma atómica (fichero temporal + os.replace).
+        """
+        with self.lock:
+            escribir_json_atomico(self.ruta, {'version': self.VERSION, 'raices': self.raices,
+                                              'compartidos': self.compartidos},
+                                  separators=(',', ':'))
+
+    def clave(self, ruta):
+        return os.path.normpath(ruta)
+
+    def directorios(self, ruta, ahora=None):
+        """
+        Retorna los directorios guardados para una raíz, o {} si debe verificarse por completo.
+        """
+        with self.lock:
+            raiz = self.raices.get(self.clave(ruta))
+        if not raiz:
+            return {}
+        ahora = ahora if ahora is not None else datetime.now().timestamp()
+        if ahora - raiz.get('verificado', 0) > self.max_edad:
+            return {}
+        return raiz['directorios']
+
+    def total(self, ruta):
+        """
+        Tamaño agregado de la última instantánea de una raíz, o None si no hay datos.
+        """
+        with self.lock:
+            raiz = self.raices.get(self.clave(ruta))
+        return raiz['total'] if raiz else None
+
+    def uso(self, rutas):
+        """
+        Retorna (aparente, real) para varias raíces según la última instantánea: el aparente
+        suma el tamaño de cada raíz por separado y el real cuenta una sola vez los ficheros
+        que comparten inodo (enlaces duros) o bloques (reflink de la deduplicación) entre
+        raíces distintas. Los reflinks se comprueban con un stat: si Chrome modificó alguno de
+        los dos ficheros, sus bloques ya no se comparten y se dejan de descontar.
+        """
+        claves = {self.clave(ruta) for ruta in rutas}
+        aparente, propios, enlaces, compartido = 0, 0, {}, 0
+        with self.lock:
+            for clave in claves:
+                raiz = self.raices.get(clave)
+                if not raiz:
+                    continue
+                aparente += raiz['total']
+                for entrada in raiz['directorios'].values():
+                    propios += entrada[1]
+                    for dev, ino, tamano in (entrada[4] if len(entrada) > 4 else ()):
+                        enlaces[(dev, ino)] = tamano
+                ficheros = self.compartidos.get(clave, {})
+                for ruta, (tamano, mtime, raiz_original, original, mtime_original) in list(ficheros.items()):
+                    try:
+                        vigente = (self._firma(ruta) == (tamano, mtime)
+                                   and self._firma(original) == (tamano, mtime_original))
+                    except OSError:
+                        vigente = False
+                    if not vigente:
+                        del ficheros[ruta]
+                    elif raiz_original in claves and raiz_original in self.raices:
+                        compartido += tamano
+        return aparente, max(propios + sum(enlaces.values()) - compartido, 0)
+
+    def _firma(self, ruta):
+        st = os.stat(ruta)
+        return st.st_size, st.st_mtime_ns
+
+    def anotar_compartidos(self, pares):
+        """
+        Registra los ficheros deduplicados con reflink: [(raíz del original, ruta del original,
+        raíz del duplicado, ruta del duplicado)]. Se descuentan del uso real mientras ninguno
+        de los dos cambie.
+        """
+        for raiz_original, original, raiz, ruta in pares:
+            try:
+                tamano, mtime = self._firma(ruta)
+                tamano_original, mtime_original = self._firma(original)
+            except OSError:
+                continue
+            if tamano != tamano_original:
+                continue
+            with self.lock:
+                self.compartidos.setdefault(self.clave(raiz), {})[ruta] = [
+                    tamano, mtime, self.clave(raiz_original), original, mtime_original]
+
+    def instantanea(self, ruta):
+        """
+        Directorios de la última instantánea de una raíz ({ruta relativa: entrada}), aunque
+        haya superado `max_edad`, o {} si no hay datos.
+        """
+        with self.lock:
+            raiz = self.raices.get(self.clave(ruta))
+        return raiz['directorios'] if raiz else {}
+
+    def verificado(self, ruta):
+        """
+        Marca de tiempo del último escaneo completo de una raíz.
+        """
+        with self.lock:
+            raiz = self.raices.get(self.clave(ruta))
+        return raiz.get('verificado', 0) if raiz else 0
+
+    def actualizar(self, ruta, directorios, total, verificado):
+        """
+        Sustituye los datos de una raíz. Los directorios que ya no existen desaparecen así
+        del índice sin necesidad de una pasada de limpieza.
+        """
+        # Agregar tamaños de abajo hacia arriba: cada subdirectorio suma al de su padre
+        for rel in sorted(directorios, key=lambda r: r.count(os.sep) if r else -1, reverse=True):
+            entrada = directorios[rel]
+            entrada[2] += entrada[1]
+            if rel:
+                padre = directorios.get(os.path.dirname(rel))
+                if padre is not None:
+                    padre[2] += entrada[2]
+        with self.lock:
+            self.raices[self.clave(ruta)] = {
+                'total': total,
+                'verificado': verificado,
+                'directorios': directorios
+            }
+
+    def olvidar(self, ruta):
+        with self.lock:
+            self.raices.pop(self.clave(ruta), None)
+            self.compartidos.pop(self.clave(ruta), None)
+
+class DirectorySizer:
+    """
+    Motor de cálculo de tamaño de directorios basado en os.scandir.
+
+    Cada directorio es una tarea independiente dentro de un pool de hilos acotado, de modo que
+    varias sesiones y los subárboles grandes de una misma sesión se recorren en paralelo. Se
+    reutiliza el stat de cada DirEntry y los ficheros con varios enlaces duros se cuentan una
+    sola vez por inodo dentro de cada raíz, como hace `du`; el uso real entre raíces que
+    comparten inodos lo calcula SizeIndex.uso. Con un SizeIndex, los directorios cuyo mtime no
+    cambió no se listan.
+
+    Solo se recorren `sesiones_simultaneas` raíces a la vez para que las sesiones vayan
+    terminando de forma progresiva en lugar de hacerlo todas al final.
+    """
+
+    # Un directorio modificado durante este margen previo al escaneo podría volver a cambiar
+    # sin que su mtime lo refleje, así que no se reutiliza en el siguiente escaneo
+    MARGEN_MTIME_NS = 2 * 10 ** 9
+
+    def __init__(self, max_workers=None, indice=None, sesiones_simultaneas=None):
+        self.max_workers = max_workers or min(32, (os.cpu_count() or 1) * 4)
+        self.indice = indice
+        self.sesiones_simultaneas = sesiones_simultaneas or max(2, self.max_workers // 2)
+        self.cancelado = threading.Event()
+
+    def cancelar(self):
+        """
+        Detiene el escaneo en curso. Las raíces sin terminar no se reportan ni se indexan.
+        """
+        self.cancelado.set()
+
+    def medir(self, rutas, al_completar=None):
+        """
+        Calcula el tamaño de varios directorios a la vez.
+        Recibe un diccionario {clave: ruta} y retorna {clave: tamaño en bytes} de las raíces
+        que llegaron a completarse. `al_completar(clave, tamaño)` se invoca desde un hilo del
+        pool en cuanto termina cada raíz; si lanza una excepción, el escaneo termina igualmente
+        y `medir` la relanza al final.
+        """
+        if not rutas:
+            return {}
+
+        inicio = datetime.now().timestamp()
+        limite_mtime = int(inicio * 10 ** 9) - self.MARGEN_MTIME_NS
+        anteriores = {clave: (self.indice.directorios(ruta, inicio) if self.indice else {})
+                      for clave, ruta in rutas.items()}
+        nuevos = {clave: {} for clave in rutas}
+        totales = {clave: 0 for clave in rutas}
+
+        vistos = {clave: set() for clave in rutas}  # (st_dev, st_ino) ya contados en cada raíz
+        lock = threading.Lock()
+        pendientes = [0]
+        pendientes_raiz = {clave: 0 for clave in rutas}
+        cola = deque(rutas)
+        completadas = []
+        errores = []  # Excepciones de al_completar
+        terminado = threading.Event()
+
+        def contar_enlaces(clave, enlaces):
+            subtotal = 0
+            with lock:
+                for dev, ino, tamano in enlaces:
+                    if (dev, ino) not in vistos[clave]:
+                        vistos[clave].add((dev, ino))
+                        subtotal += tamano
+            return subtotal
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            def enviar(clave, rel):
+                with lock:
+                    pendientes[0] += 1
+                    pendientes_raiz[clave] += 1
+                executor.submit(escanear, clave, rel)
+
+            def escanear(clave, rel):
+                try:
+                    if self.cancelado.is_set():
+                        return
+                    raiz = rutas[clave]
+                    ruta = os.path.join(raiz, rel) if rel else raiz
+                    try:
+                        mtime = os.stat(ruta).st_mtime_ns
+                    except OSError:
+                        return
+
+                    anterior = anteriores[clave].get(rel)
+                    if anterior is not None and anterior[0] == mtime:
+                        propio, subdirectorios = anterior[1], anterior[3]
+                        enlaces = anterior[4] if len(anterior) > 4 else []
+                    else:
+                        propio, subdirectorios, enlaces = 0, [], []
+                        try:
+                            with os.scandir(ruta) as entradas:
+                                for entrada in entradas:
+                                    try:
+                                        if entrada.is_dir(follow_symlinks=False):
+                                            subdirectorios.append(entrada.name)
+                                        elif entrada.is_file(follow_symlinks=False):
+                                            st = entrada.stat(follow_symlinks=False)
+                                            if st.st_nlink > 1:
+                                                enlaces.append([st.st_dev, st.st_ino, st.st_size])
+                                            else:
+                                                propio += st.st_size
+                                    except OSError:
+                                        # Ficheros que Chrome borra o bloquea mientras se recorre
+                                        continue
+                        except OSError:
+                            pass
+
+                    entrada_nueva = [mtime if mtime < limite_mtime else None, propio, 0, subdirectorios]
+                    if enlaces:
+                        entrada_nueva.append(enlaces)
+                    subtotal = propio + contar_enlaces(clave, enlaces)
+
+                    for nombre in subdirectorios:
+                        enviar(clave, os.path.join(rel, nombre) if rel else nombre)
+                    with lock:
+                        nuevos[clave][rel] = entrada_nueva
+                        totales[clave] += subtotal
+                finally:
+                    finalizar(clave)
+
+            def finalizar(clave):
+                completada, siguiente = False, None
+                with lock:
+                    pendientes_raiz[clave] -= 1
+                    if pendientes_raiz[clave] == 0 and not self.cancelado.is_set():
+                        completada = True
+                        completadas.append(clave)
+                        if cola:
+                            siguiente = cola.popleft()
+                try:
+                    if completada and al_completar is not None:
+                        al_completar(clave, totales[clave])
+                except Exception as e:
+                    errores.append(e)  # Se relanza al terminar; el escaneo no debe quedarse esperando
+                finally:
+                    if siguiente is not None:
+                        enviar(siguiente, '')
+                    with lock:
+                        pendientes[0] -= 1
+                        if pendientes[0] == 0:
+                            terminado.set()
+
+            # Las raíces iniciales se sacan de la cola y se cuentan antes de enviar ninguna: los
+            # hilos del pool toman la siguiente raíz en cuanto termina una, y el contador de
+            # pendientes no debe llegar a cero mientras quedan raíces iniciales por enviar
+            with lock:
+                iniciales = [cola.popleft() for _ in range(min(self.sesiones_simultaneas, len(cola)))]
+                for clave in iniciales:
+                    pendientes[0] += 1
+                    pendientes_raiz[clave] += 1
+            for clave in iniciales:
+                executor.submit(escanear, clave, '')
+            terminado.wait()
+
+        if self.indice is not None:
+            for clave in completadas:
+                ruta = rutas[clave]
+                # Si ningún directorio se reutilizó, la raíz acaba de verificarse por completo
+                verificado = inicio if not anteriores[clave] else self.indice.verificado(ruta)
+                self.indice.actualizar(ruta, nuevos[clave], totales[clave], verificado)
+
+        if errores:
+            raise errores[0]
+        return {clave: totales[clave] for clave in completadas}
+
+    def medir_directorio(self, ruta):
+        """
+        Calcula el tamaño de un único directorio, o None si el escaneo se canceló.
+        """
+        return self.medir({ruta: ruta}).get(ruta)
+
+def proceso_vivo(pid):
+    """
+    Comprueba si existe un proceso con el PID dado de manera multiplataforma
+    """
+    if not pid or pid <= 0:
+        return False
+    if os.name == 'nt':  # Windows
+        import ctypes
+        kernel32 = ctypes.windll.kernel32
+        handle = kernel32.OpenProcess(0x1000, False, pid)  # PROCESS_QUERY_LIMITED_INFORMATION
+        if not handle:
+            return False
+        try:
+            exit_code = ctypes.c_ulong(0)
+            kernel32.GetExitCodeProcess(handle, ctypes.byref(exit_code))
+            return exit_code.value == 259  # STILL_ACTIVE
+        finally:
+            kernel32.CloseHandle(handle)
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True  # Existe, pero pertenece a otro usuario
+    return True
+
+def perfil_bloqueado(ruta_perfil, pid=None):
+    """
+    Comprueba si Chrome tiene abierto un perfil (--user-data-dir).
+
+    En Linux y macOS Chrome crea el enlace SingletonLock -> "<host>-<pid>"; en Windows mantiene
+    abierto en exclusiva el fichero "lockfile". Si se indica `pid`, el bloqueo debe pertenecerle.
+    """
+    if os.name == 'nt':
+        lockfile = os.path.join(ruta_perfil, 'lockfile')
+        if not os.path.exists(lockfile):
+            return False
+        try:
+            fd = os.open(lockfile, os.O_RDWR)
+        except PermissionError:
+            return True
+        except OSError:
+            return False
+        os.close(fd)
+        return False
+
+    pid_bloqueo = pid_perfil(ruta_perfil)
+    return pid_bloqueo is not None and (pid is None or pid_bloqueo == pid)
+
+def pid_perfil(ruta_perfil):
+    """
+    PID del Chrome vivo que tiene abierto el perfil según SingletonLock (Linux/macOS), o None.
+    """
+    try:
+        destino = os.readlink(os.path.join(ruta_perfil, 'SingletonLock'))
+    except OSError:
+        return None
+    host, _, pid = destino.rpartition('-')
+    if host != socket.gethostname() or not pid.isdigit():
+        return None
+    return int(pid) if proceso_vivo(int(pid)) else None
+
+def leer_puerto_devtools(ruta_perfil):
+    """
+    Lee el puerto de depuración que Chrome anota en DevToolsActivePort, o None.
+    """
+    try:
+        with open(os.path.join(ruta_perfil, 'DevToolsActivePort'), 'r') as f:
+            return int(f.readline().strip())
+    except (OSError, ValueError):
+        return None
+
+def activar_sesion(puerto, timeout=2):
+    """
+    Trae al frente la primera pestaña de una instancia en ejecución a través de su puerto de
+    depuración. Retorna False si la instancia no responde.
+    """
+    import urllib.request
+    try:
+        with urllib.request.urlopen(f"http://127.0.0.1:{puerto}/json/list", timeout=timeout) as r:
+            targets = json.load(r)
+        pagina = next((t for t in targets if t.get('type') == 'page'), None)
+        if pagina is None:
+            return False
+        with urllib.request.urlopen(f"http://127.0.0.1:{puerto}/json/activate/{pagina['id']}", timeout=timeout):
+            return True
+    except (OSError, ValueError):
+        return False
+
+def pestanas_abiertas(puerto, timeout=2):
+    """
+    URLs de las pestañas abiertas en una instancia, en el orden de /json/list, o None si no responde.
+    """
+    import urllib.request
+    try:
+        with urllib.request.urlopen(f"http://127.0.0.1:{puerto}/json/list", timeout=timeout) as r:
+            targets = json.load(r)
+    except (OSError, ValueError):
+        return None
+    return [t['url'] for t in targets if t.get('type') == 'page' and t.get('url')]
+
+def comando_cdp(puerto, metodo, parametros=None, timeout=5):
+    """
+    Envía un único comando del protocolo DevTools al navegador por una conexión propia y
+    retorna el resultado, o None si la conexión se cierra antes de responder (como tras
+    Browser.close). Lanza OSError si el puerto no responde o vence el plazo y ValueError si
+    Chrome devuelve un error. Para muchas sesiones o conexiones persistentes, ver cdp.CdpPool.
+    """
+    import asyncio
+    from cdp import CdpConnection, CdpConnectionClosed
+
+    async def enviar():
+        conexion = CdpConnection(puerto, timeout=timeout, reconectar=False, intentos=1)
+        try:
+            return await conexion.comando(metodo, parametros)
+        except CdpConnectionClosed:
+            return None
+        finally:
+            await conexion.cerrar()
+
+    return asyncio.run(enviar())
+
+def esperar_carga(puerto, timeout=30, cancelado=None):
+    """
+    Espera a que la primera pestaña de la instancia termine de cargar su página. Retorna False
+    si vence el plazo, si se activa `cancelado` o si DevTools falla (ver cdp.esperar_carga).
+    """
+    import asyncio
+    import cdp
+
+    async def esperar():
+        conexion = cdp.CdpConnection(puerto, timeout=max(1, timeout), reconectar=False, intentos=1)
+        try:
+            return await cdp.esperar_carga(conexion, timeout, cancelado=cancelado)
+        except (OSError, ValueError, asyncio.TimeoutError):
+            return False
+        finally:
+            await conexion.cerrar()
+
+    return asyncio.run(esperar())
+
+def conexiones_devtools(puertos):
+    """
+    Cuenta los clientes conectados a cada puerto de depuración (conexiones TCP establecidas
+    cuyo extremo local es el puerto) leyendo /proc/net/tcp y tcp6. Retorna {puerto: clientes};
+    fuera de Linux, {}.
+    """
+    puertos = set(puertos)
+    if not puertos or not sys.platform.startswith('linux'):
+        return {}
+    clientes = dict.fromkeys(puertos, 0)
+    for tabla in ('/proc/net/tcp', '/proc/net/tcp6'):
+        try:
+            with open(tabla, 'rb') as f:
+                next(f, None)  # Cabecera
+                for linea in f:
+                    campos = linea.split(None, 4)
+                    if len(campos) < 4 or campos[3] != b'01':  # 01 = ESTABLISHED
+                        continue
+                    puerto = int(campos[1].rpartition(b':')[2], 16)
+                    if puerto in clientes:
+                        clientes[puerto] += 1
+        except (OSError, ValueError):
+            continue
+    return clientes
+
+class ProcessRegistry:
+    """
+    Registro de las instancias de Chrome lanzadas por sesión (PID, grupo de procesos y puerto).
+
+    Se guarda en Storage/Settings/running.json para sobrevivir a un reinicio del gestor. La
+    reconciliación es barata: para los procesos propios basta con poll() sobre el Popen; para
+    los heredados de una ejecución anterior se comprueba el PID y el bloqueo del perfil, lo que
+    descarta PIDs reutilizados por otros procesos. No se escanea ningún puerto.
+    """
+
+    def __init__(self, ruta=None):
+        self.ruta = ruta or os.path.join(RUTA_AJUSTES, 'running.json')
+        self.sesiones = {}  # sesión -> {'pid', 'pgid', 'port', 'perfil', 'inicio'}
+        self._procesos = {}  # sesión -> Popen de los procesos lanzados en esta ejecución
+        self._mtime = None  # mtime del fichero la última vez que se leyó o escribió
+        self.lock = threading.Lock()
+
+    def _mtime_fichero(self):
+        try:
+            return os.stat(self.ruta).st_mtime_ns
+        except OSError:
+            return None
+
+    def _leer(self):
+        try:
+            with open(self.ruta, 'r', encoding='utf-8') as f:
+                datos = json.load(f)
+        except (OSError, ValueError):
+            datos = {}
+        self._mtime = self._mtime_fichero()
+        return datos if isinstance(datos, dict) else {}
+
+    def cargar(self):
+        self.sesiones = self._leer()
+        return self
+
+    def guardar(self):
+        with self.lock:
+            datos = dict(self.sesiones)
+        try:
+            escribir_json_atomico(self.ruta, datos, indent=4, ensure_ascii=False)
+            self._mtime = self._mtime_fichero()
+        except OSError:
+            pass  # Sin el fichero, el próximo arranque reconcilia con los bloqueos de perfil
+
+    def _fusionar_externos(self):
+        """
+        Incorpora las sesiones que otro proceso (por ejemplo, la línea de comandos) registró en
+        el fichero desde la última lectura. Solo se relee si cambió su mtime.
+        """
+        if self._mtime_fichero() == self._mtime:
+            return []
+        nuevas = []
+        for sesion, datos in self._leer().items():
+            if sesion not in self.sesiones:
+                self.sesiones[sesion] = datos
+                nuevas.append(sesion)
+        return nuevas
+
+    def registrar(self, sesion, proceso, puerto, perfil, oculta=False):
+        """
+        Anota una instancia recién lanzada; `oculta` marca las precalentadas sin ventana.
+        """
+        try:
+            pgid = os.getpgid(proceso.pid) if hasattr(os, 'getpgid') else proceso.pid
+        except OSError:
+            pgid = proceso.pid
+        with self.lock:
+            self._procesos[sesion] = proceso
+            self.sesiones[sesion] = {
+                'pid': proceso.pid,
+                'pgid': pgid,
+                'port': puerto,
+                'perfil': perfil,
+                'inicio': datetime.now().strftime(FORMATO_FECHA),
+                'oculta': oculta
+            }
+        self.guardar()
+
+    def ocultas(self):
+        """
+        Sesiones precalentadas: en ejecución, pero sin ventana.
+        """
+        with self.lock:
+            return {sesion for sesion, datos in self.sesiones.items() if datos.get('oculta')}
+
+    def mostrar(self, sesion):
+        """
+        Quita la marca de precalentada de una sesión cuando se le abre una ventana.
+        """
+        with self.lock:
+            if sesion not in self.sesiones or not self.sesiones[sesion].get('oculta'):
+                return
+            self.sesiones[sesion]['oculta'] = False
+        self.guardar()
+
+    def en_ejecucion(self, sesion):
+        with self.lock:
+            return sesion in self.sesiones
+
+    def info(self, sesion):
+        with self.lock:
+            datos = self.sesiones.get(sesion)
+            return dict(datos) if datos else None
+
+    def sigue_viva(self, sesion):
+        """
+        True si el Chrome registrado para la sesión sigue abierto.
+        """
+        with self.lock:
+            datos = self.sesiones.get(sesion)
+            return datos is not None and self._sigue_viva(sesion, datos)
+
+    def detener(self, sesion, timeout=10):
+        """
+        Cierra el Chrome de una sesión de forma ordenada con Browser.close por su puerto de
+        depuración, para que guarde el perfil y las pestañas; si no responde o sigue abierto
+        pasados `timeout` segundos, envía SIGTERM a su grupo de procesos. Retorna 'cdp' o
+        'sigterm' según cómo se cerró, o None si sigue abierto.
+        """
+        info = self.info(sesion)
+        if info is None:
+            return 'cdp'
+        if info['port']:
+            try:
+                comando_cdp(info['port'], 'Browser.close', timeout=timeout)
+            except (OSError, ValueError, KeyError):
+                pass
+            else:
+                if self.esperar_cierre(sesion, timeout):
+                    return 'cdp'
+        with self.lock:
+            proceso = self._procesos.get(sesion)
+        try:
+            if os.name == 'nt':
+                if proceso is not None:
+                    proceso.terminate()
+                elif info['pid']:
+                    subprocess.run(['taskkill', '/PID', str(info['pid']), '/T'], capture_output=True)
+            elif info['pgid']:
+                try:
+                    os.killpg(info['pgid'], signal.SIGTERM)
+                except ProcessLookupError:
+                    # Chrome abierto fuera del gestor: no siempre encabeza su grupo
+                    if info['pid']:
+                        os.kill(info['pid'], signal.SIGTERM)
+        except ProcessLookupError:
+            pass
+        except OSError:
+            return None
+        return 'sigterm' if self.esperar_cierre(sesion, timeout) else None
+
+    def esperar_cierre(self, sesion, timeout, intervalo=0.2):
+        """
+        Espera hasta `timeout` segundos a que se cierre el Chrome de la sesión. Retorna False si sigue abierto.
+        """
+        limite = time.monotonic() + timeout
+        while self.sigue_viva(sesion):
+            if time.monotonic() >= limite:
+                return False
+            time.sleep(intervalo)
+        return True
+
+    def _sigue_viva(self, sesion, datos):
+        proceso = self._procesos.get(sesion)
+        if proceso is not None:
+            return proceso.poll() is None
+        if datos['pid'] is None:
+            return perfil_bloqueado(datos['perfil'])
+        return proceso_vivo(datos['pid']) and perfil_bloqueado(datos['perfil'], datos['pid'])
+
+    def reconciliar(self, perfiles=None):
+        """
+        Elimina las sesiones cuyo proceso terminó, incorpora las registradas por otro proceso y,
+        si se pasan {sesión: ruta de perfil}, adopta las que están abiertas sin figurar en el
+        registro. Retorna (iniciadas, detenidas).
+        """
+        detenidas, iniciadas = [], []
+        with self.lock:
+            externas = self._fusionar_externos()
+            for sesion, datos in list(self.sesiones.items()):
+                if not self._sigue_viva(sesion, datos):
+                    del self.sesiones[sesion]
+                    self._procesos.pop(sesion, None)
+                    if sesion not in externas:
+                        detenidas.append(sesion)
+            iniciadas.extend(sesion for sesion in externas if sesion in self.sesiones)
+            for sesion, perfil in (perfiles or {}).items():
+                if sesion in self.sesiones or not perfil_bloqueado(perfil):
+                    continue
+                # Abierta desde fuera del gestor o con el registro perdido
+                pid = pid_perfil(perfil)
+                self.sesiones[sesion] = {
+                    'pid': pid,
+                    'pgid': pid,
+                    'port': leer_puerto_devtools(perfil),
+                    'perfil': perfil,
+                    'inicio': None
+                }
+                iniciadas.append(sesion)
+        if detenidas or iniciadas:
+            self.guardar()
+        return iniciadas, detenidas
+
+class ResourceMonitor:
+    """
+    Mide lo que consume cada sesión en ejecución leyendo /proc (solo Linux).
+
+    Chrome se lanza en su propio grupo de procesos, así que navegador, renderizadores, GPU y
+    utilidades comparten pgrp: cada muestreo suma su CPU, RSS y E/S de disco por sesión. Para
+    que el coste no crezca con el resto del sistema, el pgrp de cada PID se recuerda mientras
+    el PID exista y solo se vuelven a leer los procesos de las sesiones. El PSS (smaps_rollup)
+    es caro de calcular para el kernel, así que se lee uno de cada `cada_pss` muestreos.
+    Cada sesión guarda en memoria sus últimas `historial` muestras.
+    """
+
+    def __init__(self, historial=150, cada_pss=6):
+        self.historial = historial
+        self.cada_pss = max(1, cada_pss)
+        self.disponible = os.path.isdir('/proc') and sys.platform.startswith('linux')
+        self.tick = os.sysconf('SC_CLK_TCK') if self.disponible else 100
+        self.pagina = os.sysconf('SC_PAGE_SIZE') if self.disponible else 4096
+        self.coste = 0.0  # Segundos de CPU del último muestreo
+        self._pgrp = {}  # pid -> pgrp de todos los procesos vistos
+        self._anterior = {}  # (pid, inicio) -> (ticks de CPU, bytes leídos, bytes escritos)
+        self._pss = {}  # sesión -> último PSS conocido
+        self._historial = {}  # sesión -> deque de muestras
+        self._momento = None
+        self._muestreos = 0
+        self.lock = threading.Lock()
+
+    def _leer(self, ruta):
+        fd = os.open(ruta, os.O_RDONLY)
+        try:
+            return os.read(fd, 4096)
+        finally:
+            os.close(fd)
+
+    def _stat(self, pid):
+        """
+        Retorna (pgrp, ticks de CPU, inicio, RSS en bytes) de un proceso.
+        """
+        datos = self._leer(f"/proc/{pid}/stat")
+        campos = datos[datos.rfind(b')') + 2:].split()
+        return int(campos[2]), int(campos[11]) + int(campos[12]), int(campos[19]), int(campos[21]) * self.pagina
+
+    def _io(self, pid):
+        lectura = escritura = 0
+        for linea in self._leer(f"/proc/{pid}/io").splitlines():
+            if linea.startswith(b'read_bytes:'):
+                lectura = int(linea.split()[1])
+            elif linea.startswith(b'write_bytes:'):
+                escritura = int(linea.split()[1])
+        return lectura, escritura
+
+    def _pss_proceso(self, pid):
+        for linea in self._leer(f"/proc/{pid}/smaps_rollup").splitlines():
+            if linea.startswith(b'Pss:'):
+                return int(linea.split()[1]) * 1024
+        raise ValueError("smaps_rollup sin Pss")
+
+    def muestrear(self, sesiones):
+        """
+        Toma una muestra de las sesiones {nombre: PID del proceso principal}. Retorna
+        {nombre: {'cpu', 'rss', 'pss', 'lectura', 'escritura', 'procesos'}}: CPU en % de un
+        núcleo, memoria en bytes y E/S en bytes por segundo desde la muestra anterior (0 en la
+        primera). 'pss' es el último valor leído, o None si aún no se pudo leer (entonces solo
+        vale el RSS).
+        """
+        if not self.disponible:
+            return {}
+        inicio_coste = time.thread_time()
+        with self.lock:
+            ahora = time.monotonic()
+            transcurrido = ahora - self._momento if self._momento is not None else None
+            self._momento = ahora
+            self._muestreos += 1
+            leer_pss = self._muestreos % self.cada_pss == 1 or self.cada_pss == 1
+
+            # El pgrp del proceso principal agrupa a todos los de la sesión
+            grupos = {}
+            for nombre, pid in sesiones.items():
+                try:
+                    grupos[self._stat(pid)[0]] = nombre
+                except (OSError, ValueError, IndexError):
+                    continue
+
+            # Un proceso principal visto entre el fork y el setsid quedó anotado con el pgrp del gestor
+            for pid in sesiones.values():
+                self._pgrp.pop(pid, None)
+            pids = [int(entrada) for entrada in os.listdir('/proc') if entrada.isdigit()]
+            vivos = set(pids)
+            for pid in [pid for pid in self._pgrp if pid not in vivos]:
+                del self._pgrp[pid]
+
+            # El PSS de una sesión recién abierta se lee en su primera muestra
+            con_pss = {nombre for nombre in grupos.values() if leer_pss or nombre not in self._pss}
+            pss = {}  # sesión -> PSS sumado en este muestreo, si se pudo leer
+            muestras = {nombre: {'cpu': 0.0, 'rss': 0, 'pss': self._pss.get(nombre),
+                                 'lectura': 0.0, 'escritura': 0.0, 'procesos': 0}
+                        for nombre in grupos.values()}
+            actuales = {}
+            for pid in pids:
+                pgrp = self._pgrp.get(pid)
+                if pgrp is not None and pgrp not in grupos:
+                    continue  # Proceso ajeno a las sesiones ya clasificado
+                try:
+                    pgrp, ticks, inicio, rss = self._stat(pid)
+                except (OSError, ValueError, IndexError):
+                    continue
+                self._pgrp[pid] = pgrp
+                nombre = grupos.get(pgrp)
+                if nombre is None:
+                    continue
+                muestra = muestras[nombre]
+                muestra['procesos'] += 1
+                muestra['rss'] += rss
+                try:
+                    lectura, escritura = self._io(pid)
+                except (OSError, ValueError):
+                    lectura = escritura = 0
+                if nombre in con_pss:
+                    try:
+                        pss[nombre] = pss.get(nombre, 0) + self._pss_proceso(pid)
+                    except (OSError, ValueError):
+                        pass
+                clave = (pid, inicio)
+                actuales[clave] = (ticks, lectura, escritura)
+                previo = self._anterior.get(clave)
+                if previo is not None and transcurrido:
+                    muestra['cpu'] += (ticks - previo[0]) / self.tick / transcurrido * 100
+                    muestra['lectura'] += max(lectura - previo[1], 0) / transcurrido
+                    muestra['escritura'] += max(escritura - previo[2], 0) / transcurrido
+            self._anterior = actuales
+
+            for nombre, muestra in muestras.items():
+                muestra['cpu'] = round(muestra['cpu'], 1)
+                if nombre in pss:
+                    muestra['pss'] = self._pss[nombre] = pss[nombre]
+                historial = self._historial.get(nombre)
+                if historial is None:
+                    historial = self._historial[nombre] = deque(maxlen=self.historial)
+                historial.append(dict(muestra, hora=time.time()))
+            # Las sesiones que se cerraron no conservan historial
+            for nombre in [nombre for nombre in self._historial if nombre not in muestras]:
+                del self._historial[nombre]
+                self._pss.pop(nombre, None)
+        self.coste = time.thread_time() - inicio_coste
+        return muestras
+
+    def historia(self, nombre):
+        """
+        Últimas muestras de una sesión, de la más antigua a la más reciente.
+        """
+        with self.lock:
+            return list(self._historial.get(nombre, ()))
+
+class CgroupLimiter:
+    """
+    Acota la memoria, la CPU y la E/S de cada sesión lanzada (solo Linux).
+
+    Con cgroup v2, el Chrome de cada sesión y todos sus procesos hijos se ejecutan en un grupo
+    propio, <base>/<sesión>, con memory.max, cpu.weight e io.weight. La base es `ruta` o, por
+    defecto, un grupo chrome-session-manager junto al del propio gestor (la parte de la
+    jerarquía que el usuario puede modificar, p. ej. la que delega systemd). Chrome entra en el
+    grupo antes de arrancar: una shell intermedia escribe su PID en cgroup.procs y hace exec,
+    así que ningún proceso hijo queda fuera.
+
+    Si cgroup v2 o sus controladores no están disponibles, solo se aplica el peso de CPU, como
+    una prioridad nice. El límite de memoria necesita cgroup v2: RLIMIT_DATA no sirve como
+    sustituto porque Chrome reserva de entrada mucho más espacio de direcciones del que usa y
+    con un límite realista no llega a arrancar. El peso de E/S tampoco tiene equivalente.
+    """
+
+    NOMBRE_BASE = 'chrome-session-manager'
+    CONTROLADORES = ('memory', 'cpu', 'io')
+
+    def __init__(self, activado=False, memoria=None, cpu_peso=100, io_peso=100, ruta=None):
+        self.activado = activado
+        self.memoria = memoria  # Bytes, o None sin límite
+        self.cpu_peso = cpu_peso  # 1-10000; 100 es el reparto normal
+        self.io_peso = io_peso
+        self.ruta = ruta
+        self.lock = threading.Lock()
+        self._base = None  # (ruta pedida, base resuelta o None)
+
+    @staticmethod
+    def _leer(ruta):
+        with open(ruta, 'r', encoding='utf-8') as f:
+            return f.read()
+
+    @staticmethod
+    def _escribir(ruta, valor):
+        with open(ruta, 'w', encoding='utf-8') as f:
+            f.write(valor)
+
+    @staticmethod
+    def nombre_grupo(sesion):
+        # Solo caracteres seguros: el resto se codifica para que no choquen dos sesiones
+        return 'sesion-' + ''.join(c if c.isascii() and (c.isalnum() or c in '-_') else f"_{ord(c):x}_"
+                                   for c in sesion)
+
+    def _base_predeterminada(self):
+        """
+        Grupo chrome-session-manager junto al del gestor en la jerarquía cgroup v2, o None.
+        """
+        montaje = None
+        with open('/proc/self/mountinfo', 'r', encoding='utf-8') as f:
+            for linea in f:
+                campos = linea.split(' - ')
+                if len(campos) == 2 and campos[1].split()[0] == 'cgroup2':
+                    montaje = campos[0].split()[4]
+                    break
+        if montaje is None:
+            return None
+        propio = '/'
+        for linea in self._leer('/proc/self/cgroup').splitlines():
+            if linea.startswith('0::'):
+                propio = linea[3:].strip() or '/'
+        # Un grupo con procesos no puede repartir controladores entre sus hijos: se usa el padre
+        padre = os.path.dirname(propio.rstrip('/')) if propio != '/' else '/'
+        return os.path.join(montaje, padre.lstrip('/'), self.NOMBRE_BASE)
+
+    def base(self):
+        """
+        Grupo bajo el que se crean los de las sesiones, con los controladores activados para sus
+        hijos, o None si cgroup v2 no está disponible o no se puede escribir.
+        """
+        with self.lock:
+            if self._base is not None and self._base[0] == self.ruta:
+                return self._base[1]
+            base = None
+            if sys.platform.startswith('linux'):
+                try:
+                    candidata = self.ruta or self._base_predeterminada()
+                    if candidata is not None:
+                        creada = not os.path.isdir(candidata)
+                        os.makedirs(candidata, exist_ok=True)
+                        disponibles = self._leer(os.path.join(candidata, 'cgroup.controllers')).split()
+                        for controlador in self.CONTROLADORES:
+                            if controlador in disponibles:
+                                try:
+                                    self._escribir(os.path.join(candidata, 'cgroup.subtree_control'), f"+{controlador}")
+                                except OSError:
+                                    pass
+                        activos = self._leer(os.path.join(candidata, 'cgroup.subtree_control')).split()
+                        if 'memory' in activos or 'cpu' in activos:
+                            base = candidata
+                        elif creada:
+                            os.rmdir(candidata)  # Sin controladores no sirve: no dejar el grupo vacío
+                except OSError:
+                    base = None
+            self._base = (self.ruta, base)
+            return base
+
+    def _base_actual(self):
+        # Sin límites activados no se crea nada, pero se siguen viendo los grupos ya creados
+        if self.activado:
+            return self.base()
+        return self._base[1] if self._base is not None else None
+
+    def modo(self):
+        """
+        'cgroup', 'nice' (solo la prioridad de CPU, sin límite de memoria) o None si no se
+        aplican límites.
+        """
+        if not self.activado or not sys.platform.startswith('linux'):
+            return None
+        return 'cgroup' if self.base() is not None else 'nice'
+
+    def envolver(self, sesion, comando):
+        """
+        Retorna la línea de comandos que lanza `comando` con los límites de la sesión. El PID del
+        proceso lanzado es el de Chrome (la shell y nice hacen exec).
+        """
+        modo = self.modo()
+        if modo is None:
+            return comando
+        if modo == 'cgroup':
+            grupo = os.path.join(self.base(), self.nombre_grupo(sesion))
+            try:
+                os.makedirs(grupo, exist_ok=True)
+                valores = {'memory.max': str(self.memoria) if self.memoria else 'max',
+                           'cpu.weight': str(self.cpu_peso),
+                           'io.weight': f"default {self.io_peso}"}
+                for fichero, valor in valores.items():
+                    if os.path.exists(os.path.join(grupo, fichero)):
+                        self._escribir(os.path.join(grupo, fichero), valor)
+                # Si no pudiera entrar en el grupo, Chrome arranca igualmente, sin límites
+                return ['/bin/sh', '-c', 'echo $$ > "$0" || echo "No se pudo aplicar el cgroup" >&2; exec "$@"',
+                        os.path.join(grupo, 'cgroup.procs'), *comando]
+            except OSError:
+                pass  # Grupo no modificable: solo la prioridad de CPU
+        # nice 0 con el peso normal (100) y hasta 19 con el mínimo; bajar de 0 requiere privilegios
+        nice = 0
+        if self.cpu_peso < 100:
+            nice = min(19, round((100 - self.cpu_peso) / 100 * 19) or 1)
+        if nice:
+            comando = ['nice', '-n', str(nice), *comando]
+        return comando
+
+    def liberar(self, sesion):
+        """
+        Borra el grupo de una sesión cerrada (solo si ya no tiene procesos).
+        """
+        base = self._base_actual()
+        if base is None:
+            return
+        try:
+            os.rmdir(os.path.join(base, self.nombre_grupo(sesion)))
+        except OSError:
+            pass  # No existe o aún le quedan procesos: se reintenta en el siguiente cierre
+
+    def uso(self, sesion):
+        """
+        Consumo y contadores del grupo de una sesión: {'memoria', 'memoria_max' (None = sin
+        límite), 'eventos' (high/max/oom/oom_kill de memory.events), 'cpu_usec', 'throttled'
+        (nr_throttled y throttled_usec de cpu.stat), 'presion' ({recurso: avg10 de PSI 'some'})}.
+        None si la sesión no está en un grupo.
+        """
+        base = self._base_actual()
+        if base is None:
+            return None
+        grupo = os.path.join(base, self.nombre_grupo(sesion))
+
+        def contadores(fichero):
+            try:
+                return {clave: int(valor) for clave, valor in
+                        (linea.split() for linea in self._leer(os.path.join(grupo, fichero)).splitlines()
+                         if len(linea.split()) == 2)}
+            except (OSError, ValueError):
+                return {}
+
+        try:
+            memoria = int(self._leer(os.path.join(grupo, 'memory.current')))
+        except (OSError, ValueError):
+            return None
+        try:
+            maximo = self._leer(os.path.join(grupo, 'memory.max')).strip()
+            maximo = None if maximo == 'max' else int(maximo)
+        except (OSError, ValueError):
+            maximo = None
+        eventos = contadores('memory.events')
+        cpu = contadores('cpu.stat')
+        presion = {}
+        for recurso in ('cpu', 'memory', 'io'):
+            try:
+                some = self._leer(os.path.join(grupo, f"{recurso}.pressure")).splitlines()[0].split()
+                presion[recurso] = float(dict(campo.split('=') for campo in some[1:])['avg10'])
+            except (OSError, ValueError, IndexError, KeyError):
+                pass
+        return {
+            'memoria': memoria,
+            'memoria_max': maximo,
+            'eventos': {clave: eventos.get(clave, 0) for clave in ('high', 'max', 'oom', 'oom_kill')},
+            'cpu_usec': cpu.get('usage_usec', 0),
+            'throttled': {clave: cpu.get(clave, 0) for clave in ('nr_throttled', 'throttled_usec')},
+            'presion': presion,
+        }
+
+class IdleReaper:
+    """
+    Detecta las sesiones abiertas que llevan tiempo sin usarse.
+
+    Se alimenta de las muestras del ResourceMonitor: una sesión cuenta como activa en cada
+    muestra en que su CPU alcanza el umbral o, si se piden, en que algún cliente está conectado
+    a su puerto de depuración (Puppeteer, Selenium, DevTools...). Solo se recuerda el momento
+    de la última actividad, de modo que la ventana de inactividad no depende del historial del
+    monitor. Una sesión recién vista cuenta como activa: tras reiniciar el gestor hay que
+    esperar la ventana completa antes de considerarla inactiva.
+    """
+
+    def __init__(self):
+        self._actividad = {}  # sesión -> momento (monotonic) de la última actividad
+        self.lock = threading.Lock()
+
+    def observar(self, muestras, umbral_cpu=1.0, conexiones=None):
+        """
+        Anota una muestra {sesión: muestra}; `conexiones` es {sesión: clientes de DevTools}.
+        Las sesiones que no aparecen se olvidan.
+        """
+        ahora = time.monotonic()
+        conexiones = conexiones or {}
+        with self.lock:
+            for nombre, muestra in muestras.items():
+                if nombre not in self._actividad or muestra['cpu'] >= umbral_cpu or conexiones.get(nombre):
+                    self._actividad[nombre] = ahora
+            for nombre in [nombre for nombre in self._actividad if nombre not in muestras]:
+                del self._actividad[nombre]
+
+    def inactivas(self, segundos):
+        """
+        Retorna {sesión: segundos sin actividad} de las que superan `segundos`.
+        """
+        ahora = time.monotonic()
+        with self.lock:
+            return {nombre: ahora - momento for nombre, momento in self._actividad.items()
+                    if ahora - momento >= segundos}
+
+class PortAllocator:
+    """
+    Asignador de puertos de depuración remota para las instancias de Chrome.
+
+    El sistema operativo elige un puerto libre (bind al puerto 0) en una sola llamada, sin
+    recorrer el rango probando conexiones, y cada puerto queda reservado a su sesión para que
+    dos lanzamientos seguidos nunca reciban el mismo mientras la sesión lo conserve.
+    """
+
+    INTENTOS = 16
+
+    def __init__(self, host='127.0.0.1'):
+        self.host = host
+        self._puertos = {}  # sesión -> puerto
+        self._sesiones = {}  # puerto -> sesión
+        self._lock = threading.Lock()
+
+    def _puerto_libre(self):
+        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+            s.bind((self.host, 0))
+            return s.getsockname()[1]
+
+    def reservar(self, sesion):
+        """
+        Retorna el puerto reservado para la sesión, asignando uno nuevo si no tiene.
+        Lanza OSError si el sistema no ofrece ningún puerto libre no reservado.
+        """
+        with self._lock:
+            if sesion in self._puertos:
+                return self._puertos[sesion]
+            for _ in range(self.INTENTOS):
+                puerto = self._puerto_libre()
+                if puerto not in self._sesiones:
+                    self._puertos[sesion] = puerto
+                    self._sesiones[puerto] = sesion
+                    return puerto
+        raise OSError("No se pudo encontrar un puerto disponible.")
+
+    def asignar(self, sesion, puerto):
+        """
+        Registra el puerto que ya usa una sesión en ejecución (p. ej. tras reiniciar el gestor).
+        """
+        with self._lock:
+            anterior = self._puertos.pop(sesion, None)
+            if anterior is not None:
+                self._sesiones.pop(anterior, None)
+            self._puertos[sesion] = puerto
+            self._sesiones[puerto] = sesion
+
+    def liberar(self, sesion):
+        with self._lock:
+            puerto = self._puertos.pop(sesion, None)
+            if puerto is not None:
+                self._sesiones.pop(puerto, None)
+            return puerto
+
+    def puerto(self, sesion):
+        with self._lock:
+            return self._puertos.get(sesion)
+
+class SessionTrash:
+    """
+    Papelera de sesiones en Storage/Trash.
+
+    Borrar una sesión es un rename atómico de su perfil a la papelera, que es instantáneo y
+    deja el nombre libre de inmediato; el espacio se recupera después en segundo plano con
+    `purgar`. Lo que quede en la papelera tras una interrupción se purga en el siguiente arranque.
+    """
+
+    def __init__(self, ruta=None, ruta_sesiones=None):
+        self.ruta = ruta or RUTA_PAPELERA
+        self.ruta_sesiones = ruta_sesiones or RUTA_SESIONES
+
+    def mover(self, nombre_sesion):
+        """
+        Mueve el perfil de una sesión a la papelera. Retorna la nueva ruta, o None si la sesión
+        no tenía carpeta. Lanza OSError si no se puede renombrar (p. ej. ficheros abiertos).
+        """
+        origen = os.path.join(self.ruta_sesiones, nombre_sesion)
+        if not os.path.lexists(origen):
+            return None
+        os.makedirs(self.ruta, exist_ok=True)
+        destino = os.path.join(self.ruta, f"{nombre_sesion}.{time.time_ns()}")
+        os.rename(origen, destino)
+        return destino
+
+    def pendientes(self):
+        """
+        Rutas que esperan ser purgadas.
+        """
+        try:
+            with os.scandir(self.ruta) as entradas:
+                return [entrada.path for entrada in entradas]
+        except OSError:
+            return []
+
+    def purgar(self, al_progresar=None, cancelado=None):
+        """
+        Borra todo el contenido de la papelera, incluido lo que se añada mientras tanto.
+        `al_progresar(bytes_liberados, bytes_totales)` recibe el avance acumulado.
+        Retorna los bytes liberados.
+        """
+        liberados, totales = 0, 0
+        while not (cancelado is not None and cancelado.is_set()):
+            rutas = self.pendientes()
+            if not rutas:
+                break
+            for ruta in rutas:
+                ficheros, directorios = [], [ruta]
+                self._listar(ruta, ficheros, directorios)
+                totales += sum(tamano for _, tamano in ficheros)
+                if al_progresar is not None:
+                    al_progresar(liberados, totales)
+
+                for i, (fichero, tamano) in enumerate(ficheros):
+                    if cancelado is not None and cancelado.is_set():
+                        return liberados
+                    try:
+                        os.unlink(fichero)
+                        liberados += tamano
+                    except FileNotFoundError:
+                        liberados += tamano
+                    except OSError:
+                        pass
+                    if al_progresar is not None and i % 256 == 0:
+                        al_progresar(liberados, totales)
+
+                # Directorios de más profundo a menos; lo que no se pueda borrar queda para la próxima purga
+                for directorio in reversed(directorios):
+                    try:
+                        os.rmdir(directorio)
+                    except OSError:
+                        pass
+                if os.path.lexists(ruta) and not os.path.isdir(ruta):
+                    try:
+                        os.unlink(ruta)
+                    except OSError:
+                        pass
+                if os.path.lexists(ruta):
+                    # Evitar un bucle infinito con entradas que no se pueden borrar
+                    return liberados
+                if al_progresar is not None:
+                    al_progresar(liberados, totales)
+        return liberados
+
+    def _listar(self, ruta, ficheros, directorios):
+        pila = [ruta]
+        while pila:
+            actual = pila.pop()
+            try:
+                with os.scandir(actual) as entradas:
+                    for entrada in entradas:
+                        try:
+                            if entrada.is_dir(follow_symlinks=False):
+                                directorios.append(entrada.path)
+                                pila.append(entrada.path)
+                            else:
+                                ficheros.append((entrada.path, entrada.stat(follow_symlinks=False).st_size))
+                        except OSError:
+                            continue
+            except OSError:
+                continue
+
+class ProfileCloner:
+    """
+    Clona perfiles de Chrome (plantillas) en una o varias sesiones nuevas.
+
+    Cada fichero se clona con reflink (FICLONE en Linux, clonefile en macOS) cuando el sistema
+    de ficheros lo permite: la copia es instantánea y comparte bloques con el origen hasta que
+    Chrome la modifica. Si no, se copia. El árbol de origen se recorre una sola vez y todos los
+    ficheros de todos los destinos se clonan en paralelo en un mismo pool.
+
+    No se usan enlaces duros: Chrome reescribe sus bases de datos en el sitio, así que un
+    cambio en una sesión alteraría la plantilla y el resto de sesiones clonadas.
+    """
+
+    FICLONE = 0x40049409  # _IOW(0x94, 9, int); fcntl.FICLONE solo existe desde Python 3.12
+
+    # Bloqueos de la instancia que creó el perfil y cachés que Chrome regenera
+    EXCLUIDOS = {
+        'SingletonLock', 'SingletonCookie', 'SingletonSocket', 'DevToolsActivePort', 'lockfile',
+        'Cache', 'Code Cache', 'GPUCache', 'ShaderCache', 'GrShaderCache', 'DawnCache'
+    }
+
+    def __init__(self, max_workers=None):
+        self.max_workers = max_workers or min(32, (os.cpu_count() or 1) * 4)
+        self.reflink = sys.platform.startswith('linux') or sys.platform == 'darwin'
+        self._clonefile = None
+
+    def _listar(self, origen):
+        """
+        Retorna (directorios, ficheros, enlaces) relativos al origen, sin los excluidos.
+        """
+        directorios, ficheros, enlaces = [], [], []
+        pila = ['']
+        while pila:
+            rel = pila.pop()
+            with os.scandir(os.path.join(origen, rel) if rel else origen) as entradas:
+                for entrada in entradas:
+                    if entrada.name in self.EXCLUIDOS:
+                        continue
+                    ruta_rel = os.path.join(rel, entrada.name) if rel else entrada.name
+                    if entrada.is_symlink():
+                        enlaces.append(ruta_rel)
+                    elif entrada.is_dir():
+                        directorios.append(ruta_rel)
+                        pila.append(ruta_rel)
+                    else:
+                        ficheros.append(ruta_rel)
+        return directorios, ficheros, enlaces
+
+    def _reflink(self, origen, destino):
+        """
+        Intenta clonar un fichero compartiendo bloques. Retorna False si no es posible.
+        """
+        if sys.platform == 'darwin':
+            if self._clonefile is None:
+                import ctypes
+                libc = ctypes.CDLL(None, use_errno=True)
+                self._clonefile = libc.clonefile
+            return self._clonefile(os.fsencode(origen), os.fsencode(destino), 0) == 0
+
+        import fcntl
+        with open(origen, 'rb') as f_origen, open(destino, 'wb') as f_destino:
+            try:
+                fcntl.ioctl(f_destino.fileno(), self.FICLONE, f_origen.fileno())
+                return True
+            except OSError:
+                return False
+
+    def _clonar_fichero(self, origen, destino):
+        if self.reflink:
+            try:
+                if self._reflink(origen, destino):
+                    shutil.copystat(origen, destino)
+                    return True
+            except (OSError, AttributeError):
+                pass
+            # El sistema de ficheros no admite reflink: no se vuelve a intentar en esta ejecución
+            self.reflink = False
+        shutil.copy2(origen, destino)
+        return False
+
+    def clonar(self, origen, destinos):
+        """
+        Clona el perfil `origen` en cada ruta de `destinos`, que no deben existir.
+        Retorna {'ficheros', 'reflink', 'copiados'} con el número de ficheros de cada tipo.
+        Lanza OSError si falla; los destinos incompletos se eliminan.
+        """
+        directorios, ficheros, enlaces = self._listar(origen)
+        resultado = {'ficheros': len(ficheros) * len(destinos), 'reflink': 0, 'copiados': 0}
+        creados = []
+        try:
+            for destino in destinos:
+                os.makedirs(destino)
+                creados.append(destino)
+                for rel in directorios:
+                    os.mkdir(os.path.join(destino, rel))
+                for rel in enlaces:
+                    os.symlink(os.readlink(os.path.join(origen, rel)), os.path.join(destino, rel))
+
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                futuros = [
+                    executor.submit(self._clonar_fichero, os.path.join(origen, rel), os.path.join(destino, rel))
+                    for destino in destinos for rel in ficheros
+                ]
+                for futuro in as_completed(futuros):
+                    resultado['reflink' if futuro.result() else 'copiados'] += 1
+        except BaseException:
+            for destino in creados:
+                shutil.rmtree(destino, ignore_errors=True)
+            raise
+        return resultado
+
+class ProfileDeduplicator:
+    """
+    Deduplica ficheros idénticos entre perfiles de sesiones detenidas.
+
+    Los candidatos se agrupan por sistema de ficheros y tamaño; solo los grupos con más de un
+    inodo se leen, primero los 64 KiB iniciales y después, si coinciden, el fichero completo.
+    Las lecturas se hacen en paralelo en un pool de hilos.
+
+    Cada duplicado pasa a compartir bloques con el primero del grupo mediante FIDEDUPERANGE en
+    Linux, que vuelve a comparar el contenido en el kernel y es seguro aunque Chrome escriba
+    después, o con clonefile en macOS. Los enlaces duros solo se usan si se piden y para
+    ficheros de componentes y extensiones, que Chrome sustituye por versiones nuevas en lugar
+    de modificarlos en sitio.
+    """
+
+    TAMANO_MINIMO = 4096  # Un fichero menor que un bloque no libera espacio
+    TAMANO_PARCIAL = 64 * 1024
+    BLOQUE_LECTURA = 1024 * 1024
+    FIDEDUPERANGE = 0xC0189436  # _IOWR(0x94, 54, struct file_dedupe_range)
+    MAX_DEDUPE = 16 * 1024 * 1024  # Límite por llamada de Btrfs y XFS
+    SIN_REFLINK = {errno.EOPNOTSUPP, errno.ENOTTY, errno.ENOSYS, errno.EXDEV, errno.EINVAL}
+
+    # Directorios cuyo contenido Chrome no modifica en sitio (se instala cada versión aparte)
+    INMUTABLES = {
+        'Extensions', 'Dictionaries', 'WidevineCdm', 'SafetyTips', 'hyphen-data', 'ZxcvbnData',
+        'FileTypePolicies', 'OriginTrials', 'Subresource Filter', 'CertificateRevocation',
+        'MEIPreload', 'PKIMetadata', 'OptimizationHints', 'FirstPartySetsPreloaded',
+        'TrustTokenKeyCommitments', 'AutofillStates', 'SSLErrorAssistant', 'Crowd Deny',
+        'OnDeviceHeadSuggestModel', 'pnacl'
+    }
+
+    def __init__(self, max_workers=None, enlaces_duros=False, en_ejecucion=None, cancelado=None):
+        self.max_workers = max_workers or min(32, (os.cpu_count() or 1) * 4)
+        self.enlaces_duros = enlaces_duros
+        self.en_ejecucion = en_ejecucion or (lambda sesion: False)
+        self.cancelado = cancelado or threading.Event()
+        self.reflink = sys.platform.startswith('linux') or sys.platform == 'darwin'
+        self._clonefile = None
+
+    def _listar(self, clave, raiz):
+        ficheros = []
+        pila = [raiz]
+        while pila:
+            actual = pila.pop()
+            try:
+                with os.scandir(actual) as entradas:
+                    for entrada in entradas:
+                        if entrada.name in ProfileCloner.EXCLUIDOS:
+                            continue
+                        try:
+                            if entrada.is_dir(follow_symlinks=False):
+                                pila.append(entrada.path)
+                            elif entrada.is_file(follow_symlinks=False):
+                                st = entrada.stat(follow_symlinks=False)
+                                if st.st_size >= self.TAMANO_MINIMO:
+                                    ficheros.append((clave, os.path.relpath(entrada.path, raiz), entrada.path, st))
+                        except OSError:
+                            continue
+            except OSError:
+                continue
+        return ficheros
+
+    def _hash(self, ruta, limite=None):
+        if self.cancelado.is_set():
+            return None
+        h = hashlib.blake2b(digest_size=20)
+        try:
+            with open(ruta, 'rb') as f:
+                if limite is not None:
+                    h.update(f.read(limite))
+                else:
+                    for bloque in iter(lambda: f.read(self.BLOQUE_LECTURA), b''):
+                        h.update(bloque)
+        except OSError:
+            return None
+        return h.digest()
+
+    def buscar(self, rutas, al_progresar=None):
+        """
+        Recibe {sesión: ruta} y retorna una lista de grupos de ficheros idénticos, cada uno
+        [(sesión, ruta relativa, ruta, stat), ...] con un inodo distinto por elemento.
+        `al_progresar(leídos, candidatos)` recibe el avance de la lectura.
+        """
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            listados = executor.map(lambda item: self._listar(*item), rutas.items())
+            cubetas = {}
+            for ficheros in listados:
+                for fichero in ficheros:
+                    st = fichero[3]
+                    # Un mismo inodo (ya enlazado) solo cuenta una vez por cubeta
+                    cubetas.setdefault((st.st_dev, st.st_size), {}).setdefault(st.st_ino, fichero)
+            candidatos = [list(inodos.values()) for inodos in cubetas.values() if len(inodos) > 1]
+
+            total = sum(len(grupo) for grupo in candidatos)
+            leidos = 0
+            if al_progresar is not None:
+                al_progresar(leidos, total)
+
+            def agrupar(grupos, limite):
+                """
+                Lee todos los ficheros de todos los grupos en paralelo y divide cada grupo por
+                el hash obtenido. Retorna (subgrupos con más de un fichero, ficheros descartados).
+                """
+                ficheros = [fichero for grupo in grupos for fichero in grupo]
+                futuros = {fichero[2]: executor.submit(self._hash, fichero[2], limite) for fichero in ficheros}
+                resultado, descartados = [], 0
+                for grupo in grupos:
+                    subgrupos = {}
+                    for fichero in grupo:
+                        digest = futuros[fichero[2]].result()
+                        if digest is not None:
+                            subgrupos.setdefault(digest, []).append(fichero)
+                    for sub in subgrupos.values():
+                        if len(sub) > 1:
+                            resultado.append(sub)
+                        else:
+                            descartados += len(sub)
+                    descartados += len(grupo) - sum(len(sub) for sub in subgrupos.values())
+                return resultado, descartados
+
+            parciales, descartados = agrupar(candidatos, self.TAMANO_PARCIAL)
+            grupos = [grupo for grupo in parciales if grupo[0][3].st_size <= self.TAMANO_PARCIAL]
+            pendientes = [grupo for grupo in parciales if grupo[0][3].st_size > self.TAMANO_PARCIAL]
+            # La lectura parcial ya cubrió por completo los ficheros pequeños
+            leidos += descartados + sum(len(grupo) for grupo in grupos)
+            if al_progresar is not None:
+                al_progresar(leidos, total)
+
+            # Ficheros grandes: se leen completos por tandas para informar del avance
+            tanda = max(1, self.max_workers * 4)
+            for inicio in range(0, len(pendientes), tanda):
+                bloque = pendientes[inicio:inicio + tanda]
+                completos, _ = agrupar(bloque, None)
+                grupos.extend(completos)
+                leidos += sum(len(grupo) for grupo in bloque)
+                if al_progresar is not None:
+                    al_progresar(leidos, total)
+        return grupos
+
+    def _dedupe_rango(self, origen, destino, tamano):
+        """
+        Comparte los bloques de `destino` con `origen` si su contenido es idéntico (Linux).
+        """
+        import fcntl
+        with open(origen, 'rb') as f_origen, open(destino, 'rb+') as f_destino:
+            for desplazamiento in range(0, tamano, self.MAX_DEDUPE):
+                longitud = min(self.MAX_DEDUPE, tamano - desplazamiento)
+                argumento = bytearray(
+                    struct.pack('=QQHHI', desplazamiento, longitud, 1, 0, 0)
+                    + struct.pack('=qQQiI', f_destino.fileno(), desplazamiento, 0, 0, 0)
+                )
+                fcntl.ioctl(f_origen.fileno(), self.FIDEDUPERANGE, argumento, True)
+                _, _, compartidos, estado, _ = struct.unpack_from('=qQQiI', argumento, 24)
+                if estado != 0 or compartidos != longitud:
+                    return False
+        return True
+
+    def _sustituir(self, origen, destino, st, enlazar):
+        """
+        Sustituye `destino` por un clon (o un enlace duro) de `origen` a través de un fichero
+        temporal, solo si no cambió desde que se leyó.
+        """
+        actual = os.stat(destino)
+        if (actual.st_ino, actual.st_size, actual.st_mtime_ns) != (st.st_ino, st.st_size, st.st_mtime_ns):
+            return False
+        temporal = f"{destino}.dedup-tmp"
+        if enlazar:
+            os.link(origen, temporal)
+        else:
+            if self._clonefile is None:
+                import ctypes
+                self._clonefile = ctypes.CDLL(None, use_errno=True).clonefile
+            if self._clonefile(os.fsencode(origen), os.fsencode(temporal), 0) != 0:
+                return False
+            shutil.copystat(destino, temporal)
+        try:
+            os.replace(temporal, destino)
+        except OSError:
+            os.unlink(temporal)
+            raise
+        return True
+
+    def _inmutable(self, ruta_relativa):
+        return any(parte in self.INMUTABLES for parte in ruta_relativa.split(os.sep))
+
+    def _deduplicar_fichero(self, original, duplicado):
+        """
+        Retorna 'reflink', 'enlace' o None si el duplicado se dejó como estaba.
+        """
+        sesion, rel, ruta, st = duplicado
+        if self.cancelado.is_set():
+            return None
+        if self.reflink:
+            try:
+                if sys.platform == 'darwin':
+                    if self._sustituir(original[2], ruta, st, enlazar=False):
+                        return 'reflink'
+                elif self._dedupe_rango(original[2], ruta, st.st_size):
+                    return 'reflink'
+                return None
+            except AttributeError:
+                self.reflink = False  # Sin clonefile
+            except OSError as e:
+                if e.errno not in self.SIN_REFLINK:
+                    return None
+                # Sistema de ficheros sin reflink: no se vuelve a intentar en esta ejecución
+                self.reflink = False
+        if self.enlaces_duros and self._inmutable(rel) and self._inmutable(original[1]):
+            if self.en_ejecucion(sesion):
+                return None
+            try:
+                if self._sustituir(original[2], ruta, st, enlazar=True):
+                    return 'enlace'
+            except OSError:
+                pass
+        return None
+
+    def deduplicar(self, rutas, al_progresar=None, simular=False):
+        """
+        Busca duplicados en {sesión: ruta} y los sustituye por bloques compartidos.
+        Retorna {'grupos', 'duplicados', 'reflink', 'enlaces', 'recuperado', 'clones'}, donde
+        'clones' son los pares [(original, duplicado)] que pasaron a compartir bloques con
+        reflink; con `simular`, no modifica nada y 'recuperado' es el espacio que se podría
+        recuperar. Si se activa `cancelado`, los ficheros pendientes se dejan como estaban.
+        """
+        grupos = self.buscar(rutas, al_progresar)
+        resultado = {
+            'grupos': len(grupos),
+            'duplicados': sum(len(grupo) - 1 for grupo in grupos),
+            'reflink': 0,
+            'enlaces': 0,
+            'recuperado': 0,
+            'clones': []
+        }
+        if simular:
+            resultado['recuperado'] = sum(grupo[0][3].st_size * (len(grupo) - 1) for grupo in grupos)
+            return resultado
+
+        # El original de cada grupo es, si lo hay, un fichero inmutable, para poder enlazarlo
+        for grupo in grupos:
+            grupo.sort(key=lambda fichero: not self._inmutable(fichero[1]))
+        tareas = [(grupo[0], duplicado) for grupo in grupos for duplicado in grupo[1:]]
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            metodos = executor.map(lambda tarea: self._deduplicar_fichero(*tarea), tareas)
+            for (original, duplicado), metodo in zip(tareas, metodos):
+                if metodo is None:
+                    continue
+                resultado['reflink' if metodo == 'reflink' else 'enlaces'] += 1
+                # Un inodo con más enlaces sigue ocupando su espacio
+                if duplicado[3].st_nlink == 1:
+                    resultado['recuperado'] += duplicado[3].st_size
+                    if metodo == 'reflink':
+                        resultado['clones'].append((original, duplicado))
+        return resultado
+
+class CachePruner:
+    """
+    Mide y vacía las cachés regenerables de los perfiles de Chrome.
+
+    El desglose por categoría sale del índice de tamaños, que ya guarda el tamaño agregado de
+    cada directorio, así que basta el escaneo normal de la sesión. La limpieza reparte cada
+    directorio de caché de cada sesión como una tarea de un pool de hilos, y antes de cada
+    una comprueba que la sesión no esté abierta.
+    """
+
+    # categoría -> (etiqueta, rutas relativas al perfil o a la carpeta de usuario)
+    CATEGORIAS = {
+        'cache': ('Cache', [('Cache',)]),
+        'code_cache': ('Code Cache', [('Code Cache',)]),
+        'gpu_cache': ('GPUCache', [('GPUCache',)]),
+        'service_worker': ('Service Worker/CacheStorage', [
+            ('Service Worker', 'CacheStorage'), ('Service Worker', 'ScriptCache')
+        ]),
+        'shader_cache': ('ShaderCache', [
+            ('ShaderCache',), ('GrShaderCache',), ('GraphiteDawnCache',), ('DawnCache',),
+            ('DawnGraphiteCache',), ('DawnWebGPUCache',)
+        ]),
+    }
+    PROFUNDIDAD = 3  # Perfil (Default, Profile 1...) + la ruta más larga de una categoría
+
+    def __init__(self, max_workers=None, en_ejecucion=None, cancelado=None):
+        self.max_workers = max_workers or min(32, (os.cpu_count() or 1) * 4)
+        self.en_ejecucion = en_ejecucion or (lambda sesion: False)
+        self.cancelado = cancelado or threading.Event()
+
+    PERFILES = ('Default', 'Guest Profile', 'System Profile')
+
+    @classmethod
+    def es_perfil(cls, nombre):
+        """
+        True si `nombre` es una carpeta de perfil de Chrome (Default, Profile 1...).
+        """
+        return nombre in cls.PERFILES or (nombre.startswith('Profile ') and nombre[8:].isdigit())
+
+    @classmethod
+    def categoria(cls, ruta_relativa):
+        """
+        Retorna la categoría de caché de un directorio del perfil, o None.
+        """
+        partes = tuple(ruta_relativa.split(os.sep))
+        # En la carpeta de usuario o justo dentro de un perfil, nunca en otro sitio: así
+        # 'Service Worker/Cache' o 'Default/Extensions/x/Cache' no se toman por la caché HTTP
+        if len(partes) > 1 and cls.es_perfil(partes[0]):
+            partes = partes[1:]
+        for categoria, (_, patrones) in cls.CATEGORIAS.items():
+            if partes in patrones:
+                return categoria
+        return None
+
+    def localizar(self, raiz):
+        """
+        Retorna {categoría: [rutas]} de los directorios de caché de un perfil. Solo se listan
+        los primeros niveles, donde Chrome los crea.
+        """
+        encontrados = {}
+        pila = [('', 0)]
+        while pila:
+            rel, profundidad = pila.pop()
+            try:
+                with os.scandir(os.path.join(raiz, rel) if rel else raiz) as entradas:
+                    for entrada in entradas:
+                        if not entrada.is_dir(follow_symlinks=False):
+                            continue
+                        ruta_rel = os.path.join(rel, entrada.name) if rel else entrada.name
+                        categoria = self.categoria(ruta_rel)
+                        if categoria is not None:
+                            encontrados.setdefault(categoria, []).append(entrada.path)
+                        elif profundidad + 1 < self.PROFUNDIDAD:
+                            pila.append((ruta_rel, profundidad + 1))
+            except OSError:
+                continue
+        return encontrados
+
+    def desglose(self, indice, ruta):
+        """
+        Retorna {categoría: bytes} de una sesión a partir del índice de tamaños, con la clave
+        'otros' para el resto del perfil.
+        """
+        desglose = {categoria: 0 for categoria in self.CATEGORIAS}
+        for rel, entrada in indice.instantanea(ruta).items():
+            categoria = self.categoria(rel) if rel else None
+            if categoria is not None:
+                desglose[categoria] += entrada[2]
+        desglose['otros'] = max((indice.total(ruta) or 0) - sum(desglose.values()), 0)
+        return desglose
+
+    def _vaciar(self, sesion, raiz, ruta):
+        """
+        Borra un directorio de caché. Retorna los bytes liberados, o None si la sesión está
+        abierta o se canceló la limpieza.
+        """
+        if self.cancelado.is_set() or self.en_ejecucion(sesion) or perfil_bloqueado(raiz):
+            return None
+        liberados = 0
+        directorios = [ruta]
+        pila = [ruta]
+        while pila:
+            actual = pila.pop()
+            try:
+                with os.scandir(actual) as entradas:
+                    for entrada in entradas:
+                        try:
+                            if entrada.is_dir(follow_symlinks=False):
+                                directorios.append(entrada.path)
+                                pila.append(entrada.path)
+                            else:
+                                tamano = entrada.stat(follow_symlinks=False).st_size
+                                os.unlink(entrada.path)
+                                liberados += tamano
+                        except OSError:
+                            continue
+            except OSError:
+                continue
+        for directorio in reversed(directorios):
+            try:
+                os.rmdir(directorio)
+            except OSError:
+                pass
+        return liberados
+
+    def podar(self, rutas, categorias=None, al_progresar=None):
+        """
+        Vacía las categorías indicadas (todas por defecto) de {sesión: ruta}.
+        Retorna ({sesión: bytes liberados}, [sesiones omitidas por estar abiertas]).
+        `al_progresar(directorios hechos, total)` recibe el avance.
+        """
+        categorias = set(categorias or self.CATEGORIAS)
+        tareas = []
+        for sesion, raiz in rutas.items():
+            for categoria, directorios in self.localizar(raiz).items():
+                if categoria in categorias:
+                    tareas.extend((sesion, raiz, directorio) for directorio in directorios)
+
+        liberados = {sesion: 0 for sesion in rutas}
+        omitidas = set()
+        if al_progresar is not None:
+            al_progresar(0, len(tareas))
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futuros = {executor.submit(self._vaciar, *tarea): tarea[0] for tarea in tareas}
+            for hechos, futuro in enumerate(as_completed(futuros), start=1):
+                sesion = futuros[futuro]
+                resultado = futuro.result()
+                if resultado is None:
+                    if not self.cancelado.is_set():
+                        omitidas.add(sesion)
+                else:
+                    liberados[sesion] += resultado
+                if al_progresar is not None:
+                    al_progresar(hechos, len(tareas))
+        return liberados, sorted(omitidas, key=str.casefold)
+
+def tamano_sqlite(ruta):
+    """
+    Tamaño de una base de datos SQLite junto con sus ficheros -wal y -journal.
+    """
+    total = 0
+    for sufijo in ('', '-wal', '-journal'):
+        try:
+            total += os.stat(ruta + sufijo).st_size
+        except OSError:
+            pass
+    return total
+
+def compactar_sqlite(ruta):
+    """
+    Vuelca el WAL y ejecuta VACUUM sobre una base de datos de Chrome. Se ejecuta en un proceso
+    del pool de DatabaseCompactor, por eso es una función de módulo.
+    Retorna {'ruta', 'antes', 'despues', 'estado', 'error'} con estado 'ok', 'bloqueada' o 'error'.
+    """
+    from urllib.parse import quote
+    resultado = {'ruta': ruta, 'antes': tamano_sqlite(ruta), 'despues': None, 'estado': 'ok', 'error': None}
+    try:
+        # mode=rw: nunca crear una base vacía; timeout=0: no esperar a un Chrome que la tenga abierta
+        conexion = sqlite3.connect(f"file:{quote(os.path.abspath(ruta))}?mode=rw", uri=True,
+                                   timeout=0, isolation_level=None)
+    except sqlite3.Error as e:
+        resultado.update(estado='error', error=str(e))
+        return resultado
+    try:
+        # Chrome abre sus bases con locking_mode=EXCLUSIVE: si está en uso, esto falla al momento
+        conexion.execute("BEGIN EXCLUSIVE")
+        conexion.execute("COMMIT")
+        conexion.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        conexion.execute("VACUUM")
+    except sqlite3.OperationalError as e:
+        estado = 'bloqueada' if 'locked' in str(e) or 'busy' in str(e) else 'error'
+        resultado.update(estado=estado, error=str(e))
+    except sqlite3.Error as e:
+        resultado.update(estado='error', error=str(e))
+    finally:
+        conexion.close()
+    resultado['despues'] = tamano_sqlite(ruta)
+    return resultado
+
+class DatabaseCompactor:
+    """
+    Compacta las bases de datos SQLite internas de Chrome (historial, cookies, favicons...).
+
+    Cada base es una tarea de un pool de procesos acotado: VACUUM reescribe el fichero entero,
+    así que limitar los procesos limita la E/S simultánea, y un fallo del motor SQLite en una
+    base no afecta al gestor. Las bases bloqueadas por un Chrome abierto se omiten sin esperar.
+    """
+
+    NOMBRES = {'History', 'Cookies', 'Web Data', 'Favicons', 'Top Sites'}
+    PROFUNDIDAD = 3  # Perfil (Default, Profile 1...) y subcarpeta Network de las cookies
+    CABECERA = b'SQLite format 3\x00'
+
+    def __init__(self, max_workers=None, en_ejecucion=None, cancelado=None):
+        self.max_workers = max_workers or max(1, min(4, (os.cpu_count() or 1) // 2))
+        self.en_ejecucion = en_ejecucion or (lambda sesion: False)
+        self.cancelado = cancelado or threading.Event()
+
+    def _es_sqlite(self, ruta):
+        try:
+            with open(ruta, 'rb') as f:
+                return f.read(len(self.CABECERA)) == self.CABECERA
+        except OSError:
+            return False
+
+    def localizar(self, raiz):
+        """
+        Retorna las rutas de las bases de datos a compactar de un perfil.
+        """
+        encontradas = []
+        pila = [(raiz, 0)]
+        while pila:
+            actual, profundidad = pila.pop()
+            try:
+                with os.scandir(actual) as entradas:
+                    for entrada in entradas:
+                        if entrada.is_dir(follow_symlinks=False):
+                            if profundidad + 1 < self.PROFUNDIDAD:
+                                pila.append((entrada.path, profundidad + 1))
+                        elif entrada.name in self.NOMBRES and self._es_sqlite(entrada.path):
+                            encontradas.append(entrada.path)
+            except OSError:
+                continue
+        return encontradas
+
+    def compactar(self, rutas, al_progresar=None):
+        """
+        Compacta las bases de {sesión: ruta}. Retorna (resultados, omitidas): una lista de
+        resultados de compactar_sqlite con la clave 'sesion' añadida y las sesiones que no se
+        tocaron por estar abiertas. `al_progresar(hechas, total)` recibe el avance.
+        """
+        tareas, omitidas = [], []
+        for sesion, raiz in rutas.items():
+            if self.en_ejecucion(sesion) or perfil_bloqueado(raiz):
+                omitidas.append(sesion)
+                continue
+            tareas.extend((sesion, ruta) for ruta in self.localizar(raiz))
+
+        resultados = []
+        if al_progresar is not None:
+            al_progresar(0, len(tareas))
+        if not tareas:
+            return resultados, omitidas
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+            futuros = {executor.submit(compactar_sqlite, ruta): (sesion, ruta) for sesion, ruta in tareas}
+            for hechas, futuro in enumerate(as_completed(futuros), start=1):
+                if self.cancelado.is_set():
+                    for pendiente in futuros:
+                        pendiente.cancel()
+                if futuro.cancelled():
+                    continue
+                try:
+                    resultado = futuro.result()
+                except Exception as e:  # El proceso del pool murió (p. ej. fallo de SQLite)
+                    resultado = {'ruta': futuros[futuro][1], 'antes': None, 'despues': None, 'estado': 'error',
+                                 'error': str(e)}
+                resultado['sesion'] = futuros[futuro][0]
+                resultados.append(resultado)
+                if al_progresar is not None:
+                    al_progresar(hechas, len(tareas))
+        return resultados, omitidas
+
+class SessionArchiver:
+    """
+    Exporta perfiles de sesión a un archivo tar comprimido e importa archivos de vuelta.
+
+    El tar se escribe y se lee en modo flujo, fichero a fichero y por bloques, así que la memoria
+    usada no depende del tamaño del perfil. Con el paquete opcional `zstandard` se comprime en
+    zstd repartiendo el trabajo entre varios hilos; sin él, con gzip de la biblioteca estándar.
+    Al importar, el formato se reconoce por el contenido y no por la extensión. Las cachés que
+    Chrome regenera (las categorías de CachePruner) y los bloqueos de la instancia no se guardan.
+    """
+
+    EXTENSION_ZSTD = '.tar.zst'
+    EXTENSION_GZIP = '.tar.gz'
+    MAGIA_ZSTD = b'\x28\xb5\x2f\xfd'
+    MAGIA_GZIP = b'\x1f\x8b'
+    NIVEL_ZSTD = 3
+    NIVEL_GZIP = 6
+    METADATOS = 'session.json'
+    PERFIL = 'perfil'
+    BLOQUEOS = {'SingletonLock', 'SingletonCookie', 'SingletonSocket', 'DevToolsActivePort', 'lockfile'}
+
+    def __init__(self, hilos=None):
+        self.hilos = hilos or os.cpu_count() or 1
+        try:
+            import zstandard
+        except ImportError:
+            zstandard = None
+        self.zstd = zstandard
+
+    def extension(self):
+        return self.EXTENSION_ZSTD if self.zstd is not None else self.EXTENSION_GZIP
+
+    def _entradas(self, raiz):
+        """
+        Recorre el perfil en orden y produce (ruta, ruta relativa) de lo que se archiva. Un perfil
+        que aún no existe (la sesión nunca se lanzó) se archiva vacío.
+        """
+        if not os.path.isdir(raiz):
+            return
+        pila = ['']
+        while pila:
+            rel = pila.pop()
+            with os.scandir(os.path.join(raiz, rel) if rel else raiz) as entradas:
+                hijos = sorted(entradas, key=lambda entrada: entrada.name, reverse=True)
+            for entrada in hijos:
+                if entrada.name in self.BLOQUEOS:
+                    continue
+                ruta_rel = os.path.join(rel, entrada.name) if rel else entrada.name
+                if entrada.is_dir(follow_symlinks=False):
+                    if CachePruner.categoria(ruta_rel) is not None:
+                        continue
+                    pila.append(ruta_rel)
+                yield entrada.path, ruta_rel
+
+    def _escribir_tar(self, flujo, raiz, metadatos, cancelado):
+        import io
+        import tarfile
+        with tarfile.open(fileobj=flujo, mode='w|') as tar:
+            datos = json.dumps(metadatos, ensure_ascii=False, indent=2).encode('utf-8')
+            info = tarfile.TarInfo(self.METADATOS)
+            info.size, info.mtime = len(datos), time.time()
+            tar.addfile(info, io.BytesIO(datos))
+            for ruta, rel in self._entradas(raiz):
+                if cancelado is not None and cancelado.is_set():
+                    return False
+                tar.add(ruta, arcname=f"{self.PERFIL}/{rel.replace(os.sep, '/')}", recursive=False)
+        return True
+
+    def exportar(self, raiz, destino, metadatos, cancelado=None):
+        """
+        Escribe el perfil `raiz` y sus `metadatos` en el archivo `destino`, que se sustituye de
+        forma atómica al terminar. Retorna el tamaño del archivo, o None si se canceló.
+        """
+        import gzip
+        if destino.endswith(self.EXTENSION_ZSTD) and self.zstd is None:
+            raise ValueError("El formato .tar.zst necesita el paquete 'zstandard'.")
+        temporal = f"{destino}.tmp"
+        os.makedirs(os.path.dirname(os.path.abspath(destino)), exist_ok=True)
+        try:
+            with open(temporal, 'wb') as f:
+                if destino.endswith(self.EXTENSION_ZSTD):
+                    compresor = self.zstd.ZstdCompressor(level=self.NIVEL_ZSTD, threads=self.hilos)
+                    flujo = compresor.stream_writer(f, closefd=False)
+                else:
+                    flujo = gzip.GzipFile(fileobj=f, mode='wb', compresslevel=self.NIVEL_GZIP)
+                with flujo:
+                    completo = self._escribir_tar(flujo, raiz, metadatos, cancelado)
+                if completo:
+                    f.flush()
+                    os.fsync(f.fileno())
+            if not completo:
+                os.remove(temporal)
+                return None
+            os.replace(temporal, destino)
+        except BaseException:
+            try:
+                os.remove(temporal)
+            except OSError:
+                pass
+            raise
+        return os.path.getsize(destino)
+
+    def importar(self, archivo, destino, cancelado=None):
+        """
+        Extrae el perfil de `archivo` en la carpeta `destino`, que no debe existir, y retorna sus
+        metadatos, o None si se canceló. Lanza ValueError si el archivo no es válido; lo extraído
+        a medias se elimina.
+        """
+        import gzip
+        import zlib
+        import tarfile
+        nombre_archivo = os.path.basename(archivo)
+        danado = (tarfile.TarError, EOFError, zlib.error, gzip.BadGzipFile)
+        if self.zstd is not None:
+            danado += (self.zstd.ZstdError,)
+        temporal = f"{destino}.{time.time_ns()}.importando"
+        metadatos = None
+        try:
+            with open(archivo, 'rb') as f:
+                magia = f.read(len(self.MAGIA_ZSTD))
+                f.seek(0)
+                if magia == self.MAGIA_ZSTD:
+                    if self.zstd is None:
+                        raise ValueError("Para importar archivos .tar.zst hay que instalar el paquete 'zstandard'.")
+                    flujo = self.zstd.ZstdDecompressor().stream_reader(f, closefd=False)
+                elif magia.startswith(self.MAGIA_GZIP):
+                    flujo = gzip.GzipFile(fileobj=f, mode='rb')
+                else:
+                    raise ValueError(f"'{nombre_archivo}' no es un archivo de sesión.")
+
+                os.makedirs(temporal)
+                # El filtro 'data' rechaza rutas absolutas, enlaces que salen del destino y ficheros especiales
+                filtro = {'filter': 'data'} if hasattr(tarfile, 'data_filter') else {}
+                with flujo, tarfile.open(fileobj=flujo, mode='r|') as tar:
+                    for miembro in tar:
+                        if cancelado is not None and cancelado.is_set():
+                            shutil.rmtree(temporal, ignore_errors=True)
+                            return None
+                        if miembro.name == self.METADATOS:
+                            try:
+                                metadatos = json.loads(tar.extractfile(miembro).read().decode('utf-8'))
+                            except ValueError:
+                                metadatos = None
+                            continue
+                        partes = miembro.name.split('/')
+                        if partes[0] != self.PERFIL or len(partes) < 2 or '..' in partes:
+                            raise ValueError(f"Entrada no válida en '{nombre_archivo}': {miembro.name}")
+                        miembro.name = '/'.join(partes[1:])
+                        if miembro.islnk():
+                            # Los enlaces duros (ver ProfileDeduplicator) apuntan a otra entrada del perfil
+                            enlace = miembro.linkname.split('/')
+                            if enlace[0] != self.PERFIL or len(enlace) < 2 or '..' in enlace:
+                                raise ValueError(f"Entrada no válida en '{nombre_archivo}': {miembro.linkname}")
+                            miembro.linkname = '/'.join(enlace[1:])
+                        tar.extract(miembro, temporal, **filtro)
+            if not isinstance(metadatos, dict) or not metadatos.get('name'):
+                raise ValueError(f"'{nombre_archivo}' no contiene los datos de la sesión.")
+            os.rename(temporal, destino)
+        except danado as e:
+            shutil.rmtree(temporal, ignore_errors=True)
+            raise ValueError(f"El archivo '{nombre_archivo}' está dañado: {e}")
+        except BaseException:
+            shutil.rmtree(temporal, ignore_errors=True)
+            raise
+        return metadatos
+
+def ruta_ram_predeterminada():
+    """
+    Carpeta en tmpfs para el modo RAM, o None si el sistema no tiene una a mano. En Linux se
+    usa /dev/shm; en macOS y Windows hay que montar un disco en RAM e indicarlo en `ram_ruta`.
+    """
+    if sys.platform.startswith('linux') and os.path.isdir('/dev/shm'):
+        return os.path.join('/dev/shm', f"chrome-session-manager-{os.getuid()}")
+    return None
+
+class RamDiskStager:
+    """
+    Ejecuta sesiones con el perfil en un disco en RAM (tmpfs) y sincroniza los cambios de vuelta.
+
+    Antes del lanzamiento el perfil se copia, sin cachés regenerables, a una carpeta en tmpfs y
+    Chrome escribe solo en memoria. Al cerrarse se copian a disco únicamente los ficheros cuyo
+    tamaño o mtime cambió (y se borran los que ya no existen), cada uno con un rename atómico;
+    lo mismo se hace periódicamente mientras sigue abierto para acotar lo que se perdería. En
+    esos puntos de control se omiten las bases de datos SQLite y sus ficheros -wal/-journal/-shm:
+    Chrome puede estar escribiéndolos y copiarlos uno a uno dejaría en disco una pareja
+    incoherente, así que se copian cuando Chrome se cierra.
+
+    Las sesiones preparadas se anotan en Storage/Settings/ram.json. Si el gestor se cierra de
+    golpe, el siguiente arranque sincroniza las que quedaron en tmpfs con Chrome ya cerrado; si
+    se reinició el equipo, el contenido de tmpfs se perdió y en disco queda el último punto de
+    control.
+
+    Cada sesión reserva el tamaño de su perfil más CACHE bytes para las cachés que Chrome
+    regenera en tmpfs, y su caché HTTP se limita a esa cantidad con --disk-cache-size. Como el
+    resto de cachés (Code Cache, GPUCache...) no tienen límite, en cada punto de control se mide
+    lo que ocupa de verdad la carpeta en RAM, y un nuevo perfil solo se prepara si la ocupación
+    real (nunca menor que lo reservado) más el suyo no supera `limite` bytes.
+    """
+
+    CABECERA_SQLITE = b'SQLite format 3\x00'
+    SUFIJOS_SQLITE = ('-wal', '-journal', '-shm')
+    CACHE = 64 * 1024 ** 2
+
+    def __init__(self, ruta=None, limite=None, ruta_manifiesto=None):
+        self.ruta_base = ruta or ruta_ram_predeterminada()
+        self.limite = limite
+        self.ruta_manifiesto = ruta_manifiesto or os.path.join(RUTA_AJUSTES, 'ram.json')
+        self.lock = threading.RLock()
+
+    def disponible(self):
+        return self.ruta_base is not None
+
+    def _leer(self):
+        try:
+            with open(self.ruta_manifiesto, 'r', encoding='utf-8') as f:
+                datos = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        return datos if isinstance(datos, dict) else {}
+
+    def _guardar(self, datos):
+        escribir_json_atomico(self.ruta_manifiesto, datos, indent=4, ensure_ascii=False)
+
+    def preparadas(self):
+        """
+        Retorna {sesión: {'ram', 'disco', 'tamano', 'cache', 'ocupado', 'inicio', 'sincronizado'}}:
+        'tamano' es el del perfil sin cachés y 'ocupado' lo que ocupaba la carpeta en RAM, cachés
+        incluidas, en el último punto de control.
+        """
+        with self.lock:
+            return self._leer()
+
+    def ruta(self, nombre_sesion):
+        """
+        Carpeta en tmpfs de una sesión preparada, o None.
+        """
+        datos = self.preparadas().get(nombre_sesion)
+        return datos['ram'] if datos else None
+
+    def _ocupacion(self, datos, ocupado=None):
+        """
+        RAM que cuenta para el límite de una sesión preparada: lo que ocupa su carpeta (la
+        medición de `ocupado` o la del último punto de control), nunca menos que lo reservado.
+        """
+        reserva = datos.get('tamano', 0) + datos.get('cache', 0)
+        return max(reserva, datos.get('ocupado', 0) if ocupado is None else ocupado)
+
+    def uso(self):
+        """
+        Bytes de RAM ocupados o reservados por los perfiles preparados.
+        """
+        return sum(self._ocupacion(datos) for datos in self.preparadas().values())
+
+    def flags(self, flags):
+        """
+        Opciones de Chrome para una sesión en RAM: limita la caché HTTP a CACHE bytes, salvo
+        que `flags` ya fije un límite menor.
+        """
+        limites = [flag.split('=', 1)[1] for flag in flags if flag.startswith('--disk-cache-size=')]
+        if limites and limites[-1].isdigit() and 0 < int(limites[-1]) <= self.CACHE:
+            return []
+        return [f"--disk-cache-size={self.CACHE}"]
+
+    def _tamano(self, raiz, caches=False):
+        """
+        Bytes de los ficheros de `raiz`; sin `caches`, sin contar las que Chrome regenera.
+        """
+        total = 0
+        for directorio, subdirectorios, ficheros in os.walk(raiz):
+            if not caches:
+                subdirectorios[:] = [d for d in subdirectorios if d not in ProfileCloner.EXCLUIDOS]
+            for fichero in ficheros:
+                if fichero in ProfileCloner.EXCLUIDOS and not caches:
+                    continue
+                try:
+                    total += os.lstat(os.path.join(directorio, fichero)).st_size
+                except OSError:
+                    pass
+        return total
+
+    def preparar(self, nombre_sesion, perfil):
+        """
+        Copia el perfil `perfil` a tmpfs y retorna la carpeta en RAM. Lanza OSError si el modo RAM
+        no está disponible y ValueError si el perfil no cabe en el límite de RAM.
+        """
+        if not self.disponible():
+            raise OSError("El modo RAM no está disponible: indique una carpeta en tmpfs en 'ram_ruta'.")
+        tamano = self._tamano(perfil) if os.path.isdir(perfil) else 0
+        necesario = tamano + self.CACHE
+        destino = os.path.join(self.ruta_base, nombre_sesion)
+        with self.lock:
+            datos = self._leer()
+            if nombre_sesion in datos:
+                raise ValueError(f"La sesión '{nombre_sesion}' ya está en RAM.")
+            # Lo que ocupan ahora las sesiones preparadas, cachés incluidas
+            usado = sum(self._ocupacion(d, self._tamano(d['ram'], caches=True)) for d in datos.values())
+            if self.limite and usado + necesario > self.limite:
+                raise ValueError(f"No hay RAM suficiente para la sesión '{nombre_sesion}': necesita "
+                                 f"{format_size(necesario)} y quedan {format_size(max(self.limite - usado, 0))} "
+                                 f"del límite de {format_size(self.limite)}.")
+            os.makedirs(self.ruta_base, mode=0o700, exist_ok=True)
+            if uso_volumen(self.ruta_base)[1] < necesario:
+                raise ValueError(f"No queda espacio en '{self.ruta_base}' para la sesión '{nombre_sesion}'.")
+            # Reservar antes de copiar: varios lanzamientos en paralelo no superan el límite
+            datos[nombre_sesion] = {'ram': destino, 'disco': perfil, 'tamano': tamano, 'cache': self.CACHE,
+                                    'ocupado': tamano, 'inicio': datetime.now().strftime(FORMATO_FECHA),
+                                    'sincronizado': None}
+            self._guardar(datos)
+        try:
+            shutil.rmtree(destino, ignore_errors=True)  # Restos de una ejecución anterior ya descartada
+            if os.path.isdir(perfil):
+                ProfileCloner().clonar(perfil, [destino])
+            else:
+                os.makedirs(destino)
+        except BaseException:
+            self.descartar(nombre_sesion)
+            raise
+        return destino
+
+    def _sqlite(self, ruta, nombre, hermanos):
+        """
+        True si el fichero es una base de datos SQLite o el diario (-wal, -journal, -shm) de una
+        de las que hay junto a él (`hermanos`, los nombres de su carpeta).
+        """
+        if any(nombre.endswith(sufijo) and nombre[:-len(sufijo)] in hermanos for sufijo in self.SUFIJOS_SQLITE):
+            return True
+        try:
+            with open(ruta, 'rb') as f:
+                return f.read(len(self.CABECERA_SQLITE)) == self.CABECERA_SQLITE
+        except OSError:
+            return False
+
+    def _sincronizar(self, origen, destino, en_vivo=False):
+        """
+        Copia de `origen` a `destino` los ficheros que cambiaron y borra los que ya no existen.
+        Las cachés y los bloqueos no se tocan en ningún lado. Con `en_vivo` (Chrome sigue abierto)
+        las bases de datos SQLite y sus diarios se dejan como estaban en disco. Retorna
+        (copiados, bytes, borrados, tamaño, omitidos).
+        """
+        copiados, copiados_bytes, borrados, tamano, omitidos = 0, 0, 0, 0, 0
+        pila = ['']
+        while pila:
+            rel = pila.pop()
+            dir_origen = os.path.join(origen, rel) if rel else origen
+            dir_destino = os.path.join(destino, rel) if rel else destino
+            os.makedirs(dir_destino, exist_ok=True)
+            vistos = set()
+            try:
+                entradas = list(os.scandir(dir_origen))
+            except FileNotFoundError:
+                continue  # Chrome lo borró mientras se recorría
+            hermanos = {entrada.name for entrada in entradas}
+            for entrada in entradas:
+                if entrada.name in ProfileCloner.EXCLUIDOS:
+                    continue
+                vistos.add(entrada.name)
+                ruta_rel = os.path.join(rel, entrada.name) if rel else entrada.name
+                ruta_destino = os.path.join(dir_destino, entrada.name)
+                try:
+                    if entrada.is_symlink():
+                        enlace = os.readlink(entrada.path)
+                        if not os.path.islink(ruta_destino) or os.readlink(ruta_destino) != enlace:
+                            temporal = f"{ruta_destino}.{time.time_ns()}.ram"
+                            os.symlink(enlace, temporal)
+                            os.replace(temporal, ruta_destino)
+                        continue
+                    if entrada.is_dir():
+                        if os.path.lexists(ruta_destino) and not os.path.isdir(ruta_destino):
+                            os.unlink(ruta_destino)
+                        pila.append(ruta_rel)
+                        continue
+                    st = entrada.stat()
+                except FileNotFoundError:
+                    continue
+                tamano += st.st_size
+                try:
+                    st_destino = os.lstat(ruta_destino)
+                    if st_destino.st_size == st.st_size and st_destino.st_mtime_ns == st.st_mtime_ns:
+                        continue
+                except OSError:
+                    pass
+                if en_vivo and self._sqlite(entrada.path, entrada.name, hermanos):
+                    omitidos += 1
+                    continue
+                temporal = f"{ruta_destino}.{time.time_ns()}.ram"
+                try:
+                    shutil.copy2(entrada.path, temporal)
+                    os.replace(temporal, ruta_destino)
+                except FileNotFoundError:
+                    continue  # Fichero temporal de Chrome que desapareció durante la copia
+                except IsADirectoryError:
+                    shutil.rmtree(ruta_destino)
+                    os.replace(temporal, ruta_destino)
+                finally:
+                    if os.path.lexists(temporal):
+                        os.unlink(temporal)
+                copiados += 1
+                copiados_bytes += st.st_size
+
+            # Lo que ya no existe en RAM se borró en la sesión (salvo los diarios de SQLite en
+            # vivo: acompañan a la versión de la base de datos que sigue en disco)
+            with os.scandir(dir_destino) as entradas_destino:
+                sobrantes = [e for e in entradas_destino
+                             if e.name not in vistos and e.name not in ProfileCloner.EXCLUIDOS
+                             and not (en_vivo and e.name.endswith(self.SUFIJOS_SQLITE))]
+            for entrada in sobrantes:
+                if entrada.is_dir(follow_symlinks=False):
+                    shutil.rmtree(entrada.path, ignore_errors=True)
+                else:
+                    try:
+                        os.unlink(entrada.path)
+                    except FileNotFoundError:
+                        pass
+                borrados += 1
+        return copiados, copiados_bytes, borrados, tamano, omitidos
+
+    def sincronizar(self, nombre_sesion, en_vivo=True):
+        """
+        Punto de control: copia a disco los cambios de una sesión preparada, sin sus bases de
+        datos SQLite si Chrome sigue abierto (`en_vivo`). Retorna {'copiados', 'bytes',
+        'borrados', 'omitidos'}, o None si la sesión no está en RAM o su carpeta se perdió (p. ej.
+        tras un reinicio).
+        """
+        with self.lock:
+            datos = self._leer().get(nombre_sesion)
+            if datos is None or not os.path.isdir(datos['ram']):
+                return None
+            copiados, copiados_bytes, borrados, tamano, omitidos = self._sincronizar(datos['ram'], datos['disco'], en_vivo)
+            ocupado = self._tamano(datos['ram'], caches=True)
+            manifiesto = self._leer()
+            if nombre_sesion in manifiesto:
+                manifiesto[nombre_sesion].update(tamano=tamano, ocupado=ocupado,
+                                                 sincronizado=datetime.now().strftime(FORMATO_FECHA))
+                self._guardar(manifiesto)
+        return {'copiados': copiados, 'bytes': copiados_bytes, 'borrados': borrados, 'omitidos': omitidos}
+
+    def devolver(self, nombre_sesion):
+        """
+        Sincroniza por última vez una sesión cuyo Chrome ya se cerró y libera su RAM. Retorna el
+        resultado de `sincronizar` con 'perdida' a True si la carpeta en tmpfs ya no existía, o
+        None si la sesión no estaba en RAM.
+        """
+        with self.lock:
+            datos = self._leer().get(nombre_sesion)
+            if datos is None:
+                return None
+            resultado = self.sincronizar(nombre_sesion, en_vivo=False)
+            if resultado is None:
+                resultado = {'copiados': 0, 'bytes': 0, 'borrados': 0, 'omitidos': 0, 'perdida': True}
+            else:
+                resultado['perdida'] = False
+            self.descartar(nombre_sesion)
+        return resultado
+
+    def descartar(self, nombre_sesion):
+        """
+        Libera la RAM de una sesión sin sincronizar (p. ej. porque se borró).
+        """
+        with self.lock:
+            datos = self._leer()
+            entrada = datos.pop(nombre_sesion, None)
+            if entrada is None:
+                return
+            shutil.rmtree(entrada['ram'], ignore_errors=True)
+            self._guardar(datos)
+
+def rutas_chrome():
+    """
+    Rutas habituales del ejecutable de Chrome según el sistema operativo
+    """
+    if os.name == 'nt':  # Windows
+        return [
+            os.path.join(os.environ.get('LOCALAPPDATA', ''), 
+                        'Google', 'Chrome', 'Application', 'chrome.exe'),
+            os.path.join(os.environ.get('PROGRAMFILES', ''), 
+                        'Google', 'Chrome', 'Application', 'chrome.exe'),
+            os.path.join(os.environ.get('PROGRAMFILES(X86)', ''), 
+                        'Google', 'Chrome', 'Application', 'chrome.exe')
+        ]
+    elif sys.platform == 'darwin':  # macOS
+        return [
+            '/Applications/Google Chrome.app/Contents/MacOS/Google Chrome',
+            os.path.expanduser('~/Applications/Google Chrome.app/Contents/MacOS/Google Chrome')
+        ]
+    else:  # Linux
+        return [
+            '/usr/bin/google-chrome',
+            '/usr/bin/google-chrome-stable',
+            '/usr/bin/chrome',
+            '/snap/bin/google-chrome'
+        ]
+
+def detectar_ruta_chrome():
+    """
+    Retorna la primera ruta de Chrome que existe en el sistema, o None
+    """
+    for path in rutas_chrome():
+        if os.path.isfile(path):
+            return path
+    return None
+
+def ruta_chrome_predeterminada():
+    """
+    Ruta de Chrome a usar cuando no se detecta ninguna instalación
+    """
+    if os.name == 'nt':
+        return os.path.join(os.environ.get('PROGRAMFILES', ''),
+                        'Google', 'Chrome', 'Application', 'chrome.exe')
+    elif sys.platform == 'darwin':
+        return '/Applications/Google Chrome.app/Contents/MacOS/Google Chrome'
+    else:
+        return '/usr/bin/google-chrome'
+
+def ruta_configuracion():
+    return os.path.join(RUTA_AJUSTES, 'constants.json')
+
+def cargar_configuracion():
+    """
+    Carga la configuración con rutas predeterminadas según la plataforma.
+    Si el fichero no existe o está dañado, se crea uno con los valores predeterminados.
+    """
+    config_path = ruta_configuracion()
+    try:
+        with open(config_path, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        default_config = {
+            "chrome_ruta": detectar_ruta_chrome() or ruta_chrome_predeterminada(),
+            "tema": "Oscuro"  # tema predeterminado
+        }
+        guardar_configuracion(default_config)
+        return default_config
+
+def guardar_configuracion(config):
+    """
+    Guarda la configuración en el archivo JSON.
+    """
+    escribir_json_atomico(ruta_configuracion(), config, indent=4)
+
+def uso_volumen(ruta=None):
+    """
+    Retorna (capacidad, libre) en bytes del volumen que contiene `ruta` (por defecto, Storage).
+    Si la carpeta aún no existe se mide la carpeta existente más cercana que la contiene.
+    """
+    uso = shutil.disk_usage(_ruta_existente(ruta))
+    return uso.total, uso.free
+
+def _ruta_existente(ruta):
+    ruta = os.path.abspath(ruta or RUTA_STORAGE)
+    while not os.path.exists(ruta) and os.path.dirname(ruta) != ruta:
+        ruta = os.path.dirname(ruta)
+    return ruta
+
+def dispositivo_volumen(ruta=None):
+    """
+    Identificador (st_dev) del volumen que contiene `ruta`, con el mismo criterio que uso_volumen.
+    """
+    return os.stat(_ruta_existente(ruta)).st_dev
+
+def memoria_disponible():
+    """
+    Bytes de RAM disponibles para nuevos procesos sin recurrir a swap, o None si no se puede
+    saber (MemAvailable en Linux, GlobalMemoryStatusEx en Windows).
+    """
+    if os.name == 'nt':
+        import ctypes
+
+        class MEMORYSTATUSEX(ctypes.Structure):
+            _fields_ = [('dwLength', ctypes.c_ulong), ('dwMemoryLoad', ctypes.c_ulong),
+                        ('ullTotalPhys', ctypes.c_ulonglong), ('ullAvailPhys', ctypes.c_ulonglong),
+                        ('ullTotalPageFile', ctypes.c_ulonglong), ('ullAvailPageFile', ctypes.c_ulonglong),
+                        ('ullTotalVirtual', ctypes.c_ulonglong), ('ullAvailVirtual', ctypes.c_ulonglong),
+                        ('ullAvailExtendedVirtual', ctypes.c_ulonglong)]
+
+        estado = MEMORYSTATUSEX(dwLength=ctypes.sizeof(MEMORYSTATUSEX))
+        if not ctypes.windll.kernel32.GlobalMemoryStatusEx(ctypes.byref(estado)):
+            return None
+        return estado.ullAvailPhys
+    try:
+        with open('/proc/meminfo', 'rb') as f:
+            for linea in f:
+                if linea.startswith(b'MemAvailable:'):
+                    return int(linea.split()[1]) * 1024
+    except (OSError, ValueError):
+        pass
+    return None
+
+def espacio_libre(ruta=None):
+    """
+    Obtiene el espacio libre del volumen que contiene `ruta` (por defecto, Storage) de manera
+    multiplataforma.
+    """
+    return uso_volumen(ruta)[1]
+
+def carga_volumenes(rutas, intervalo=0.1):
+    """
+    Retorna {ruta: fracción del tiempo con E/S en curso} de los dispositivos que contienen cada
+    ruta, medida durante `intervalo` segundos con /proc/diskstats. Fuera de Linux, o si el
+    dispositivo no aparece (overlay, red...), la carga es 0.
+    """
+    carga = {ruta: 0.0 for ruta in rutas}
+    if not os.path.exists('/proc/diskstats'):
+        return carga
+
+    def leer():
+        # Campo 10 de las estadísticas: milisegundos con E/S en curso
+        ticks = {}
+        with open('/proc/diskstats') as f:
+            for linea in f:
+                campos = linea.split()
+                if len(campos) > 12:
+                    ticks[(int(campos[0]), int(campos[1]))] = int(campos[12])
+        return ticks
+
+    dispositivos = {}
+    for ruta in rutas:
+        try:
+            st = os.stat(ruta)
+        except OSError:
+            continue
+        dispositivos[ruta] = (os.major(st.st_dev), os.minor(st.st_dev))
+    try:
+        antes = leer()
+        inicio = time.monotonic()
+        time.sleep(intervalo)
+        despues = leer()
+        transcurrido = (time.monotonic() - inicio) * 1000
+    except (OSError, ValueError):
+        return carga
+    for ruta, dispositivo in dispositivos.items():
+        if dispositivo in antes and dispositivo in despues:
+            carga[ruta] = min(1.0, (despues[dispositivo] - antes[dispositivo]) / transcurrido)
+    return carga
+
+def esperar_devtools(puerto, timeout=30, proceso=None, intervalo=0.2, cancelado=None):
+    """
+    Espera a que el endpoint /json/version del puerto de depuración responda.
+    Retorna False si vence el plazo, si el proceso termina antes o si se activa `cancelado`.
+    """
+    import urllib.request
+    limite = time.monotonic() + timeout
+    while time.monotonic() < limite:
+        if proceso is not None and proceso.poll() is not None:
+            return False
+        if cancelado is not None and cancelado.is_set():
+            return False
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{puerto}/json/version", timeout=1) as r:
+                if r.status == 200:
+                    return True
+        except (OSError, ValueError):
+            pass
+        if cancelado is not None:
+            cancelado.wait(intervalo)
+        else:
+            time.sleep(intervalo)
+    return False
+
+class SessionRunningError(RuntimeError):
+    """
+    La sesión ya tiene un Chrome abierto sobre su perfil.
+    """
+
+# Fases de un arranque, en orden (ver SessionLauncher.esperar_arranque)
+ETIQUETAS_FASES = {
+    'port': "Puerto",
+    'profile': "Perfil",
+    'popen': "Popen",
+    'devtools': "DevTools",
+    'load': "Primera carga",
+    'total': "Total",
+}
+
+# Presets de lanzamiento: opciones de Chrome que acotan la RAM y el disco de cada instancia.
+# 'ventana' indica si la instancia abre ventanas (las headless no se pueden precalentar).
+PRESETS_LANZAMIENTO = {
+    'full': {
+        'descripcion': "Chrome con sus opciones predeterminadas",
+        'flags': [],
+        'ventana': True,
+    },
+    'low-memory': {
+        'descripcion': "Caché de disco de 64 MB, como mucho 2 procesos de pestañas, 512 MB de memoria "
+                       "JavaScript por pestaña y sin tráfico en segundo plano",
+        'flags': [
+            '--disk-cache-size=67108864',
+            '--renderer-process-limit=2',
+            '--process-per-site',
+            '--js-flags=--max-old-space-size=512',
+            '--disable-background-networking',
+            '--disable-component-update',
+            '--disable-default-apps',
+        ],
+        'ventana': True,
+    },
+    'headless-batch': {
+        'descripcion': "Sin ventana (headless), sin GPU ni sonido, para trabajos por lotes: caché de disco "
+                       "de 32 MB y los mismos límites de memoria que low-memory",
+        'flags': [
+            '--headless=new',
+            '--disable-gpu',
+            '--mute-audio',
+            '--no-first-run',
+            '--no-default-browser-check',
+            '--disk-cache-size=33554432',
+            '--renderer-process-limit=2',
+            '--process-per-site',
+            '--js-flags=--max-old-space-size=512',
+            '--disable-background-networking',
+            '--disable-component-update',
+            '--disable-sync',
+        ],
+        'ventana': False,
+    },
+}
+PRESET_PREDETERMINADO = 'full'
+
+# Opciones que fija el propio gestor y no se pueden cambiar por sesión
+FLAGS_RESERVADOS = ('--remote-debugging-port', '--user-data-dir', '--no-startup-window')
+
+def validar_arranque(preset=None, urls=None, flags=None):
+    """
+    Comprueba la configuración de arranque de una sesión: un preset de PRESETS_LANZAMIENTO,
+    URLs de inicio y opciones adicionales de Chrome (que empiecen por '--' y no sean de las que
+    fija el gestor). Lanza ValueError si algo no es válido.
+    """
+    if preset is not None and preset not in PRESETS_LANZAMIENTO:
+        raise ValueError(f"No existe el preset '{preset}' (disponibles: {', '.join(PRESETS_LANZAMIENTO)}).")
+    for url in urls or []:
+        if not url or url.startswith('-') or any(c.isspace() for c in url):
+            raise ValueError(f"URL de inicio no válida: '{url}'.")
+    for flag in flags or []:
+        if not flag.startswith('--'):
+            raise ValueError(f"Opción de Chrome no válida: '{flag}' (debe empezar por '--').")
+        if flag.split('=', 1)[0] in FLAGS_RESERVADOS:
+            raise ValueError(f"La opción '{flag.split('=', 1)[0]}' la fija el gestor.")
+
+def percentiles(valores, cuantiles=(50, 95, 99)):
+    """
+    Retorna {'p50': ..., 'p95': ..., 'p99': ...} (método del rango más cercano) de una lista de
+    valores, ignorando los None, o None si no queda ninguno.
+    """
+    valores = sorted(valor for valor in valores if valor is not None)
+    if not valores:
+        return None
+    return {f"p{cuantil}": valores[max(0, -(-cuantil * len(valores) // 100) - 1)] for cuantil in cuantiles}
+
+class SessionLauncher:
+    """
+    Lanza Chrome para una sesión: reserva el puerto, prepara el perfil, ejecuta el proceso y
+    lo anota en el registro. Con `store`, anota además la fecha del lanzamiento como último uso
+    de la sesión y reabre las pestañas de las sesiones cerradas por inactividad; con `ram` (un
+    RamDiskStager), puede ejecutarla con el perfil en tmpfs; con `limites` (un CgroupLimiter),
+    acota sus recursos en Linux. No depende de la interfaz, así que puede usarse desde hilos.
+
+    La línea de comandos de Chrome añade las opciones del preset de la sesión (ver
+    PRESETS_LANZAMIENTO) y sus opciones propias (launch_flags), y abre sus URLs de inicio.
+
+    Cada lanzamiento anota cuándo termina cada fase (puerto, perfil, Popen); `esperar_arranque`
+    completa la cronología con la primera respuesta de DevTools y, en segundo plano, con la
+    primera carga de página, y la guarda en el store (ver SessionStore.registrar_lanzamiento).
+    """
+
+    URL_INICIO = "https://www.google.com/"
+
+    def __init__(self, port_allocator, process_registry, store=None, ram=None, limites=None):
+        self.port_allocator = port_allocator
+        self.process_registry = process_registry
+        self.store = store
+        self.ram = ram
+        self.limites = limites
+        self._cronologias = {}  # sesión -> {'oculta', fase: instante monotónico}
+        self._mediciones = []  # Hilos que miden la primera carga (ver esperar_arranque)
+        self._lock_cronologias = threading.Lock()
+
+    def lanzar(self, nombre_instancia, chrome_ruta, en_ram=False, oculta=False):
+        """
+        Retorna (proceso, puerto). Con `en_ram`, Chrome usa una copia del perfil en tmpfs; con
+        `oculta`, arranca sin ventana (--no-startup-window) para precalentarla (ver WarmPool).
+        Lanza SessionRunningError si la sesión ya está abierta, FileNotFoundError si no se
+        encuentra Chrome, ValueError si el perfil no cabe en RAM (o si se pide `oculta` con un
+        preset sin ventana) y OSError si falla el lanzamiento.
+        """
+        if self.process_registry.en_ejecucion(nombre_instancia):
+            raise SessionRunningError(f"La sesión '{nombre_instancia}' ya está en ejecución.")
+
+        # Si no se proporciona una ruta válida, intentar encontrar Chrome automáticamente
+        if not chrome_ruta or not os.path.isfile(chrome_ruta):
+            chrome_ruta = detectar_ruta_chrome()
+            if not chrome_ruta:
+                raise FileNotFoundError("No se pudo encontrar Google Chrome instalado en el sistema.")
+
+        datos = (self.store.obtener(nombre_instancia) if self.store is not None else None) or {}
+        preset = PRESETS_LANZAMIENTO.get(datos.get('preset') or PRESET_PREDETERMINADO, PRESETS_LANZAMIENTO['full'])
+        flags = preset['flags'] + list(datos.get('launch_flags') or [])
+        if oculta and not preset['ventana']:
+            raise ValueError(f"La sesión '{nombre_instancia}' usa un preset sin ventana y no se puede precalentar.")
+
+        cronologia = {'oculta': oculta, 'inicio': time.monotonic()}
+        port = self.port_allocator.reservar(nombre_instancia)
+        cronologia['port'] = time.monotonic()
+
+        # Una sesión cerrada por inactividad se reabre con las pestañas que tenía
+        urls = self.urls_inicio(datos)
+        suspendida = datos.get('suspended')
+        if oculta:
+            urls = ['--no-startup-window']  # Las pestañas se abren al entregarla
+
+        storage_r = ruta_sesion(nombre_instancia, self.store.raiz(nombre_instancia) if self.store is not None else None)
+        preparada = False
+        try:
+            os.makedirs(storage_r, exist_ok=True)
+            if self.ram is not None and self.ram.ruta(nombre_instancia) is not None:
+                # Copia en RAM de una ejecución anterior aún sin devolver: se reutiliza o se vuelca
+                if en_ram:
+                    storage_r = self.ram.ruta(nombre_instancia)
+                    flags = flags + self.ram.flags(flags)
+                else:
+                    self.ram.devolver(nombre_instancia)
+            elif en_ram:
+                if self.ram is None:
+                    raise OSError("El modo RAM no está disponible.")
+                storage_r = self.ram.preparar(nombre_instancia, storage_r)
+                preparada = True
+                flags = flags + self.ram.flags(flags)
+            cronologia['profile'] = time.monotonic()
+            if os.name == 'nt':  # Windows
+                proceso = subprocess.Popen([
+                    chrome_ruta,
+                    f"--remote-debugging-port={port}",
+                    f"--user-data-dir={os.path.abspath(storage_r)}",
+                    *flags,
+                    *urls
+                ], creationflags=subprocess.CREATE_NEW_PROCESS_GROUP)
+            else:  # Linux/Mac
+                comando = [
+                    chrome_ruta,
+                    f"--remote-debugging-port={port}",
+                    f"--user-data-dir={storage_r}",
+                    *flags,
+                    *urls
+                ]
+                if self.limites is not None:
+                    comando = self.limites.envolver(nombre_instancia, comando)
+                proceso = subprocess.Popen(comando, start_new_session=True)
+        except Exception:
+            self.port_allocator.liberar(nombre_instancia)
+            if preparada:
+                self.ram.descartar(nombre_instancia)  # Chrome no llegó a usar la copia recién hecha
+            elif en_ram and self.ram is not None:
+                self.ram.devolver(nombre_instancia)  # Copia de una ejecución anterior: guarda sus cambios
+            raise
+        cronologia['popen'] = time.monotonic()
+
+        with self._lock_cronologias:
+            self._cronologias[nombre_instancia] = cronologia
+        self.process_registry.registrar(nombre_instancia, proceso, port, storage_r, oculta)
+        if self.store is not None and not oculta:
+            campos = {'last_used': datetime.now().strftime(FORMATO_FECHA)}
+            if suspendida is not None:
+                campos['suspended'] = None
+            try:
+                self.store.actualizar(nombre_instancia, **campos)
+            except sqlite3.Error:
+                pass  # El último uso solo ordena el archivado automático; no impide el lanzamiento
+        return proceso, port
+
+    def urls_inicio(self, datos):
+        """
+        Páginas con las que arranca una sesión según sus metadatos: las pestañas que tenía si se
+        cerró por inactividad, sus URLs de inicio o, si no tiene, la página de inicio.
+        """
+        suspendida = datos.get('suspended')
+        if suspendida and suspendida.get('pestanas'):
+            return suspendida['pestanas']
+        return list(datos.get('start_urls') or []) or [self.URL_INICIO]
+
+    def esperar_arranque(self, nombre_instancia, proceso, puerto, timeout=30, cancelado=None, al_cargar=None):
+        """
+        Espera a que DevTools responda en el puerto (ver esperar_devtools) y retorna {fase:
+        segundos} del lanzamiento hasta ese momento, o None si DevTools no respondió. Salvo en
+        las instancias ocultas, la primera carga de página se mide después en un hilo aparte,
+        con el resto del plazo, sin retener a quien espera: al terminar completa ese mismo
+        diccionario (la carga queda en None si la página no llegó a cargar), guarda la
+        cronología en el store e invoca `al_cargar(fases)`. Ver esperar_mediciones.
+        """
+        with self._lock_cronologias:
+            cronologia = self._cronologias.pop(nombre_instancia, None)
+        limite = time.monotonic() + timeout
+        if not esperar_devtools(puerto, timeout, proceso, cancelado=cancelado):
+            return None
+        medida = cronologia is not None  # Sin lanzamiento previo solo se miden DevTools y la carga
+        if not medida:
+            cronologia = {'oculta': nombre_instancia in self.process_registry.ocultas(), 'inicio': time.monotonic()}
+        cronologia['devtools'] = time.monotonic()
+        fases = self._fases(cronologia)
+        if cronologia['oculta']:
+            self._registrar_cronologia(nombre_instancia, cronologia, fases, medida, al_cargar)
+            return fases
+        hilo = threading.Thread(target=self._medir_carga, name=f"carga-{nombre_instancia}", daemon=True,
+                                args=(nombre_instancia, puerto, cronologia, fases, medida, limite, cancelado, al_cargar))
+        with self._lock_cronologias:
+            self._mediciones = [medicion for medicion in self._mediciones if medicion.is_alive()] + [hilo]
+        hilo.start()
+        return fases
+
+    def esperar_mediciones(self, timeout=None):
+        """
+        Espera a que terminen las mediciones de la primera carga en curso (p. ej. antes de que
+        la línea de comandos termine y se pierdan).
+        """
+        with self._lock_cronologias:
+            mediciones = list(self._mediciones)
+        limite = None if timeout is None else time.monotonic() + timeout
+        for medicion in mediciones:
+            medicion.join(None if limite is None else max(0.0, limite - time.monotonic()))
+
+    def _medir_carga(self, nombre_instancia, puerto, cronologia, fases, medida, limite, cancelado, al_cargar):
+        if esperar_carga(puerto, max(0.0, limite - time.monotonic()), cancelado):
+            cronologia['load'] = time.monotonic()
+            fases.update(self._fases(cronologia))
+        self._registrar_cronologia(nombre_instancia, cronologia, fases, medida, al_cargar)
+
+    @staticmethod
+    def _fases(cronologia):
+        fases = dict.fromkeys(SessionStore.FASES_LANZAMIENTO)
+        anterior = cronologia['inicio']
+        for fase in ('port', 'profile', 'popen', 'devtools', 'load'):
+            if fase in cronologia:
+                fases[fase] = round(cronologia[fase] - anterior, 3)
+                anterior = cronologia[fase]
+        fases['total'] = round(anterior - cronologia['inicio'], 3)
+        return fases
+
+    def _registrar_cronologia(self, nombre_instancia, cronologia, fases, medida, al_cargar):
+        if medida and self.store is not None:
+            try:
+                self.store.registrar_lanzamiento(nombre_instancia, fases, cronologia['oculta'])
+            except sqlite3.Error:
+                pass  # Las latencias son solo informativas; no impiden el lanzamiento
+        if al_cargar is not None:
+            al_cargar(fases)
+
+    def entregar(self, nombre_instancia, timeout=5):
+        """
+        Abre la ventana de una sesión precalentada con la página de inicio (o las pestañas que
+        tenía al suspenderse) y la marca como en uso. Retorna el puerto. Lanza OSError si la
+        instancia no responde.
+        """
+        info = self.process_registry.info(nombre_instancia)
+        if info is None or not info['port']:
+            raise OSError(f"La sesión '{nombre_instancia}' no está precalentada.")
+        datos = (self.store.obtener(nombre_instancia) if self.store is not None else None) or {}
+        urls = self.urls_inicio(datos)
+        suspendida = datos.get('suspended')
+        try:
+            # La primera pestaña abre la ventana; las demás se añaden a ella
+            comando_cdp(info['port'], 'Target.createTarget', {'url': urls[0], 'newWindow': True}, timeout)
+            for url in urls[1:]:
+                comando_cdp(info['port'], 'Target.createTarget', {'url': url}, timeout)
+        except ValueError as e:
+            raise OSError(str(e)) from e
+        self.process_registry.mostrar(nombre_instancia)
+        if self.store is not None:
+            campos = {'last_used': datetime.now().strftime(FORMATO_FECHA)}
+            if suspendida is not None:
+                campos['suspended'] = None
+            try:
+                self.store.actualizar(nombre_instancia, **campos)
+            except sqlite3.Error:
+                pass
+        return info['port']
+
+class WarmPool:
+    """
+    Política de la reserva de instancias precalentadas.
+
+    Una sesión precalentada es su propio Chrome arrancado sin ventana (--no-startup-window) con
+    su perfil ya cargado; al ejecutarla solo hay que abrirle una ventana por DevTools, lo que
+    evita el arranque en frío. El tamaño de la reserva crece con el número de sesiones lanzadas
+    en la última `ventana` de segundos (al menos una si hay sesiones designadas), sin pasar del
+    máximo configurado ni de lo que cabe en la RAM disponible dejando libre la reserva.
+    También guarda cuánto tardó cada lanzamiento hasta tener la ventana utilizable.
+    """
+
+    MEMORIA_ESTIMADA = 300 * 1024 ** 2  # Por instancia, hasta que el monitor mida una
+
+    def __init__(self, ventana=3600, historial=100):
+        self.ventana = ventana
+        self.tiempos = deque(maxlen=historial)  # (sesión, segundos hasta la ventana, precalentada)
+        self.lock = threading.Lock()
+
+    def anotar(self, nombre, segundos, precalentada):
+        """
+        Registra cuánto tardó un lanzamiento a demanda en tener la ventana utilizable.
+        """
+        if segundos is None:
+            return
+        with self.lock:
+            self.tiempos.append((nombre, segundos, precalentada))
+
+    def objetivo(self, maximo, recientes=0, disponible=None, reserva=0, estimado=None):
+        """
+        Número de instancias que conviene tener precalentadas, según las sesiones lanzadas
+        recientemente y la RAM libre (`disponible`, contando la que ya ocupan las precalentadas).
+        """
+        if maximo <= 0:
+            return 0
+        objetivo = min(maximo, max(1, recientes))
+        if disponible is not None:
+            objetivo = min(objetivo, max(0, (disponible - reserva) // (estimado or self.MEMORIA_ESTIMADA)))
+        return int(objetivo)
+
+    def medias(self):
+        """
+        Retorna {precalentada: segundos medios hasta la ventana} de los lanzamientos anotados.
+        """
+        with self.lock:
+            tiempos = list(self.tiempos)
+        medias = {}
+        for precalentada in (False, True):
+            valores = [segundos for _, segundos, caliente in tiempos if caliente == precalentada]
+            if valores:
+                medias[precalentada] = sum(valores) / len(valores)
+        return medias
+
+class BatchLauncher:
+    """
+    Lanza muchas sesiones en paralelo sin saturar CPU y disco.
+
+    Como mucho `concurrencia` instancias están arrancando a la vez; cada hueco se libera
+    en cuanto DevTools responde en el puerto de la instancia (o vence `timeout`). Entre dos
+    lanzamientos consecutivos pasan al menos `intervalo` segundos (rampa de arranque).
+    La primera carga de página se mide aparte y no retiene el hueco.
+    """
+
+    def __init__(self, launcher, chrome_ruta, concurrencia=4, intervalo=0.5, timeout=30, en_ram=False):
+        self.launcher = launcher
+        self.chrome_ruta = chrome_ruta
+        self.en_ram = en_ram
+        self.concurrencia = max(1, concurrencia)
+        self.intervalo = max(0.0, intervalo)
+        self.timeout = timeout
+        self.cancelado = threading.Event()
+        self._lock_rampa = threading.Lock()
+        self._proximo_lanzamiento = 0.0
+
+    def cancelar(self):
+        """
+        No lanza más sesiones; las ya iniciadas siguen abiertas.
+        """
+        self.cancelado.set()
+
+    def _esperar_turno(self):
+        with self._lock_rampa:
+            ahora = time.monotonic()
+            espera = self._proximo_lanzamiento - ahora
+            self._proximo_lanzamiento = max(ahora, self._proximo_lanzamiento) + self.intervalo
+        if espera > 0:
+            self.cancelado.wait(espera)
+
+    def lanzar_sesion(self, sesion):
+        """
+        Lanza una sesión y espera a que esté lista. Retorna un diccionario con el resultado.
+        """
+        resultado = {'sesion': sesion, 'estado': 'cancelada', 'puerto': None, 'pid': None,
+                     'segundos': None, 'error': None, 'precalentada': False, 'fases': None}
+        if self.cancelado.is_set():
+            return resultado
+        self._esperar_turno()
+        if self.cancelado.is_set():
+            return resultado
+
+        inicio = time.monotonic()
+        try:
+            proceso, puerto = self.launcher.lanzar(sesion, self.chrome_ruta, self.en_ram)
+        except SessionRunningError as e:
+            resultado.update(estado='en_ejecucion', error=str(e))
+            return resultado
+        except Exception as e:
+            resultado.update(estado='error', error=str(e))
+            return resultado
+
+        resultado.update(puerto=puerto, pid=proceso.pid)
+        fases = self.launcher.esperar_arranque(sesion, proceso, puerto, self.timeout, self.cancelado)
+        if fases is not None:
+            resultado.update(estado='ok', fases=fases)
+        elif proceso.poll() is not None:
+            resultado.update(estado='error', error=f"Chrome terminó con código {proceso.returncode}")
+        elif self.cancelado.is_set():
+            resultado['estado'] = 'iniciada'  # Lanzada, pero se dejó de esperar a DevTools
+        else:
+            resultado.update(estado='timeout', error="DevTools no respondió a tiempo")
+        resultado['segundos'] = round(time.monotonic() - inicio, 3)
+        return resultado
+
+    def ejecutar(self, sesiones, al_terminar=None):
+        """
+        Lanza todas las sesiones y retorna la lista de resultados en el orden recibido.
+        `al_terminar(resultado)` se invoca desde un hilo de trabajo al acabar cada sesión.
+        """
+        with ThreadPoolExecutor(max_workers=self.concurrencia) as executor:
+            futuros = [executor.submit(self.lanzar_sesion, sesion) for sesion in sesiones]
+            if al_terminar is not None:
+                for futuro in as_completed(futuros):
+                    al_terminar(futuro.result())
+        # Completa las 'fases' de los resultados con la primera carga antes de retornarlos
+        self.launcher.esperar_mediciones()
+        return [futuro.result() for futuro in futuros]
+
+def format_size(size):
+    for unit in ['B', 'KB', 'MB', 'GB', 'TB']:
+        if size < 1024:
+            return f"{size:.2f} {unit}"
+        size /= 1024
+    return f"{size:.2f} PB"
+
+
+class SessionManager:
+    """
+    Fachada del núcleo que reúne el almacén, el índice de tamaños, el registro de procesos, los
+    puertos, el lanzador y la papelera. La usan la interfaz gráfica y la línea de comandos.
+    """
+
+    def __init__(self, config=None):
+        self.config = config if config is not None else cargar_configuracion()
+        self.store = SessionStore().abrir()
+        self.size_index = SizeIndex().cargar()
+        self.port_allocator = PortAllocator()
+        self.process_registry = ProcessRegistry().cargar()
+        self.monitor = ResourceMonitor(historial=self.config.get('monitor_historial', 150))
+        self.reaper = IdleReaper()
+        self.warm = WarmPool()
+        self.ram = RamDiskStager(self.config.get('ram_ruta'), self.config.get('ram_limite_mb', 2048) * 1024 ** 2)
+        self.limites = CgroupLimiter(self.config.get('limites_activado', False),
+                                     self.config.get('limites_memoria_mb', 0) * 1024 ** 2 or None,
+                                     self.config.get('limites_cpu_peso', 100),
+                                     self.config.get('limites_io_peso', 100),
+                                     self.config.get('limites_cgroup_ruta') or None)
+        self.launcher = SessionLauncher(self.port_allocator, self.process_registry, self.store, self.ram,
+                                        self.limites)
+        self.trash = SessionTrash()
+        self.trash_plantillas = SessionTrash(ruta_sesiones=RUTA_PLANTILLAS)
+        self._papeleras = {}
+        self._cdp = None
+
+    def cerrar(self):
+        if self._cdp is not None:
+            self._cdp.cerrar()
+        self.store.cerrar()
+
+    def raices(self):
+        """
+        Raíces de almacenamiento configuradas: Storage/Sessions y las de raices_almacenamiento.
+        """
+        return [RUTA_SESIONES] + [raiz for raiz in self.config.get('raices_almacenamiento', [])
+                                  if raiz != RUTA_SESIONES]
+
+    def ruta(self, nombre_sesion, raices=None):
+        """
+        Carpeta del perfil de una sesión en su raíz. `raices` ({nombre: raíz}, de
+        SessionStore.raices) evita una consulta por sesión al recorrer muchas.
+        """
+        raiz = raices.get(nombre_sesion) if raices is not None else self.store.raiz(nombre_sesion)
+        return ruta_sesion(nombre_sesion, raiz)
+
+    def papelera(self, raiz=None):
+        """
+        Papelera de una raíz de almacenamiento. Cada raíz tiene la suya en el mismo volumen, para
+        que borrar siga siendo un rename instantáneo.
+        """
+        if not raiz or raiz == RUTA_SESIONES:
+            return self.trash
+        if raiz not in self._papeleras:
+            self._papeleras[raiz] = SessionTrash(ruta=os.path.join(raiz, '.Trash'), ruta_sesiones=raiz)
+        return self._papeleras[raiz]
+
+    def papelera_pendiente(self):
+        """
+        True si alguna papelera tiene espacio por liberar.
+        """
+        raices = set(self.raices()) | set(self.store.raices().values())
+        return any(self.papelera(raiz).pendientes() for raiz in raices)
+
+    def agregar_raiz(self, raiz):
+        """
+        Añade una raíz de almacenamiento (p. ej. otro SSD) y guarda la configuración. La carpeta
+        se crea si no existe. Lanza ValueError si ya está o se solapa con otra raíz.
+        """
+        raiz = os.path.abspath(os.path.expanduser(raiz))
+        for existente in self.raices():
+            existente = os.path.abspath(existente)
+            if raiz == existente:
+                raise ValueError(f"La raíz '{raiz}' ya está configurada.")
+            if os.path.commonpath([raiz, existente]) in (raiz, existente):
+                raise ValueError(f"La raíz '{raiz}' se solapa con '{existente}'.")
+        os.makedirs(raiz, exist_ok=True)
+        if not os.access(raiz, os.W_OK):
+            raise ValueError(f"No se puede escribir en '{raiz}'.")
+        self.config['raices_almacenamiento'] = self.config.get('raices_almacenamiento', []) + [raiz]
+        guardar_configuracion(self.config)
+        return raiz
+
+    def quitar_raiz(self, raiz):
+        """
+        Quita una raíz de la configuración. Lanza ValueError si es la predeterminada o si
+        todavía tiene sesiones (hay que moverlas antes).
+        """
+        configuradas = self.config.get('raices_almacenamiento', [])
+        if raiz not in configuradas:
+            raise ValueError(f"La raíz '{raiz}' no está configurada.")
+        en_uso = sorted(nombre for nombre, r in self.store.raices().items() if r == raiz)
+        if en_uso:
+            raise ValueError(f"La raíz '{raiz}' tiene sesiones: {', '.join(en_uso)}. Muévalas antes.")
+        self.config['raices_almacenamiento'] = [r for r in configuradas if r != raiz]
+        guardar_configuracion(self.config)
+
+    def volumenes(self, carga=False):
+        """
+        Retorna [{'raiz', 'capacidad', 'libre', 'sesiones', 'carga'}] de cada raíz disponible.
+        Con `carga`, mide además la E/S actual de cada volumen (tarda una décima de segundo).
+        """
+        raices = self.store.raices()
+        por_raiz = {}
+        for nombre in self.store.listar():
+            raiz = raices.get(nombre, RUTA_SESIONES)
+            por_raiz[raiz] = por_raiz.get(raiz, 0) + 1
+        cargas = carga_volumenes(self.raices()) if carga else {}
+        volumenes = []
+        for raiz in self.raices():
+            try:
+                capacidad, libre = uso_volumen(raiz)
+            except OSError:
+                capacidad, libre = None, None  # Raíz no disponible (p. ej. disco desmontado)
+            sesiones = por_raiz.get(raiz, 0)
+            volumenes.append({'raiz': raiz, 'capacidad': capacidad, 'libre': libre, 'sesiones': sesiones,
+                              'carga': cargas.get(raiz)})
+        return volumenes
+
+    def elegir_raices(self, cantidad, estimado=0):
+        """
+        Reparte `cantidad` sesiones nuevas entre las raíces disponibles: cada una va a la raíz
+        con más espacio libre ponderado por su carga de E/S actual, descontando `estimado`
+        bytes por cada sesión ya asignada. `estimado` puede ser una función que los calcula, que
+        solo se llama si hay que elegir entre varias raíces para más de una sesión. Retorna una
+        raíz por sesión.
+        """
+        raices = self.raices()
+        if len(raices) == 1:
+            return raices * cantidad
+        if callable(estimado):
+            estimado = estimado() if cantidad > 1 else 0
+        volumenes = [v for v in self.volumenes(carga=True) if v['libre'] is not None]
+        if not volumenes:
+            raise OSError("No hay ninguna raíz de almacenamiento disponible.")
+        libres = {v['raiz']: v['libre'] for v in volumenes}
+        cargas = {v['raiz']: v['carga'] or 0.0 for v in volumenes}
+        elegidas = []
+        for _ in range(cantidad):
+            raiz = max(libres, key=lambda r: libres[r] * (1.0 - 0.9 * cargas[r]))
+            elegidas.append(raiz)
+            libres[raiz] -= estimado
+        return elegidas
+
+    def _tamano_estimado(self, plantilla=None):
+        """
+        Espacio que se espera que ocupe una sesión nueva: el de la plantilla o, sin ella, la media
+        de las sesiones conocidas.
+        """
+        if plantilla:
+            return DirectorySizer().medir_directorio(ruta_plantilla(plantilla)) or 0
+        raices = self.store.raices()
+        tamanos = [t for t in (self.size_index.total(self.ruta(n, raices)) for n in self.activas()) if t]
+        return sum(tamanos) // len(tamanos) if tamanos else 0
+
+    def mover(self, nombres, raiz_destino, al_progresar=None, cancelado=None):
+        """
+        Mueve el perfil de sesiones detenidas a otra raíz. En el mismo volumen es un rename; entre
+        volumenes el perfil se clona (sin cachés regenerables) en una carpeta temporal, se
+        renombra y el original va a la papelera de su raíz. Retorna ({sesión: raíz}, omitidas
+        por estar en ejecución). Lanza ValueError si la raíz no está configurada.
+        """
+        if raiz_destino not in self.raices():
+            raise ValueError(f"La raíz '{raiz_destino}' no está configurada.")
+        self.reconciliar()
+        archivadas = self.store.archivadas()
+        movidas, omitidas = {}, []
+        for hechas, nombre in enumerate(nombres):
+            if al_progresar is not None:
+                al_progresar(hechas, len(nombres))
+            if cancelado is not None and cancelado.is_set():
+                break
+            raiz_origen = self.store.raiz(nombre) or RUTA_SESIONES
+            if raiz_origen == raiz_destino:
+                continue
+            origen = ruta_sesion(nombre, raiz_origen)
+            destino = ruta_sesion(nombre, raiz_destino)
+            if self.process_registry.en_ejecucion(nombre) or perfil_bloqueado(origen):
+                omitidas.append(nombre)
+                continue
+            if os.path.lexists(destino):
+                raise ValueError(f"Ya existe una carpeta para la sesión '{nombre}' en '{raiz_destino}'.")
+            os.makedirs(raiz_destino, exist_ok=True)
+            if nombre in archivadas or not os.path.isdir(origen):
+                pass  # Sin perfil en disco: basta con anotar la raíz nueva
+            elif os.stat(origen).st_dev == os.stat(raiz_destino).st_dev:
+                os.rename(origen, destino)
+            else:
+                temporal = ruta_sesion(f".{nombre}.moviendo.{time.time_ns()}", raiz_destino)
+                ProfileCloner().clonar(origen, [temporal])
+                os.rename(temporal, destino)
+            self.store.actualizar(nombre, root=None if raiz_destino == RUTA_SESIONES else raiz_destino)
+            self.papelera(raiz_origen).mover(nombre)
+            self.size_index.olvidar(origen)
+            movidas[nombre] = raiz_destino
+        if al_progresar is not None:
+            al_progresar(len(nombres), len(nombres))
+        return movidas, sorted(omitidas, key=str.casefold)
+
+    def reconciliar(self, adoptar=False, devolver_ram=True):
+        """
+        Actualiza el registro de procesos y libera los puertos de las sesiones que se cerraron.
+        Las sesiones lanzadas por otro proceso del gestor se incorporan al releer el registro; con
+        `adoptar`, se detectan además las abiertas fuera del registro y se recuperan sus puertos
+        (pensado para el arranque). Con `devolver_ram`, las sesiones en RAM que se cerraron se
+        sincronizan a disco en el acto (ver `sincronizar_ram`). Retorna (iniciadas, detenidas).
+        """
+        perfiles = None
+        if adoptar:
+            raices = self.store.raices()
+            en_ram = self.ram.preparadas()
+            perfiles = {nombre: en_ram[nombre]['ram'] if nombre in en_ram else self.ruta(nombre, raices)
+                        for nombre in self.store.listar()}
+        iniciadas, detenidas = self.process_registry.reconciliar(perfiles)
+        if devolver_ram:
+            self.devolver_ram()
+        for nombre in detenidas:
+            self.port_allocator.liberar(nombre)
+            self.limites.liberar(nombre)
+        for nombre in (list(self.process_registry.sesiones) if adoptar else iniciadas):
+            info = self.process_registry.info(nombre)
+            if info and info['port']:
+                self.port_allocator.asignar(nombre, info['port'])
+        return iniciadas, detenidas
+
+    def muestrear(self):
+        """
+        Toma una muestra del consumo de las sesiones en ejecución (ver ResourceMonitor) y la
+        anota para detectar las inactivas. Cada muestra lleva en 'cgroup' el consumo y los
+        contadores de su grupo (ver CgroupLimiter.uso), o None. Retorna {sesión: muestra}.
+        """
+        with self.process_registry.lock:
+            pids = {nombre: datos['pid'] for nombre, datos in self.process_registry.sesiones.items()
+                    if datos.get('pid')}
+            puertos = {nombre: datos['port'] for nombre, datos in self.process_registry.sesiones.items()
+                       if datos.get('port')}
+        muestras = self.monitor.muestrear(pids)
+        for nombre, muestra in muestras.items():
+            muestra['cgroup'] = self.limites.uso(nombre)
+        conexiones = None
+        if self.config.get('inactividad_devtools', True):
+            clientes = conexiones_devtools(puertos.values())
+            conexiones = {nombre: clientes.get(puerto, 0) for nombre, puerto in puertos.items()}
+        self.reaper.observar(muestras, self.config.get('inactividad_cpu', 1.0), conexiones)
+        return muestras
+
+    def inactivas(self, segundos=None):
+        """
+        Retorna {sesión: segundos sin actividad} de las sesiones abiertas que superan la ventana
+        de inactividad (`inactividad_minutos`, o `segundos`), sin las de `inactividad_excluidas`.
+        Necesita que se muestree periódicamente con `muestrear`.
+        """
+        if segundos is None:
+            segundos = self.config.get('inactividad_minutos', 0) * 60
+        if not segundos:
+            return {}
+        # Las precalentadas están inactivas a propósito
+        excluidas = set(self.config.get('inactividad_excluidas', [])) | self.process_registry.ocultas()
+        return {nombre: inactiva for nombre, inactiva in self.reaper.inactivas(segundos).items()
+                if nombre not in excluidas and self.process_registry.en_ejecucion(nombre)}
+
+    def suspender(self, nombres, al_progresar=None, cancelado=None):
+        """
+        Cierra sesiones abiertas para liberar memoria y las marca como suspendidas con sus
+        pestañas, que se reabren en el siguiente lanzamiento (ver ProcessRegistry.detener).
+        Retorna {sesión: 'cdp' | 'sigterm' | None}; None indica que sigue abierta.
+        """
+        resultados = {}
+        for hechas, nombre in enumerate(nombres):
+            if cancelado is not None and cancelado.is_set():
+                break
+            info = self.process_registry.info(nombre)
+            if info is None:
+                continue
+            # Si DevTools no responde se marca sin pestañas: se reabrirá con la página de inicio
+            pestanas = pestanas_abiertas(info['port']) if info['port'] else None
+            self.store.actualizar(nombre, suspended={'fecha': datetime.now().strftime(FORMATO_FECHA),
+                                                     'pestanas': pestanas or []})
+            resultados[nombre] = self.process_registry.detener(nombre)
+            if resultados[nombre] is None:
+                self.store.actualizar(nombre, suspended=None)
+            if al_progresar is not None:
+                al_progresar(hechas + 1, len(nombres))
+        self.reconciliar()
+        return resultados
+
+    def cerrar_inactivas(self, segundos=None, simular=False, al_progresar=None, cancelado=None):
+        """
+        Suspende las sesiones inactivas (ver `inactivas`). Con `simular` solo las retorna.
+        Retorna {sesión: resultado de `suspender`, o segundos sin actividad al simular}.
+        """
+        inactivas = self.inactivas(segundos)
+        if simular or not inactivas:
+            return inactivas
+        return self.suspender(sorted(inactivas, key=str.casefold), al_progresar, cancelado)
+
+    def cdp(self, operacion, nombres=None, **parametros):
+        """
+        Ejecuta una operación del protocolo DevTools en paralelo sobre las sesiones en ejecución
+        indicadas (todas si no se indican), reutilizando una conexión persistente por sesión
+        (ver cdp.CdpPool): 'pestanas', 'abrir' (urls=[...]), 'limpiar_cache', 'cerrar' o
+        'ejecutar' (metodo=..., parametros={...}). Retorna {sesión: resultado o excepción}; las
+        sesiones detenidas o sin puerto de depuración se omiten.
+        """
+        self.reconciliar()
+        with self.process_registry.lock:
+            puertos = {nombre: datos['port'] for nombre, datos in self.process_registry.sesiones.items()
+                       if datos.get('port')}
+        objetivo = {nombre: puertos[nombre] for nombre in (puertos if nombres is None else nombres)
+                    if nombre in puertos}
+        if self._cdp is None:
+            from cdp import CdpRunner
+            self._cdp = CdpRunner()
+        resultados = self._cdp.ejecutar(operacion, objetivo, activas=puertos, **parametros)
+        if operacion == 'cerrar':
+            # Todas se cierran a la vez: basta esperar a la más lenta
+            for nombre, resultado in resultados.items():
+                if resultado is True:
+                    self.process_registry.esperar_cierre(nombre, 10)
+            self.reconciliar()
+        return resultados
+
+    def precalentadas(self):
+        """
+        Sesiones de la reserva precalentada: abiertas sin ventana a la espera de ejecutarse.
+        """
+        return self.process_registry.ocultas()
+
+    def precalentar(self, chrome_ruta=None, simular=False):
+        """
+        Ajusta la reserva de sesiones precalentadas (las de `precalentar_sesiones`) al tamaño que
+        indica WarmPool según `precalentar_maximo`, `precalentar_reserva_mb` y las sesiones usadas
+        en la última hora: arranca sin ventana las que falten, empezando por las usadas más
+        recientemente, y cierra las que sobren. Con `simular` solo calcula qué haría.
+        Retorna {'objetivo', 'lanzadas', 'cerradas', 'errores': {sesión: mensaje}}.
+        """
+        self.reconciliar()
+        designadas = set(self.config.get('precalentar_sesiones', []))
+        archivadas = self.store.archivadas()
+        en_ram = self.ram.preparadas()
+        usos = self.store.ultimos_usos()
+        calientes = self.process_registry.ocultas()
+
+        # Lo que ocupa cada una: el PSS medido de las que ya están calientes, si lo hay
+        medidas = [muestras[-1]['pss'] for muestras in map(self.monitor.historia, calientes)
+                   if muestras and muestras[-1]['pss']]
+        estimado = sum(medidas) / len(medidas) if medidas else WarmPool.MEMORIA_ESTIMADA
+        disponible = memoria_disponible()
+        if disponible is not None:
+            disponible += len(calientes) * estimado
+        desde = datetime.fromtimestamp(time.time() - self.warm.ventana).strftime(FORMATO_FECHA)
+        recientes = sum(1 for uso in usos.values() if uso and uso >= desde)
+        objetivo = self.warm.objetivo(self.config.get('precalentar_maximo', 2) if designadas else 0, recientes,
+                                      disponible, self.config.get('precalentar_reserva_mb', 2048) * 1024 ** 2,
+                                      estimado)
+
+        # Se conservan las designadas usadas más recientemente
+        conservadas = sorted(calientes, key=lambda nombre: (nombre in designadas, usos.get(nombre) or ''),
+                             reverse=True)
+        cerradas = conservadas[objetivo:]
+        conservadas = conservadas[:objetivo]
+        candidatas = sorted((nombre for nombre in self.config.get('precalentar_sesiones', [])
+                             if self.store.existe(nombre) and nombre not in archivadas and nombre not in en_ram
+                             and not self.process_registry.en_ejecucion(nombre)
+                             and PRESETS_LANZAMIENTO[self.arranque(nombre)['preset']]['ventana']),
+                            key=lambda nombre: usos.get(nombre) or '', reverse=True)
+        lanzadas = candidatas[:max(0, objetivo - len(conservadas))]
+        informe = {'objetivo': objetivo, 'lanzadas': lanzadas, 'cerradas': cerradas, 'errores': {}}
+        if simular:
+            return informe
+
+        for nombre in cerradas:
+            if self.process_registry.detener(nombre) is None:
+                informe['errores'][nombre] = "No se pudo cerrar"
+        chrome_ruta = chrome_ruta or self.config.get('chrome_ruta')
+        timeout = self.config.get('lanzamiento_timeout', 30)
+        for nombre in lanzadas:
+            try:
+                proceso, puerto = self.launcher.lanzar(nombre, chrome_ruta, oculta=True)
+            except (SessionRunningError, ValueError, OSError) as e:
+                informe['errores'][nombre] = str(e)
+                continue
+            if not self.launcher.esperar_arranque(nombre, proceso, puerto, timeout):
+                informe['errores'][nombre] = "DevTools no respondió a tiempo"
+        informe['lanzadas'] = [nombre for nombre in lanzadas if nombre not in informe['errores']]
+        self.reconciliar()
+        return informe
+
+    def entregar(self, nombre_sesion):
+        """
+        Abre la ventana de una sesión precalentada (ver SessionLauncher.entregar) y anota cuánto
+        tardó. Retorna los segundos hasta tener la ventana. Lanza OSError si no responde.
+        """
+        inicio = time.monotonic()
+        self.launcher.entregar(nombre_sesion)
+        segundos = round(time.monotonic() - inicio, 3)
+        self.warm.anotar(nombre_sesion, segundos, True)
+        return segundos
+
+    def latencias(self, nombres=None, ocultas=True):
+        """
+        Percentiles (p50/p95/p99, ver `percentiles`) de la duración de cada fase de los últimos
+        arranques guardados, por sesión y de todas juntas. Con `ocultas=False` no cuenta los
+        arranques de la reserva precalentada.
+        Retorna {'global': {fase: {...} o None, 'n'}, 'sesiones': {sesión: {fase: ..., 'n'}}}.
+        """
+        def resumir(arranques):
+            resumen = {fase: percentiles(arranque[fase] for arranque in arranques)
+                       for fase in SessionStore.FASES_LANZAMIENTO}
+            resumen['n'] = len(arranques)
+            return resumen
+
+        lanzamientos = self.store.lanzamientos(nombres)
+        if not ocultas:
+            lanzamientos = {nombre: [arranque for arranque in arranques if not arranque['hidden']]
+                            for nombre, arranques in lanzamientos.items()}
+        todos = [arranque for arranques in lanzamientos.values() for arranque in arranques]
+        return {'global': resumir(todos),
+                'sesiones': {nombre: resumir(arranques) for nombre, arranques in sorted(lanzamientos.items())
+                             if arranques}}
+
+    def cerrar_precalentadas(self):
+        """
+        Cierra todas las sesiones precalentadas a la vez (p. ej. al salir del gestor).
+        """
+        calientes = list(self.process_registry.ocultas())
+        return self.cdp('cerrar', calientes) if calientes else {}
+
+    def devolver_ram(self, nombres=None):
+        """
+        Sincroniza a disco y libera la RAM de las sesiones en modo RAM cuyo Chrome ya se cerró
+        (también las que quedaron de una ejecución interrumpida). Retorna {sesión: resultado}.
+        """
+        devueltas = {}
+        for nombre in self.ram.preparadas():
+            if nombres is not None and nombre not in nombres:
+                continue
+            if self.process_registry.en_ejecucion(nombre):
+                continue
+            resultado = self.ram.devolver(nombre)
+            if resultado is not None:
+                devueltas[nombre] = resultado
+        return devueltas
+
+    def ram_pendiente(self):
+        """
+        True si alguna sesión en RAM se cerró sin devolverse o le toca un punto de control.
+        """
+        intervalo = self.config.get('ram_checkpoint_min', 5) * 60
+        ahora = datetime.now()
+        for nombre, datos in self.ram.preparadas().items():
+            if not self.process_registry.en_ejecucion(nombre):
+                return True
+            ultimo = datos.get('sincronizado') or datos.get('inicio')
+            if intervalo and ultimo and (ahora - datetime.strptime(ultimo, FORMATO_FECHA)).total_seconds() >= intervalo:
+                return True
+        return False
+
+    def sincronizar_ram(self, nombres=None, forzar=False):
+        """
+        Devuelve a disco las sesiones en RAM que se cerraron y hace un punto de control de las que
+        siguen abiertas cuando pasaron `ram_checkpoint_min` minutos desde el último (o siempre,
+        con `forzar`). Retorna {'devueltas': {sesión: resultado}, 'sincronizadas': {sesión: resultado}}.
+        """
+        self.reconciliar(devolver_ram=False)
+        devueltas = self.devolver_ram(nombres)
+        intervalo = self.config.get('ram_checkpoint_min', 5) * 60
+        ahora = datetime.now()
+        sincronizadas = {}
+        for nombre, datos in self.ram.preparadas().items():
+            if nombres is not None and nombre not in nombres:
+                continue
+            ultimo = datos.get('sincronizado') or datos.get('inicio')
+            vencido = intervalo and ultimo and (ahora - datetime.strptime(ultimo, FORMATO_FECHA)).total_seconds() >= intervalo
+            if not (forzar or vencido):
+                continue
+            resultado = self.ram.sincronizar(nombre)
+            if resultado is not None:
+                sincronizadas[nombre] = resultado
+        return {'devueltas': devueltas, 'sincronizadas': sincronizadas}
+
+    def listar(self):
+        """
+        Lista las sesiones con su estado y el último tamaño conocido del índice.
+        """
+        sesiones = []
+        archivadas = self.archivadas()
+        raices = self.store.raices()
+        en_ram = self.ram.preparadas()
+        suspendidas = self.store.suspendidas()
+        presets = self.store.presets()
+        for nombre, creada in sorted(self.store.listar().items(), key=lambda item: item[0].casefold()):
+            info = self.process_registry.info(nombre)
+            sesiones.append({
+                'nombre': nombre,
+                'creada': creada,
+                'en_ejecucion': info is not None,
+                'pid': info['pid'] if info else None,
+                'puerto': info['port'] if info else None,
+                'archivada': nombre in archivadas,
+                'en_ram': nombre in en_ram,
+                'precalentada': bool(info and info.get('oculta')),
+                'suspendida': nombre in suspendidas and info is None,
+                'preset': presets.get(nombre, PRESET_PREDETERMINADO),
+                'raiz': raices.get(nombre, RUTA_SESIONES),
+                'tamano': archivadas[nombre] if nombre in archivadas else self.size_index.total(self.ruta(nombre, raices))
+            })
+        return sesiones
+
+    def archivadas(self):
+        """
+        Retorna {nombre: tamaño del archivo} de las sesiones archivadas.
+        """
+        tamanos = {}
+        for nombre, fichero in self.store.archivadas().items():
+            try:
+                tamanos[nombre] = os.path.getsize(ruta_archivo(fichero))
+            except OSError:
+                tamanos[nombre] = 0
+        return tamanos
+
+    def activas(self):
+        """
+        Nombres de las sesiones cuyo perfil está en disco (no archivadas).
+        """
+        archivadas = self.store.archivadas()
+        return [nombre for nombre in self.store.listar() if nombre not in archivadas]
+
+    def crear(self, nombre_sesion, plantilla=None, raiz=None, preset=None, urls=None):
+        """
+        Registra una sesión nueva y crea su carpeta, vacía o clonada de `plantilla`.
+        Retorna (nombre, fecha de creación). Lanza ValueError si el nombre no es válido o ya
+        existe, o si la plantilla no existe.
+        """
+        return self.crear_varias([nombre_sesion], plantilla, raiz, preset, urls)[0]
+
+    def crear_varias(self, nombres, plantilla=None, raiz=None, preset=None, urls=None):
+        """
+        Crea varias sesiones de una vez; con `plantilla`, todas se clonan en paralelo desde
+        ella. Sin `raiz`, cada sesión se coloca en la raíz de almacenamiento con más espacio
+        libre y menos carga (ver `elegir_raices`). `preset` y `urls` fijan su configuración de
+        arranque (ver configurar_arranque). Retorna [(nombre, fecha de creación)]. Si algo
+        falla no se crea ninguna.
+        """
+        nombres = [validar_nombre_sesion(nombre) for nombre in nombres]
+        validar_arranque(preset, urls)
+        if len(set(nombres)) != len(nombres):
+            raise ValueError("Hay nombres de sesión repetidos.")
+        if plantilla:
+            origen = ruta_plantilla(validar_nombre_sesion(plantilla))
+            if not os.path.isdir(origen):
+                raise ValueError(f"No existe la plantilla '{plantilla}'.")
+        if raiz is not None and raiz not in self.raices():
+            raise ValueError(f"La raíz '{raiz}' no está configurada.")
+        if raiz is not None:
+            raices = dict.fromkeys(nombres, raiz)
+        else:
+            raices = dict(zip(nombres, self.elegir_raices(len(nombres), lambda: self._tamano_estimado(plantilla))))
+        for nombre in nombres:
+            if os.path.lexists(ruta_sesion(nombre, raices[nombre])):
+                raise ValueError(f"Ya existe una carpeta para la sesión '{nombre}'.")
+
+        creada = self.store.agregar_varias(
+            nombres, template=plantilla or None,
+            raices={nombre: r for nombre, r in raices.items() if r != RUTA_SESIONES},
+            preset=None if preset == PRESET_PREDETERMINADO else preset,
+            start_urls=list(urls) if urls else None
+        )
+        creadas = []  # Carpetas creadas por esta llamada, para deshacerlas si algo falla
+        try:
+            if plantilla:
+                # Un clonado por raíz: el reflink solo funciona dentro de un mismo volumen
+                for r in dict.fromkeys(raices.values()):
+                    destinos = [ruta_sesion(n, r) for n in nombres if raices[n] == r]
+                    ProfileCloner().clonar(origen, destinos)
+                    creadas.extend(destinos)
+            else:
+                for nombre in nombres:
+                    ruta = ruta_sesion(nombre, raices[nombre])
+                    os.makedirs(ruta)
+                    creadas.append(ruta)
+        except BaseException:
+            for ruta in creadas:
+                shutil.rmtree(ruta, ignore_errors=True)
+            for nombre in nombres:
+                self.store.eliminar(nombre)
+            raise
+        return [(nombre, creada) for nombre in nombres]
+
+    def arranque(self, nombre_sesion):
+        """
+        Configuración de arranque de una sesión: {'preset', 'urls' (de inicio), 'flags'
+        (opciones adicionales de Chrome)}. Lanza KeyError si la sesión no existe.
+        """
+        datos = self.store.obtener(nombre_sesion)
+        if datos is None:
+            raise KeyError(f"No existe la sesión: {nombre_sesion}")
+        preset = datos.get('preset')
+        return {'preset': preset if preset in PRESETS_LANZAMIENTO else PRESET_PREDETERMINADO,
+                'urls': list(datos.get('start_urls') or []),
+                'flags': list(datos.get('launch_flags') or [])}
+
+    def configurar_arranque(self, nombres, preset=None, urls=None, flags=None):
+        """
+        Cambia el preset, las URLs de inicio y/o las opciones adicionales de Chrome de las
+        sesiones; lo que se pasa como None no cambia y una lista vacía lo borra. Se aplica en el
+        siguiente lanzamiento. Lanza KeyError si alguna sesión no existe y ValueError si la
+        configuración no es válida (ver validar_arranque).
+        """
+        desconocidas = [nombre for nombre in nombres if not self.store.existe(nombre)]
+        if desconocidas:
+            raise KeyError(f"No existe la sesión: {', '.join(desconocidas)}")
+        validar_arranque(preset, urls, flags)
+        campos = {}
+        if preset is not None:
+            campos['preset'] = None if preset == PRESET_PREDETERMINADO else preset
+        if urls is not None:
+            campos['start_urls'] = list(urls) or None
+        if flags is not None:
+            campos['launch_flags'] = list(flags)
+        for nombre in nombres:
+            self.store.actualizar(nombre, **campos)
+
+    def plantillas(self):
+        """
+        Retorna los nombres de las plantillas disponibles.
+        """
+        try:
+            with os.scandir(RUTA_PLANTILLAS) as entradas:
+                return sorted((e.name for e in entradas if e.is_dir(follow_symlinks=False)), key=str.casefold)
+        except OSError:
+            return []
+
+    def crear_plantilla(self, nombre_plantilla, nombre_sesion):
+        """
+        Guarda una copia del perfil de una sesión ya configurada como plantilla.
+        Lanza ValueError si el nombre no es válido o ya existe y SessionRunningError si la
+        sesión está abierta (su perfil se está escribiendo).
+        """
+        nombre_plantilla = validar_nombre_sesion(nombre_plantilla)
+        if not self.store.existe(nombre_sesion):
+            raise ValueError(f"No existe la sesión '{nombre_sesion}'.")
+        if self.process_registry.en_ejecucion(nombre_sesion):
+            raise SessionRunningError(f"La sesión '{nombre_sesion}' está en ejecución.")
+        if nombre_sesion in self.store.archivadas():
+            raise ValueError(f"La sesión '{nombre_sesion}' está archivada; restáurela antes.")
+        destino = ruta_plantilla(nombre_plantilla)
+        if os.path.lexists(destino):
+            raise ValueError(f"La plantilla '{nombre_plantilla}' ya existe.")
+        os.makedirs(RUTA_PLANTILLAS, exist_ok=True)
+        self.devolver_ram([nombre_sesion])
+        ProfileCloner().clonar(self.ruta(nombre_sesion), [destino])
+        return nombre_plantilla
+
+    def borrar_plantilla(self, nombre_plantilla):
+        """
+        Mueve una plantilla a la papelera. Las sesiones ya clonadas no se ven afectadas.
+        """
+        if self.trash_plantillas.mover(validar_nombre_sesion(nombre_plantilla)) is None:
+            raise ValueError(f"No existe la plantilla '{nombre_plantilla}'.")
+
+    def lanzar(self, nombres, al_terminar=None, **opciones):
+        """
+        Lanza una o varias sesiones con BatchLauncher y retorna sus resultados; a las
+        precalentadas solo se les abre la ventana. Con la opción `en_ram`, los perfiles se
+        ejecutan en tmpfs (ver RamDiskStager). Las opciones no indicadas se toman de la
+        configuración.
+        """
+        self.reconciliar()
+        desconocidas = [nombre for nombre in nombres if not self.store.existe(nombre)]
+        if desconocidas:
+            raise KeyError(f"No existe la sesión: {', '.join(desconocidas)}")
+        # Las sesiones archivadas se restauran antes de lanzarlas
+        archivadas = [nombre for nombre in nombres if nombre in self.store.archivadas()]
+        if archivadas:
+            self.restaurar(archivadas)
+        # Las precalentadas solo necesitan abrir su ventana
+        resultados = {}
+        calientes = self.process_registry.ocultas()
+        for nombre in nombres:
+            if nombre not in calientes:
+                continue
+            resultado = {'sesion': nombre, 'estado': 'ok', 'puerto': None, 'pid': None, 'segundos': None,
+                         'error': None, 'precalentada': True}
+            inicio = time.monotonic()
+            try:
+                resultado['segundos'] = self.entregar(nombre)
+                info = self.process_registry.info(nombre)
+                resultado.update(puerto=info['port'], pid=info['pid'])
+            except OSError as e:
+                resultado.update(estado='error', error=str(e), segundos=round(time.monotonic() - inicio, 3))
+            resultados[nombre] = resultado
+            if al_terminar is not None:
+                al_terminar(resultado)
+
+        def anotar(resultado):
+            if resultado['estado'] == 'ok':
+                self.warm.anotar(resultado['sesion'], resultado['segundos'], False)
+            if al_terminar is not None:
+                al_terminar(resultado)
+
+        intervalo = opciones.get('intervalo')
+        if intervalo is None:
+            intervalo = self.config.get('lanzamiento_intervalo', 0.5)
+        batch = BatchLauncher(
+            self.launcher,
+            opciones.get('chrome_ruta') or self.config.get('chrome_ruta'),
+            concurrencia=opciones.get('concurrencia') or self.config.get('lanzamiento_concurrencia', 4),
+            intervalo=intervalo,
+            timeout=opciones.get('timeout') or self.config.get('lanzamiento_timeout', 30),
+            en_ram=opciones.get('en_ram', False)
+        )
+        frias = [nombre for nombre in nombres if nombre not in resultados]
+        resultados.update((resultado['sesion'], resultado) for resultado in batch.ejecutar(frias, al_terminar=anotar))
+        return [resultados[nombre] for nombre in nombres]
+
+    def borrar(self, nombre_sesion):
+        """
+        Mueve el perfil a la papelera y da de baja la sesión; el espacio se libera con `purgar`.
+        Lanza SessionRunningError si la sesión está abierta y OSError si no se puede mover.
+        """
+        if self.process_registry.en_ejecucion(nombre_sesion):
+            raise SessionRunningError(f"La sesión '{nombre_sesion}' está en ejecución.")
+        self.ram.descartar(nombre_sesion)  # Una copia en RAM sin devolver ya no hace falta
+        raiz = self.store.raiz(nombre_sesion)
+        self.papelera(raiz).mover(nombre_sesion)
+        fichero = self.store.archivadas().get(nombre_sesion)
+        if fichero:
+            try:
+                os.remove(ruta_archivo(fichero))
+            except FileNotFoundError:
+                pass
+        self.store.eliminar(nombre_sesion)
+        self.size_index.olvidar(ruta_sesion(nombre_sesion, raiz))
+        self.port_allocator.liberar(nombre_sesion)
+
+    def purgar(self, al_progresar=None, cancelado=None):
+        """
+        Vacía las papeleras de todas las raíces. Retorna los bytes liberados.
+        """
+        liberados = 0
+        for raiz in dict.fromkeys(self.raices() + list(self.store.raices().values())):
+            if cancelado is not None and cancelado.is_set():
+                break
+            papelera = self.papelera(raiz)
+            if not papelera.pendientes():
+                continue
+            progreso = None
+            if al_progresar is not None:
+                progreso = lambda hechos, total, base=liberados: al_progresar(base + hechos, base + total)
+            liberados += papelera.purgar(al_progresar=progreso, cancelado=cancelado)
+        return liberados
+
+    def uso(self, nombres=None):
+        """
+        Retorna (aparente, real) del espacio de las sesiones según el índice de tamaños; el real
+        descuenta los ficheros compartidos entre sesiones mediante enlaces duros o reflink.
+        """
+        nombres = self.activas() if nombres is None else nombres
+        raices = self.store.raices()
+        return self.size_index.uso([self.ruta(nombre, raices) for nombre in nombres])
+
+    def deduplicar(self, al_progresar=None, simular=False, enlaces_duros=None, cancelado=None):
+        """
+        Deduplica los ficheros idénticos de todas las sesiones detenidas; las que están en
+        ejecución no se tocan. Los enlaces duros se usan si lo indica `enlaces_duros` o, por
+        defecto, la opción de configuración dedup_enlaces_duros.
+        Retorna el informe de ProfileDeduplicator con la lista 'omitidas' de sesiones abiertas.
+        Los ficheros clonados con reflink se anotan en el índice de tamaños para el uso real.
+        """
+        self.reconciliar()
+        if enlaces_duros is None:
+            enlaces_duros = self.config.get('dedup_enlaces_duros', False)
+        rutas, omitidas = {}, []
+        raices = self.store.raices()
+        for nombre in self.activas():
+            if self.process_registry.en_ejecucion(nombre):
+                omitidas.append(nombre)
+            else:
+                rutas[nombre] = self.ruta(nombre, raices)
+        deduplicador = ProfileDeduplicator(enlaces_duros=enlaces_duros,
+                                           en_ejecucion=self.process_registry.en_ejecucion,
+                                           cancelado=cancelado)
+        resultado = deduplicador.deduplicar(rutas, al_progresar=al_progresar, simular=simular)
+        clones = resultado.pop('clones')
+        if clones:
+            self.size_index.anotar_compartidos([
+                (rutas[original[0]], original[2], rutas[duplicado[0]], duplicado[2])
+                for original, duplicado in clones
+            ])
+            try:
+                self.size_index.guardar()
+            except OSError:
+                pass
+        resultado['omitidas'] = sorted(omitidas, key=str.casefold)
+        return resultado
+
+    def desglose_cache(self, nombres):
+        """
+        Retorna {categoría: bytes} sumado para las sesiones indicadas, con 'otros' para el resto
+        de los perfiles. Las sesiones sin datos en el índice se miden antes.
+        """
+        sin_medir = [nombre for nombre in nombres if self.size_index.total(self.ruta(nombre)) is None]
+        if sin_medir:
+            self.medir(sin_medir)
+        pruner = CachePruner()
+        total = {categoria: 0 for categoria in list(CachePruner.CATEGORIAS) + ['otros']}
+        for nombre in nombres:
+            for categoria, tamano in pruner.desglose(self.size_index, self.ruta(nombre)).items():
+                total[categoria] += tamano
+        return total
+
+    def limpiar_cache(self, nombres=None, categorias=None, al_progresar=None, cancelado=None):
+        """
+        Vacía las cachés de las sesiones indicadas (todas por defecto) que no estén abiertas.
+        Retorna ({sesión: bytes liberados}, [sesiones omitidas por estar en ejecución]).
+        """
+        self.reconciliar()
+        nombres = self.activas() if nombres is None else nombres
+        rutas, omitidas = {}, []
+        for nombre in nombres:
+            if self.process_registry.en_ejecucion(nombre):
+                omitidas.append(nombre)
+            else:
+                rutas[nombre] = self.ruta(nombre)
+        pruner = CachePruner(en_ejecucion=self.process_registry.en_ejecucion, cancelado=cancelado)
+        liberados, abiertas = pruner.podar(rutas, categorias, al_progresar=al_progresar)
+        return liberados, sorted(set(omitidas) | set(abiertas), key=str.casefold)
+
+    def compactar(self, nombres=None, al_progresar=None, cancelado=None, max_workers=None):
+        """
+        Compacta las bases de datos de Chrome de las sesiones indicadas (todas por defecto) que
+        no estén abiertas. Retorna (resultados, omitidas) como DatabaseCompactor.compactar.
+        """
+        self.reconciliar()
+        nombres = self.activas() if nombres is None else nombres
+        compactador = DatabaseCompactor(max_workers=max_workers,
+                                        en_ejecucion=self.process_registry.en_ejecucion,
+                                        cancelado=cancelado)
+        resultados, omitidas = compactador.compactar({nombre: self.ruta(nombre) for nombre in nombres},
+                                                     al_progresar=al_progresar)
+        return resultados, sorted(omitidas, key=str.casefold)
+
+    def _metadatos(self, nombre_sesion):
+        datos = self.store.obtener(nombre_sesion)
+        datos.pop('archive', None)
+        return datos
+
+    def exportar(self, nombres, directorio, al_progresar=None, cancelado=None):
+        """
+        Exporta las sesiones a archivos comprimidos en `directorio` sin quitarlas del gestor; de
+        las archivadas se copia su archivo. Retorna ({sesión: ruta del archivo}, omitidas por
+        estar en ejecución). Lanza KeyError si alguna sesión no existe.
+        """
+        self.reconciliar()
+        desconocidas = [nombre for nombre in nombres if not self.store.existe(nombre)]
+        if desconocidas:
+            raise KeyError(f"No existe la sesión: {', '.join(desconocidas)}")
+        archiver = SessionArchiver()
+        archivadas = self.store.archivadas()
+        exportadas, omitidas = {}, []
+        for hechas, nombre in enumerate(nombres):
+            if al_progresar is not None:
+                al_progresar(hechas, len(nombres))
+            if cancelado is not None and cancelado.is_set():
+                break
+            if nombre in archivadas:
+                destino = os.path.join(directorio, archivadas[nombre])
+                os.makedirs(directorio, exist_ok=True)
+                shutil.copyfile(ruta_archivo(archivadas[nombre]), destino)
+            elif self.process_registry.en_ejecucion(nombre) or perfil_bloqueado(self.ruta(nombre)):
+                omitidas.append(nombre)
+                continue
+            else:
+                destino = os.path.join(directorio, nombre + archiver.extension())
+                if archiver.exportar(self.ruta(nombre), destino, self._metadatos(nombre), cancelado) is None:
+                    break
+            exportadas[nombre] = destino
+        if al_progresar is not None:
+            al_progresar(len(exportadas) + len(omitidas), len(nombres))
+        return exportadas, omitidas
+
+    def importar(self, archivo, nombre_sesion=None, cancelado=None):
+        """
+        Importa una sesión exportada y la registra con sus metadatos, con el nombre guardado en
+        el archivo o con `nombre_sesion`. Retorna (nombre, fecha de creación), o None si se
+        canceló. Lanza ValueError si el archivo no es válido o el nombre ya existe.
+        """
+        if nombre_sesion is not None:
+            nombre_sesion = validar_nombre_sesion(nombre_sesion)
+            if self.store.existe(nombre_sesion):
+                raise ValueError(f"La sesión '{nombre_sesion}' ya existe.")
+        # El perfil descomprimido ocupa más que el archivo; el doble es una estimación prudente
+        raiz = self.elegir_raices(1, 2 * os.path.getsize(archivo))[0]
+        os.makedirs(raiz, exist_ok=True)
+        temporal = ruta_sesion(f".importando.{time.time_ns()}", raiz)
+        metadatos = SessionArchiver().importar(archivo, temporal, cancelado)
+        if metadatos is None:
+            return None
+        try:
+            nombre_sesion = nombre_sesion or validar_nombre_sesion(metadatos['name'])
+            if self.store.existe(nombre_sesion) or os.path.lexists(ruta_sesion(nombre_sesion, raiz)):
+                raise ValueError(f"La sesión '{nombre_sesion}' ya existe.")
+            campos = {campo: metadatos[campo]
+                      for campo in ('last_used', 'tags', 'launch_flags', 'preset', 'start_urls', 'template')
+                      if metadatos.get(campo) is not None}
+            if campos.get('preset') not in (None, *PRESETS_LANZAMIENTO):
+                del campos['preset']  # Preset de otra versión del gestor: se usa el predeterminado
+            creada = self.store.agregar_varias([nombre_sesion], metadatos.get('created'),
+                                               raices={nombre_sesion: raiz} if raiz != RUTA_SESIONES else None,
+                                               **campos)
+            try:
+                os.rename(temporal, ruta_sesion(nombre_sesion, raiz))
+            except OSError:
+                self.store.eliminar(nombre_sesion)
+                raise
+        except BaseException:
+            shutil.rmtree(temporal, ignore_errors=True)
+            raise
+        return nombre_sesion, creada
+
+    def archivar(self, nombres, al_progresar=None, cancelado=None):
+        """
+        Pasa las sesiones a almacenamiento en frío: exporta cada perfil a Storage/Archive, lo
+        anota en el almacén y mueve el perfil a la papelera (el espacio se libera con `purgar`).
+        Las sesiones siguen en la lista y se restauran al lanzarlas. Retorna
+        ({sesión: (bytes del perfil, bytes del archivo)}, omitidas por estar en ejecución).
+        """
+        self.reconciliar()
+        archiver = SessionArchiver()
+        ya_archivadas = self.store.archivadas()
+        pendientes = [nombre for nombre in nombres if nombre not in ya_archivadas]
+        archivadas, omitidas = {}, []
+        for hechas, nombre in enumerate(pendientes):
+            if al_progresar is not None:
+                al_progresar(hechas, len(pendientes))
+            if cancelado is not None and cancelado.is_set():
+                break
+            raiz = self.ruta(nombre)
+            if self.process_registry.en_ejecucion(nombre) or perfil_bloqueado(raiz):
+                omitidas.append(nombre)
+                continue
+            fichero = nombre + archiver.extension()
+            antes = self.size_index.total(raiz) or DirectorySizer().medir_directorio(raiz) or 0
+            tamano = archiver.exportar(raiz, ruta_archivo(fichero), self._metadatos(nombre), cancelado)
+            if tamano is None:
+                break
+            self.store.actualizar(nombre, archive=fichero)
+            self.papelera(self.store.raiz(nombre)).mover(nombre)
+            self.size_index.olvidar(raiz)
+            archivadas[nombre] = (antes, tamano)
+        if al_progresar is not None:
+            al_progresar(len(archivadas) + len(omitidas), len(pendientes))
+        return archivadas, sorted(omitidas, key=str.casefold)
+
+    def restaurar(self, nombres, al_progresar=None, cancelado=None):
+        """
+        Devuelve a Storage/Sessions el perfil de las sesiones archivadas y borra su archivo.
+        Retorna la lista de sesiones restauradas.
+        """
+        archiver = SessionArchiver()
+        archivadas = self.store.archivadas()
+        pendientes = [nombre for nombre in nombres if nombre in archivadas]
+        restauradas = []
+        for hechas, nombre in enumerate(pendientes):
+            if al_progresar is not None:
+                al_progresar(hechas, len(pendientes))
+            archivo = ruta_archivo(archivadas[nombre])
+            # Perfil que quedó de un archivado interrumpido: el archivo ya está completo
+            self.papelera(self.store.raiz(nombre)).mover(nombre)
+            if archiver.importar(archivo, self.ruta(nombre), cancelado) is None:
+                break
+            self.store.actualizar(nombre, archive=None)
+            os.remove(archivo)
+            restauradas.append(nombre)
+        if al_progresar is not None:
+            al_progresar(len(restauradas), len(pendientes))
+        return restauradas
+
+    def liberar_espacio(self, simular=False, minimo=None, objetivo=None, al_progresar=None, cancelado=None):
+        """
+        Archivado automático por LRU. Cuando el espacio libre de un volumen con raíces de
+        sesiones baja de `minimo` bytes, archiva las sesiones detenidas de ese volumen usadas
+        hace más tiempo hasta que vuelve a haber `objetivo` bytes libres en él. Los umbrales no
+        indicados se toman de la configuración (archivado_libre_minimo_gb y
+        archivado_libre_objetivo_gb; 0 desactiva el archivado). Los archivos se escriben en
+        Storage/Archive, así que una sesión de otro volumen no se archiva si al de Storage
+        también le falta espacio.
+
+        Con `simular` no se toca nada y el informe lista lo que se archivaría para llegar al
+        objetivo en cada volumen, se haya alcanzado o no el mínimo. Retorna {'libre', 'minimo',
+        'objetivo', 'activado', 'sesiones', 'libre_final', 'volumenes'}: 'volumenes' es la lista
+        de {'raices', 'libre', 'activado', 'libre_final'} de cada volumen; 'libre' y
+        'libre_final' son los del volumen con menos espacio y 'activado' indica si alguno
+        bajó del mínimo. 'sesiones' es la lista de {'nombre', 'raiz', 'ultimo_uso', 'tamano'}
+        elegidas (con 'archivo', los bytes del archivo comprimido, en las que se archivaron).
+        """
+        gb = 1024 ** 3
+        if minimo is None:
+            minimo = int(self.config.get('archivado_libre_minimo_gb', 0) * gb)
+        if objetivo is None:
+            objetivo = int(self.config.get('archivado_libre_objetivo_gb', 0) * gb)
+        objetivo = max(objetivo, minimo)
+        # Archivar una sesión solo libera espacio en el volumen que la contiene
+        volumenes = {}  # st_dev -> {'raices', 'libre', 'activado', 'libre_final'}
+        for raiz in self.raices():
+            try:
+                dispositivo, libre = dispositivo_volumen(raiz), espacio_libre(raiz)
+            except OSError:
+                continue  # Raíz no disponible (p. ej. disco desmontado)
+            volumen = volumenes.setdefault(dispositivo, {'raices': [], 'libre': libre, 'libre_final': libre,
+                                                         'activado': bool(minimo) and libre < minimo})
+            volumen['raices'].append(raiz)
+        libre = min((volumen['libre'] for volumen in volumenes.values()), default=espacio_libre(RUTA_STORAGE))
+        informe = {'libre': libre, 'minimo': minimo, 'objetivo': objetivo,
+                   'activado': any(volumen['activado'] for volumen in volumenes.values()),
+                   'sesiones': [], 'libre_final': libre, 'volumenes': list(volumenes.values())}
+        if not minimo or not (simular or informe['activado']):
+            return informe
+
+        # Candidatas: detenidas y con el perfil en disco, de la usada hace más tiempo a la más reciente
+        self.reconciliar()
+        usos = {nombre: uso for nombre, uso in self.store.ultimos_usos().items()
+                if not self.process_registry.en_ejecucion(nombre)}
+        raices = self.store.raices()
+        sin_medir = [nombre for nombre in usos if self.size_index.total(self.ruta(nombre, raices)) is None]
+        if sin_medir:
+            self.medir(sin_medir)
+        dispositivos = {raiz: dispositivo for dispositivo, volumen in volumenes.items() for raiz in volumen['raices']}
+        necesario = {dispositivo: objetivo - volumen['libre'] for dispositivo, volumen in volumenes.items()
+                     if simular or volumen['activado']}
+        # Estimación: se liberaría el tamaño del perfil, sin descontar lo que ocupa el archivo
+        for nombre in sorted(usos, key=lambda nombre: (usos[nombre], nombre.casefold())):
+            raiz = raices.get(nombre, RUTA_SESIONES)
+            dispositivo = dispositivos.get(raiz)
+            if necesario.get(dispositivo, 0) <= 0:
+                continue
+            tamano = self.size_index.total(self.ruta(nombre, raices)) or 0
+            if not tamano:
+                continue  # Archivarla no liberaría espacio
+            informe['sesiones'].append({'nombre': nombre, 'raiz': raiz, 'ultimo_uso': usos[nombre], 'tamano': tamano})
+            necesario[dispositivo] -= tamano
+        if simular:
+            return informe
+
+        dispositivo_archivo = dispositivo_volumen(RUTA_ARCHIVO)
+        for hechas, sesion in enumerate(informe['sesiones']):
+            if al_progresar is not None:
+                al_progresar(hechas, len(informe['sesiones']))
+            if cancelado is not None and cancelado.is_set():
+                break
+            if espacio_libre(sesion['raiz']) >= objetivo:
+                continue  # Su volumen ya llegó al objetivo
+            if dispositivos[sesion['raiz']] != dispositivo_archivo and espacio_libre(RUTA_ARCHIVO) < minimo:
+                continue  # Solo trasladaría la falta de espacio al volumen de Storage
+            archivadas, _ = self.archivar([sesion['nombre']], cancelado=cancelado)
+            if sesion['nombre'] in archivadas:
+                sesion['archivo'] = archivadas[sesion['nombre']][1]
+                self.purgar(cancelado=cancelado)
+        informe['sesiones'] = [sesion for sesion in informe['sesiones'] if 'archivo' in sesion]
+        for volumen in volumenes.values():
+            volumen['libre_final'] = espacio_libre(volumen['raices'][0])
+        informe['libre_final'] = min((volumen['libre_final'] for volumen in volumenes.values()),
+                                     default=espacio_libre(RUTA_STORAGE))
+        if al_progresar is not None:
+            al_progresar(len(informe['sesiones']), len(informe['sesiones']))
+        return informe
+
+    def medir(self, nombres=None, al_completar=None, sizer=None):
+        """
+        Calcula el tamaño de las sesiones indicadas (todas por defecto) con el índice
+        incremental y lo guarda. Retorna {nombre: bytes} de las que se completaron.
+        """
+        nombres = self.activas() if nombres is None else nombres
+        sizer = sizer or DirectorySizer(indice=self.size_index)
+        raices = self.store.raices()
+        tamanos = sizer.medir({nombre: self.ruta(nombre, raices) for nombre in nombres}, al_completar=al_completar)
+        try:
+            self.size_index.guardar()
+        except OSError:
+            pass  # El índice es solo una caché; sin él el próximo escaneo será completo
+        return tamanos
@@ -1,18 +1,24 @@
 import os
-import re
-import json
-import shutil
-import socket
+import sys
+import sqlite3
+import time
+import threading
 import subprocess
-from pathlib import Path
+import multiprocessing
 from datetime import datetime
 
-from PyQt5.QtCore import Qt
 from PyQt5.QtGui import QIcon, QFont
-from PyQt5.QtCore import Qt, QThread, pyqtSignal
+from PyQt5.QtCore import Qt, QThread, QTimer, pyqtSignal, QAbstractTableModel, QModelIndex, QSortFilterProxyModel
 from PyQt5.QtWidgets import (
-    QApplication, QWidget, QVBoxLayout, QPushButton, QLineEdit, QTreeWidget, QTreeWidgetItem,
-    QMessageBox, QHBoxLayout, QLabel, QDialog, QFileDialog, QComboBox
+    QApplication, QWidget, QVBoxLayout, QPushButton, QLineEdit, QTreeView, QAbstractItemView,
+    QMessageBox, QHBoxLayout, QLabel, QDialog, QFileDialog, QComboBox, QProgressBar, QSpinBox, QDoubleSpinBox,
+    QInputDialog, QCheckBox, QTableWidget, QTableWidgetItem, QListWidget, QMenu, QPlainTextEdit
+)
+
+from core import (
+    RUTA_STORAGE, RUTA_AJUSTES, RUTA_SESIONES, SessionManager, DirectorySizer, BatchLauncher, CachePruner,
+    SessionRunningError, ETIQUETAS_FASES, PRESETS_LANZAMIENTO, PRESET_PREDETERMINADO, activar_sesion, detectar_ruta_chrome, guardar_configuracion, espacio_libre,
+    format_size, uso_volumen
 )
 
 
@@ -29,26 +35,575 @@ VERSION = '1.9'
 
 
 class SessionLoaderThread(QThread):
-    session_data_ready = pyqtSignal(list)  # Señal para enviar los datos al hilo principal
+    session_sized = pyqtSignal(str, str, object)  # Nombre, ruta y tamaño de cada sesión terminada
+    progress = pyqtSignal(int, int)  # Sesiones terminadas y total
+    scan_finished = pyqtSignal(bool)  # True si el escaneo se canceló
 
-    def __init__(self, session_paths):
+    def __init__(self, session_paths, size_index=None):
         super().__init__()
         self.session_paths = session_paths
+        self.size_index = size_index
+        self.sizer = DirectorySizer(indice=size_index)
+        self.completed = 0
+
+    def cancel(self):
+        self.sizer.cancelar()
+
+    def run(self):
+        total = len(self.session_paths)
+        self.progress.emit(0, total)
+
+        def on_completed(session_name, size):
+            self.completed += 1
+            self.session_sized.emit(session_name, self.session_paths[session_name], size)
+            self.progress.emit(self.completed, total)
+
+        self.sizer.medir(self.session_paths, al_completar=on_completed)
+        if self.size_index is not None:
+            try:
+                self.size_index.guardar()
+            except OSError:
+                pass  # El índice es solo una caché; sin él el próximo escaneo será completo
+        self.scan_finished.emit(self.sizer.cancelado.is_set())
+
+class BatchLaunchThread(QThread):
+    session_launched = pyqtSignal(dict)  # Resultado de cada sesión
+    batch_finished = pyqtSignal(list)  # Resultados de todas las sesiones
+
+    def __init__(self, batch_launcher, sessions):
+        super().__init__()
+        self.batch_launcher = batch_launcher
+        self.sessions = sessions
+
+    def cancel(self):
+        self.batch_launcher.cancelar()
+
+    def run(self):
+        results = self.batch_launcher.ejecutar(self.sessions, al_terminar=self.session_launched.emit)
+        self.batch_finished.emit(results)
+
+class TrashPurgeThread(QThread):
+    purge_progress = pyqtSignal(object, object)  # Bytes liberados y bytes totales
+    purge_finished = pyqtSignal(object)  # Bytes liberados
+
+    def __init__(self, core):
+        super().__init__()
+        self.core = core
+        self.cancelled = threading.Event()
+
+    def cancel(self):
+        self.cancelled.set()
+
+    def run(self):
+        freed = self.core.purgar(al_progresar=self.purge_progress.emit, cancelado=self.cancelled)
+        self.purge_finished.emit(freed)
+
+class DedupThread(QThread):
+    dedup_progress = pyqtSignal(int, int)  # Ficheros leídos y candidatos
+    dedup_finished = pyqtSignal(object)  # Informe de la deduplicación, o la excepción
+
+    def __init__(self, core):
+        super().__init__()
+        self.core = core
+        self.cancelled = threading.Event()
+
+    def cancel(self):
+        self.cancelled.set()
+
+    def run(self):
+        try:
+            resultado = self.core.deduplicar(al_progresar=self.dedup_progress.emit, cancelado=self.cancelled)
+        except (OSError, sqlite3.Error) as e:
+            resultado = e
+        self.dedup_finished.emit(resultado)
+
+class CachePruneThread(QThread):
+    prune_progress = pyqtSignal(int, int)  # Directorios de caché vaciados y total
+    prune_finished = pyqtSignal(object, object)  # {sesión: bytes liberados} y sesiones omitidas
+
+    def __init__(self, core, sessions, categories):
+        super().__init__()
+        self.core = core
+        self.sessions = sessions
+        self.categories = categories
+        self.cancelled = threading.Event()
+
+    def cancel(self):
+        self.cancelled.set()
+
+    def run(self):
+        freed, skipped = self.core.limpiar_cache(self.sessions, self.categories,
+                                                 al_progresar=self.prune_progress.emit,
+                                                 cancelado=self.cancelled)
+        self.prune_finished.emit(freed, skipped)
+
+class CompactThread(QThread):
+    compact_progress = pyqtSignal(int, int)  # Bases compactadas y total
+    compact_finished = pyqtSignal(object, object)  # Resultados por base y sesiones omitidas
+
+    def __init__(self, core):
+        super().__init__()
+        self.core = core
+        self.cancelled = threading.Event()
+
+    def cancel(self):
+        self.cancelled.set()
+
+    def run(self):
+        try:
+            resultados, omitidas = self.core.compactar(al_progresar=self.compact_progress.emit,
+                                                       cancelado=self.cancelled)
+        except (OSError, sqlite3.Error) as e:
+            resultados, omitidas = e, []
+        self.compact_finished.emit(resultados, omitidas)
+
+class MonitorThread(QThread):
+    samples_ready = pyqtSignal(object)  # {sesión: muestra} de cada muestreo
+
+    def __init__(self, core, interval):
+        super().__init__()
+        self.core = core
+        self.interval = interval
+        self.cancelled = threading.Event()
+
+    def cancel(self):
+        self.cancelled.set()
+
+    def run(self):
+        while not self.cancelled.is_set():
+            self.samples_ready.emit(self.core.muestrear())
+            self.cancelled.wait(self.interval)
+
+class WarmPoolThread(QThread):
+    warm_finished = pyqtSignal(object)  # Informe de precalentar o la excepción
+
+    def __init__(self, core, chrome_ruta):
+        super().__init__()
+        self.core = core
+        self.chrome_ruta = chrome_ruta
+
+    def run(self):
+        try:
+            resultado = self.core.precalentar(self.chrome_ruta)
+        except (OSError, sqlite3.Error) as e:
+            resultado = e
+        self.warm_finished.emit(resultado)
+
+class LaunchWaitThread(QThread):
+    window_ready = pyqtSignal(str, object)  # Sesión y segundos desde el clic, o None si no arrancó
+    timeline_ready = pyqtSignal(str, object)  # Sesión y {fase: segundos} del arranque
+
+    def __init__(self, launcher, session, port, process, start, timeout):
+        super().__init__()
+        self.launcher = launcher
+        self.session = session
+        self.port = port
+        self.process = process
+        self.start_time = start
+        self.timeout = timeout
+        self.cancelled = threading.Event()
+
+    def cancel(self):
+        self.cancelled.set()
+
+    def run(self):
+        # La ventana es utilizable en cuanto DevTools responde; después se espera a que el
+        # launcher termine de medir la primera carga, para poder cancelarla al salir
+        medida = threading.Event()
+
+        def al_cargar(fases):
+            self.timeline_ready.emit(self.session, dict(fases))
+            medida.set()
+
+        fases = self.launcher.esperar_arranque(self.session, self.process, self.port, self.timeout,
+                                               self.cancelled, al_cargar=al_cargar)
+        if fases is None:
+            self.window_ready.emit(self.session, None)
+            return
+        self.window_ready.emit(self.session, round(time.monotonic() - self.start_time, 3))
+        medida.wait()
+
+class RamSyncThread(QThread):
+    ram_sync_finished = pyqtSignal(object)  # Informe de sincronizar_ram o la excepción
+
+    def __init__(self, core):
+        super().__init__()
+        self.core = core
+
+    def run(self):
+        try:
+            resultado = self.core.sincronizar_ram()
+        except (OSError, sqlite3.Error) as e:
+            resultado = e
+        self.ram_sync_finished.emit(resultado)
+
+class ReaperThread(QThread):
+    reap_finished = pyqtSignal(object)  # {sesión: resultado} de cerrar_inactivas o la excepción
+
+    def __init__(self, core):
+        super().__init__()
+        self.core = core
+        self.cancelled = threading.Event()
+
+    def cancel(self):
+        self.cancelled.set()
+
+    def run(self):
+        try:
+            resultado = self.core.cerrar_inactivas(cancelado=self.cancelled)
+        except (OSError, sqlite3.Error) as e:
+            resultado = e
+        self.reap_finished.emit(resultado)
+
+class CdpThread(QThread):
+    cdp_finished = pyqtSignal(str, object)  # Operación y {sesión: resultado}, o la excepción
+
+    def __init__(self, core, operacion, sesiones, **parametros):
+        super().__init__()
+        self.core = core
+        self.operacion = operacion
+        self.sesiones = sesiones
+        self.parametros = parametros
+
+    def run(self):
+        try:
+            resultado = self.core.cdp(self.operacion, self.sesiones, **self.parametros)
+        except (OSError, ValueError) as e:
+            resultado = e
+        self.cdp_finished.emit(self.operacion, resultado)
+
+class ArchiveThread(QThread):
+    archive_progress = pyqtSignal(int, int)  # Sesiones hechas y total
+    archive_finished = pyqtSignal(object)  # Resultado de la tarea o la excepción que la detuvo
+
+    def __init__(self, tarea):
+        """
+        `tarea(al_progresar, cancelado)` archiva, restaura, exporta o importa sesiones.
+        """
+        super().__init__()
+        self.tarea = tarea
+        self.cancelled = threading.Event()
+
+    def cancel(self):
+        self.cancelled.set()
 
     def run(self):
-        sessions = []
-        for session_name, session_path in self.session_paths.items():
-            size = self.calculate_directory_size(session_path)
-            sessions.append((session_name, session_path, size))
-        self.session_data_ready.emit(sessions)
-
-    def calculate_directory_size(self, path):
-        total_size = 0
-        for root, dirs, files in os.walk(path):
-            for f in files:
-                fp = os.path.join(root, f)
-                total_size += os.path.getsize(fp)
-        return total_size
+        try:
+            resultado = self.tarea(self.archive_progress.emit, self.cancelled)
+        except (ValueError, KeyError, OSError, sqlite3.Error) as e:
+            resultado = e
+        self.archive_finished.emit(resultado)
+
+class SessionTableModel(QAbstractTableModel):
+    """
+    Modelo de la tabla de sesiones.
+
+    Guarda los valores crudos (bytes y marcas de tiempo) y expone el texto formateado solo en
+    DisplayRole. Ordenar usa las claves de SORT_ROLE sobre la lista de filas en Python, sin
+    volver a interpretar el texto mostrado ni recrear filas, y las filas nuevas o que cambian
+    de tamaño se colocan directamente en su posición ordenada.
+    """
+
+    COLUMNS = ["Nombre", "Fecha/Hora de Creación", "Uso de Almacenamiento", "Estado", "Ubicación",
+               "CPU", "Memoria", "E/S de disco", "Límites"]
+    SORT_ROLE = Qt.UserRole
+    DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        # [nombre, texto de fecha, marca de tiempo, bytes, en ejecución, archivada, raíz, última muestra]
+        self._rows = []
+        self._row_by_name = {}
+        self._total_size = 0
+        self._sort_column = 0
+        self._sort_order = Qt.AscendingOrder
+        self.history = None  # Función nombre -> muestras anteriores, para el tooltip
+        self.suspended = set()  # Sesiones cerradas por inactividad pendientes de relanzar
+        self.warm = set()  # Sesiones precalentadas: en ejecución pero sin ventana
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.COLUMNS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return self.COLUMNS[section]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        row = self._rows[index.row()]
+        column = index.column()
+        if role == Qt.DisplayRole:
+            if column == 0:
+                return row[0]
+            if column == 1:
+                return row[1]
+            if column == 3:
+                if row[4]:
+                    return "Precalentada" if row[0] in self.warm else "En ejecución"
+                if row[5]:
+                    return "Archivada"
+                return "Suspendida" if row[0] in self.suspended else "Detenida"
+            if column == 4:
+                return row[6]
+            if column >= 5:
+                return self._sample_text(row[7], column)
+            porcentaje = (row[3] / self._total_size * 100) if self._total_size > 0 else 0
+            return f"{format_size(row[3])} ({porcentaje:.2f}% del espacio total ocupado)"
+        if role == self.SORT_ROLE:
+            return self._sort_key(row, column)
+        if role == Qt.ToolTipRole and column == 8 and row[7] is not None and row[7].get('cgroup'):
+            return self._cgroup_text(row[7]['cgroup'])
+        if role == Qt.ToolTipRole and column >= 5 and row[7] is not None and self.history is not None:
+            return self._history_text(self.history(row[0]))
+        return None
+
+    def _sample_text(self, sample, column):
+        if sample is None:
+            return ""
+        if column == 8:
+            cgroup = sample.get('cgroup')
+            if not cgroup:
+                return ""
+            maximo = format_size(cgroup['memoria_max']) if cgroup['memoria_max'] else "sin límite"
+            texto = f"{format_size(cgroup['memoria'])} / {maximo}"
+            # Veces que se reclamó memoria al llegar al límite y procesos matados por falta de ella
+            if cgroup['eventos']['max'] or cgroup['eventos']['oom_kill']:
+                texto += f" · límite {cgroup['eventos']['max']}× · OOM {cgroup['eventos']['oom_kill']}"
+            return texto
+        if column == 5:
+            return f"{sample['cpu']:.1f} %"
+        if column == 6:
+            # El PSS reparte la memoria compartida entre procesos; hasta la primera lectura, RSS
+            if sample['pss'] is not None:
+                return f"{format_size(sample['pss'])} ({sample['procesos']} proc.)"
+            return f"{format_size(sample['rss'])} RSS ({sample['procesos']} proc.)"
+        return f"L {format_size(sample['lectura'])}/s · E {format_size(sample['escritura'])}/s"
+
+    def _cgroup_text(self, cgroup):
+        presion = ", ".join(f"{recurso} {valor:.1f} %" for recurso, valor in cgroup['presion'].items())
+        return (f"Memoria {format_size(cgroup['memoria'])} de "
+                f"{format_size(cgroup['memoria_max']) if cgroup['memoria_max'] else 'sin límite'}\n"
+                f"Eventos de memoria: high {cgroup['eventos']['high']}, max {cgroup['eventos']['max']}, "
+                f"OOM {cgroup['eventos']['oom']}, procesos matados {cgroup['eventos']['oom_kill']}\n"
+                f"CPU usada {cgroup['cpu_usec'] / 1e6:.1f} s, limitada {cgroup['throttled']['nr_throttled']} veces "
+                f"({cgroup['throttled']['throttled_usec'] / 1e6:.1f} s)\n"
+                f"Presión (últimos 10 s): {presion or 'no disponible'}")
+
+    def _history_text(self, history):
+        if not history:
+            return None
+        cpus = [sample['cpu'] for sample in history]
+        memory = [sample['pss'] if sample['pss'] is not None else sample['rss'] for sample in history]
+        minutes = (history[-1]['hora'] - history[0]['hora']) / 60
+        return (f"Últimos {minutes:.0f} min ({len(history)} muestras)\n"
+                f"CPU media {sum(cpus) / len(cpus):.1f} % (máx. {max(cpus):.1f} %)\n"
+                f"Memoria máx. {format_size(max(memory))}\n"
+                f"Escritura media {format_size(sum(s['escritura'] for s in history) / len(history))}/s")
+
+    def _sort_key(self, row, column):
+        if column == 0:
+            return row[0].casefold()
+        if column == 1:
+            return row[2]
+        if column == 3:
+            return (row[4], not row[5])
+        if column == 4:
+            return row[6].casefold()
+        if column >= 5:
+            if row[7] is None:
+                return -1
+            if column == 8:
+                cgroup = row[7].get('cgroup')
+                return cgroup['memoria'] if cgroup else -1
+            if column == 5:
+                return row[7]['cpu']
+            if column == 6:
+                return row[7]['pss'] if row[7]['pss'] is not None else row[7]['rss']
+            return row[7]['lectura'] + row[7]['escritura']
+        return row[3]
+
+    def _timestamp(self, date_text):
+        try:
+            return datetime.strptime(date_text, self.DATE_FORMAT).timestamp()
+        except (TypeError, ValueError):
+            return 0.0
+
+    def _reindex(self, first=0, last=None):
+        last = len(self._rows) - 1 if last is None else last
+        for i in range(first, last + 1):
+            self._row_by_name[self._rows[i][0]] = i
+
+    def _sorted_position(self, row):
+        """
+        Posición de inserción de una fila según el orden actual (búsqueda binaria).
+        """
+        key = self._sort_key(row, self._sort_column)
+        descending = self._sort_order == Qt.DescendingOrder
+        lo, hi = 0, len(self._rows)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            other = self._sort_key(self._rows[mid], self._sort_column)
+            if (other > key) if descending else (other <= key):
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        self._sort_column, self._sort_order = column, order
+        self.layoutAboutToBeChanged.emit()
+        persistent = self.persistentIndexList()
+        names = [self._rows[index.row()][0] for index in persistent]
+        self._rows.sort(key=lambda row: self._sort_key(row, column), reverse=order == Qt.DescendingOrder)
+        self._reindex()
+        # Mantener la selección y el elemento actual apuntando a la misma sesión
+        self.changePersistentIndexList(persistent, [
+            self.index(self._row_by_name[name], index.column()) for name, index in zip(names, persistent)
+        ])
+        self.layoutChanged.emit()
+
+    def set_sessions(self, sessions, running=(), archived=()):
+        """
+        Sustituye todas las filas. Recibe una lista de tuplas (nombre, fecha, bytes, raíz) y los
+        nombres de las sesiones en ejecución y de las archivadas.
+        """
+        running, archived = set(running), set(archived)
+        self.beginResetModel()
+        self._rows = [[name, date_text, self._timestamp(date_text), size, name in running, name in archived, root, None]
+                      for name, date_text, size, root in sessions]
+        self._rows.sort(key=lambda row: self._sort_key(row, self._sort_column),
+                        reverse=self._sort_order == Qt.DescendingOrder)
+        self._row_by_name = {}
+        self._reindex()
+        self._total_size = sum(row[3] for row in self._rows)
+        self.endResetModel()
+
+    def upsert(self, name, date_text, size, running=False, archived=False, root=""):
+        """
+        Añade una sesión o actualiza su tamaño, si está archivada y su raíz sin tocar el resto de
+        filas.
+        """
+        row = self._row_by_name.get(name)
+        if row is None:
+            data = [name, date_text, self._timestamp(date_text), size, running, archived, root, None]
+            position = self._sorted_position(data)
+            self.beginInsertRows(QModelIndex(), position, position)
+            self._rows.insert(position, data)
+            self._reindex(position)
+            self._total_size += size
+            self.endInsertRows()
+        else:
+            self._total_size += size - self._rows[row][3]
+            self._rows[row][3] = size
+            if self._rows[row][5] != archived:
+                self._rows[row][5] = archived
+                self.dataChanged.emit(self.index(row, 3), self.index(row, 3), [Qt.DisplayRole])
+                if self._sort_column == 3:
+                    self._move_to_sorted_position(row)
+            row = self._row_by_name[name]
+            if self._rows[row][6] != root:
+                self._rows[row][6] = root
+                self.dataChanged.emit(self.index(row, 4), self.index(row, 4), [Qt.DisplayRole])
+                if self._sort_column == 4:
+                    self._move_to_sorted_position(row)
+            if self._sort_column == 2:
+                self._move_to_sorted_position(self._row_by_name[name])
+        self._size_column_changed()
+
+    def _move_to_sorted_position(self, row):
+        data = self._rows.pop(row)
+        target = self._sorted_position(data)
+        self._rows.insert(row, data)
+        if target == row:
+            return
+        self.beginMoveRows(QModelIndex(), row, row, QModelIndex(), target + 1 if target > row else target)
+        del self._rows[row]
+        self._rows.insert(target, data)
+        self._reindex(min(row, target), max(row, target))
+        self.endMoveRows()
+
+    def set_running(self, name, running):
+        row = self._row_by_name.get(name)
+        if row is None or self._rows[row][4] == running:
+            return
+        self._rows[row][4] = running
+        self.dataChanged.emit(self.index(row, 3), self.index(row, 3), [Qt.DisplayRole])
+        if self._sort_column == 3:
+            self._move_to_sorted_position(row)
+
+    def set_suspended(self, names):
+        """
+        Marca como suspendidas (cerradas por inactividad) las sesiones indicadas.
+        """
+        names = set(names)
+        if names == self.suspended:
+            return
+        self.suspended = names
+        if self._rows:
+            self.dataChanged.emit(self.index(0, 3), self.index(len(self._rows) - 1, 3), [Qt.DisplayRole])
+
+    def set_warm(self, names):
+        """
+        Marca como precalentadas las sesiones indicadas.
+        """
+        names = set(names)
+        if names == self.warm:
+            return
+        self.warm = names
+        if self._rows:
+            self.dataChanged.emit(self.index(0, 3), self.index(len(self._rows) - 1, 3), [Qt.DisplayRole])
+
+    def set_samples(self, samples):
+        """
+        Actualiza las columnas de consumo con {nombre: muestra}; las sesiones que no aparecen
+        se quedan en blanco.
+        """
+        if not self._rows:
+            return
+        for row in self._rows:
+            row[7] = samples.get(row[0])
+        self.dataChanged.emit(self.index(0, 5), self.index(len(self._rows) - 1, 8), [Qt.DisplayRole])
+        if self._sort_column >= 5:
+            self.sort(self._sort_column, self._sort_order)
+
+    def remove(self, name):
+        row = self._row_by_name.pop(name, None)
+        if row is None:
+            return
+        self.beginRemoveRows(QModelIndex(), row, row)
+        self._total_size -= self._rows[row][3]
+        del self._rows[row]
+        self._reindex(row)
+        self.endRemoveRows()
+        self._size_column_changed()
+
+    def _size_column_changed(self):
+        # El porcentaje de cada fila depende del total, así que cambia toda la columna
+        if self._rows:
+            self.dataChanged.emit(self.index(0, 2), self.index(len(self._rows) - 1, 2), [Qt.DisplayRole])
+
+    def name_at(self, row):
+        return self._rows[row][0]
+
+    def total_size(self):
+        return self._total_size
+
+class SessionSortProxyModel(QSortFilterProxyModel):
+    """
+    Proxy de la vista de sesiones que delega la ordenación en SessionTableModel.
+
+    La ordenación nativa del proxy compara índice a índice llamando a data() en Python, lo que
+    con miles de sesiones tarda más de un segundo por clic; el modelo ordena sus claves crudas
+    en una sola pasada y el proxy solo traduce índices.
+    """
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        self.sourceModel().sort(column, order)
 
 class ChromeSessionManager(QWidget):
     def __init__(self):
@@ -57,21 +612,42 @@ class ChromeSessionManager(QWidget):
         # Configuración de la ventana principal
         self.setWindowTitle(f"Session Manager (v{VERSION}) - Google Chrome")
         self.setGeometry(100, 100, 1080, 720)
-        icon_r = os.path.join('Storage', 'Settings', 'icons', 'favicon.png')
+        icon_r = os.path.join(RUTA_AJUSTES, 'icons', 'favicon.png')
         self.setWindowIcon(QIcon(icon_r))
 
-        # Cargar configuraciones y sesiones existentes
-        self.config = self.cargar_configuracion()
+        # Núcleo compartido con la línea de comandos: configuración, almacén de sesiones, índice de
+        # tamaños, puertos, registro de procesos, lanzador y papelera
+        self.core = SessionManager()
+        self.config = self.core.config
+        self.session_store = self.core.store
+        self.size_index = self.core.size_index
+        self.port_allocator = self.core.port_allocator
+        self.process_registry = self.core.process_registry
+        self.session_launcher = self.core.launcher
 
         # Caché para datos de sesiones
         self.session_cache = {}
 
-        # Variable para el estado del orden actual (ascendente o descendente) para cada columna
-        self.sort_orders = {
-            'name': Qt.AscendingOrder,  # Para el nombre, inicialmente ascendente
-            'date': Qt.AscendingOrder,  # Para la fecha, inicialmente ascendente
-            'size': Qt.DescendingOrder  # Para el uso de almacenamiento, inicialmente descendente
-        }
+        # Hilos de trabajo en segundo plano
+        self.loader_thread = None
+        self.batch_thread = None
+        self.purge_thread = None
+        self.dedup_thread = None
+        self.cache_thread = None
+        self.compact_thread = None
+        self.archive_thread = None
+        self.ram_thread = None
+        self.monitor_thread = None
+        self.reaper_thread = None
+        self.cdp_thread = None
+        self.warm_thread = None
+        self.wait_threads = []
+
+        # Sesiones en almacenamiento en frío: {nombre: bytes del archivo}
+        self.sesiones_archivadas = {}
+
+        # Bytes que las sesiones comparten mediante enlaces duros o reflink (aparente - real)
+        self.espacio_compartido = 0
 
         # Layout principal
         main_layout = QVBoxLayout()
@@ -87,7 +663,26 @@ class ChromeSessionManager(QWidget):
         self.session_name_input.setPlaceholderText("Nombre de la sesión")
         self.session_name_input.setFont(QFont("Arial", 12))
         self.session_name_input.setStyleSheet("padding: 10px; border-radius: 5px; border: 1px solid #ccc;")
-        main_layout.addWidget(self.session_name_input)
+
+        # Plantilla desde la que se clona la nueva sesión
+        self.template_selector = QComboBox(self)
+        self.template_selector.setFont(QFont("Arial", 12))
+        self.template_selector.setToolTip("Plantilla de perfil para la nueva sesión")
+
+        # Preset de lanzamiento de la nueva sesión
+        self.preset_selector = QComboBox(self)
+        self.preset_selector.setFont(QFont("Arial", 12))
+        self.preset_selector.setToolTip("Preset de lanzamiento de la nueva sesión")
+        for preset, datos in PRESETS_LANZAMIENTO.items():
+            self.preset_selector.addItem(preset, preset)
+            self.preset_selector.setItemData(self.preset_selector.count() - 1, datos['descripcion'], Qt.ToolTipRole)
+        self.preset_selector.setCurrentIndex(self.preset_selector.findData(PRESET_PREDETERMINADO))
+
+        session_input_layout = QHBoxLayout()
+        session_input_layout.addWidget(self.session_name_input, 1)
+        session_input_layout.addWidget(self.template_selector)
+        session_input_layout.addWidget(self.preset_selector)
+        main_layout.addLayout(session_input_layout)
 
         # Botón para crear una nueva sesión
         create_session_btn = QPushButton("Crear sesión paralela", self)
@@ -106,28 +701,36 @@ class ChromeSessionManager(QWidget):
         create_session_btn.clicked.connect(self.crear_sesion)
         main_layout.addWidget(create_session_btn)
 
-        # Árbol para mostrar las sesiones creadas
-        self.sessions_tree = QTreeWidget(self)
+        # Modelo de sesiones con valores crudos y proxy que ordena por SORT_ROLE
+        self.sessions_model = SessionTableModel(self)
+        self.sessions_proxy = SessionSortProxyModel(self)
+        self.sessions_proxy.setSourceModel(self.sessions_model)
+        self.sessions_proxy.setSortRole(SessionTableModel.SORT_ROLE)
+
+        # Vista para mostrar las sesiones creadas
+        self.sessions_tree = QTreeView(self)
         self.sessions_tree.setFont(QFont("Arial", 11))
-        self.sessions_tree.setHeaderLabels(["Nombre", "Fecha/Hora de Creación", "Uso de Almacenamiento"])
+        self.sessions_tree.setModel(self.sessions_proxy)
+        self.sessions_tree.setRootIsDecorated(False)
+        self.sessions_tree.setUniformRowHeights(True)  # Evita medir cada fila con miles de sesiones
+        self.sessions_tree.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.sessions_tree.setSelectionMode(QAbstractItemView.ExtendedSelection)
 
         # Ajustar automáticamente el tamaño de las columnas
         self.sessions_tree.header().setSectionResizeMode(0, self.sessions_tree.header().ResizeToContents)  # Nombre
         self.sessions_tree.header().setSectionResizeMode(1, self.sessions_tree.header().ResizeToContents)  # Fecha/Hora
         self.sessions_tree.header().setSectionResizeMode(2, self.sessions_tree.header().ResizeToContents)  # Uso de almacenamiento
+        self.sessions_tree.header().setSectionResizeMode(3, self.sessions_tree.header().ResizeToContents)  # Estado
+        self.sessions_tree.header().setSectionResizeMode(4, self.sessions_tree.header().ResizeToContents)  # Ubicación
+        for column in (5, 6, 7, 8):  # CPU, memoria, E/S de disco y límites
+            self.sessions_tree.header().setSectionResizeMode(column, self.sessions_tree.header().ResizeToContents)
 
-        # Habilitar clics en el encabezado para ordenar
-        header = self.sessions_tree.header()
-        header.setSectionsClickable(True)
-        header.sectionClicked.connect(self.on_header_click)
-        header.setSortIndicatorShown(True)  # Mostrar el indicador de orden en el encabezado
-
-        # Establecer el orden inicial por "Nombre" (columna 0, orden ascendente)
-        self.sessions_tree.sortItems(0, Qt.AscendingOrder)
-        header.setSortIndicator(0, Qt.AscendingOrder)
+        # Ordenar al hacer clic en el encabezado, empezando por "Nombre" ascendente
+        self.sessions_tree.setSortingEnabled(True)
+        self.sessions_tree.sortByColumn(0, Qt.AscendingOrder)
 
         # Conectar la señal de cambio de selección al método actualizar_botones
-        self.sessions_tree.itemSelectionChanged.connect(self.actualizar_botones)
+        self.sessions_tree.selectionModel().selectionChanged.connect(self.actualizar_botones)
 
         main_layout.addWidget(self.sessions_tree)
 
@@ -143,6 +746,29 @@ class ChromeSessionManager(QWidget):
         update_button_layout.setSpacing(0)  # Eliminar espacios
         update_button_container.setLayout(update_button_layout)
 
+        # Progreso del cálculo de tamaños y botón para cancelarlo
+        self.scan_progress = QProgressBar(self)
+        self.scan_progress.setFormat("Calculando tamaños: %v/%m sesiones")
+        self.scan_progress.setVisible(False)
+        update_button_layout.addWidget(self.scan_progress)
+
+        self.cancel_scan_btn = QPushButton("Cancelar", self)
+        self.cancel_scan_btn.setFont(QFont("Arial", 12))
+        self.cancel_scan_btn.setStyleSheet("""
+            QPushButton {
+                padding: 10px;
+                background-color: #6c757d;
+                color: white;
+                border-radius: 5px;
+            }
+            QPushButton:hover {
+                background-color: #5a6268;
+            }
+        """)
+        self.cancel_scan_btn.clicked.connect(self.cancelar_carga)
+        self.cancel_scan_btn.setVisible(False)
+        update_button_layout.addWidget(self.cancel_scan_btn)
+
         # Botón de actualización
         self.update_btn = QPushButton("Actualizar", self)
         self.update_btn.setFont(QFont("Arial", 12))
@@ -159,6 +785,57 @@ class ChromeSessionManager(QWidget):
         """)
         self.update_btn.clicked.connect(self.actualizar_todo)
         update_button_layout.addStretch()  # Empujar el botón hacia la derecha
+
+        # Botón para deduplicar ficheros idénticos entre sesiones detenidas
+        self.dedup_btn = QPushButton("Deduplicar", self)
+        self.dedup_btn.setFont(QFont("Arial", 12))
+        self.dedup_btn.setStyleSheet("""
+            QPushButton {
+                padding: 10px;
+                background-color: #6f42c1;
+                color: white;
+                border-radius: 5px;
+            }
+            QPushButton:hover {
+                background-color: #59339d;
+            }
+        """)
+        self.dedup_btn.clicked.connect(self.deduplicar_sesiones)
+        update_button_layout.addWidget(self.dedup_btn)
+
+        # Botón para compactar las bases de datos internas de Chrome
+        self.compact_btn = QPushButton("Compactar", self)
+        self.compact_btn.setFont(QFont("Arial", 12))
+        self.compact_btn.setStyleSheet("""
+            QPushButton {
+                padding: 10px;
+                background-color: #20c997;
+                color: white;
+                border-radius: 5px;
+            }
+            QPushButton:hover {
+                background-color: #199d76;
+            }
+        """)
+        self.compact_btn.clicked.connect(lambda: self.compactar_bases())
+        update_button_layout.addWidget(self.compact_btn)
+
+        # Botón para importar sesiones exportadas
+        self.import_btn = QPushButton("Importar", self)
+        self.import_btn.setFont(QFont("Arial", 12))
+        self.import_btn.setStyleSheet("""
+            QPushButton {
+                padding: 10px;
+                background-color: #343a40;
+                color: white;
+                border-radius: 5px;
+            }
+            QPushButton:hover {
+                background-color: #23272b;
+            }
+        """)
+        self.import_btn.clicked.connect(self.importar_sesiones)
+        update_button_layout.addWidget(self.import_btn)
         update_button_layout.addWidget(self.update_btn)
 
         main_layout.addWidget(update_button_container)  # Añadir contenedor al layout principal
@@ -183,6 +860,18 @@ class ChromeSessionManager(QWidget):
         self.run_session_btn.setVisible(False)  # Inicialmente oculto
         self.action_buttons_layout.addWidget(self.run_session_btn)
 
+        # Modo RAM: el perfil se copia a tmpfs y los cambios se guardan al cerrar Chrome
+        self.ram_checkbox = QCheckBox("En RAM", self)
+        self.ram_checkbox.setFont(QFont("Arial", 12))
+        if self.core.ram.disponible():
+            self.ram_checkbox.setToolTip("Ejecuta la sesión con el perfil en memoria (tmpfs); los cambios "
+                                         "se guardan en disco al cerrarla y periódicamente")
+        else:
+            self.ram_checkbox.setEnabled(False)
+            self.ram_checkbox.setToolTip("No hay un disco en RAM disponible; indique uno en 'ram_ruta'")
+        self.ram_checkbox.setVisible(False)  # Inicialmente oculto
+        self.action_buttons_layout.addWidget(self.ram_checkbox)
+
         self.delete_session_btn = QPushButton("Borrar sesión paralela", self)
         self.delete_session_btn.setFont(QFont("Arial", 12, QFont.Bold))
         self.delete_session_btn.setStyleSheet("""
@@ -200,8 +889,200 @@ class ChromeSessionManager(QWidget):
         self.delete_session_btn.setVisible(False)  # Inicialmente oculto
         self.action_buttons_layout.addWidget(self.delete_session_btn)
 
+        self.cache_btn = QPushButton("Limpiar caché", self)
+        self.cache_btn.setFont(QFont("Arial", 12, QFont.Bold))
+        self.cache_btn.setStyleSheet("""
+            QPushButton {
+                padding: 10px;
+                background-color: #fd7e14;
+                color: white;
+                border-radius: 5px;
+            }
+            QPushButton:hover {
+                background-color: #dc6a0c;
+            }
+        """)
+        self.cache_btn.clicked.connect(self.limpiar_cache)
+        self.cache_btn.setVisible(False)  # Inicialmente oculto
+        self.action_buttons_layout.addWidget(self.cache_btn)
+
+        self.archive_btn = QPushButton("Archivar", self)
+        self.archive_btn.setFont(QFont("Arial", 12, QFont.Bold))
+        self.archive_btn.setStyleSheet("""
+            QPushButton {
+                padding: 10px;
+                background-color: #6610f2;
+                color: white;
+                border-radius: 5px;
+            }
+            QPushButton:hover {
+                background-color: #520dc2;
+            }
+        """)
+        self.archive_btn.setToolTip("Comprime las sesiones y libera su perfil del disco; se restauran al ejecutarlas")
+        self.archive_btn.clicked.connect(self.archivar_sesiones)
+        self.archive_btn.setVisible(False)  # Inicialmente oculto
+        self.action_buttons_layout.addWidget(self.archive_btn)
+
+        self.export_btn = QPushButton("Exportar", self)
+        self.export_btn.setFont(QFont("Arial", 12, QFont.Bold))
+        self.export_btn.setStyleSheet("""
+            QPushButton {
+                padding: 10px;
+                background-color: #343a40;
+                color: white;
+                border-radius: 5px;
+            }
+            QPushButton:hover {
+                background-color: #23272b;
+            }
+        """)
+        self.export_btn.clicked.connect(self.exportar_sesiones)
+        self.export_btn.setVisible(False)  # Inicialmente oculto
+        self.action_buttons_layout.addWidget(self.export_btn)
+
+        self.move_btn = QPushButton("Mover a...", self)
+        self.move_btn.setFont(QFont("Arial", 12, QFont.Bold))
+        self.move_btn.setStyleSheet("""
+            QPushButton {
+                padding: 10px;
+                background-color: #795548;
+                color: white;
+                border-radius: 5px;
+            }
+            QPushButton:hover {
+                background-color: #5d4037;
+            }
+        """)
+        self.move_btn.setToolTip("Mueve el perfil de las sesiones a otra raíz de almacenamiento")
+        self.move_btn.clicked.connect(self.mover_sesiones)
+        self.move_btn.setVisible(False)  # Inicialmente oculto
+        self.action_buttons_layout.addWidget(self.move_btn)
+
+        self.launch_config_btn = QPushButton("Arranque...", self)
+        self.launch_config_btn.setFont(QFont("Arial", 12, QFont.Bold))
+        self.launch_config_btn.setStyleSheet("""
+            QPushButton {
+                padding: 10px;
+                background-color: #607d8b;
+                color: white;
+                border-radius: 5px;
+            }
+            QPushButton:hover {
+                background-color: #546e7a;
+            }
+        """)
+        self.launch_config_btn.setToolTip("Preset de lanzamiento, URLs de inicio y opciones de Chrome de las "
+                                          "sesiones seleccionadas")
+        self.launch_config_btn.clicked.connect(self.configurar_arranque)
+        self.launch_config_btn.setVisible(False)  # Inicialmente oculto
+        self.action_buttons_layout.addWidget(self.launch_config_btn)
+
+        # Operaciones sobre las sesiones abiertas a través de su puerto de depuración
+        self.devtools_btn = QPushButton("DevTools", self)
+        self.devtools_btn.setFont(QFont("Arial", 12, QFont.Bold))
+        self.devtools_btn.setStyleSheet("""
+            QPushButton {
+                padding: 10px;
+                background-color: #455a64;
+                color: white;
+                border-radius: 5px;
+            }
+            QPushButton:hover {
+                background-color: #37474f;
+            }
+        """)
+        self.devtools_btn.setToolTip("Abre URLs, lista pestañas, vacía la caché o cierra las sesiones seleccionadas "
+                                     "que están en ejecución")
+        devtools_menu = QMenu(self.devtools_btn)
+        devtools_menu.addAction("Abrir URL...", self.abrir_urls)
+        devtools_menu.addAction("Ver pestañas", lambda: self.operacion_cdp('pestanas'))
+        devtools_menu.addAction("Vaciar caché", lambda: self.operacion_cdp('limpiar_cache'))
+        devtools_menu.addAction("Cerrar Chrome", lambda: self.operacion_cdp('cerrar'))
+        self.devtools_btn.setMenu(devtools_menu)
+        self.devtools_btn.setVisible(False)  # Inicialmente oculto
+        self.action_buttons_layout.addWidget(self.devtools_btn)
+
+        self.save_template_btn = QPushButton("Guardar como plantilla", self)
+        self.save_template_btn.setFont(QFont("Arial", 12, QFont.Bold))
+        self.save_template_btn.setStyleSheet("""
+            QPushButton {
+                padding: 10px;
+                background-color: #17a2b8;
+                color: white;
+                border-radius: 5px;
+            }
+            QPushButton:hover {
+                background-color: #138496;
+            }
+        """)
+        self.save_template_btn.clicked.connect(self.guardar_plantilla)
+        self.save_template_btn.setVisible(False)  # Inicialmente oculto
+        self.action_buttons_layout.addWidget(self.save_template_btn)
+
         main_layout.addLayout(self.action_buttons_layout)
 
+        # Progreso del lanzamiento en lote
+        launch_progress_layout = QHBoxLayout()
+        self.launch_progress = QProgressBar(self)
+        self.launch_progress.setFormat("Iniciando sesiones: %v/%m")
+        self.launch_progress.setVisible(False)
+        launch_progress_layout.addWidget(self.launch_progress)
+
+        self.cancel_launch_btn = QPushButton("Cancelar lanzamiento", self)
+        self.cancel_launch_btn.setFont(QFont("Arial", 12))
+        self.cancel_launch_btn.setStyleSheet("""
+            QPushButton {
+                padding: 10px;
+                background-color: #6c757d;
+                color: white;
+                border-radius: 5px;
+            }
+            QPushButton:hover {
+                background-color: #5a6268;
+            }
+        """)
+        self.cancel_launch_btn.clicked.connect(self.cancelar_lanzamiento)
+        self.cancel_launch_btn.setVisible(False)
+        launch_progress_layout.addWidget(self.cancel_launch_btn)
+        main_layout.addLayout(launch_progress_layout)
+
+        # Tiempo desde el clic hasta tener la ventana utilizable
+        self.launch_time_label = QLabel("", self)
+        self.launch_time_label.setVisible(False)
+        main_layout.addWidget(self.launch_time_label)
+        self.launch_timeline_label = QLabel("", self)
+        self.launch_timeline_label.setVisible(False)
+        main_layout.addWidget(self.launch_timeline_label)
+
+        # Progreso de la liberación de espacio de sesiones borradas
+        self.purge_progress = QProgressBar(self)
+        self.purge_progress.setVisible(False)
+        main_layout.addWidget(self.purge_progress)
+
+        # Progreso de la limpieza de caché
+        self.cache_progress = QProgressBar(self)
+        self.cache_progress.setFormat("Limpiando caché: %v/%m directorios")
+        self.cache_progress.setVisible(False)
+        main_layout.addWidget(self.cache_progress)
+
+        # Progreso de archivar, restaurar, exportar e importar sesiones
+        self.archive_progress = QProgressBar(self)
+        self.archive_progress.setVisible(False)
+        main_layout.addWidget(self.archive_progress)
+
+        # Progreso de la compactación de bases de datos
+        self.compact_progress = QProgressBar(self)
+        self.compact_progress.setFormat("Compactando bases de datos: %v/%m")
+        self.compact_progress.setVisible(False)
+        main_layout.addWidget(self.compact_progress)
+
+        # Progreso de la deduplicación
+        self.dedup_progress = QProgressBar(self)
+        self.dedup_progress.setFormat("Buscando duplicados: %v/%m ficheros")
+        self.dedup_progress.setVisible(False)
+        main_layout.addWidget(self.dedup_progress)
+
         # Botón "Ver carpeta de sesiones"
         self.view_sessions_folder_btn = QPushButton("Ver carpeta de almacenamiento", self)
         self.view_sessions_folder_btn.setFont(QFont("Arial", 12))
@@ -223,6 +1104,23 @@ class ChromeSessionManager(QWidget):
         # Botones para salir y configuración
         bottom_buttons_layout = QHBoxLayout()
 
+        # Botón para ver las latencias de arranque
+        latency_btn = QPushButton("Latencias", self)
+        latency_btn.setFont(QFont("Arial", 12, QFont.Bold))
+        latency_btn.setStyleSheet("""
+            QPushButton {
+                padding: 10px;
+                background-color: #455a64;
+                color: white;
+                border-radius: 5px;
+            }
+            QPushButton:hover {
+                background-color: #37474f;
+            }
+        """)
+        latency_btn.clicked.connect(self.ver_latencias)
+        bottom_buttons_layout.addWidget(latency_btn)
+
         # Botón para configuración
         config_btn = QPushButton("Configuración", self)
         config_btn.setFont(QFont("Arial", 12, QFont.Bold))
@@ -263,8 +1161,27 @@ class ChromeSessionManager(QWidget):
 
         # Cargar sesiones existentes y mostrarlas asincrónicamente
         self.sesiones = self.cargar_sesiones_existentes()
+        self.actualizar_plantillas()
+        self.reconciliar_procesos(adoptar=True)
         self.load_sessions_async()
 
+        # Reanudar la purga de sesiones borradas que quedó interrumpida
+        self.purgar_papelera()
+
+        # Comprobar periódicamente qué instancias siguen abiertas
+        self.process_timer = QTimer(self)
+        self.process_timer.timeout.connect(self.reconciliar_procesos)
+        self.process_timer.start(3000)
+
+        # Consumo de CPU, memoria y disco de las sesiones abiertas
+        self.sessions_model.history = self.core.monitor.historia
+        self.iniciar_monitor()
+
+        # Mantenimiento programado: archivar sesiones si falta espacio y compactar las bases de datos
+        self.maintenance_timer = QTimer(self)
+        self.maintenance_timer.timeout.connect(self.comprobar_mantenimiento)
+        self.maintenance_timer.start(60 * 1000)
+
         # Aplicar el tema al final
         self.tema = self.config.get("tema", "Oscuro")  # Oscuro por defecto
         self.aplicar_tema()
@@ -272,28 +1189,180 @@ class ChromeSessionManager(QWidget):
     def load_sessions_async(self):
         """
         Carga las sesiones de forma asincrónica para evitar bloqueos de la interfaz.
+        Mientras se recalculan los tamaños se muestra la última instantánea del índice.
         """
+        # Las sesiones archivadas no tienen perfil en disco: su tamaño es el del archivo
+        self.sesiones_archivadas = self.core.archivadas()
+        raices = self.session_store.raices()
         session_paths = {
-            session_name: os.path.join('Storage', 'Sessions', session_name)
+            session_name: self.core.ruta(session_name, raices)
             for session_name in self.sesiones
+            if session_name not in self.sesiones_archivadas
         }
-        self.loader_thread = SessionLoaderThread(session_paths)
-        self.loader_thread.session_data_ready.connect(self.on_sessions_loaded)
+
+        # Mostrar de inmediato los tamaños conocidos del último escaneo
+        first_load = not self.session_cache
+        for session_name in self.sesiones:
+            archivada = session_name in self.sesiones_archivadas
+            cached = self.session_cache.get(session_name)
+            session_path = self.core.ruta(session_name, raices)
+            if cached is None or cached.get('archived', False) != archivada or cached['path'] != session_path:
+                self.session_cache[session_name] = {
+                    'path': session_path,
+                    'size': self.sesiones_archivadas[session_name] if archivada
+                            else self.size_index.total(session_path) or 0,
+                    'archived': archivada,
+                    'root': raices.get(session_name, RUTA_SESIONES)
+                }
+                if not first_load:
+                    self.actualizar_fila_sesion(session_name)
+        if first_load:
+            self.mostrar_sesiones()
+        self.actualizar_espacio()
+
+        if self.loader_thread is not None and self.loader_thread.isRunning():
+            return
+        self.loader_thread = SessionLoaderThread(session_paths, self.size_index)
+        self.loader_thread.session_sized.connect(self.on_session_sized)
+        self.loader_thread.progress.connect(self.on_scan_progress)
+        self.loader_thread.scan_finished.connect(self.on_scan_finished)
+        self.scan_progress.setVisible(True)
+        self.cancel_scan_btn.setVisible(True)
         self.loader_thread.start()
-    
-    def on_sessions_loaded(self, sessions):
+
+    def cancelar_carga(self):
         """
-        Maneja los datos de sesiones cargados asincrónicamente.
+        Cancela el cálculo de tamaños en curso. Las sesiones pendientes conservan el último tamaño conocido.
         """
-        for session_name, session_path, size in sessions:
-            self.session_cache[session_name] = {
-                'path': session_path,
-                'size': size
-            }
-        self.mostrar_sesiones()
-        
-        # Ordenar por defecto por "Nombre" (columna 0, orden ascendente)
-        self.sessions_tree.sortItems(0, Qt.AscendingOrder)
+        if self.loader_thread is not None and self.loader_thread.isRunning():
+            self.loader_thread.cancel()
+            self.cancel_scan_btn.setEnabled(False)
+    
+    def on_session_sized(self, session_name, session_path, size):
+        """
+        Actualiza una sesión en cuanto se conoce su tamaño, sin reconstruir el árbol.
+        """
+        cached = self.session_cache.get(session_name)
+        if cached is None or cached['path'] != session_path or session_name in self.sesiones_archivadas:
+            return  # La sesión se borró, se movió o se archivó mientras se calculaba su tamaño
+        cached['size'] = size
+        self.actualizar_fila_sesion(session_name)
+        self.actualizar_espacio()
+
+    def reconciliar_procesos(self, adoptar=False):
+        """
+        Actualiza el estado de ejecución de las sesiones y libera los puertos de las que se cerraron.
+        Con `adoptar`, detecta además las sesiones abiertas fuera del registro (solo al arrancar).
+        Las sesiones en RAM que se cerraron se devuelven a disco en segundo plano.
+        """
+        iniciadas, detenidas = self.core.reconciliar(adoptar, devolver_ram=False)
+        for session_name in detenidas:
+            self.sessions_model.set_running(session_name, False)
+        for session_name in iniciadas:
+            self.sessions_model.set_running(session_name, True)
+        if adoptar or iniciadas or detenidas:
+            self.sessions_model.set_suspended(self.session_store.suspendidas())
+        self.sessions_model.set_warm(self.core.precalentadas())
+        self.sincronizar_ram()
+
+    def iniciar_monitor(self):
+        """
+        (Re)inicia el muestreo periódico de recursos con el intervalo configurado.
+        """
+        if self.monitor_thread is not None and self.monitor_thread.isRunning():
+            self.monitor_thread.cancel()
+            self.monitor_thread.wait()
+        self.core.reaper.observar({})  # Sin muestreo no se sabe qué hicieron: la ventana vuelve a empezar
+        intervalo = self.config.get('monitor_intervalo', 5)
+        if not intervalo or not self.core.monitor.disponible:
+            self.sessions_model.set_samples({})
+            return
+        self.monitor_thread = MonitorThread(self.core, intervalo)
+        self.monitor_thread.samples_ready.connect(self.sessions_model.set_samples)
+        self.monitor_thread.start()
+
+    def sincronizar_ram(self):
+        """
+        Devuelve a disco las sesiones en RAM que se cerraron y hace los puntos de control que
+        tocan, en un hilo para no bloquear la interfaz.
+        """
+        if self.ram_thread is not None and self.ram_thread.isRunning():
+            return
+        if not self.core.ram_pendiente():
+            return
+        self.ram_thread = RamSyncThread(self.core)
+        self.ram_thread.ram_sync_finished.connect(self.on_ram_sync_finished)
+        self.ram_thread.start()
+
+    def on_ram_sync_finished(self, informe):
+        if isinstance(informe, Exception):
+            QMessageBox.critical(self, "Error", f"Error al guardar una sesión en RAM: {str(informe)}", QMessageBox.Ok)
+            return
+        perdidas = [nombre for nombre, resultado in informe['devueltas'].items() if resultado['perdida']]
+        if informe['devueltas']:
+            self.load_sessions_async()  # Los perfiles en disco cambiaron de tamaño
+        if perdidas:
+            QMessageBox.warning(self, "Sesiones en RAM",
+                                "La copia en RAM de estas sesiones ya no existía (¿se reinició el equipo?); "
+                                "se conserva el último punto de control guardado en disco:\n" + "\n".join(perdidas),
+                                QMessageBox.Ok)
+
+    def closeEvent(self, event):
+        """
+        Detiene el cálculo de tamaños antes de cerrar para no destruir el hilo en ejecución.
+        """
+        if self.loader_thread is not None and self.loader_thread.isRunning():
+            self.loader_thread.cancel()
+            self.loader_thread.wait()
+        if self.batch_thread is not None and self.batch_thread.isRunning():
+            self.batch_thread.cancel()
+            self.batch_thread.wait()
+        if self.purge_thread is not None and self.purge_thread.isRunning():
+            self.purge_thread.cancel()  # Lo que quede se purga en el próximo arranque
+            self.purge_thread.wait()
+        if self.cache_thread is not None and self.cache_thread.isRunning():
+            self.cache_thread.cancel()
+            self.cache_thread.wait()
+        if self.compact_thread is not None and self.compact_thread.isRunning():
+            self.compact_thread.cancel()  # Las bases en curso terminan; el resto no se empieza
+            self.compact_thread.wait()
+        if self.archive_thread is not None and self.archive_thread.isRunning():
+            self.archive_thread.cancel()  # Los archivos a medio escribir se descartan
+            self.archive_thread.wait()
+        if self.dedup_thread is not None and self.dedup_thread.isRunning():
+            self.dedup_thread.cancel()  # Cada sustitución es atómica; las pendientes se omiten
+            self.dedup_thread.wait()
+        if self.monitor_thread is not None and self.monitor_thread.isRunning():
+            self.monitor_thread.cancel()
+            self.monitor_thread.wait()
+        if self.reaper_thread is not None and self.reaper_thread.isRunning():
+            self.reaper_thread.cancel()  # La sesión que se está cerrando termina de cerrarse
+            self.reaper_thread.wait()
+        if self.cdp_thread is not None and self.cdp_thread.isRunning():
+            self.cdp_thread.wait()
+        if self.warm_thread is not None and self.warm_thread.isRunning():
+            self.warm_thread.wait()
+        for thread in self.wait_threads:
+            thread.cancel()
+            thread.wait()
+        try:
+            self.core.cerrar_precalentadas()  # No dejar Chrome sin ventana al salir
+        except OSError:
+            pass
+        if self.ram_thread is not None and self.ram_thread.isRunning():
+            self.ram_thread.wait()  # Las sesiones en RAM que sigan abiertas se devuelven en el próximo arranque
+        self.core.cerrar()
+        super().closeEvent(event)
+
+    def on_scan_progress(self, completed, total):
+        self.scan_progress.setMaximum(total)
+        self.scan_progress.setValue(completed)
+
+    def on_scan_finished(self, cancelled):
+        self.scan_progress.setVisible(False)
+        self.cancel_scan_btn.setVisible(False)
+        self.cancel_scan_btn.setEnabled(True)
+        self.actualizar_uso_real()
     
     def aplicar_tema(self):
         """
@@ -306,7 +1375,7 @@ class ChromeSessionManager(QWidget):
             """)
             self.sessions_tree.setStyleSheet("""
                 QHeaderView::section { background-color: black; color: white; }
-                QTreeWidget { background-color: black; color: white; }
+                QTreeView { background-color: black; color: white; }
                 QLineEdit { background-color: white; color: black; }
             """)
             self.session_name_input.setStyleSheet("background-color: white; color: black;")
@@ -317,507 +1386,1036 @@ class ChromeSessionManager(QWidget):
             """)
             self.sessions_tree.setStyleSheet("""
                 QHeaderView::section { background-color: white; color: black; }
-                QTreeWidget { background-color: white; color: black; }
+                QTreeView { background-color: white; color: black; }
                 QLineEdit { background-color: white; color: black; }
             """)
             self.session_name_input.setStyleSheet("background-color: white; color: black;")
 
-    def on_header_click(self, logical_index):
-        """
-        Controla el clic en el encabezado de una columna para ordenar los elementos.
-        """
-        if logical_index == 0:  # Columna "Nombre"
-            current_order = self.sort_orders['name']
-            self.sessions_tree.sortItems(0, current_order)
-            self.sort_orders['name'] = Qt.AscendingOrder if current_order == Qt.DescendingOrder else Qt.DescendingOrder
-        elif logical_index == 1:  # Columna "Fecha/Hora de Creación"
-            current_order = self.sort_orders['date']
-            self.sort_sessions_by_date(current_order)
-            self.sort_orders['date'] = Qt.AscendingOrder if current_order == Qt.DescendingOrder else Qt.DescendingOrder
-        elif logical_index == 2:  # Columna "Uso de Almacenamiento"
-            current_order = self.sort_orders['size']
-            self.sort_sessions_by_size(current_order)
-            self.sort_orders['size'] = Qt.AscendingOrder if current_order == Qt.DescendingOrder else Qt.DescendingOrder
-
-        # Después de ordenar, actualizamos los botones
-        self.actualizar_botones()
-
-    def sort_sessions_by_date(self, order):
-        """
-        Ordena las sesiones por fecha de creación.
-        """
-        items = []
-        for index in range(self.sessions_tree.topLevelItemCount()):
-            item = self.sessions_tree.topLevelItem(index)
-            items.append({
-                'name': item.text(0),
-                'date': item.text(1),
-                'size': item.text(2)
-            })
-
-        # Ordenar por fecha
-        items.sort(key=lambda x: datetime.strptime(x['date'], "%Y-%m-%d %H:%M:%S"), reverse=order == Qt.DescendingOrder)
-
-        # Limpiar el QTreeWidget
-        self.sessions_tree.clear()
-
-        # Volver a agregar los elementos, creando nuevos QTreeWidgetItem
-        for item_data in items:
-            new_item = QTreeWidgetItem([item_data['name'], item_data['date'], item_data['size']])
-            self.sessions_tree.addTopLevelItem(new_item)
-            
-    def sort_sessions_by_size(self, order):
-        """
-        Ordena las sesiones por el uso de almacenamiento.
-        """
-        items = []
-        for index in range(self.sessions_tree.topLevelItemCount()):
-            item = self.sessions_tree.topLevelItem(index)
-            size_text = item.text(2)  # Esto contiene la cantidad, la unidad y el porcentaje
-
-            # Extraer la cantidad y la unidad usando expresiones regulares
-            match = re.search(r'(\d+(\.\d+)?)\s*(B|KB|MB|GB|TB)', size_text)
-            if match:
-                size_value = float(match.group(1))  # La cantidad, p. ej., 2.5
-                size_unit = match.group(3)  # La unidad, p. ej., GB
-                size_in_bytes = self.convert_to_bytes(size_value, size_unit)
-            else:
-                size_in_bytes = 0  # Si no se puede extraer, asignar 0
-
-            items.append({
-                'name': item.text(0),
-                'date': item.text(1),
-                'size': item.text(2),
-                'size_in_bytes': size_in_bytes  # Agregamos el tamaño en bytes para el ordenamiento
-            })
-
-        # Ordenar por tamaño en bytes
-        items.sort(key=lambda x: x['size_in_bytes'], reverse=order == Qt.DescendingOrder)
-
-        # Limpiar el QTreeWidget
-        self.sessions_tree.clear()
-
-        # Volver a agregar los elementos, creando nuevos QTreeWidgetItem
-        for item_data in items:
-            new_item = QTreeWidgetItem([item_data['name'], item_data['date'], item_data['size']])
-            self.sessions_tree.addTopLevelItem(new_item)
-    
-    def convert_to_bytes(self, size_value, size_unit):
-        """
-        Convierte una cantidad con unidad a bytes.
-        """
-        unit_multipliers = {'B': 1, 'KB': 1024, 'MB': 1024 ** 2, 'GB': 1024 ** 3, 'TB': 1024 ** 4}
-        return size_value * unit_multipliers[size_unit.upper()]
-
-    def cargar_configuracion(self):
-        """
-        Carga la configuración con rutas predeterminadas según la plataforma
-        """
-        config_path = os.path.join('Storage', 'Settings', 'constants.json')
-        if not os.path.exists(config_path):
-            os.makedirs(os.path.dirname(config_path), exist_ok=True)
-            
-            # Determinar la ruta predeterminada según el sistema operativo
-            chrome_path = None
-            
-            if os.name == 'nt':  # Windows
-                possible_paths = [
-                    os.path.join(os.environ.get('LOCALAPPDATA', ''), 
-                                'Google', 'Chrome', 'Application', 'chrome.exe'),
-                    os.path.join(os.environ.get('PROGRAMFILES', ''), 
-                                'Google', 'Chrome', 'Application', 'chrome.exe'),
-                    os.path.join(os.environ.get('PROGRAMFILES(X86)', ''), 
-                                'Google', 'Chrome', 'Application', 'chrome.exe')
-                ]
-                for path in possible_paths:
-                    if os.path.isfile(path):
-                        chrome_path = path
-                        break
-                        
-            elif sys.platform == 'darwin':  # macOS
-                possible_paths = [
-                    '/Applications/Google Chrome.app/Contents/MacOS/Google Chrome',
-                    os.path.expanduser('~/Applications/Google Chrome.app/Contents/MacOS/Google Chrome')
-                ]
-                for path in possible_paths:
-                    if os.path.isfile(path):
-                        chrome_path = path
-                        break
-                        
-            else:  # Linux
-                possible_paths = [
-                    '/usr/bin/google-chrome',
-                    '/usr/bin/google-chrome-stable',
-                    '/usr/bin/chrome',
-                    '/snap/bin/google-chrome'
-                ]
-                for path in possible_paths:
-                    if os.path.isfile(path):
-                        chrome_path = path
-                        break
-            
-            # Si no se encontró Chrome, usar una ruta predeterminada según el SO
-            if not chrome_path:
-                if os.name == 'nt':
-                    chrome_path = os.path.join(os.environ.get('PROGRAMFILES', ''),
-                                            'Google', 'Chrome', 'Application', 'chrome.exe')
-                elif sys.platform == 'darwin':
-                    chrome_path = '/Applications/Google Chrome.app/Contents/MacOS/Google Chrome'
-                else:
-                    chrome_path = '/usr/bin/google-chrome'
-            
-            default_config = {
-                "chrome_ruta": chrome_path,
-                "tema": "Oscuro"  # tema predeterminado
-            }
-            
-            with open(config_path, 'w') as f:
-                json.dump(default_config, f, indent=4)
-                
-            return default_config
-        else:
-            with open(config_path, 'r') as f:
-                try:
-                    return json.load(f)
-                except json.JSONDecodeError:
-                    # Si hay error al cargar el JSON, crear configuración predeterminada
-                    default_config = {
-                        "chrome_ruta": self.detectar_ruta_chrome(),
-                        "tema": "Oscuro"
-                    }
-                    with open(config_path, 'w') as f:
-                        json.dump(default_config, f, indent=4)
-                    return default_config
-
     def guardar_configuracion(self):
         """
         Guarda la configuración actual en el archivo JSON.
         """
-        config_path = os.path.join('Storage', 'Settings', 'constants.json')
         self.config['tema'] = self.tema  # Guardar el tema seleccionado
-        with open(config_path, 'w') as f:
-            json.dump(self.config, f, indent=4)
+        self.core.config = self.config
+        guardar_configuracion(self.config)
     
-    def detectar_ruta_chrome(self):
-        """
-        Detecta la ruta de Chrome según el sistema operativo
-        """
-        if os.name == 'nt':  # Windows
-            possible_paths = [
-                os.path.join(os.environ.get('LOCALAPPDATA', ''), 
-                            'Google', 'Chrome', 'Application', 'chrome.exe'),
-                os.path.join(os.environ.get('PROGRAMFILES', ''), 
-                            'Google', 'Chrome', 'Application', 'chrome.exe'),
-                os.path.join(os.environ.get('PROGRAMFILES(X86)', ''), 
-                            'Google', 'Chrome', 'Application', 'chrome.exe')
-            ]
-        elif sys.platform == 'darwin':  # macOS
-            possible_paths = [
-                '/Applications/Google Chrome.app/Contents/MacOS/Google Chrome',
-                os.path.expanduser('~/Applications/Google Chrome.app/Contents/MacOS/Google Chrome')
-            ]
-        else:  # Linux
-            possible_paths = [
-                '/usr/bin/google-chrome',
-                '/usr/bin/google-chrome-stable',
-                '/usr/bin/chrome',
-                '/snap/bin/google-chrome'
-            ]
-
-        for path in possible_paths:
-            if os.path.isfile(path):
-                return path
-                
-        # Retornar ruta predeterminada si no se encuentra
-        if os.name == 'nt':
-            return os.path.join(os.environ.get('PROGRAMFILES', ''),
-                            'Google', 'Chrome', 'Application', 'chrome.exe')
-        elif sys.platform == 'darwin':
-            return '/Applications/Google Chrome.app/Contents/MacOS/Google Chrome'
-        else:
-            return '/usr/bin/google-chrome'
-
     def cargar_sesiones_existentes(self):
-        storage_path = os.path.join('Storage', 'Settings', 'sessions.json')
-        if not os.path.exists(storage_path):
-            # Crear el archivo con un JSON vacío
-            os.makedirs(os.path.dirname(storage_path), exist_ok=True)
-            with open(storage_path, 'w') as f:
-                json.dump({}, f, indent=4)
-        with open(storage_path, 'r') as f:
-            try:
-                return json.load(f)
-            except json.JSONDecodeError:
-                return {}
-
-    def guardar_sesiones(self):
         """
-        Guarda las sesiones de manera segura y multiplataforma
+        Retorna {nombre: fecha de creación} desde el almacén de sesiones
         """
-        storage_path = os.path.join('Storage', 'Settings', 'sessions.json')
         try:
-            # Asegurar que el directorio existe
-            os.makedirs(os.path.dirname(storage_path), exist_ok=True)
-            
-            # Guardar con manejo de errores
-            with open(storage_path, 'w', encoding='utf-8') as f:
-                json.dump(self.sesiones, f, indent=4, ensure_ascii=False)
-        except Exception as e:
+            return self.session_store.listar()
+        except sqlite3.Error as e:
             QMessageBox.critical(self, "Error", 
-                            f"Error al guardar las sesiones: {str(e)}", 
+                            f"Error al cargar las sesiones: {str(e)}", 
                             QMessageBox.Ok)
+            return {}
 
     def mostrar_sesiones(self):
         """
         Muestra las sesiones en el árbol utilizando los datos de la caché.
         """
-        self.sessions_tree.clear()
-        total_size = sum(data['size'] for data in self.session_cache.values())
+        self.sessions_model.set_sessions([
+            (session_name, self.sesiones[session_name], data['size'], data['root'])
+            for session_name, data in self.session_cache.items()
+        ], running=self.process_registry.sesiones, archived=self.sesiones_archivadas)
+        self.actualizar_espacio()
 
-        for session_name, data in self.session_cache.items():
-            size_formatted = self.format_size(data['size'])
-            porcentaje = (data['size'] / total_size * 100) if total_size > 0 else 0
-            size_display = f"{size_formatted} ({porcentaje:.2f}% del espacio total ocupado)"
-            item = QTreeWidgetItem([session_name, self.sesiones[session_name], size_display])
-            self.sessions_tree.addTopLevelItem(item)
+    def actualizar_fila_sesion(self, session_name):
+        """
+        Crea la fila de una sesión si no existe o actualiza su tamaño.
+        """
+        self.sessions_model.upsert(session_name, self.sesiones[session_name],
+                                   self.session_cache[session_name]['size'],
+                                   self.process_registry.en_ejecucion(session_name),
+                                   self.session_cache[session_name].get('archived', False),
+                                   self.session_cache[session_name]['root'])
 
-        self.actualizar_espacio()
+    def quitar_fila_sesion(self, session_name):
+        """
+        Elimina la fila y los datos en caché de una sesión.
+        """
+        self.session_cache.pop(session_name, None)
+        self.sessions_model.remove(session_name)
 
-    def calcular_tamano_sesion(self, nombre_sesion):
+    def sesion_seleccionada(self):
         """
-        Calcula el tamaño de una sesión de manera multiplataforma
+        Retorna el nombre de la sesión seleccionada o None.
         """
-        storage_r = Path('Storage') / 'Sessions' / nombre_sesion
-        try:
-            if storage_r.exists():
-                return sum(f.stat().st_size for f in storage_r.rglob('*') if f.is_file())
-            return 0
-        except Exception:
-            return 0
+        sesiones = self.sesiones_seleccionadas()
+        return sesiones[0] if sesiones else None
 
-    def calcular_espacio_ocupado_directorio(self, directory):
+    def sesiones_seleccionadas(self):
         """
-        Calcula el espacio ocupado por un directorio de manera multiplataforma
+        Retorna los nombres de las sesiones seleccionadas en el orden en que se muestran.
         """
-        try:
-            directory_path = Path(directory)
-            return sum(f.stat().st_size for f in directory_path.rglob('*') if f.is_file())
-        except Exception:
-            return 0
+        rows = sorted(self.sessions_tree.selectionModel().selectedRows(), key=lambda index: index.row())
+        return [self.sessions_model.name_at(self.sessions_proxy.mapToSource(index).row()) for index in rows]
+
+    def calcular_tamano_sesion(self, nombre_sesion):
+        """
+        Calcula el tamaño de una sesión de manera multiplataforma, o None si se canceló
+        """
+        return DirectorySizer().medir_directorio(self.core.ruta(nombre_sesion))
 
     def calcular_espacio_ocupado(self):
-        storage_dir = os.path.join('Storage', 'Sessions')
-        if not os.path.exists(storage_dir):
-            return 0
-        return self.calcular_espacio_ocupado_directorio(storage_dir)
+        return sum(DirectorySizer().medir_directorio(raiz) or 0 for raiz in self.core.raices())
 
     def obtener_espacio_libre(self):
         """
-        Obtiene el espacio libre en el disco de manera multiplataforma
-        """
-        if os.name == 'nt':  # Windows
-            import ctypes
-            free_bytes = ctypes.c_ulonglong(0)
-            ctypes.windll.kernel32.GetDiskFreeSpaceExW(ctypes.c_wchar_p(os.path.abspath('.')), 
-                                                    None, None, 
-                                                    ctypes.pointer(free_bytes))
-            return free_bytes.value
-        elif os.name == 'posix':  # Linux/Mac
-            if hasattr(os, 'statvfs'):  # Linux
-                disk_info = os.statvfs('/')
-                return disk_info.f_frsize * disk_info.f_bavail
-            else:  # Mac
-                st = os.statvfs(os.path.abspath('.'))
-                return st.f_bavail * st.f_frsize
+        Obtiene el espacio libre del disco donde se guardan las sesiones de manera multiplataforma
+        """
+        return espacio_libre(RUTA_STORAGE)
 
     def format_size(self, size):
-        for unit in ['B', 'KB', 'MB', 'GB', 'TB']:
-            if size < 1024:
-                return f"{size:.2f} {unit}"
-            size /= 1024
-        return f"{size:.2f} PB"
+        return format_size(size)
 
     def actualizar_espacio(self):
         """
         Actualiza la información del espacio ocupado y libre.
         """
-        espacio_ocupado = sum(data['size'] for data in self.session_cache.values())
-        espacio_libre = self.obtener_espacio_libre()
-        self.space_info_label.setText(
-            f"Espacio total ocupado: {self.format_size(espacio_ocupado)} - Espacio libre: {self.format_size(espacio_libre)}"
-        )
+        espacio_aparente = self.sessions_model.total_size()
+        espacio_ocupado = max(espacio_aparente - self.espacio_compartido, 0)
+        texto = f"Espacio total ocupado: {self.format_size(espacio_ocupado)}"
+        if self.espacio_compartido:
+            texto += f" (aparente: {self.format_size(espacio_aparente)})"
+        raices = self.core.raices()
+        if len(raices) == 1:
+            self.space_info_label.setText(f"{texto} - Espacio libre: {self.format_size(self.obtener_espacio_libre())}")
+            return
+
+        # Con varias raíces, una línea por volumen. Los archivos de las sesiones archivadas se
+        # guardan en Storage, así que cuentan en la raíz predeterminada.
+        por_raiz = dict.fromkeys(raices, 0)
+        for session_name, data in self.session_cache.items():
+            raiz = RUTA_SESIONES if data.get('archived') else data['root']
+            por_raiz[raiz] = por_raiz.get(raiz, 0) + data['size']
+        lineas = [texto]
+        for raiz, ocupado in por_raiz.items():
+            try:
+                capacidad, libre = uso_volumen(raiz)
+            except OSError:
+                lineas.append(f"{raiz}: {self.format_size(ocupado)} - no disponible")
+                continue
+            lineas.append(f"{raiz}: {self.format_size(ocupado)} - Libre: {self.format_size(libre)} "
+                          f"de {self.format_size(capacidad)}")
+        self.space_info_label.setText("\n".join(lineas))
+
+    def actualizar_uso_real(self):
+        """
+        Recalcula con el índice de tamaños el espacio que las sesiones comparten entre sí.
+        """
+        aparente, real = self.core.uso(list(self.sesiones))
+        self.espacio_compartido = aparente - real
+        self.actualizar_espacio()
 
     def actualizar_botones(self):
         """
         Controla la visibilidad de los botones en función de si se ha seleccionado una sesión.
         """
-        selected_item = self.sessions_tree.currentItem()
-        if selected_item:
+        if self.sesion_seleccionada() is not None:
             self.run_session_btn.setVisible(True)
+            self.ram_checkbox.setVisible(True)
             self.delete_session_btn.setVisible(True)
+            self.cache_btn.setVisible(True)
+            self.archive_btn.setVisible(True)
+            self.export_btn.setVisible(True)
+            # Solo tiene sentido mover si hay más de una raíz de almacenamiento
+            self.move_btn.setVisible(len(self.core.raices()) > 1)
+            self.launch_config_btn.setVisible(True)
+            self.devtools_btn.setVisible(any(self.process_registry.en_ejecucion(nombre)
+                                             for nombre in self.sesiones_seleccionadas()))
         else:
             self.run_session_btn.setVisible(False)
+            self.ram_checkbox.setVisible(False)
             self.delete_session_btn.setVisible(False)
+            self.cache_btn.setVisible(False)
+            self.archive_btn.setVisible(False)
+            self.export_btn.setVisible(False)
+            self.move_btn.setVisible(False)
+            self.launch_config_btn.setVisible(False)
+            self.devtools_btn.setVisible(False)
+        # Una plantilla se guarda a partir de una única sesión
+        self.save_template_btn.setVisible(len(self.sesiones_seleccionadas()) == 1)
 
     def crear_sesion(self):
-        nombre_instancia = self.session_name_input.text().strip()
         chrome_ruta = self.config['chrome_ruta']
 
-        if not nombre_instancia:
-            QMessageBox.warning(self, "Error", "Debe ingresar un nombre para la sesión.", QMessageBox.Ok)
+        # Registrar la nueva sesión, clonándola de la plantilla elegida si hay una
+        plantilla = self.template_selector.currentData()
+        QApplication.setOverrideCursor(Qt.WaitCursor)
+        try:
+            nombre_instancia, fecha_hora_creacion = self.core.crear(self.session_name_input.text(), plantilla,
+                                                                    preset=self.preset_selector.currentData())
+        except ValueError as e:
+            QApplication.restoreOverrideCursor()
+            QMessageBox.warning(self, "Error", str(e), QMessageBox.Ok)
             return
-
-        if nombre_instancia in self.sesiones:
-            QMessageBox.warning(self, "Error", "La sesión ya existe.", QMessageBox.Ok)
+        except (OSError, sqlite3.Error) as e:
+            QApplication.restoreOverrideCursor()
+            QMessageBox.critical(self, "Error", 
+                            f"Error al guardar la sesión: {str(e)}", 
+                            QMessageBox.Ok)
             return
-
-        # Registrar la nueva sesión
-        fecha_hora_creacion = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        QApplication.restoreOverrideCursor()
         self.sesiones[nombre_instancia] = fecha_hora_creacion
-        self.guardar_sesiones()
 
         self.crear_instancia_chrome(nombre_instancia, chrome_ruta)
-        self.mostrar_sesiones()
+        self.session_cache[nombre_instancia] = {
+            'path': self.core.ruta(nombre_instancia),
+            'size': 0,
+            'root': self.session_store.raiz(nombre_instancia) or RUTA_SESIONES
+        }
+        self.actualizar_fila_sesion(nombre_instancia)
+        self.actualizar_espacio()
         self.session_name_input.clear()
         self.view_sessions_folder_btn.setVisible(True)
 
+    def actualizar_plantillas(self):
+        """
+        Rellena el selector de plantillas manteniendo la elegida si sigue existiendo.
+        """
+        actual = self.template_selector.currentData()
+        self.template_selector.clear()
+        self.template_selector.addItem("Sin plantilla", None)
+        for plantilla in self.core.plantillas():
+            self.template_selector.addItem(plantilla, plantilla)
+        indice = self.template_selector.findData(actual)
+        self.template_selector.setCurrentIndex(max(indice, 0))
+
+    def guardar_plantilla(self):
+        """
+        Guarda el perfil de la sesión seleccionada como plantilla para nuevas sesiones.
+        """
+        nombre_sesion = self.sesion_seleccionada()
+        if nombre_sesion is None:
+            return
+        nombre_plantilla, ok = QInputDialog.getText(self, "Guardar como plantilla",
+                                                    "Nombre de la plantilla:", text=nombre_sesion)
+        if not ok:
+            return
+
+        QApplication.setOverrideCursor(Qt.WaitCursor)
+        try:
+            nombre_plantilla = self.core.crear_plantilla(nombre_plantilla, nombre_sesion)
+        except SessionRunningError as e:
+            QApplication.restoreOverrideCursor()
+            QMessageBox.warning(self, "Sesión en ejecución",
+                              f"{str(e)} Ciérrela antes de guardarla como plantilla.",
+                              QMessageBox.Ok)
+            return
+        except ValueError as e:
+            QApplication.restoreOverrideCursor()
+            QMessageBox.warning(self, "Error", str(e), QMessageBox.Ok)
+            return
+        except OSError as e:
+            QApplication.restoreOverrideCursor()
+            QMessageBox.critical(self, "Error",
+                            f"Error al guardar la plantilla: {str(e)}",
+                            QMessageBox.Ok)
+            return
+        QApplication.restoreOverrideCursor()
+
+        self.actualizar_plantillas()
+        self.template_selector.setCurrentIndex(self.template_selector.findData(nombre_plantilla))
+
     def ejecutar_sesion(self):
-        selected_item = self.sessions_tree.currentItem()
-        if not selected_item:
+        sesiones = self.sesiones_seleccionadas()
+        if not sesiones:
             QMessageBox.warning(self, "Seleccionar Sesión", "Debe seleccionar una sesión antes de ejecutar.", QMessageBox.Ok)
             return
 
-        nombre_sesion = selected_item.text(0)
         chrome_ruta = self.config['chrome_ruta']
-        self.crear_instancia_chrome(nombre_sesion, chrome_ruta)
+        archivadas = [sesion for sesion in sesiones if sesion in self.sesiones_archivadas]
+        if archivadas:
+            # Restaurar primero las archivadas; el lanzamiento sigue al terminar
+            self.iniciar_tarea_archivo(
+                lambda al_progresar, cancelado: self.core.restaurar(archivadas, al_progresar, cancelado),
+                "Restaurando sesiones: %v/%m",
+                lambda resultado: self.on_restore_finished(resultado, sesiones, chrome_ruta)
+            )
+            return
+        if len(sesiones) == 1:
+            self.crear_instancia_chrome(sesiones[0], chrome_ruta)
+        else:
+            self.ejecutar_sesiones_en_lote(sesiones, chrome_ruta)
+
+    def on_restore_finished(self, resultado, sesiones, chrome_ruta):
+        self.refrescar_archivadas()
+        if isinstance(resultado, Exception):
+            QMessageBox.critical(self, "Error", f"Error al restaurar la sesión: {str(resultado)}", QMessageBox.Ok)
+            return
+        sesiones = [sesion for sesion in sesiones if sesion not in self.sesiones_archivadas]
+        if len(sesiones) == 1:
+            self.crear_instancia_chrome(sesiones[0], chrome_ruta)
+        elif sesiones:
+            self.ejecutar_sesiones_en_lote(sesiones, chrome_ruta)
+
+    def iniciar_tarea_archivo(self, tarea, formato, al_terminar):
+        """
+        Ejecuta en segundo plano una tarea de archivo (archivar, restaurar, exportar o importar).
+        Retorna False si ya hay una en curso.
+        """
+        if self.archive_thread is not None and self.archive_thread.isRunning():
+            QMessageBox.warning(self, "Tarea en curso",
+                                "Espere a que termine la operación de archivo actual.",
+                                QMessageBox.Ok)
+            return False
+        for boton in (self.archive_btn, self.export_btn, self.import_btn, self.move_btn):
+            boton.setEnabled(False)
+        self.archive_progress.setFormat(formato)
+        self.archive_progress.setMaximum(0)
+        self.archive_progress.setValue(0)
+        self.archive_progress.setVisible(True)
+        self.archive_thread = ArchiveThread(tarea)
+        self.archive_thread.archive_progress.connect(self.on_archive_progress)
+        self.archive_thread.archive_finished.connect(self.on_archive_task_finished)
+        self.archive_thread.archive_finished.connect(al_terminar)
+        self.archive_thread.start()
+        return True
+
+    def on_archive_progress(self, hechas, total):
+        self.archive_progress.setMaximum(total)
+        self.archive_progress.setValue(hechas)
+
+    def on_archive_task_finished(self, resultado):
+        self.archive_progress.setVisible(False)
+        for boton in (self.archive_btn, self.export_btn, self.import_btn, self.move_btn):
+            boton.setEnabled(True)
+
+    def refrescar_archivadas(self):
+        """
+        Vuelve a leer qué sesiones están archivadas y recalcula los tamaños.
+        """
+        self.sesiones = self.cargar_sesiones_existentes()
+        self.load_sessions_async()
+        self.actualizar_uso_real()
+
+    def on_eviction_finished(self, informe):
+        self.refrescar_archivadas()
+        if isinstance(informe, Exception):
+            QMessageBox.critical(self, "Error", f"Error en el archivado automático: {str(informe)}", QMessageBox.Ok)
+            return
+        self.purgar_papelera()
+        if not informe['sesiones']:
+            return
+        QMessageBox.information(
+            self, "Archivado automático",
+            f"Quedaba poco espacio libre; se archivaron las sesiones menos usadas:\n"
+            + "\n".join(sesion['nombre'] for sesion in informe['sesiones'][:20])
+            + f"\n\nEspacio libre: {self.format_size(informe['libre_final'])}. "
+              "Se restaurarán automáticamente al ejecutarlas.",
+            QMessageBox.Ok
+        )
+
+    def archivar_sesiones(self):
+        """
+        Pasa las sesiones seleccionadas a almacenamiento en frío.
+        """
+        sesiones = [sesion for sesion in self.sesiones_seleccionadas() if sesion not in self.sesiones_archivadas]
+        if not sesiones:
+            return
+        respuesta = QMessageBox.question(
+            self, "Archivar sesiones",
+            f"Se comprimirán {len(sesiones)} sesiones y se liberará su perfil del disco. Seguirán en la "
+            "lista y se restaurarán automáticamente al ejecutarlas.\n¿Desea continuar?",
+            QMessageBox.Yes | QMessageBox.No, QMessageBox.No
+        )
+        if respuesta != QMessageBox.Yes:
+            return
+        self.reconciliar_procesos()
+        self.iniciar_tarea_archivo(
+            lambda al_progresar, cancelado: self.core.archivar(sesiones, al_progresar, cancelado),
+            "Archivando sesiones: %v/%m",
+            self.on_archive_finished
+        )
+
+    def on_archive_finished(self, resultado):
+        self.refrescar_archivadas()
+        if isinstance(resultado, Exception):
+            QMessageBox.critical(self, "Error", f"Error al archivar: {str(resultado)}", QMessageBox.Ok)
+            return
+        archivadas, omitidas = resultado
+        self.purgar_papelera()
+        antes = sum(tamanos[0] for tamanos in archivadas.values())
+        despues = sum(tamanos[1] for tamanos in archivadas.values())
+        mensaje = (f"Sesiones archivadas: {len(archivadas)}\n"
+                   f"Tamaño: {self.format_size(antes)} → {self.format_size(despues)}")
+        if omitidas:
+            mensaje += "\n\nSesiones en ejecución omitidas:\n" + "\n".join(omitidas)
+        QMessageBox.information(self, "Archivado terminado", mensaje, QMessageBox.Ok)
+
+    def exportar_sesiones(self):
+        """
+        Exporta las sesiones seleccionadas a archivos comprimidos en una carpeta elegida.
+        """
+        sesiones = self.sesiones_seleccionadas()
+        if not sesiones:
+            return
+        directorio = QFileDialog.getExistingDirectory(self, "Carpeta de destino")
+        if not directorio:
+            return
+        self.reconciliar_procesos()
+        self.iniciar_tarea_archivo(
+            lambda al_progresar, cancelado: self.core.exportar(sesiones, directorio, al_progresar, cancelado),
+            "Exportando sesiones: %v/%m",
+            self.on_export_finished
+        )
+
+    def on_export_finished(self, resultado):
+        if isinstance(resultado, Exception):
+            QMessageBox.critical(self, "Error", f"Error al exportar: {str(resultado)}", QMessageBox.Ok)
+            return
+        exportadas, omitidas = resultado
+        mensaje = f"Sesiones exportadas: {len(exportadas)}"
+        if exportadas:
+            mensaje += "\n\n" + "\n".join(list(exportadas.values())[:20])
+        if omitidas:
+            mensaje += "\n\nSesiones en ejecución omitidas (ciérrelas para exportarlas):\n" + "\n".join(omitidas)
+        QMessageBox.information(self, "Exportación terminada", mensaje, QMessageBox.Ok)
+
+    def mover_sesiones(self):
+        """
+        Mueve el perfil de las sesiones seleccionadas a otra raíz de almacenamiento.
+        """
+        sesiones = self.sesiones_seleccionadas()
+        raices = self.core.raices()
+        if not sesiones or len(raices) < 2:
+            return
+        etiquetas = []
+        for volumen in self.core.volumenes():
+            if volumen['libre'] is None:
+                etiquetas.append(f"{volumen['raiz']} (no disponible)")
+            else:
+                etiquetas.append(f"{volumen['raiz']} ({self.format_size(volumen['libre'])} libres)")
+        etiqueta, ok = QInputDialog.getItem(self, "Mover sesiones",
+                                            f"Raíz de destino para {len(sesiones)} sesión(es):",
+                                            etiquetas, 0, False)
+        if not ok:
+            return
+        destino = raices[etiquetas.index(etiqueta)]
+        self.reconciliar_procesos()
+        self.iniciar_tarea_archivo(
+            lambda al_progresar, cancelado: self.core.mover(sesiones, destino, al_progresar, cancelado),
+            "Moviendo sesiones: %v/%m",
+            self.on_move_finished
+        )
+
+    def configurar_arranque(self):
+        """
+        Cambia el preset de lanzamiento, las URLs de inicio y las opciones de Chrome de las
+        sesiones seleccionadas; el diálogo parte de la configuración de la primera.
+        """
+        sesiones = self.sesiones_seleccionadas()
+        if not sesiones:
+            return
+        dialog = LaunchConfigDialog(self.core.arranque(sesiones[0]), sesiones, self)
+        if dialog.exec_() != QDialog.Accepted:
+            return
+        preset, urls, flags = dialog.get_config()
+        try:
+            self.core.configurar_arranque(sesiones, preset, urls, flags)
+        except ValueError as e:
+            QMessageBox.warning(self, "Arranque", str(e), QMessageBox.Ok)
+            return
+        except (KeyError, sqlite3.Error) as e:
+            QMessageBox.critical(self, "Error", f"Error al guardar la configuración: {str(e)}", QMessageBox.Ok)
+            return
+        en_ejecucion = [nombre for nombre in sesiones if self.process_registry.en_ejecucion(nombre)]
+        if en_ejecucion:
+            QMessageBox.information(self, "Arranque",
+                                    "Los cambios se aplicarán la próxima vez que se lancen:\n" + "\n".join(en_ejecucion),
+                                    QMessageBox.Ok)
+
+    def on_move_finished(self, resultado):
+        self.refrescar_archivadas()
+        if isinstance(resultado, Exception):
+            QMessageBox.critical(self, "Error", f"Error al mover las sesiones: {str(resultado)}", QMessageBox.Ok)
+            return
+        movidas, omitidas = resultado
+        if movidas:
+            self.purgar_papelera()
+        if omitidas:
+            QMessageBox.warning(self, "Sesión en ejecución",
+                                "Cierre estas sesiones antes de moverlas:\n" + "\n".join(omitidas),
+                                QMessageBox.Ok)
+
+    def importar_sesiones(self):
+        """
+        Importa sesiones desde archivos exportados.
+        """
+        archivos, _ = QFileDialog.getOpenFileNames(self, "Importar sesiones", "",
+                                                   "Sesiones exportadas (*.tar.zst *.tar.gz);;Todos los archivos (*)")
+        if not archivos:
+            return
+
+        def importar(al_progresar, cancelado):
+            importadas, errores = [], []
+            for hechos, archivo in enumerate(archivos):
+                al_progresar(hechos, len(archivos))
+                if cancelado.is_set():
+                    break
+                try:
+                    resultado = self.core.importar(archivo, cancelado=cancelado)
+                except (ValueError, OSError, sqlite3.Error) as e:
+                    errores.append(f"{os.path.basename(archivo)}: {str(e)}")
+                    continue
+                if resultado is not None:
+                    importadas.append(resultado[0])
+            return importadas, errores
+
+        self.iniciar_tarea_archivo(importar, "Importando sesiones: %v/%m", self.on_import_finished)
+
+    def on_import_finished(self, resultado):
+        self.refrescar_archivadas()
+        if isinstance(resultado, Exception):
+            QMessageBox.critical(self, "Error", f"Error al importar: {str(resultado)}", QMessageBox.Ok)
+            return
+        importadas, errores = resultado
+        if importadas:
+            self.view_sessions_folder_btn.setVisible(True)
+        if errores:
+            QMessageBox.warning(self, "Importación",
+                                f"Sesiones importadas: {len(importadas)}\n\nNo se pudieron importar:\n"
+                                + "\n".join(errores),
+                                QMessageBox.Ok)
+
+    def ejecutar_sesiones_en_lote(self, sesiones, chrome_ruta):
+        """
+        Lanza varias sesiones en segundo plano respetando el límite de concurrencia y la rampa de arranque.
+        """
+        if self.batch_thread is not None and self.batch_thread.isRunning():
+            QMessageBox.warning(self, "Lanzamiento en curso",
+                                "Espere a que termine el lanzamiento en lote actual.",
+                                QMessageBox.Ok)
+            return
+
+        self.reconciliar_procesos()
+        # Las precalentadas solo necesitan abrir su ventana
+        calientes = [sesion for sesion in sesiones if sesion in self.core.precalentadas()]
+        fallidas = []
+        for sesion in calientes:
+            inicio = time.monotonic()
+            try:
+                self.core.entregar(sesion)
+            except OSError as e:
+                fallidas.append(f"{sesion}: {e}")
+                continue
+            self.mostrar_tiempo_lanzamiento(sesion, time.monotonic() - inicio, True)
+        if calientes:
+            self.sessions_model.set_warm(self.core.precalentadas())
+            self.precalentar()
+        if fallidas:
+            QMessageBox.warning(self, "Sesiones precalentadas", "\n".join(fallidas), QMessageBox.Ok)
+        sesiones = [sesion for sesion in sesiones if sesion not in calientes]
+        if not sesiones:
+            return
+        batch_launcher = BatchLauncher(
+            self.session_launcher, chrome_ruta,
+            concurrencia=self.config.get('lanzamiento_concurrencia', 4),
+            intervalo=self.config.get('lanzamiento_intervalo', 0.5),
+            timeout=self.config.get('lanzamiento_timeout', 30),
+            en_ram=self.ram_checkbox.isChecked()
+        )
+        self.batch_thread = BatchLaunchThread(batch_launcher, sesiones)
+        self.batch_thread.session_launched.connect(self.on_session_launched)
+        self.batch_thread.batch_finished.connect(self.on_batch_finished)
+        self.launch_progress.setMaximum(len(sesiones))
+        self.launch_progress.setValue(0)
+        self.launch_progress.setVisible(True)
+        self.cancel_launch_btn.setVisible(True)
+        self.batch_thread.start()
+
+    def cancelar_lanzamiento(self):
+        if self.batch_thread is not None and self.batch_thread.isRunning():
+            self.batch_thread.cancel()
+
+    def on_session_launched(self, resultado):
+        if resultado['estado'] in ('ok', 'timeout', 'iniciada'):
+            self.sessions_model.set_running(resultado['sesion'], True)
+        if resultado['estado'] == 'ok':
+            self.core.warm.anotar(resultado['sesion'], resultado['segundos'], False)
+            self.mostrar_tiempo_lanzamiento(resultado['sesion'], resultado['segundos'], False)
+        self.launch_progress.setValue(self.launch_progress.value() + 1)
+
+    def on_batch_finished(self, resultados):
+        self.launch_progress.setVisible(False)
+        self.cancel_launch_btn.setVisible(False)
+        self.reconciliar_procesos()
+
+        fallidas = [r for r in resultados if r['estado'] not in ('ok', 'en_ejecucion', 'iniciada')]
+        if fallidas:
+            detalle = "\n".join(f"{r['sesion']}: {r['estado']}" + (f" ({r['error']})" if r['error'] else "")
+                                for r in fallidas[:20])
+            if len(fallidas) > 20:
+                detalle += f"\n... y {len(fallidas) - 20} más"
+            QMessageBox.warning(self, "Lanzamiento en lote",
+                                f"{len(resultados) - len(fallidas)} de {len(resultados)} sesiones iniciadas.\n\n{detalle}",
+                                QMessageBox.Ok)
+
+    def abrir_urls(self):
+        """
+        Abre una o varias URLs en pestañas nuevas de las sesiones seleccionadas en ejecución.
+        """
+        texto, ok = QInputDialog.getText(self, "Abrir URL", "URLs que abrir (separadas por espacios):")
+        urls = texto.split()
+        if ok and urls:
+            self.operacion_cdp('abrir', urls=urls)
+
+    def operacion_cdp(self, operacion, **parametros):
+        """
+        Lanza en segundo plano una operación de DevTools sobre las sesiones seleccionadas que
+        están en ejecución, todas a la vez.
+        """
+        if self.cdp_thread is not None and self.cdp_thread.isRunning():
+            return
+        sesiones = [nombre for nombre in self.sesiones_seleccionadas() if self.process_registry.en_ejecucion(nombre)]
+        if not sesiones:
+            QMessageBox.information(self, "DevTools", "Ninguna de las sesiones seleccionadas está en ejecución.",
+                                    QMessageBox.Ok)
+            return
+        self.devtools_btn.setEnabled(False)
+        self.cdp_thread = CdpThread(self.core, operacion, sesiones, **parametros)
+        self.cdp_thread.cdp_finished.connect(self.on_cdp_finished)
+        self.cdp_thread.start()
+
+    def on_cdp_finished(self, operacion, resultado):
+        self.devtools_btn.setEnabled(True)
+        if isinstance(resultado, Exception):
+            QMessageBox.critical(self, "Error", f"Error de DevTools: {str(resultado)}", QMessageBox.Ok)
+            return
+        if operacion == 'cerrar':
+            for session_name in resultado:
+                self.sessions_model.set_running(session_name, self.process_registry.en_ejecucion(session_name))
+            self.actualizar_botones()
+        fallidas = [f"{nombre}: {r}" for nombre, r in resultado.items() if isinstance(r, Exception)]
+        if operacion == 'pestanas':
+            lineas = [f"{nombre}: {pestana['url']}" for nombre, pestanas in sorted(resultado.items())
+                      if not isinstance(pestanas, Exception) for pestana in pestanas]
+            detalle = "\n".join(lineas[:40]) + (f"\n... y {len(lineas) - 40} más" if len(lineas) > 40 else "")
+            QMessageBox.information(self, "Pestañas abiertas", detalle or "No hay pestañas abiertas.", QMessageBox.Ok)
+        if fallidas:
+            QMessageBox.warning(self, "DevTools", "Estas sesiones no respondieron:\n" + "\n".join(fallidas[:20]),
+                                QMessageBox.Ok)
+
+    def enfocar_sesion(self, nombre_sesion):
+        """
+        Trae al frente una sesión que ya está en ejecución en lugar de abrir otro Chrome sobre el mismo perfil.
+        """
+        info = self.process_registry.info(nombre_sesion) or {}
+        if not info.get('port') or not activar_sesion(info['port']):
+            QMessageBox.information(self, "Sesión en ejecución",
+                                    f"La sesión '{nombre_sesion}' ya está en ejecución.",
+                                    QMessageBox.Ok)
 
     def borrar_sesion(self):
         """
-        Borra una sesión de manera multiplataforma
+        Borra las sesiones seleccionadas moviéndolas a la papelera; el espacio se libera en segundo plano
         """
-        selected_item = self.sessions_tree.currentItem()
-        if not selected_item:
+        sesiones = self.sesiones_seleccionadas()
+        if not sesiones:
             QMessageBox.warning(self, "Seleccionar Sesión", 
                                 "Debe seleccionar una sesión antes de borrar.", 
                                 QMessageBox.Ok)
             return
 
-        nombre_sesion = selected_item.text(0)
+        if len(sesiones) == 1:
+            pregunta = f"¿Está seguro de que desea borrar la sesión '{sesiones[0]}' permanentemente?"
+        else:
+            pregunta = f"¿Está seguro de que desea borrar {len(sesiones)} sesiones permanentemente?"
         confirm = QMessageBox.question(self, "Confirmar Borrado", 
-                                        f"¿Está seguro de que desea borrar la sesión '{nombre_sesion}' permanentemente?",
+                                        pregunta,
                                         QMessageBox.Yes | QMessageBox.No)
         
-        if confirm == QMessageBox.Yes:
-            storage_r = os.path.join('Storage', 'Sessions', nombre_sesion)
+        if confirm != QMessageBox.Yes:
+            return
+
+        self.reconciliar_procesos()
+        en_ejecucion, errores, borradas = [], [], []
+        for nombre_sesion in sesiones:
             try:
-                if os.path.exists(storage_r):
-                    shutil.rmtree(storage_r, ignore_errors=True)
+                self.core.borrar(nombre_sesion)
+            except SessionRunningError:
+                en_ejecucion.append(nombre_sesion)
+                continue
+            except (OSError, sqlite3.Error) as e:
+                errores.append(f"{nombre_sesion}: {str(e)}")
+                continue
+
+            self.sesiones.pop(nombre_sesion, None)
+            self.quitar_fila_sesion(nombre_sesion)
+            borradas.append(nombre_sesion)
+
+        if borradas:
+            self.actualizar_uso_real()
+            self.purgar_papelera()
+
+        if en_ejecucion:
+            QMessageBox.warning(self, "Sesión en ejecución",
+                                "Cierre estas sesiones antes de borrarlas:\n" + "\n".join(en_ejecucion),
+                                QMessageBox.Ok)
+        if errores:
+            QMessageBox.critical(self, "Error", 
+                                "No se pudieron eliminar algunas sesiones:\n" + "\n".join(errores), 
+                                QMessageBox.Ok)
 
-                if os.path.exists(storage_r):  # Verificar si la carpeta aún existe
-                    raise OSError("No se pudo eliminar el directorio.")
+    def purgar_papelera(self):
+        """
+        Libera en segundo plano el espacio de las sesiones que están en la papelera.
+        """
+        if self.purge_thread is not None and self.purge_thread.isRunning():
+            return  # La purga en curso recoge también lo que se acaba de añadir
+        if not self.core.papelera_pendiente():
+            return
+        self.purge_thread = TrashPurgeThread(self.core)
+        self.purge_thread.purge_progress.connect(self.on_purge_progress)
+        self.purge_thread.purge_finished.connect(self.on_purge_finished)
+        self.purge_progress.setValue(0)
+        self.purge_progress.setVisible(True)
+        self.purge_thread.start()
+
+    def on_purge_progress(self, freed, total):
+        self.purge_progress.setMaximum(1000)
+        self.purge_progress.setValue(int(freed / total * 1000) if total else 0)
+        self.purge_progress.setFormat(f"Liberando espacio: {self.format_size(freed)} de {self.format_size(total)}")
+
+    def on_purge_finished(self, freed):
+        self.purge_progress.setVisible(False)
+        self.actualizar_espacio()
 
-                if nombre_sesion in self.sesiones:
-                    del self.sesiones[nombre_sesion]
-                    self.guardar_sesiones()
-                    del self.session_cache[nombre_sesion]
+    def limpiar_cache(self):
+        """
+        Muestra el desglose de caché de las sesiones seleccionadas y vacía las categorías elegidas.
+        """
+        sesiones = self.sesiones_seleccionadas()
+        if not sesiones or (self.cache_thread is not None and self.cache_thread.isRunning()):
+            return
 
-                self.mostrar_sesiones()
-            except Exception as e:
-                QMessageBox.critical(self, "Error", 
-                                    f"No se pudo eliminar la sesión: {str(e)}", 
-                                    QMessageBox.Ok)
+        QApplication.setOverrideCursor(Qt.WaitCursor)
+        try:
+            desglose = self.core.desglose_cache(sesiones)
+        finally:
+            QApplication.restoreOverrideCursor()
+        dialogo = CacheDialog(desglose, sesiones, self)
+        if dialogo.exec_() != QDialog.Accepted:
+            return
+        categorias = dialogo.categorias_seleccionadas()
+        if not categorias:
+            return
 
-    def crear_instancia_chrome(self, nombre_instancia: str, chrome_ruta: str):
+        self.cache_btn.setEnabled(False)
+        self.cache_progress.setValue(0)
+        self.cache_progress.setMaximum(0)
+        self.cache_progress.setVisible(True)
+        self.cache_thread = CachePruneThread(self.core, sesiones, categorias)
+        self.cache_thread.prune_progress.connect(self.on_cache_progress)
+        self.cache_thread.prune_finished.connect(self.on_cache_finished)
+        self.cache_thread.start()
+
+    def on_cache_progress(self, hechos, total):
+        self.cache_progress.setMaximum(total)
+        self.cache_progress.setValue(hechos)
+
+    def on_cache_finished(self, liberados, omitidas):
+        self.cache_progress.setVisible(False)
+        self.cache_btn.setEnabled(True)
+        total = sum(liberados.values())
+        lineas = [f"{nombre}: {self.format_size(tamano)}"
+                  for nombre, tamano in sorted(liberados.items(), key=lambda item: item[1], reverse=True)
+                  if tamano]
+        mensaje = f"Espacio liberado: {self.format_size(total)}"
+        if lineas:
+            mensaje += "\n\n" + "\n".join(lineas[:20])
+            if len(lineas) > 20:
+                mensaje += f"\n... y {len(lineas) - 20} sesiones más"
+        if omitidas:
+            mensaje += "\n\nSesiones en ejecución omitidas:\n" + "\n".join(omitidas)
+        QMessageBox.information(self, "Limpieza de caché terminada", mensaje, QMessageBox.Ok)
+        self.load_sessions_async()
+
+    def comprobar_mantenimiento(self):
         """
-        Crea una nueva instancia de Chrome de manera multiplataforma
+        Lanza en segundo plano el ajuste de la reserva precalentada, el cierre de las sesiones
+        inactivas, el archivado automático si el espacio libre bajó del mínimo y la compactación
+        si toca según la configuración.
         """
-        def find_chrome_path():
-            if os.name == 'nt':  # Windows
-                paths = [
-                    os.path.join(os.environ.get('LOCALAPPDATA', ''), 
-                                'Google', 'Chrome', 'Application', 'chrome.exe'),
-                    os.path.join(os.environ.get('PROGRAMFILES', ''),
-                                'Google', 'Chrome', 'Application', 'chrome.exe'),
-                    os.path.join(os.environ.get('PROGRAMFILES(X86)', ''),
-                                'Google', 'Chrome', 'Application', 'chrome.exe')
-                ]
-                for path in paths:
-                    if os.path.isfile(path):
-                        return path
-            elif sys.platform == 'darwin':  # macOS
-                paths = [
-                    '/Applications/Google Chrome.app/Contents/MacOS/Google Chrome',
-                    os.path.expanduser('~/Applications/Google Chrome.app/Contents/MacOS/Google Chrome')
-                ]
-                for path in paths:
-                    if os.path.isfile(path):
-                        return path
-            else:  # Linux
-                return '/usr/bin/google-chrome'
-            return None
+        self.precalentar()
+        cerrando = self.reaper_thread is not None and self.reaper_thread.isRunning()
+        midiendo = self.monitor_thread is not None and self.monitor_thread.isRunning()
+        if midiendo and not cerrando and self.core.inactivas():
+            self.reaper_thread = ReaperThread(self.core)
+            self.reaper_thread.reap_finished.connect(self.on_reap_finished)
+            self.reaper_thread.start()
+
+        minimo = self.config.get('archivado_libre_minimo_gb', 0)
+        archivando = self.archive_thread is not None and self.archive_thread.isRunning()
+        if minimo and not archivando and any(volumen['libre'] is not None and volumen['libre'] < minimo * 1024 ** 3
+                                             for volumen in self.core.volumenes()):
+            self.iniciar_tarea_archivo(
+                lambda al_progresar, cancelado: self.core.liberar_espacio(al_progresar=al_progresar,
+                                                                          cancelado=cancelado),
+                "Liberando espacio: %v/%m sesiones",
+                self.on_eviction_finished
+            )
+
+        dias = self.config.get('compactacion_dias', 0)
+        if not dias:
+            return
+        ultima = self.config.get('compactacion_ultima', 0)
+        if datetime.now().timestamp() - ultima >= dias * 86400:
+            self.compactar_bases(automatica=True)
 
-        def find_available_port():
-            for port in range(49152, 65536):
-                with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-                    result = s.connect_ex(('127.0.0.1', port))
-                    if result != 0:  # Si la conexión falló, el puerto está libre
-                        return port
-            return None
+    def precalentar(self):
+        """
+        Ajusta en segundo plano la reserva de sesiones precalentadas, si hay sesiones designadas.
+        """
+        if self.warm_thread is not None and self.warm_thread.isRunning():
+            return
+        if not self.config.get('precalentar_sesiones') and not self.core.precalentadas():
+            return
+        self.warm_thread = WarmPoolThread(self.core, self.config.get('chrome_ruta'))
+        self.warm_thread.warm_finished.connect(self.on_warm_finished)
+        self.warm_thread.start()
+
+    def on_warm_finished(self, informe):
+        if isinstance(informe, Exception):
+            return  # Se reintenta en el siguiente mantenimiento
+        for session_name in informe['lanzadas']:
+            self.sessions_model.set_running(session_name, True)
+        self.reconciliar_procesos()
+
+    def mostrar_tiempo_lanzamiento(self, session_name, segundos, precalentada):
+        """
+        Muestra cuánto tardó la última sesión en tener la ventana utilizable y las medias.
+        """
+        if segundos is None:
+            return
+        medias = self.core.warm.medias()
+        texto = f"Ventana de '{session_name}' lista en {segundos:.2f} s" + (" (precalentada)" if precalentada else "")
+        if False in medias:
+            texto += f" · media en frío {medias[False]:.2f} s"
+        if True in medias:
+            texto += f" · media precalentada {medias[True]:.2f} s"
+        self.launch_time_label.setText(texto)
+        self.launch_time_label.setVisible(True)
+        self.launch_timeline_label.setVisible(False)
+
+    def mostrar_cronologia(self, session_name, fases):
+        """
+        Muestra el desglose por fases del último arranque en frío.
+        """
+        partes = [f"{etiqueta} {LatencyDialog.segundos(fases[fase])}"
+                  for fase, etiqueta in ETIQUETAS_FASES.items()]
+        self.launch_timeline_label.setText(f"Arranque de '{session_name}': " + " · ".join(partes))
+        self.launch_timeline_label.setVisible(True)
+
+    def ver_latencias(self):
+        try:
+            dialog = LatencyDialog(self.core, self)
+        except sqlite3.Error as e:
+            QMessageBox.critical(self, "Error", f"No se pudieron leer las latencias: {str(e)}", QMessageBox.Ok)
+            return
+        dialog.exec_()
 
-        # Si no se proporciona una ruta válida, intentar encontrar Chrome automáticamente
-        if not os.path.isfile(chrome_ruta):
-            chrome_ruta = find_chrome_path()
-            if not chrome_ruta:
-                QMessageBox.critical(self, "Error", 
-                                "No se pudo encontrar Google Chrome instalado en el sistema.", 
+    def on_reap_finished(self, resultado):
+        if isinstance(resultado, Exception):
+            QMessageBox.critical(self, "Error", f"Error al cerrar las sesiones inactivas: {str(resultado)}",
+                                 QMessageBox.Ok)
+            return
+        for session_name, cierre in resultado.items():
+            if cierre is not None:
+                self.sessions_model.set_running(session_name, False)
+        self.sessions_model.set_suspended(self.session_store.suspendidas())
+        abiertas = [nombre for nombre, cierre in resultado.items() if cierre is None]
+        if abiertas:
+            QMessageBox.warning(self, "Sesiones inactivas",
+                                "Estas sesiones inactivas no respondieron y siguen abiertas:\n" + "\n".join(abiertas),
                                 QMessageBox.Ok)
+
+    def compactar_bases(self, automatica=False):
+        """
+        Compacta las bases de datos SQLite de Chrome de las sesiones detenidas. La compactación
+        automática no pide confirmación ni muestra el informe.
+        """
+        if self.compact_thread is not None and self.compact_thread.isRunning():
+            return
+        if not automatica:
+            respuesta = QMessageBox.question(
+                self, "Compactar bases de datos",
+                "Se compactarán el historial, las cookies y el resto de bases de datos de Chrome de las "
+                "sesiones detenidas. Las sesiones en ejecución no se modifican.\n¿Desea continuar?",
+                QMessageBox.Yes | QMessageBox.No, QMessageBox.No
+            )
+            if respuesta != QMessageBox.Yes:
                 return
 
-        port = find_available_port()
-        if port is None:
-            QMessageBox.critical(self, "Error", 
-                            "No se pudo encontrar un puerto disponible.", 
-                            QMessageBox.Ok)
+        self.compact_btn.setEnabled(False)
+        self.compact_progress.setValue(0)
+        self.compact_progress.setMaximum(0)
+        self.compact_progress.setVisible(True)
+        self.compact_thread = CompactThread(self.core)
+        self.compact_thread.automatica = automatica
+        self.compact_thread.compact_progress.connect(self.on_compact_progress)
+        self.compact_thread.compact_finished.connect(self.on_compact_finished)
+        self.compact_thread.start()
+
+    def on_compact_progress(self, hechas, total):
+        self.compact_progress.setMaximum(total)
+        self.compact_progress.setValue(hechas)
+
+    def on_compact_finished(self, resultados, omitidas):
+        self.compact_progress.setVisible(False)
+        self.compact_btn.setEnabled(True)
+        if isinstance(resultados, Exception):
+            QMessageBox.critical(self, "Error", f"Error al compactar: {str(resultados)}", QMessageBox.Ok)
             return
 
-        storage_r = os.path.join('Storage', 'Sessions', nombre_instancia)
-        if not os.path.exists(storage_r):
-            os.makedirs(storage_r)
+        self.config['compactacion_ultima'] = datetime.now().timestamp()
+        self.guardar_configuracion()
+        self.load_sessions_async()
+        if self.compact_thread.automatica:
+            return
+
+        compactadas = [r for r in resultados if r['estado'] == 'ok']
+        antes = sum(r['antes'] for r in compactadas)
+        despues = sum(r['despues'] for r in compactadas)
+        mensaje = (f"Bases compactadas: {len(compactadas)}\n"
+                   f"Tamaño: {self.format_size(antes)} → {self.format_size(despues)}")
+        bloqueadas = [r for r in resultados if r['estado'] == 'bloqueada']
+        if bloqueadas:
+            mensaje += f"\nBloqueadas (en uso), omitidas: {len(bloqueadas)}"
+        errores = [r for r in resultados if r['estado'] == 'error']
+        if errores:
+            mensaje += f"\nCon errores: {len(errores)}"
+
+        # Ficheros que más se redujeron
+        mayores = sorted(compactadas, key=lambda r: r['antes'] - r['despues'], reverse=True)[:10]
+        lineas = [f"{r['sesion']} / {os.path.basename(r['ruta'])}: "
+                  f"{self.format_size(r['antes'])} → {self.format_size(r['despues'])}"
+                  for r in mayores if r['antes'] > r['despues']]
+        if lineas:
+            mensaje += "\n\n" + "\n".join(lineas)
+        if omitidas:
+            mensaje += "\n\nSesiones en ejecución omitidas:\n" + "\n".join(omitidas)
+        QMessageBox.information(self, "Compactación terminada", mensaje, QMessageBox.Ok)
+
+    def deduplicar_sesiones(self):
+        """
+        Sustituye los ficheros idénticos de las sesiones detenidas por bloques compartidos.
+        """
+        if self.dedup_thread is not None and self.dedup_thread.isRunning():
+            return
+        respuesta = QMessageBox.question(
+            self, "Deduplicar sesiones",
+            "Se buscarán ficheros idénticos en las sesiones detenidas para que compartan espacio en disco. "
+            "Las sesiones en ejecución no se modifican.\n¿Desea continuar?",
+            QMessageBox.Yes | QMessageBox.No, QMessageBox.No
+        )
+        if respuesta != QMessageBox.Yes:
+            return
+
+        self.dedup_btn.setEnabled(False)
+        self.dedup_progress.setValue(0)
+        self.dedup_progress.setMaximum(0)  # Indeterminado mientras se listan los ficheros
+        self.dedup_progress.setVisible(True)
+        self.dedup_thread = DedupThread(self.core)
+        self.dedup_thread.dedup_progress.connect(self.on_dedup_progress)
+        self.dedup_thread.dedup_finished.connect(self.on_dedup_finished)
+        self.dedup_thread.start()
+
+    def on_dedup_progress(self, leidos, total):
+        self.dedup_progress.setMaximum(total)
+        self.dedup_progress.setValue(leidos)
+
+    def on_dedup_finished(self, resultado):
+        self.dedup_progress.setVisible(False)
+        self.dedup_btn.setEnabled(True)
+        if isinstance(resultado, Exception):
+            QMessageBox.critical(self, "Error", f"Error al deduplicar: {str(resultado)}", QMessageBox.Ok)
+            return
+
+        mensaje = (f"Duplicados encontrados: {resultado['duplicados']}\n"
+                   f"Compartidos por reflink: {resultado['reflink']}\n"
+                   f"Sustituidos por enlaces duros: {resultado['enlaces']}\n"
+                   f"Espacio recuperado: {self.format_size(resultado['recuperado'])}")
+        if resultado['duplicados'] and not resultado['reflink']:
+            if self.config.get('dedup_enlaces_duros', False):
+                mensaje += ("\n\nEl sistema de ficheros no admite reflink; el resto de duplicados no son "
+                            "extensiones ni componentes y no se pueden enlazar de forma segura.")
+            else:
+                mensaje += ("\n\nEl sistema de ficheros no admite reflink. Puede activar los enlaces duros "
+                            "para extensiones y componentes en la configuración.")
+        if resultado['omitidas']:
+            mensaje += "\n\nSesiones en ejecución omitidas:\n" + "\n".join(resultado['omitidas'])
+        QMessageBox.information(self, "Deduplicación terminada", mensaje, QMessageBox.Ok)
+        self.actualizar_todo()
+
+    def crear_instancia_chrome(self, nombre_instancia: str, chrome_ruta: str):
+        """
+        Crea una nueva instancia de Chrome de manera multiplataforma
+        """
+        inicio = time.monotonic()
+        # Nunca abrir un segundo Chrome sobre el mismo user-data-dir
+        self.reconciliar_procesos()
+        if nombre_instancia in self.core.precalentadas():
+            # Ya arrancada sin ventana: basta con abrírsela
+            try:
+                self.core.entregar(nombre_instancia)
+            except OSError as e:
+                QMessageBox.critical(self, "Error", f"Error al abrir la sesión precalentada: {str(e)}",
+                                     QMessageBox.Ok)
+                return
+            self.sessions_model.set_warm(self.core.precalentadas())
+            self.mostrar_tiempo_lanzamiento(nombre_instancia, time.monotonic() - inicio, True)
+            self.precalentar()  # Reponer la reserva
+            return
+        if self.process_registry.en_ejecucion(nombre_instancia):
+            self.enfocar_sesion(nombre_instancia)
+            return
 
-        url = "https://www.google.com/"
-        
         try:
-            if os.name == 'nt':  # Windows
-                subprocess.Popen([
-                    chrome_ruta,
-                    f"--remote-debugging-port={port}",
-                    f"--user-data-dir={os.path.abspath(storage_r)}",
-                    url
-                ], creationflags=subprocess.CREATE_NEW_PROCESS_GROUP)
-            else:  # Linux/Mac
-                subprocess.Popen([
-                    chrome_ruta,
-                    f"--remote-debugging-port={port}",
-                    f"--user-data-dir={storage_r}",
-                    url
-                ], start_new_session=True)
+            proceso, puerto = self.session_launcher.lanzar(nombre_instancia, chrome_ruta, self.ram_checkbox.isChecked())
+        except FileNotFoundError as e:
+            QMessageBox.critical(self, "Error", 
+                            str(e), 
+                            QMessageBox.Ok)
+            return
+        except ValueError as e:
+            QMessageBox.warning(self, "Modo RAM", str(e), QMessageBox.Ok)
+            return
         except Exception as e:
             QMessageBox.critical(self, "Error", 
                             f"Error al iniciar Chrome: {str(e)}", 
                             QMessageBox.Ok)
             return
 
+        self.sessions_model.set_running(nombre_instancia, True)
+
+        # Medir en segundo plano hasta que DevTools responde y la primera página carga
+        self.wait_threads = [thread for thread in self.wait_threads if thread.isRunning()]
+        thread = LaunchWaitThread(self.session_launcher, nombre_instancia, puerto, proceso, inicio,
+                                  self.config.get('lanzamiento_timeout', 30))
+        thread.window_ready.connect(self.on_window_ready)
+        thread.timeline_ready.connect(self.mostrar_cronologia)
+        self.wait_threads.append(thread)
+        thread.start()
+
+    def on_window_ready(self, session_name, segundos):
+        self.core.warm.anotar(session_name, segundos, False)
+        self.mostrar_tiempo_lanzamiento(session_name, segundos, False)
+
     def abrir_configuracion(self):
         config_dialog = ConfiguracionDialog(self.config, self)
         config_dialog.exec_()
         self.config = config_dialog.get_config()
         self.guardar_configuracion()
+        self.actualizar_botones()  # "Mover a..." depende de las raíces configuradas
 
     def abrir_carpeta_sesiones(self):
         """
         Abre la carpeta de sesiones de manera multiplataforma
         """
-        folder_path = os.path.abspath(os.path.join('Storage', 'Sessions'))
+        folder_path = os.path.abspath(RUTA_SESIONES)
         if os.path.exists(folder_path):
             if os.name == 'nt':  # Windows
                 os.startfile(folder_path)
@@ -831,15 +2429,224 @@ class ChromeSessionManager(QWidget):
                             QMessageBox.Ok)
 
     def actualizar_todo(self):
-        # Recargar las sesiones existentes
+        # Recargar las sesiones existentes y las plantillas
         self.sesiones = self.cargar_sesiones_existentes()
+        self.actualizar_plantillas()
+        for session_name in list(self.session_cache):
+            if session_name not in self.sesiones:
+                self.quitar_fila_sesion(session_name)
         
-        # Actualizar la visualización de las sesiones
-        self.mostrar_sesiones()
+        # Actualizar la visualización de las sesiones y recalcular tamaños en segundo plano
+        self.load_sessions_async()
         
         # Actualizar la información del espacio
         self.actualizar_espacio()
 
+class CacheDialog(QDialog):
+    """
+    Desglose del espacio de las sesiones por categoría de caché, con la opción de vaciar las
+    categorías marcadas.
+    """
+
+    def __init__(self, desglose, sesiones, parent=None):
+        super().__init__(parent)
+        if len(sesiones) == 1:
+            self.setWindowTitle(f"Caché de la sesión {sesiones[0]}")
+        else:
+            self.setWindowTitle(f"Caché de {len(sesiones)} sesiones")
+        self.setGeometry(150, 150, 460, 320)
+        self.desglose = desglose
+        self.parent = parent
+
+        # Configurar la interfaz
+        self.setup_ui()
+
+    def setup_ui(self):
+        layout = QVBoxLayout()
+
+        total = sum(self.desglose.values())
+        filas = [(categoria, etiqueta) for categoria, (etiqueta, _) in CachePruner.CATEGORIAS.items()]
+        filas.append(('otros', "Resto del perfil"))
+
+        self.tabla = QTableWidget(len(filas), 3, self)
+        self.tabla.setHorizontalHeaderLabels(["Categoría", "Tamaño", "%"])
+        self.tabla.verticalHeader().setVisible(False)
+        self.tabla.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.tabla.setSelectionMode(QAbstractItemView.NoSelection)
+        for fila, (categoria, etiqueta) in enumerate(filas):
+            tamano = self.desglose.get(categoria, 0)
+            item = QTableWidgetItem(etiqueta)
+            item.setData(Qt.UserRole, categoria)
+            if categoria != 'otros':
+                # Las cachés se marcan por defecto; el resto del perfil nunca se borra
+                item.setFlags(item.flags() | Qt.ItemIsUserCheckable)
+                item.setCheckState(Qt.Checked if tamano else Qt.Unchecked)
+            self.tabla.setItem(fila, 0, item)
+            self.tabla.setItem(fila, 1, QTableWidgetItem(self.parent.format_size(tamano)))
+            porcentaje = tamano * 100 / total if total else 0
+            self.tabla.setItem(fila, 2, QTableWidgetItem(f"{porcentaje:.1f} %"))
+        self.tabla.resizeColumnsToContents()
+        self.tabla.horizontalHeader().setStretchLastSection(True)
+        layout.addWidget(self.tabla)
+
+        layout.addWidget(QLabel(f"Total: {self.parent.format_size(total)}", self))
+
+        # Botones
+        botones_layout = QHBoxLayout()
+        limpiar_btn = QPushButton("Limpiar seleccionadas", self)
+        limpiar_btn.clicked.connect(self.accept)
+        cerrar_btn = QPushButton("Cerrar", self)
+        cerrar_btn.clicked.connect(self.reject)
+        botones_layout.addWidget(limpiar_btn)
+        botones_layout.addWidget(cerrar_btn)
+        layout.addLayout(botones_layout)
+
+        self.setLayout(layout)
+
+    def categorias_seleccionadas(self):
+        """
+        Retorna las categorías de caché marcadas.
+        """
+        categorias = []
+        for fila in range(self.tabla.rowCount()):
+            item = self.tabla.item(fila, 0)
+            if item.flags() & Qt.ItemIsUserCheckable and item.checkState() == Qt.Checked:
+                categorias.append(item.data(Qt.UserRole))
+        return categorias
+
+class LaunchConfigDialog(QDialog):
+    """
+    Configuración de arranque de una o varias sesiones: preset de lanzamiento, URLs de inicio
+    (una por línea) y opciones adicionales de Chrome.
+    """
+
+    def __init__(self, arranque, sesiones, parent=None):
+        super().__init__(parent)
+        if len(sesiones) == 1:
+            self.setWindowTitle(f"Arranque de la sesión {sesiones[0]}")
+        else:
+            self.setWindowTitle(f"Arranque de {len(sesiones)} sesiones")
+        self.setGeometry(150, 150, 560, 380)
+        self.arranque = arranque
+        self.setup_ui()
+
+    def setup_ui(self):
+        layout = QVBoxLayout()
+
+        layout.addWidget(QLabel("Preset de lanzamiento:", self))
+        self.preset_input = QComboBox(self)
+        for preset in PRESETS_LANZAMIENTO:
+            self.preset_input.addItem(preset, preset)
+        self.preset_input.setCurrentIndex(self.preset_input.findData(self.arranque['preset']))
+        layout.addWidget(self.preset_input)
+        self.preset_description = QLabel(self)
+        self.preset_description.setWordWrap(True)
+        layout.addWidget(self.preset_description)
+        self.preset_input.currentIndexChanged.connect(self.actualizar_descripcion)
+        self.actualizar_descripcion()
+
+        layout.addWidget(QLabel("URLs de inicio (una por línea; vacío = página de inicio):", self))
+        self.urls_input = QPlainTextEdit(self)
+        self.urls_input.setPlainText("\n".join(self.arranque['urls']))
+        layout.addWidget(self.urls_input)
+
+        layout.addWidget(QLabel("Opciones adicionales de Chrome (separadas por espacios):", self))
+        self.flags_input = QLineEdit(self)
+        self.flags_input.setPlaceholderText("--lang=es --force-dark-mode")
+        self.flags_input.setText(" ".join(self.arranque['flags']))
+        layout.addWidget(self.flags_input)
+
+        # Botones
+        botones_layout = QHBoxLayout()
+        guardar_btn = QPushButton("Guardar", self)
+        guardar_btn.clicked.connect(self.accept)
+        cancelar_btn = QPushButton("Cancelar", self)
+        cancelar_btn.clicked.connect(self.reject)
+        botones_layout.addWidget(guardar_btn)
+        botones_layout.addWidget(cancelar_btn)
+        layout.addLayout(botones_layout)
+
+        self.setLayout(layout)
+
+    def actualizar_descripcion(self):
+        datos = PRESETS_LANZAMIENTO[self.preset_input.currentData()]
+        texto = datos['descripcion']
+        if datos['flags']:
+            texto += "\n" + " ".join(datos['flags'])
+        self.preset_description.setText(texto)
+
+    def get_config(self):
+        """
+        Retorna (preset, URLs de inicio, opciones adicionales).
+        """
+        urls = [linea.strip() for linea in self.urls_input.toPlainText().splitlines() if linea.strip()]
+        return self.preset_input.currentData(), urls, self.flags_input.text().split()
+
+class LatencyDialog(QDialog):
+    """
+    Percentiles del tiempo de arranque de las sesiones, en total y por fase (puerto, perfil,
+    Popen, DevTools y primera carga), sobre los últimos arranques guardados.
+    """
+
+    def __init__(self, core, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Latencias de arranque")
+        self.setGeometry(150, 150, 900, 420)
+        self.core = core
+        self.setup_ui()
+        self.actualizar()
+
+    def setup_ui(self):
+        layout = QVBoxLayout()
+
+        self.ocultas_checkbox = QCheckBox("Incluir los arranques de la reserva precalentada (sin primera carga)", self)
+        self.ocultas_checkbox.setChecked(True)
+        self.ocultas_checkbox.toggled.connect(self.actualizar)
+        layout.addWidget(self.ocultas_checkbox)
+
+        fases = [fase for fase in ETIQUETAS_FASES if fase != 'total']
+        self.tabla = QTableWidget(0, 5 + len(fases), self)
+        self.tabla.setHorizontalHeaderLabels(["Sesión", "Arranques", "p50", "p95", "p99"]
+                                             + [f"{ETIQUETAS_FASES[fase]} (p50)" for fase in fases])
+        self.tabla.verticalHeader().setVisible(False)
+        self.tabla.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.tabla.setSelectionMode(QAbstractItemView.NoSelection)
+        self.tabla.horizontalHeader().setStretchLastSection(True)
+        layout.addWidget(self.tabla)
+
+        cerrar_btn = QPushButton("Cerrar", self)
+        cerrar_btn.clicked.connect(self.accept)
+        layout.addWidget(cerrar_btn)
+
+        self.setLayout(layout)
+
+    @staticmethod
+    def segundos(valor, clave='p50'):
+        """
+        Formatea unos segundos, o un percentil de un resumen de `percentiles`; '—' si no hay dato.
+        """
+        if isinstance(valor, dict):
+            valor = valor[clave]
+        return f"{valor:.2f} s" if valor is not None else "—"
+
+    def actualizar(self):
+        latencias = self.core.latencias(ocultas=self.ocultas_checkbox.isChecked())
+        filas = [("Todas", latencias['global'])] + list(latencias['sesiones'].items())
+        fases = [fase for fase in ETIQUETAS_FASES if fase != 'total']
+        self.tabla.setRowCount(len(filas))
+        for fila, (nombre, resumen) in enumerate(filas):
+            celdas = [nombre, str(resumen['n'])]
+            celdas += [self.segundos(resumen['total'], clave) for clave in ('p50', 'p95', 'p99')]
+            celdas += [self.segundos(resumen[fase]) for fase in fases]
+            for columna, texto in enumerate(celdas):
+                item = QTableWidgetItem(texto)
+                if fila == 0:
+                    fuente = item.font()
+                    fuente.setBold(True)
+                    item.setFont(fuente)
+                self.tabla.setItem(fila, columna, item)
+        self.tabla.resizeColumnsToContents()
+
 class ConfiguracionDialog(QDialog):
     def __init__(self, config, parent=None):
         super().__init__(parent)
@@ -888,6 +2695,191 @@ class ConfiguracionDialog(QDialog):
         chrome_layout.addLayout(browse_layout)
         layout.addLayout(chrome_layout)
 
+        # Parámetros del lanzamiento en lote
+        lote_layout = QHBoxLayout()
+        self.concurrencia_input = QSpinBox(self)
+        self.concurrencia_input.setRange(1, 64)
+        self.concurrencia_input.setToolTip("Sesiones que pueden estar arrancando a la vez")
+        self.intervalo_input = QDoubleSpinBox(self)
+        self.intervalo_input.setRange(0.0, 60.0)
+        self.intervalo_input.setSingleStep(0.1)
+        self.intervalo_input.setSuffix(" s")
+        self.intervalo_input.setToolTip("Tiempo mínimo entre dos lanzamientos consecutivos")
+        self.timeout_input = QSpinBox(self)
+        self.timeout_input.setRange(1, 600)
+        self.timeout_input.setSuffix(" s")
+        self.timeout_input.setToolTip("Espera máxima a que DevTools responda")
+        lote_layout.addWidget(QLabel("Lanzamiento en lote:", self))
+        lote_layout.addWidget(self.concurrencia_input)
+        lote_layout.addWidget(self.intervalo_input)
+        lote_layout.addWidget(self.timeout_input)
+        layout.addLayout(lote_layout)
+
+        # Deduplicación con enlaces duros cuando el sistema de ficheros no admite reflink
+        self.dedup_enlaces_input = QCheckBox("Deduplicar extensiones y componentes con enlaces duros", self)
+        self.dedup_enlaces_input.setToolTip("Solo se usa si el sistema de ficheros no admite reflink")
+        layout.addWidget(self.dedup_enlaces_input)
+
+        # Compactación programada de las bases de datos de Chrome
+        compactacion_layout = QHBoxLayout()
+        self.compactacion_input = QSpinBox(self)
+        self.compactacion_input.setRange(0, 365)
+        self.compactacion_input.setSuffix(" días")
+        self.compactacion_input.setSpecialValueText("Nunca")
+        self.compactacion_input.setToolTip("Compactar las bases de datos de las sesiones detenidas con esta frecuencia")
+        compactacion_layout.addWidget(QLabel("Compactar bases de datos cada:", self))
+        compactacion_layout.addWidget(self.compactacion_input)
+        layout.addLayout(compactacion_layout)
+
+        # Archivado automático de las sesiones menos usadas cuando falta espacio
+        archivado_layout = QHBoxLayout()
+        self.archivado_minimo_input = QDoubleSpinBox(self)
+        self.archivado_minimo_input.setRange(0.0, 100000.0)
+        self.archivado_minimo_input.setSuffix(" GB")
+        self.archivado_minimo_input.setSpecialValueText("Nunca")
+        self.archivado_minimo_input.setToolTip("Espacio libre por debajo del cual se archivan las sesiones menos usadas")
+        self.archivado_objetivo_input = QDoubleSpinBox(self)
+        self.archivado_objetivo_input.setRange(0.0, 100000.0)
+        self.archivado_objetivo_input.setSuffix(" GB")
+        self.archivado_objetivo_input.setToolTip("Espacio libre que se recupera antes de dejar de archivar")
+        simular_btn = QPushButton("Vista previa", self)
+        simular_btn.clicked.connect(self.simular_archivado)
+        archivado_layout.addWidget(QLabel("Archivar si quedan menos de:", self))
+        archivado_layout.addWidget(self.archivado_minimo_input)
+        archivado_layout.addWidget(QLabel("hasta:", self))
+        archivado_layout.addWidget(self.archivado_objetivo_input)
+        archivado_layout.addWidget(simular_btn)
+        layout.addLayout(archivado_layout)
+
+        # Modo RAM: límite de memoria para los perfiles en tmpfs y frecuencia de los puntos de control
+        ram_layout = QHBoxLayout()
+        self.ram_limite_input = QSpinBox(self)
+        self.ram_limite_input.setRange(64, 1024 * 1024)
+        self.ram_limite_input.setSingleStep(256)
+        self.ram_limite_input.setSuffix(" MB")
+        self.ram_limite_input.setToolTip("RAM máxima que pueden ocupar entre todos los perfiles ejecutados en RAM")
+        self.ram_checkpoint_input = QSpinBox(self)
+        self.ram_checkpoint_input.setRange(0, 1440)
+        self.ram_checkpoint_input.setSuffix(" min")
+        self.ram_checkpoint_input.setSpecialValueText("Solo al cerrar")
+        self.ram_checkpoint_input.setToolTip("Cada cuánto se guardan en disco los cambios de las sesiones en RAM abiertas")
+        ram_layout.addWidget(QLabel("Modo RAM, límite:", self))
+        ram_layout.addWidget(self.ram_limite_input)
+        ram_layout.addWidget(QLabel("guardar cada:", self))
+        ram_layout.addWidget(self.ram_checkpoint_input)
+        layout.addLayout(ram_layout)
+
+        # Muestreo de CPU, memoria y E/S de las sesiones en ejecución
+        monitor_layout = QHBoxLayout()
+        self.monitor_input = QSpinBox(self)
+        self.monitor_input.setRange(0, 3600)
+        self.monitor_input.setSuffix(" s")
+        self.monitor_input.setSpecialValueText("Desactivado")
+        self.monitor_input.setToolTip("Cada cuánto se mide el consumo de las sesiones abiertas (solo Linux)")
+        monitor_layout.addWidget(QLabel("Medir consumo de las sesiones cada:", self))
+        monitor_layout.addWidget(self.monitor_input)
+        layout.addLayout(monitor_layout)
+
+        # Cierre de sesiones inactivas: se suspenden con sus pestañas para reabrirlas al lanzarlas
+        inactividad_layout = QHBoxLayout()
+        self.inactividad_input = QSpinBox(self)
+        self.inactividad_input.setRange(0, 7 * 24 * 60)
+        self.inactividad_input.setSingleStep(15)
+        self.inactividad_input.setSuffix(" min")
+        self.inactividad_input.setSpecialValueText("Nunca")
+        self.inactividad_input.setToolTip("Minutos seguidos sin actividad tras los que se cierra una sesión "
+                                          "(requiere medir el consumo)")
+        self.inactividad_cpu_input = QDoubleSpinBox(self)
+        self.inactividad_cpu_input.setRange(0.1, 100)
+        self.inactividad_cpu_input.setSingleStep(0.5)
+        self.inactividad_cpu_input.setSuffix(" %")
+        self.inactividad_cpu_input.setToolTip("Por debajo de este uso de CPU la sesión se considera inactiva")
+        self.inactividad_devtools_checkbox = QCheckBox("y sin clientes DevTools", self)
+        self.inactividad_devtools_checkbox.setToolTip("Una conexión a su puerto de depuración (Puppeteer, "
+                                                      "Selenium...) cuenta como actividad")
+        inactividad_layout.addWidget(QLabel("Cerrar sesiones inactivas tras:", self))
+        inactividad_layout.addWidget(self.inactividad_input)
+        inactividad_layout.addWidget(QLabel("con CPU bajo:", self))
+        inactividad_layout.addWidget(self.inactividad_cpu_input)
+        inactividad_layout.addWidget(self.inactividad_devtools_checkbox)
+        layout.addLayout(inactividad_layout)
+        excluidas_layout = QHBoxLayout()
+        self.inactividad_excluidas_input = QLineEdit(self)
+        self.inactividad_excluidas_input.setPlaceholderText("Nombres separados por comas")
+        excluidas_layout.addWidget(QLabel("No cerrar nunca:", self))
+        excluidas_layout.addWidget(self.inactividad_excluidas_input)
+        layout.addLayout(excluidas_layout)
+
+        # Reserva precalentada: sesiones arrancadas sin ventana para abrirlas al instante
+        precalentar_layout = QHBoxLayout()
+        self.precalentar_input = QLineEdit(self)
+        self.precalentar_input.setPlaceholderText("Nombres separados por comas")
+        self.precalentar_input.setToolTip("Sesiones que se mantienen arrancadas sin ventana; al ejecutarlas solo "
+                                          "se abre la ventana")
+        self.precalentar_maximo_input = QSpinBox(self)
+        self.precalentar_maximo_input.setRange(0, 100)
+        self.precalentar_maximo_input.setToolTip("Como mucho, tantas como sesiones se usaron en la última hora")
+        self.precalentar_reserva_input = QSpinBox(self)
+        self.precalentar_reserva_input.setRange(0, 1024 * 1024)
+        self.precalentar_reserva_input.setSingleStep(512)
+        self.precalentar_reserva_input.setSuffix(" MB")
+        self.precalentar_reserva_input.setToolTip("No se precalienta si la RAM disponible baja de esta cantidad")
+        precalentar_layout.addWidget(QLabel("Precalentar:", self))
+        precalentar_layout.addWidget(self.precalentar_input)
+        precalentar_layout.addWidget(QLabel("máximo:", self))
+        precalentar_layout.addWidget(self.precalentar_maximo_input)
+        precalentar_layout.addWidget(QLabel("dejar libre:", self))
+        precalentar_layout.addWidget(self.precalentar_reserva_input)
+        layout.addLayout(precalentar_layout)
+
+        # Límites de recursos por sesión: cgroup v2 o, si no está disponible, límites por proceso
+        limites_layout = QHBoxLayout()
+        self.limites_checkbox = QCheckBox("Limitar cada sesión:", self)
+        self.limites_checkbox.setToolTip("Ejecuta cada sesión en su propio cgroup v2 (solo Linux); si no está "
+                                         "disponible, limita la memoria y la prioridad de cada proceso")
+        self.limites_memoria_input = QSpinBox(self)
+        self.limites_memoria_input.setRange(0, 1024 * 1024)
+        self.limites_memoria_input.setSingleStep(512)
+        self.limites_memoria_input.setSuffix(" MB")
+        self.limites_memoria_input.setSpecialValueText("Sin límite")
+        self.limites_memoria_input.setToolTip("memory.max: memoria máxima de todos los procesos de la sesión")
+        self.limites_cpu_input = QSpinBox(self)
+        self.limites_cpu_input.setRange(1, 10000)
+        self.limites_cpu_input.setToolTip("cpu.weight: reparto de CPU frente a las demás sesiones (100 = normal)")
+        self.limites_io_input = QSpinBox(self)
+        self.limites_io_input.setRange(1, 10000)
+        self.limites_io_input.setToolTip("io.weight: reparto del disco frente a las demás sesiones (100 = normal)")
+        limites_layout.addWidget(self.limites_checkbox)
+        limites_layout.addWidget(QLabel("memoria:", self))
+        limites_layout.addWidget(self.limites_memoria_input)
+        limites_layout.addWidget(QLabel("peso CPU:", self))
+        limites_layout.addWidget(self.limites_cpu_input)
+        limites_layout.addWidget(QLabel("peso E/S:", self))
+        limites_layout.addWidget(self.limites_io_input)
+        layout.addLayout(limites_layout)
+        cgroup_layout = QHBoxLayout()
+        self.limites_ruta_input = QLineEdit(self)
+        self.limites_ruta_input.setPlaceholderText("Automático (junto al grupo del gestor)")
+        self.limites_ruta_input.setToolTip("Grupo cgroup v2 con permiso de escritura bajo el que se crean los de "
+                                           "las sesiones, p. ej. uno delegado por systemd")
+        cgroup_layout.addWidget(QLabel("Grupo cgroup:", self))
+        cgroup_layout.addWidget(self.limites_ruta_input)
+        layout.addLayout(cgroup_layout)
+
+        # Raíces de almacenamiento: las sesiones nuevas van a la que tenga más espacio libre
+        layout.addWidget(QLabel("Raíces de almacenamiento de sesiones:", self))
+        self.raices_list = QListWidget(self)
+        self.raices_list.setToolTip("Las sesiones nuevas se colocan en la raíz con más espacio libre y menos carga")
+        layout.addWidget(self.raices_list)
+        raices_layout = QHBoxLayout()
+        agregar_raiz_btn = QPushButton("Añadir...", self)
+        agregar_raiz_btn.clicked.connect(self.agregar_raiz)
+        quitar_raiz_btn = QPushButton("Quitar", self)
+        quitar_raiz_btn.clicked.connect(self.quitar_raiz)
+        raices_layout.addWidget(agregar_raiz_btn)
+        raices_layout.addWidget(quitar_raiz_btn)
+        layout.addLayout(raices_layout)
+
         # Botón guardar
         save_btn = QPushButton("Guardar", self)
         save_btn.clicked.connect(self.guardar)
@@ -899,34 +2891,7 @@ class ConfiguracionDialog(QDialog):
         """
         Detecta automáticamente la instalación de Chrome según el sistema operativo
         """
-        chrome_path = None
-        
-        if os.name == 'nt':  # Windows
-            possible_paths = [
-                os.path.join(os.environ.get('LOCALAPPDATA', ''), 
-                            'Google', 'Chrome', 'Application', 'chrome.exe'),
-                os.path.join(os.environ.get('PROGRAMFILES', ''), 
-                            'Google', 'Chrome', 'Application', 'chrome.exe'),
-                os.path.join(os.environ.get('PROGRAMFILES(X86)', ''), 
-                            'Google', 'Chrome', 'Application', 'chrome.exe')
-            ]
-        elif sys.platform == 'darwin':  # macOS
-            possible_paths = [
-                '/Applications/Google Chrome.app/Contents/MacOS/Google Chrome',
-                os.path.expanduser('~/Applications/Google Chrome.app/Contents/MacOS/Google Chrome')
-            ]
-        else:  # Linux
-            possible_paths = [
-                '/usr/bin/google-chrome',
-                '/usr/bin/google-chrome-stable',
-                '/usr/bin/chrome',
-                '/snap/bin/google-chrome'
-            ]
-
-        for path in possible_paths:
-            if os.path.isfile(path):
-                chrome_path = path
-                break
+        chrome_path = detectar_ruta_chrome()
 
         if chrome_path:
             self.chrome_ruta_input.setText(chrome_path)
@@ -959,12 +2924,111 @@ class ConfiguracionDialog(QDialog):
             selected_file = file_dialog.selectedFiles()[0]
             self.chrome_ruta_input.setText(selected_file)
 
+    def simular_archivado(self):
+        """
+        Muestra qué sesiones se archivarían con los umbrales indicados, sin archivar nada.
+        """
+        gb = 1024 ** 3
+        minimo = int(self.archivado_minimo_input.value() * gb)
+        if not minimo:
+            QMessageBox.information(self, "Archivado automático",
+                                    "Indique el espacio libre mínimo que activa el archivado.",
+                                    QMessageBox.Ok)
+            return
+        QApplication.setOverrideCursor(Qt.WaitCursor)
+        try:
+            informe = self.parent.core.liberar_espacio(simular=True, minimo=minimo,
+                                                       objetivo=int(self.archivado_objetivo_input.value() * gb))
+        finally:
+            QApplication.restoreOverrideCursor()
+
+        mensaje = f"Espacio libre: {format_size(informe['libre'])}\n"
+        if len(informe['volumenes']) > 1:
+            mensaje += "".join(f"  {', '.join(volumen['raices'])}: {format_size(volumen['libre'])}\n"
+                               for volumen in informe['volumenes'])
+        if informe['activado']:
+            mensaje += "El espacio libre está por debajo del mínimo: el archivado se activaría ahora.\n"
+        else:
+            mensaje += "El espacio libre está por encima del mínimo: ahora no se archivaría nada.\n"
+        if informe['sesiones']:
+            mensaje += (f"\nPara llegar a {format_size(informe['objetivo'])} libres se archivarían, "
+                        "de la usada hace más tiempo a la más reciente:\n")
+            mensaje += "\n".join(f"{sesion['nombre']} (último uso {sesion['ultimo_uso']}, {format_size(sesion['tamano'])})"
+                                 for sesion in informe['sesiones'][:20])
+            if len(informe['sesiones']) > 20:
+                mensaje += f"\n... y {len(informe['sesiones']) - 20} más"
+        QMessageBox.information(self, "Archivado automático", mensaje, QMessageBox.Ok)
+
+    def mostrar_raices(self):
+        self.raices_list.clear()
+        for volumen in self.parent.core.volumenes():
+            if volumen['libre'] is None:
+                self.raices_list.addItem(f"{volumen['raiz']} - no disponible")
+            else:
+                self.raices_list.addItem(f"{volumen['raiz']} - {volumen['sesiones']} sesiones, "
+                                         f"{format_size(volumen['libre'])} libres de {format_size(volumen['capacidad'])}")
+
+    def agregar_raiz(self):
+        """
+        Añade una carpeta (p. ej. en otro disco) como raíz de almacenamiento de sesiones.
+        """
+        directorio = QFileDialog.getExistingDirectory(self, "Raíz de almacenamiento")
+        if not directorio:
+            return
+        try:
+            self.parent.core.agregar_raiz(directorio)
+        except (ValueError, OSError) as e:
+            QMessageBox.warning(self, "Error", str(e), QMessageBox.Ok)
+            return
+        self.mostrar_raices()
+        self.parent.actualizar_espacio()
+
+    def quitar_raiz(self):
+        """
+        Quita la raíz seleccionada. La predeterminada no se puede quitar.
+        """
+        fila = self.raices_list.currentRow()
+        if fila <= 0:
+            if fila == 0:
+                QMessageBox.warning(self, "Error", "La raíz predeterminada no se puede quitar.", QMessageBox.Ok)
+            return
+        try:
+            self.parent.core.quitar_raiz(self.parent.core.raices()[fila])
+        except ValueError as e:
+            QMessageBox.warning(self, "Error", str(e), QMessageBox.Ok)
+            return
+        self.mostrar_raices()
+        self.parent.actualizar_espacio()
+
     def cargar_configuracion_actual(self):
         """
         Carga la configuración actual en la interfaz
         """
         self.tema_selector.setCurrentText(self.config.get("tema", "Oscuro"))
         self.chrome_ruta_input.setText(self.config.get("chrome_ruta", ""))
+        self.concurrencia_input.setValue(self.config.get("lanzamiento_concurrencia", 4))
+        self.intervalo_input.setValue(self.config.get("lanzamiento_intervalo", 0.5))
+        self.timeout_input.setValue(self.config.get("lanzamiento_timeout", 30))
+        self.dedup_enlaces_input.setChecked(self.config.get("dedup_enlaces_duros", False))
+        self.compactacion_input.setValue(self.config.get("compactacion_dias", 0))
+        self.archivado_minimo_input.setValue(self.config.get("archivado_libre_minimo_gb", 0))
+        self.archivado_objetivo_input.setValue(self.config.get("archivado_libre_objetivo_gb", 0))
+        self.ram_limite_input.setValue(self.config.get("ram_limite_mb", 2048))
+        self.ram_checkpoint_input.setValue(self.config.get("ram_checkpoint_min", 5))
+        self.monitor_input.setValue(self.config.get("monitor_intervalo", 5))
+        self.inactividad_input.setValue(self.config.get("inactividad_minutos", 0))
+        self.inactividad_cpu_input.setValue(self.config.get("inactividad_cpu", 1.0))
+        self.inactividad_devtools_checkbox.setChecked(self.config.get("inactividad_devtools", True))
+        self.inactividad_excluidas_input.setText(", ".join(self.config.get("inactividad_excluidas", [])))
+        self.precalentar_input.setText(", ".join(self.config.get("precalentar_sesiones", [])))
+        self.precalentar_maximo_input.setValue(self.config.get("precalentar_maximo", 2))
+        self.precalentar_reserva_input.setValue(self.config.get("precalentar_reserva_mb", 2048))
+        self.limites_checkbox.setChecked(self.config.get("limites_activado", False))
+        self.limites_memoria_input.setValue(self.config.get("limites_memoria_mb", 0))
+        self.limites_cpu_input.setValue(self.config.get("limites_cpu_peso", 100))
+        self.limites_io_input.setValue(self.config.get("limites_io_peso", 100))
+        self.limites_ruta_input.setText(self.config.get("limites_cgroup_ruta", ""))
+        self.mostrar_raices()
 
     def guardar(self):
         """
@@ -983,6 +3047,47 @@ class ConfiguracionDialog(QDialog):
             # Guardar la configuración
             self.config['tema'] = self.tema_selector.currentText()
             self.config['chrome_ruta'] = chrome_ruta
+            self.config['lanzamiento_concurrencia'] = self.concurrencia_input.value()
+            self.config['lanzamiento_intervalo'] = self.intervalo_input.value()
+            self.config['lanzamiento_timeout'] = self.timeout_input.value()
+            self.config['dedup_enlaces_duros'] = self.dedup_enlaces_input.isChecked()
+            self.config['compactacion_dias'] = self.compactacion_input.value()
+            self.config['archivado_libre_minimo_gb'] = self.archivado_minimo_input.value()
+            self.config['archivado_libre_objetivo_gb'] = max(self.archivado_objetivo_input.value(),
+                                                             self.archivado_minimo_input.value())
+            self.config['ram_limite_mb'] = self.ram_limite_input.value()
+            self.config['ram_checkpoint_min'] = self.ram_checkpoint_input.value()
+            self.parent.core.ram.limite = self.config['ram_limite_mb'] * 1024 ** 2
+            self.config['monitor_intervalo'] = self.monitor_input.value()
+            self.parent.iniciar_monitor()
+            self.config['inactividad_minutos'] = self.inactividad_input.value()
+            self.config['inactividad_cpu'] = self.inactividad_cpu_input.value()
+            self.config['inactividad_devtools'] = self.inactividad_devtools_checkbox.isChecked()
+            self.config['inactividad_excluidas'] = [
+                nombre.strip() for nombre in self.inactividad_excluidas_input.text().split(',') if nombre.strip()
+            ]
+            self.config['precalentar_sesiones'] = [
+                nombre.strip() for nombre in self.precalentar_input.text().split(',') if nombre.strip()
+            ]
+            self.config['precalentar_maximo'] = self.precalentar_maximo_input.value()
+            self.config['precalentar_reserva_mb'] = self.precalentar_reserva_input.value()
+            self.config['limites_activado'] = self.limites_checkbox.isChecked()
+            self.config['limites_memoria_mb'] = self.limites_memoria_input.value()
+            self.config['limites_cpu_peso'] = self.limites_cpu_input.value()
+            self.config['limites_io_peso'] = self.limites_io_input.value()
+            self.config['limites_cgroup_ruta'] = self.limites_ruta_input.text().strip()
+            # Se aplican a las sesiones que se lancen a partir de ahora
+            limites = self.parent.core.limites
+            limites.activado = self.config['limites_activado']
+            limites.memoria = self.config['limites_memoria_mb'] * 1024 ** 2 or None
+            limites.cpu_peso = self.config['limites_cpu_peso']
+            limites.io_peso = self.config['limites_io_peso']
+            limites.ruta = self.config['limites_cgroup_ruta'] or None
+            if limites.modo() == 'nice':
+                QMessageBox.information(self, "Límites de recursos",
+                                        "cgroup v2 no está disponible o no se puede modificar: el límite de "
+                                        "memoria y el peso de E/S no se aplicarán (necesitan cgroup v2) y la "
+                                        "CPU se limitará con la prioridad nice.", QMessageBox.Ok)
 
             # Aplicar el tema
             self.parent.tema = self.config['tema']
@@ -990,6 +3095,7 @@ class ConfiguracionDialog(QDialog):
 
             # Guardar en el archivo
             self.parent.guardar_configuracion()
+            self.parent.precalentar()
             
             self.accept()
             
@@ -1005,6 +3111,7 @@ class ConfiguracionDialog(QDialog):
         return self.config
 
 if __name__ == '__main__':
+    multiprocessing.freeze_support()  # Pool de procesos de la compactación en el ejecutable de PyInstaller
     app = QApplication([])
     app.setStyle("Fusion")
     window = ChromeSessionManager()
@@ -0,0 +1,35 @@
+import os
+import sys
+
+import pytest
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+CHROME_FALSO = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fake_chrome.py')
+
+
+@pytest.fixture
+def storage(tmp_path, monkeypatch):
+    """
+    Ejecuta la prueba en un directorio vacío, con su propio Storage (las rutas del núcleo son
+    relativas al directorio de trabajo).
+    """
+    os.makedirs(tmp_path / 'Storage' / 'Settings')
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+@pytest.fixture
+def chrome_falso():
+    return CHROME_FALSO
+
+
+@pytest.fixture(scope='session')
+def qapp():
+    """
+    QApplication sin pantalla para probar los componentes de la interfaz.
+    """
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    from PyQt5.QtWidgets import QApplication
+    return QApplication.instance() or QApplication([])
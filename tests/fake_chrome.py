@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Chrome falso para las pruebas: un servidor DevTools mínimo (HTTP /json/version y /json/list
+más el websocket del navegador) que responde a los métodos de Target, Runtime, Network y
+Browser que usa el gestor.
+
+Ejecutado como programa hace de ejecutable de Chrome: lee --remote-debugging-port y
+--user-data-dir, crea el SingletonLock del perfil y abre el puerto tras FAKE_DELAY segundos.
+FAKE_EXIT=<código> termina sin abrirlo, FAKE_LOAD son los segundos hasta que la primera página
+termina de cargar, FAKE_LIFE la vida máxima del proceso y FAKE_LOG un fichero al que añade una
+línea "<monotonic> <pid>" al arrancar. Importado, `servir` abre el mismo servidor en el bucle
+actual.
+"""
+
+import os
+import sys
+import json
+import time
+import base64
+import socket
+import struct
+import asyncio
+import hashlib
+
+GUID_WEBSOCKET = b'258EAFA5-E914-47DA-95CA-C5AB0DC85B11'
+
+
+def _trama(mensaje):
+    datos = json.dumps(mensaje).encode()
+    if len(datos) < 126:
+        return struct.pack('!BB', 0x81, len(datos)) + datos
+    if len(datos) < 65536:
+        return struct.pack('!BBH', 0x81, 126, len(datos)) + datos
+    return struct.pack('!BBQ', 0x81, 127, len(datos)) + datos
+
+async def _leer_trama(lector):
+    primero, segundo = await lector.readexactly(2)
+    longitud = segundo & 0x7F
+    if longitud == 126:
+        longitud = struct.unpack('!H', await lector.readexactly(2))[0]
+    elif longitud == 127:
+        longitud = struct.unpack('!Q', await lector.readexactly(8))[0]
+    mascara = await lector.readexactly(4)
+    datos = await lector.readexactly(longitud)
+    return primero & 0x0F, bytes(b ^ mascara[i % 4] for i, b in enumerate(datos))
+
+
+class Navegador:
+    """
+    Estado de un navegador falso: pestañas {id: url} y contadores para las pruebas.
+    """
+
+    def __init__(self, urls=(), carga=0.0, al_cerrar=None):
+        self.pestanas = {f'T{i}': url for i, url in enumerate(urls)} or {'T0': 'about:blank'}
+        self.carga = carga
+        self.al_cerrar = al_cerrar
+        self.inicio = time.monotonic()
+        self.comandos = 0
+        self.websockets = 0
+
+    def responder(self, metodo, parametros, enviar):
+        if metodo == 'Target.getTargets':
+            return {'targetInfos': [{'targetId': t, 'type': 'page', 'url': u, 'title': u}
+                                    for t, u in self.pestanas.items()]}
+        if metodo == 'Target.createTarget':
+            destino = f'T{len(self.pestanas)}'
+            self.pestanas[destino] = parametros['url']
+            enviar({'method': 'Target.targetCreated', 'params': {'targetInfo': {'targetId': destino}}})
+            return {'targetId': destino}
+        if metodo == 'Target.attachToTarget':
+            return {'sessionId': 'S-' + parametros['targetId']}
+        if metodo == 'Runtime.evaluate':
+            cargada = time.monotonic() - self.inicio >= self.carga
+            return {'result': {'type': 'boolean', 'value': cargada}}
+        if metodo in ('Target.detachFromTarget', 'Network.clearBrowserCache', 'Browser.getVersion'):
+            return {}
+        raise KeyError(metodo)
+
+    async def atender(self, lector, escritor, puerto):
+        try:
+            cabecera = await lector.readuntil(b'\r\n\r\n')
+        except (asyncio.IncompleteReadError, ConnectionError):
+            escritor.close()
+            return
+        lineas = cabecera.decode('latin-1').split('\r\n')
+        ruta = lineas[0].split()[1]
+        campos = {l.split(':', 1)[0].strip().lower(): l.split(':', 1)[1].strip() for l in lineas[1:] if ':' in l}
+        if 'upgrade' in campos:
+            await self._websocket(lector, escritor, campos['sec-websocket-key'].encode())
+            return
+        if ruta.startswith('/json/version'):
+            cuerpo = {'Browser': 'FakeChrome/1.0', 'webSocketDebuggerUrl': f'ws://127.0.0.1:{puerto}/devtools/browser/fake'}
+        elif ruta.startswith('/json/list'):
+            cuerpo = [{'id': t, 'type': 'page', 'url': u} for t, u in self.pestanas.items()]
+        else:
+            escritor.write(b'HTTP/1.1 404 Not Found\r\nContent-Length: 0\r\n\r\n')
+            escritor.close()
+            return
+        datos = json.dumps(cuerpo).encode()
+        escritor.write(b'HTTP/1.1 200 OK\r\nContent-Type: application/json\r\nContent-Length: %d\r\n\r\n' % len(datos) + datos)
+        await escritor.drain()
+        escritor.close()
+
+    async def _websocket(self, lector, escritor, clave):
+        aceptada = base64.b64encode(hashlib.sha1(clave + GUID_WEBSOCKET).digest())
+        escritor.write(b'HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n'
+                       b'Sec-WebSocket-Accept: ' + aceptada + b'\r\n\r\n')
+        self.websockets += 1
+        enviar = lambda mensaje: escritor.write(_trama(mensaje))
+        try:
+            while True:
+                operacion, datos = await _leer_trama(lector)
+                if operacion == 0x8:
+                    break
+                mensaje = json.loads(datos)
+                self.comandos += 1
+                if mensaje['method'] == 'Browser.close':
+                    if self.al_cerrar is not None:
+                        self.al_cerrar()
+                    break
+                try:
+                    respuesta = {'id': mensaje['id'], 'result': self.responder(mensaje['method'], mensaje.get('params', {}), enviar)}
+                except KeyError:
+                    respuesta = {'id': mensaje['id'], 'error': {'code': -32601, 'message': f"'{mensaje['method']}' wasn't found"}}
+                if 'sessionId' in mensaje:
+                    respuesta['sessionId'] = mensaje['sessionId']
+                enviar(respuesta)
+                await escritor.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        escritor.close()
+
+
+async def servir(navegador, puerto=0):
+    """
+    Abre el servidor DevTools de `navegador` en 127.0.0.1. Retorna (servidor, puerto).
+    """
+    caja = {}
+    servidor = await asyncio.start_server(lambda l, e: navegador.atender(l, e, caja['puerto']), '127.0.0.1', puerto)
+    caja['puerto'] = servidor.sockets[0].getsockname()[1]
+    return servidor, caja['puerto']
+
+
+async def _principal(argumentos):
+    opciones = dict(a[2:].split('=', 1) for a in argumentos if a.startswith('--') and '=' in a)
+    urls = [a for a in argumentos if not a.startswith('-')]
+    if 'FAKE_LOG' in os.environ:
+        with open(os.environ['FAKE_LOG'], 'a') as f:
+            f.write(f"{time.monotonic()} {os.getpid()}\n")
+    perfil = opciones['user-data-dir']
+    os.makedirs(perfil, exist_ok=True)
+    bloqueo = os.path.join(perfil, 'SingletonLock')
+    if os.path.lexists(bloqueo):
+        os.unlink(bloqueo)
+    os.symlink(f"{socket.gethostname()}-{os.getpid()}", bloqueo)
+
+    def salir(codigo=0):
+        if os.path.lexists(bloqueo):
+            os.unlink(bloqueo)
+        os._exit(codigo)
+
+    await asyncio.sleep(float(os.environ.get('FAKE_DELAY', '0')))
+    if 'FAKE_EXIT' in os.environ:
+        salir(int(os.environ['FAKE_EXIT']))
+    navegador = Navegador(urls, float(os.environ.get('FAKE_LOAD', '0')), salir)
+    await servir(navegador, int(opciones['remote-debugging-port']))
+    await asyncio.sleep(float(os.environ.get('FAKE_LIFE', '60')))
+    salir()
+
+
+if __name__ == '__main__':
+    asyncio.run(_principal(sys.argv[1:]))
@@ -0,0 +1,46 @@
+import os
+
+import pytest
+
+from core import SessionArchiver
+
+
+@pytest.fixture
+def perfil(tmp_path):
+    raiz = tmp_path / 'perfil'
+    os.makedirs(raiz / 'Default' / 'Extensions')
+    (raiz / 'Local State').write_text('{}')
+    (raiz / 'Default' / 'Extensions' / 'a.js').write_text('extension')
+    # Como deja ProfileDeduplicator con enlaces duros
+    os.link(raiz / 'Default' / 'Extensions' / 'a.js', raiz / 'Default' / 'b.js')
+    os.makedirs(raiz / 'Default' / 'Cache')
+    (raiz / 'Default' / 'Cache' / 'data_0').write_text('cache')
+    (raiz / 'SingletonLock').write_text('bloqueo')
+    return raiz
+
+
+@pytest.mark.parametrize('zstd', [False, True])
+def test_ida_y_vuelta_con_enlaces_duros(tmp_path, perfil, zstd):
+    archivador = SessionArchiver()
+    if zstd and archivador.zstd is None:
+        pytest.skip("Sin el paquete 'zstandard'")
+    if not zstd:
+        archivador.zstd = None
+    archivo = str(tmp_path / f"sesion{archivador.extension()}")
+    assert archivador.exportar(str(perfil), archivo, {'name': 'sesion'}) > 0
+
+    destino = tmp_path / 'importada'
+    assert archivador.importar(archivo, str(destino)) == {'name': 'sesion'}
+    assert (destino / 'Local State').read_text() == '{}'
+    assert (destino / 'Default' / 'b.js').read_text() == 'extension'
+    assert os.path.samefile(destino / 'Default' / 'b.js', destino / 'Default' / 'Extensions' / 'a.js')
+    assert not (destino / 'Default' / 'Cache').exists()
+    assert not (destino / 'SingletonLock').exists()
+
+
+def test_archivo_no_valido(tmp_path):
+    archivo = tmp_path / 'otro.tar.gz'
+    archivo.write_bytes(b'no es un archivo')
+    with pytest.raises(ValueError):
+        SessionArchiver().importar(str(archivo), str(tmp_path / 'destino'))
+    assert not (tmp_path / 'destino').exists()
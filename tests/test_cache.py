@@ -0,0 +1,40 @@
+import os
+
+import pytest
+
+from core import CachePruner
+
+
+@pytest.mark.parametrize('ruta, categoria', [
+    ('Default/Cache', 'cache'),
+    ('Profile 2/Code Cache', 'code_cache'),
+    ('Default/GPUCache', 'gpu_cache'),
+    ('Default/Service Worker/CacheStorage', 'service_worker'),
+    ('Default/Service Worker/ScriptCache', 'service_worker'),
+    ('ShaderCache', 'shader_cache'),
+    ('GrShaderCache', 'shader_cache'),
+    # Directorios con nombres parecidos que no son cachés regenerables
+    ('Default/Service Worker/Cache', None),
+    ('Default/Service Worker', None),
+    ('Default/Cache/Cache_Data', None),
+    ('Default/Extensions/abc/Cache', None),
+    ('Default/IndexedDB/Cache', None),
+    ('Otra carpeta/Cache', None),
+    ('Profile x/Cache', None),
+    ('Default', None),
+])
+def test_categoria_anclada_al_perfil(ruta, categoria):
+    assert CachePruner.categoria(ruta.replace('/', os.sep)) == categoria
+
+
+def test_podar_solo_vacia_las_caches(tmp_path):
+    for rel in ('Default/Cache/Cache_Data', 'Default/Service Worker/CacheStorage/x',
+                'Default/Service Worker/Cache', 'Default/Extensions/abc/Cache', 'ShaderCache'):
+        os.makedirs(tmp_path / rel)
+        (tmp_path / rel / 'f').write_bytes(b'x' * 100)
+    liberados, omitidas = CachePruner().podar({'a': str(tmp_path)})
+    assert (liberados, omitidas) == ({'a': 300}, [])
+    assert not (tmp_path / 'Default' / 'Cache').exists()
+    assert not (tmp_path / 'ShaderCache').exists()
+    assert (tmp_path / 'Default' / 'Service Worker' / 'Cache' / 'f').exists()
+    assert (tmp_path / 'Default' / 'Extensions' / 'abc' / 'Cache' / 'f').exists()
@@ -0,0 +1,107 @@
+import time
+import socket
+import asyncio
+
+import pytest
+
+import cdp
+import core
+from fake_chrome import Navegador, servir
+
+
+@pytest.fixture
+def puerto_colgado():
+    """
+    Puerto que acepta conexiones (por la cola del núcleo) y nunca responde, como un Chrome colgado.
+    """
+    escucha = socket.socket()
+    escucha.bind(('127.0.0.1', 0))
+    escucha.listen(16)
+    yield escucha.getsockname()[1]
+    escucha.close()
+
+
+def test_comandos_y_eventos():
+    async def prueba():
+        navegador = Navegador(['https://example.com/'])
+        servidor, puerto = await servir(navegador)
+        pool = cdp.CdpPool(timeout=2)
+        creadas = []
+        pool.escuchar('Target.targetCreated', lambda sesion, parametros: creadas.append(sesion))
+        try:
+            pestanas = await pool.pestanas({'a': puerto})
+            abiertas = await pool.abrir({'a': puerto}, ['https://uno/', 'https://dos/'])
+            fallida = await pool.ejecutar({'a': puerto}, 'No.existe')
+            limpiada = await pool.limpiar_cache({'a': puerto})
+        finally:
+            await pool.cerrar_conexiones()
+            servidor.close()
+        return navegador, pestanas, abiertas, fallida, limpiada, creadas
+
+    navegador, pestanas, abiertas, fallida, limpiada, creadas = asyncio.run(prueba())
+    assert pestanas == {'a': [{'id': 'T0', 'url': 'https://example.com/', 'titulo': 'https://example.com/'}]}
+    assert sorted(abiertas['a']) == ['T1', 'T2']
+    assert isinstance(fallida['a'], cdp.CdpError)
+    assert limpiada == {'a': True}
+    assert creadas == ['a', 'a']
+    assert navegador.websockets == 1  # Una sola conexión persistente para todo
+
+
+def test_servidor_colgado_no_rompe_las_demas(puerto_colgado):
+    async def prueba():
+        servidor, puerto = await servir(Navegador())
+        pool = cdp.CdpPool(timeout=0.5)
+        try:
+            return await pool.pestanas({'colgada': puerto_colgado, 'sana': puerto})
+        finally:
+            await pool.cerrar_conexiones()
+            servidor.close()
+
+    resultados = asyncio.run(prueba())
+    assert isinstance(resultados['colgada'], OSError)
+    assert resultados['sana'][0]['id'] == 'T0'
+
+
+def test_comando_cdp_colgado_lanza_oserror(puerto_colgado):
+    with pytest.raises(OSError):
+        core.comando_cdp(puerto_colgado, 'Browser.close', timeout=0.5)
+
+
+def test_runner_con_servidor_colgado(puerto_colgado):
+    runner = cdp.CdpRunner(timeout=0.5)
+    try:
+        resultados = runner.ejecutar('ejecutar', {'colgada': puerto_colgado}, metodo='Browser.getVersion')
+    finally:
+        runner.cerrar()
+    assert isinstance(resultados['colgada'], OSError)
+
+
+def test_reparto_entre_200_sesiones(puerto_colgado):
+    async def prueba():
+        navegadores = [Navegador() for _ in range(200)]
+        servidores = [await servir(navegador) for navegador in navegadores]
+        puertos = {f's{i}': puerto for i, (_, puerto) in enumerate(servidores)}
+        puertos['colgada'] = puerto_colgado
+        pool = cdp.CdpPool(timeout=1)
+        try:
+            inicio = time.monotonic()
+            primera = await pool.pestanas(puertos)
+            fria = time.monotonic() - inicio
+            inicio = time.monotonic()
+            segunda = await pool.ejecutar({n: p for n, p in puertos.items() if n != 'colgada'}, 'Browser.getVersion')
+            caliente = time.monotonic() - inicio
+        finally:
+            await pool.cerrar_conexiones()
+            for servidor, _ in servidores:
+                servidor.close()
+        return navegadores, primera, fria, segunda, caliente
+
+    navegadores, primera, fria, segunda, caliente = asyncio.run(prueba())
+    assert isinstance(primera.pop('colgada'), OSError)
+    assert all(pestanas[0]['id'] == 'T0' for pestanas in primera.values())
+    assert segunda == {nombre: {} for nombre in primera}
+    assert all(navegador.websockets == 1 for navegador in navegadores)
+    # En paralelo: la sesión colgada solo cuesta su plazo (3 intentos de 1 s) y, con las
+    # conexiones ya abiertas, el segundo reparto no espera a ninguna
+    assert fria < 6
+    assert caliente < 1
@@ -0,0 +1,67 @@
+import os
+import sys
+import tempfile
+import subprocess
+
+from conftest import RAIZ
+
+CLI = os.path.join(RAIZ, 'cli.py')
+
+
+def ejecutar(base, *argumentos):
+    # Salida a ficheros: el Chrome lanzado hereda los descriptores y no cerraría una tubería
+    with tempfile.TemporaryFile('w+') as salida, tempfile.TemporaryFile('w+') as errores:
+        resultado = subprocess.run([sys.executable, CLI, '--base', str(base), *argumentos],
+                                   stdout=salida, stderr=errores, text=True, timeout=60)
+        salida.seek(0)
+        errores.seek(0)
+        resultado.stdout, resultado.stderr = salida.read(), errores.read()
+    return resultado
+
+
+def test_lanzamiento_fallido_muestra_el_error(storage):
+    assert ejecutar(storage, 'create', 'a').returncode == 0
+    resultado = ejecutar(storage, 'launch', 'a', '--chrome', os.path.join(str(storage), 'no-existe'))
+    assert resultado.returncode == 1
+    assert 'Traceback' not in resultado.stderr
+    assert resultado.stdout.startswith('a: error (')
+
+
+def test_lanzamiento_con_chrome_falso(storage, chrome_falso):
+    assert ejecutar(storage, 'create', 'a', 'b').returncode == 0
+    resultado = ejecutar(storage, 'launch', 'a', 'b', '--chrome', chrome_falso, '--interval', '0')
+    try:
+        assert resultado.returncode == 0, resultado.stderr
+        lineas = sorted(resultado.stdout.splitlines())
+        assert [linea.split(' (')[0] for linea in lineas] == ['a: ok', 'b: ok']
+        # Ya en ejecución: no se relanza ni se mide
+        repetido = ejecutar(storage, 'launch', 'a', '--chrome', chrome_falso)
+        assert repetido.returncode == 0
+        assert repetido.stdout.startswith('a: en_ejecucion (')
+    finally:
+        ejecutar(storage, 'cdp', 'close', 'a', 'b')
+
+
+def test_reap_cierra_y_suspende(storage, chrome_falso):
+    assert ejecutar(storage, 'create', 'a').returncode == 0
+    assert ejecutar(storage, 'launch', 'a', '--chrome', chrome_falso, '--interval', '0').returncode == 0
+    try:
+        simulado = ejecutar(storage, 'reap', 'a', '--dry-run')
+        assert (simulado.returncode, simulado.stdout) == (0, "a\tse cerraría\n")
+        resultado = ejecutar(storage, 'reap', 'a')
+        assert resultado.returncode == 0, resultado.stderr
+        assert resultado.stdout.startswith("a\tcerrada; se reabrirá")
+    finally:
+        ejecutar(storage, 'cdp', 'close', 'a')
+
+
+def test_cdp_salida_por_columnas(storage, chrome_falso):
+    assert ejecutar(storage, 'create', 'a').returncode == 0
+    assert ejecutar(storage, 'launch', 'a', '--chrome', chrome_falso, '--interval', '0').returncode == 0
+    try:
+        pestanas = ejecutar(storage, 'cdp', 'tabs', 'a')
+        assert pestanas.returncode == 0 and pestanas.stdout, pestanas.stderr
+        assert all(len(linea.split('\t')) == 3 and linea.startswith('a\t') for linea in pestanas.stdout.splitlines())
+    finally:
+        cierre = ejecutar(storage, 'cdp', 'close', 'a')
+    assert cierre.stdout == "a\tcerrada\n"
@@ -0,0 +1,66 @@
+import concurrent.futures
+import os
+import socket
+import sqlite3
+
+import core
+from core import DatabaseCompactor, compactar_sqlite
+
+
+def base_inflada(ruta, filas=2000):
+    os.makedirs(os.path.dirname(ruta), exist_ok=True)
+    conexion = sqlite3.connect(ruta)
+    conexion.execute("CREATE TABLE urls (id INTEGER PRIMARY KEY, url TEXT)")
+    conexion.executemany("INSERT INTO urls (url) VALUES (?)", [('x' * 500,)] * filas)
+    conexion.commit()
+    conexion.execute("DELETE FROM urls")
+    conexion.commit()
+    conexion.close()
+
+
+def test_compactar_sqlite_reduce_la_base(tmp_path):
+    ruta = str(tmp_path / 'History')
+    base_inflada(ruta)
+    resultado = compactar_sqlite(ruta)
+    assert resultado['estado'] == 'ok' and resultado['error'] is None
+    assert resultado['despues'] < resultado['antes']
+
+
+def test_compactar_sqlite_no_espera_a_una_base_en_uso(tmp_path):
+    ruta = str(tmp_path / 'History')
+    base_inflada(ruta, filas=10)
+    # Como Chrome, que mantiene sus bases con bloqueo exclusivo
+    conexion = sqlite3.connect(ruta, isolation_level=None)
+    conexion.execute("PRAGMA locking_mode=EXCLUSIVE")
+    conexion.execute("BEGIN EXCLUSIVE")
+    try:
+        resultado = compactar_sqlite(ruta)
+    finally:
+        conexion.close()
+    assert resultado['estado'] == 'bloqueada'
+    assert resultado['despues'] == resultado['antes']
+
+
+def test_compactador_localiza_omite_abiertas_y_conserva_la_ruta_en_errores(tmp_path, monkeypatch):
+    cerrada, abierta = tmp_path / 'cerrada', tmp_path / 'abierta'
+    base_inflada(str(cerrada / 'Default' / 'History'))
+    base_inflada(str(cerrada / 'Default' / 'Network' / 'Cookies'))
+    (cerrada / 'Default' / 'Preferences').write_text('{}')
+    (cerrada / 'Default' / 'Favicons').write_text('no es SQLite')
+    base_inflada(str(abierta / 'Default' / 'History'))
+    os.symlink(f"{socket.gethostname()}-{os.getpid()}", abierta / 'SingletonLock')
+
+    compactador = DatabaseCompactor()
+    assert sorted(os.path.relpath(ruta, cerrada) for ruta in compactador.localizar(str(cerrada))) == [
+        os.path.join('Default', 'History'), os.path.join('Default', 'Network', 'Cookies')]
+
+    # Un fallo dentro del proceso del pool (p. ej. el motor SQLite abortando) no pierde la ruta
+    def fallar(ruta):
+        raise RuntimeError("proceso terminado")
+
+    monkeypatch.setattr(concurrent.futures, 'ProcessPoolExecutor', concurrent.futures.ThreadPoolExecutor)
+    monkeypatch.setattr(core, 'compactar_sqlite', fallar)
+    resultados, omitidas = compactador.compactar({'cerrada': str(cerrada), 'abierta': str(abierta)})
+    assert omitidas == ['abierta']
+    assert sorted(r['ruta'] for r in resultados) == sorted(compactador.localizar(str(cerrada)))
+    assert all(r['estado'] == 'error' and r['sesion'] == 'cerrada' for r in resultados)
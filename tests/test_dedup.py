@@ -0,0 +1,68 @@
+import errno
+import os
+import sys
+
+import pytest
+
+from core import ProfileDeduplicator, SessionManager
+
+CONTENIDO = os.urandom(64 * 1024)
+
+
+@pytest.fixture
+def manager(storage):
+    manager = SessionManager(config={'chrome_ruta': 'chrome', 'raices_almacenamiento': []})
+    manager.crear_varias(['a', 'b'])
+    for nombre in ('a', 'b'):
+        carpeta = os.path.join(manager.ruta(nombre), 'Default', 'Extensions')
+        os.makedirs(carpeta)
+        with open(os.path.join(carpeta, 'ext.js'), 'wb') as f:
+            f.write(CONTENIDO)
+    manager.medir()
+    yield manager
+    manager.cerrar()
+
+
+def test_reflink_cuenta_una_vez_en_el_uso_real(manager, monkeypatch):
+    if not sys.platform.startswith('linux'):
+        pytest.skip("FIDEDUPERANGE solo existe en Linux")
+    # El kernel comparte los bloques sin cambiar el inodo ni el contenido del duplicado
+    monkeypatch.setattr(ProfileDeduplicator, '_dedupe_rango', lambda self, origen, destino, tamano: True)
+    assert manager.uso() == (2 * len(CONTENIDO), 2 * len(CONTENIDO))
+    resultado = manager.deduplicar()
+    assert (resultado['reflink'], resultado['recuperado']) == (1, len(CONTENIDO))
+    assert 'clones' not in resultado
+    aparente, real = manager.uso()
+    assert (aparente, real) == (2 * len(CONTENIDO), len(CONTENIDO))
+    assert manager.uso(['a']) == (len(CONTENIDO), len(CONTENIDO))
+
+    # Persistido con el índice de tamaños
+    manager.size_index.cargar()
+    assert manager.uso()[1] == len(CONTENIDO)
+
+    # Chrome reescribe uno de los dos: los bloques dejan de compartirse
+    with open(os.path.join(manager.ruta('b'), 'Default', 'Extensions', 'ext.js'), 'r+b') as f:
+        f.write(b'x')
+        os.utime(f.fileno(), ns=(0, 1))
+    assert manager.uso() == (2 * len(CONTENIDO), 2 * len(CONTENIDO))
+
+
+def test_enlaces_duros_cuentan_una_vez_en_el_uso_real(manager, monkeypatch):
+    def sin_reflink(self, origen, destino, tamano):
+        raise OSError(errno.EOPNOTSUPP, "Sin reflink")
+
+    monkeypatch.setattr(ProfileDeduplicator, '_dedupe_rango', sin_reflink)
+    resultado = manager.deduplicar(enlaces_duros=True)
+    assert (resultado['reflink'], resultado['enlaces']) == (0, 1)
+    manager.medir()  # Los inodos compartidos se anotan al escanear
+    assert manager.uso() == (2 * len(CONTENIDO), len(CONTENIDO))
+
+
+def test_reflink_real(manager):
+    if not sys.platform.startswith('linux'):
+        pytest.skip("FIDEDUPERANGE solo existe en Linux")
+    resultado = manager.deduplicar()
+    if resultado['reflink'] == 0:
+        pytest.skip("El sistema de ficheros no admite reflink")
+    aparente, real = manager.uso()
+    assert real < aparente
@@ -0,0 +1,83 @@
+import os
+import socket
+
+import core
+from core import SessionManager
+
+
+def ocupado(raiz):
+    return sum(os.lstat(os.path.join(carpeta, fichero)).st_size
+               for carpeta, _, ficheros in os.walk(raiz) for fichero in ficheros)
+
+
+def test_libera_cada_volumen_con_sus_sesiones(storage, monkeypatch):
+    otro = str(storage / 'otro')
+    os.makedirs(otro)
+    # Dos volúmenes simulados: 'otro' tiene 2500 bytes y Storage, espacio de sobra
+    en_otro = lambda ruta: os.path.abspath(ruta).startswith(otro)
+    monkeypatch.setattr(core, 'dispositivo_volumen', lambda ruta=None: 1 if en_otro(ruta) else 0)
+    monkeypatch.setattr(core, 'espacio_libre', lambda ruta=None: 2500 - ocupado(otro) if en_otro(ruta) else 10 ** 12)
+
+    manager = SessionManager(config={'chrome_ruta': 'chrome', 'raices_almacenamiento': [otro]})
+    try:
+        manager.crear('a')
+        manager.crear('b', raiz=otro)
+        manager.crear('c', raiz=otro)
+        for nombre, uso in (('a', '2020-01-01 00:00:00'), ('b', '2021-01-01 00:00:00'), ('c', '2022-01-01 00:00:00')):
+            os.makedirs(manager.ruta(nombre), exist_ok=True)
+            with open(os.path.join(manager.ruta(nombre), 'History'), 'wb') as f:
+                f.write(b'x' * 1000)
+            manager.store.actualizar(nombre, last_used=uso)
+
+        simulado = manager.liberar_espacio(simular=True, minimo=1000, objetivo=1500)
+        assert simulado['activado']
+        assert [v['activado'] for v in simulado['volumenes']] == [False, True]
+        # 'a' es la más antigua, pero está en un volumen con espacio: no cuenta para 'otro'
+        assert [sesion['nombre'] for sesion in simulado['sesiones']] == ['b']
+
+        informe = manager.liberar_espacio(minimo=1000, objetivo=1500)
+        assert [sesion['nombre'] for sesion in informe['sesiones']] == ['b']
+        assert informe['volumenes'][1]['libre_final'] >= 1500
+        assert manager.store.archivadas().keys() == {'b'}
+    finally:
+        manager.cerrar()
+
+
+def test_lru_en_un_volumen(storage, monkeypatch):
+    capacidad = 10000
+    monkeypatch.setattr(core, 'espacio_libre', lambda ruta=None: (
+        capacidad - ocupado(storage / 'Storage' / 'Sessions') - ocupado(storage / 'Storage' / 'Archive')))
+
+    manager = SessionManager(config={'chrome_ruta': 'chrome', 'raices_almacenamiento': []})
+    try:
+        usos = {'vieja': '2020-01-01 00:00:00', 'abierta': '2019-01-01 00:00:00', 'vacia': '2018-01-01 00:00:00',
+                'media': '2021-01-01 00:00:00', 'reciente': '2023-01-01 00:00:00'}
+        for nombre, uso in usos.items():
+            manager.crear(nombre)
+            if nombre != 'vacia':
+                with open(os.path.join(manager.ruta(nombre), 'History'), 'wb') as f:
+                    f.write(b'x' * 1500)
+            manager.store.actualizar(nombre, last_used=uso)
+        # Nunca lanzada: cuenta desde su creación, la más antigua de todas
+        manager.crear('nunca')
+        manager.store.actualizar('nunca', created='2017-01-01 00:00:00')
+        with open(os.path.join(manager.ruta('nunca'), 'History'), 'wb') as f:
+            f.write(b'x' * 1500)
+        # La más antigua de las lanzadas sigue abierta: no se toca
+        os.symlink(f"{socket.gethostname()}-{os.getpid()}", os.path.join(manager.ruta('abierta'), 'SingletonLock'))
+        manager.reconciliar(adoptar=True)
+
+        # Libre: unos 10000 - 5 * 1500 = 2500 bytes, por encima del mínimo
+        assert not manager.liberar_espacio(minimo=2000, objetivo=4500)['activado']
+
+        simulado = manager.liberar_espacio(simular=True, minimo=3000, objetivo=4500)
+        assert simulado['activado'] and simulado['libre'] < 3000
+        assert [sesion['nombre'] for sesion in simulado['sesiones']] == ['nunca', 'vieja']
+
+        informe = manager.liberar_espacio(minimo=3000, objetivo=4500)
+        assert [sesion['nombre'] for sesion in informe['sesiones']] == ['nunca', 'vieja']
+        assert informe['libre_final'] >= 4500
+        assert set(manager.store.archivadas()) == {'nunca', 'vieja'}
+        assert os.path.isdir(manager.ruta('abierta'))
+    finally:
+        manager.cerrar()
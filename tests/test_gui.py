@@ -0,0 +1,104 @@
+import os
+
+from PyQt5.QtCore import QEventLoop, QTimer
+
+
+def esperar_hilo(qapp, hilo, timeout=10000):
+    """
+    Arranca `hilo` (un QThread) y procesa eventos hasta que termina, para recibir sus señales.
+    """
+    bucle = QEventLoop()
+    hilo.finished.connect(bucle.quit)
+    QTimer.singleShot(timeout, bucle.quit)
+    hilo.start()
+    bucle.exec_()
+    assert hilo.wait(timeout)
+    qapp.processEvents()
+
+
+def test_escaneo_rellena_sesiones_progresivamente(qapp, tmp_path):
+    from main import SessionLoaderThread
+    rutas = {}
+    for nombre in ('a', 'b', 'c'):
+        os.makedirs(tmp_path / nombre)
+        (tmp_path / nombre / 'Preferences').write_bytes(b'x' * 10)
+        rutas[nombre] = str(tmp_path / nombre)
+    hilo = SessionLoaderThread(rutas)
+    medidas, progreso, fin = [], [], []
+    hilo.session_sized.connect(lambda nombre, ruta, tamano: medidas.append((nombre, ruta, tamano)))
+    hilo.progress.connect(lambda hechas, total: progreso.append((hechas, total)))
+    hilo.scan_finished.connect(fin.append)
+    esperar_hilo(qapp, hilo)
+    assert sorted(medidas) == [(nombre, rutas[nombre], 10) for nombre in ('a', 'b', 'c')]
+    assert progreso[0] == (0, 3) and progreso[-1] == (3, 3)
+    assert fin == [False]
+
+
+def test_escaneo_cancelado(qapp, tmp_path):
+    from main import SessionLoaderThread
+    os.makedirs(tmp_path / 'a')
+    hilo = SessionLoaderThread({'a': str(tmp_path / 'a')})
+    medidas, fin = [], []
+    hilo.session_sized.connect(lambda *datos: medidas.append(datos))
+    hilo.scan_finished.connect(fin.append)
+    hilo.cancel()
+    esperar_hilo(qapp, hilo)
+    assert medidas == [] and fin == [True]
+
+
+def nombres(modelo):
+    return [modelo.data(modelo.index(fila, 0)) for fila in range(modelo.rowCount())]
+
+
+def modelo_con(sesiones):
+    from main import SessionTableModel
+    modelo = SessionTableModel()
+    modelo.set_sessions(sesiones)
+    return modelo
+
+
+def test_tabla_ordena_por_valores_crudos(qapp):
+    from PyQt5.QtCore import Qt
+    modelo = modelo_con([
+        ('a', '2024-03-01 10:00:00', 2048, ''),
+        ('b', '2023-12-31 23:59:59', 10, ''),
+        ('c', '2024-01-15 08:00:00', 3 * 1024 ** 3, ''),
+    ])
+    modelo.sort(2)  # Bytes, no el texto "2.00 KB" / "10.00 B" / "3.00 GB"
+    assert nombres(modelo) == ['b', 'a', 'c']
+    modelo.sort(2, Qt.DescendingOrder)
+    assert nombres(modelo) == ['c', 'a', 'b']
+    modelo.sort(1)  # Fecha, por marca de tiempo
+    assert nombres(modelo) == ['b', 'c', 'a']
+
+
+def test_tabla_coloca_filas_nuevas_y_cambios_en_su_posicion(qapp):
+    from PyQt5.QtCore import Qt
+    modelo = modelo_con([('a', '2024-01-01 00:00:00', 100, ''), ('c', '2024-01-01 00:00:00', 300, '')])
+    modelo.sort(2, Qt.DescendingOrder)
+    modelo.upsert('b', '2024-01-01 00:00:00', 200)
+    assert nombres(modelo) == ['c', 'b', 'a']
+    modelo.upsert('a', '2024-01-01 00:00:00', 1000)  # Crece: pasa a la primera posición
+    assert nombres(modelo) == ['a', 'c', 'b']
+    assert modelo._row_by_name == {'a': 0, 'c': 1, 'b': 2}
+    assert modelo.data(modelo.index(0, 2)).startswith('1000.00 B')
+
+
+def test_tabla_conserva_la_seleccion_al_ordenar(qapp):
+    from PyQt5.QtCore import QPersistentModelIndex
+    modelo = modelo_con([('a', '2024-01-01 00:00:00', 300, ''), ('b', '2024-01-01 00:00:00', 100, '')])
+    seleccion = QPersistentModelIndex(modelo.index(0, 0))
+    assert modelo.data(seleccion.sibling(seleccion.row(), 0)) == 'a'
+    modelo.sort(2)
+    assert seleccion.row() == 1
+    assert modelo.data(modelo.index(seleccion.row(), 0)) == 'a'
+
+
+def test_tabla_usa_el_rss_hasta_leer_el_pss(qapp):
+    modelo = modelo_con([('a', '2024-01-01 00:00:00', 0, ''), ('b', '2024-01-01 00:00:00', 0, '')])
+    muestra = {'cpu': 0.0, 'lectura': 0.0, 'escritura': 0.0, 'procesos': 2}
+    modelo.sort(6)
+    modelo.set_samples({'a': dict(muestra, rss=300, pss=None), 'b': dict(muestra, rss=900, pss=100)})
+    assert nombres(modelo) == ['b', 'a']
+    assert modelo.data(modelo.index(1, 6)) == "300.00 B RSS (2 proc.)"
+    assert modelo.data(modelo.index(0, 6)) == "100.00 B (2 proc.)"
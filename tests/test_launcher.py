@@ -0,0 +1,159 @@
+import time
+import threading
+
+import pytest
+
+import core
+from conftest import CHROME_FALSO
+from core import BatchLauncher, SessionManager, validar_arranque
+
+
+@pytest.fixture
+def manager(storage):
+    manager = SessionManager(config={'chrome_ruta': CHROME_FALSO})
+    yield manager
+    for nombre in list(manager.process_registry.sesiones):
+        manager.process_registry.detener(nombre, timeout=2)
+    manager.cerrar()
+
+
+def lanzar(manager, nombres, **opciones):
+    """
+    Lanza con manager.lanzar y retorna (resultados, {sesión: segundos hasta al_terminar}).
+    """
+    inicio = time.monotonic()
+    terminadas = {}
+    opciones.setdefault('intervalo', 0)
+    resultados = manager.lanzar(nombres, al_terminar=lambda r: terminadas.setdefault(r['sesion'], time.monotonic() - inicio),
+                                **opciones)
+    return resultados, terminadas
+
+
+def test_el_hueco_se_libera_cuando_responde_devtools(manager, monkeypatch):
+    monkeypatch.setenv('FAKE_LOAD', '3')
+    manager.crear_varias(['a', 'b'])
+    resultados, terminadas = lanzar(manager, ['a', 'b'], concurrencia=1, timeout=10)
+    assert [r['estado'] for r in resultados] == ['ok', 'ok']
+    # Con un solo hueco, 'b' arranca sin esperar a que cargue la página de 'a'
+    assert max(terminadas.values()) < 2.5
+    # La carga se mide en segundo plano y completa las fases antes de retornar
+    assert all(r['fases']['load'] is not None and r['fases']['total'] >= 2.5 for r in resultados)
+    assert manager.latencias(['a', 'b'])['global']['n'] == 2
+
+
+def test_pagina_que_no_carga_no_retiene_el_lanzamiento(manager, monkeypatch):
+    monkeypatch.setenv('FAKE_LOAD', '100')
+    manager.crear('a')
+    resultados, terminadas = lanzar(manager, ['a'], timeout=1.5)
+    assert resultados[0]['estado'] == 'ok'
+    assert terminadas['a'] < 1.5
+    assert resultados[0]['fases']['load'] is None
+
+
+def arranques(ruta):
+    with open(ruta) as f:
+        return sorted(float(linea.split()[0]) for linea in f)
+
+
+def lote(manager, **opciones):
+    return BatchLauncher(manager.launcher, CHROME_FALSO, **opciones)
+
+
+def test_limite_de_concurrencia(manager, monkeypatch, tmp_path):
+    monkeypatch.setenv('FAKE_DELAY', '1')
+    monkeypatch.setenv('FAKE_LOG', str(tmp_path / 'arranques.log'))
+    nombres = ['a', 'b', 'c', 'd']
+    manager.crear_varias(nombres)
+    resultados = lote(manager, concurrencia=2, intervalo=0, timeout=10).ejecutar(nombres)
+    assert [r['estado'] for r in resultados] == ['ok'] * 4
+    inicios = arranques(tmp_path / 'arranques.log')
+    # Dos tandas: las dos últimas esperan a que DevTools responda en las primeras
+    assert inicios[1] - inicios[0] < 0.5
+    assert inicios[2] - inicios[0] >= 0.9
+
+
+def test_rampa_entre_lanzamientos(manager, monkeypatch, tmp_path):
+    monkeypatch.setenv('FAKE_LOG', str(tmp_path / 'arranques.log'))
+    nombres = ['a', 'b', 'c']
+    manager.crear_varias(nombres)
+    resultados = lote(manager, concurrencia=3, intervalo=0.4, timeout=10).ejecutar(nombres)
+    assert [r['estado'] for r in resultados] == ['ok'] * 3
+    inicios = arranques(tmp_path / 'arranques.log')
+    assert all(despues - antes >= 0.35 for antes, despues in zip(inicios, inicios[1:]))
+
+
+def test_cancelar(manager, monkeypatch):
+    monkeypatch.setenv('FAKE_DELAY', '3')
+    nombres = ['a', 'b', 'c']
+    manager.crear_varias(nombres)
+    batch = lote(manager, concurrencia=1, intervalo=0, timeout=10)
+    temporizador = threading.Timer(0.5, batch.cancelar)
+    temporizador.start()
+    inicio = time.monotonic()
+    resultados = batch.ejecutar(nombres)
+    assert time.monotonic() - inicio < 2
+    # La primera ya se había lanzado y sigue abierta; las demás no llegan a lanzarse
+    assert [r['estado'] for r in resultados] == ['iniciada', 'cancelada', 'cancelada']
+    assert resultados[0]['pid'] is not None and resultados[1]['segundos'] is None
+
+
+def test_errores_y_plazo(manager, monkeypatch, storage):
+    manager.crear_varias(['a', 'b', 'c'])
+    monkeypatch.setenv('FAKE_EXIT', '3')
+    fallida, = lote(manager, intervalo=0, timeout=10).ejecutar(['a'])
+    assert fallida['estado'] == 'error' and '3' in fallida['error']
+
+    monkeypatch.delenv('FAKE_EXIT')
+    monkeypatch.setenv('FAKE_DELAY', '5')
+    lenta, = lote(manager, intervalo=0, timeout=0.5).ejecutar(['b'])
+    assert lenta['estado'] == 'timeout' and lenta['pid'] is not None
+
+    sin_chrome, = BatchLauncher(manager.launcher, str(storage / 'no-existe'), intervalo=0).ejecutar(['c'])
+    assert sin_chrome['estado'] == 'error' and sin_chrome['segundos'] is None
+
+
+def comandos_lanzados(monkeypatch):
+    """
+    Registra los comandos con que se lanza Chrome, sin dejar de lanzarlo.
+    """
+    comandos = []
+    popen = core.subprocess.Popen
+    monkeypatch.setattr(core.subprocess, 'Popen', lambda comando, **kwargs: comandos.append(comando) or popen(comando, **kwargs))
+    return comandos
+
+
+def test_validar_arranque():
+    validar_arranque('low-memory', ['https://example.com/'], ['--lang=es'])
+    for preset, urls, flags in (('turbo', None, None),
+                                (None, ['--no-sandbox'], None), (None, ['https://a b'], None), (None, [''], None),
+                                (None, None, ['lang=es']), (None, None, ['--user-data-dir=/tmp/x']),
+                                (None, None, ['--remote-debugging-port']), (None, None, ['--no-startup-window'])):
+        with pytest.raises(ValueError):
+            validar_arranque(preset, urls, flags)
+
+
+def test_comando_con_preset_flags_y_urls(manager, monkeypatch):
+    comandos = comandos_lanzados(monkeypatch)
+    manager.crear('a', preset='low-memory', urls=['https://example.com/', 'https://example.org/'])
+    manager.configurar_arranque(['a'], flags=['--lang=es'])
+    with pytest.raises(ValueError):
+        manager.configurar_arranque(['a'], flags=['--user-data-dir=/tmp/otro'])
+    assert manager.arranque('a') == {'preset': 'low-memory', 'flags': ['--lang=es'],
+                                     'urls': ['https://example.com/', 'https://example.org/']}
+    resultado, = manager.lanzar(['a'], intervalo=0, timeout=10)
+    assert resultado['estado'] == 'ok'
+    comando, = comandos
+    puerto = manager.process_registry.info('a')['port']
+    assert comando[comando.index(CHROME_FALSO) + 1:] == [
+        f"--remote-debugging-port={puerto}", f"--user-data-dir={manager.ruta('a')}",
+        *core.PRESETS_LANZAMIENTO['low-memory']['flags'], '--lang=es',
+        'https://example.com/', 'https://example.org/']
+
+
+def test_preset_sin_ventana_no_se_precalienta(manager, monkeypatch):
+    comandos = comandos_lanzados(monkeypatch)
+    manager.crear('a', preset='headless-batch')
+    with pytest.raises(ValueError):
+        manager.launcher.lanzar('a', CHROME_FALSO, oculta=True)
+    assert comandos == [] and not manager.process_registry.en_ejecucion('a')
+    assert manager.port_allocator.puerto('a') is None
@@ -0,0 +1,71 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+from core import CgroupLimiter
+
+pytestmark = pytest.mark.skipif(not sys.platform.startswith('linux'), reason="Solo Linux")
+
+COMANDO = [sys.executable, '-c', 'import os; print(os.getpid())']
+
+
+class CgroupFalso(CgroupLimiter):
+    """
+    Sobre una carpeta normal, cgroup.subtree_control acumula los controladores activados como
+    lo hace el kernel en vez de sobrescribirse.
+    """
+
+    @staticmethod
+    def _escribir(ruta, valor):
+        if os.path.basename(ruta) == 'cgroup.subtree_control':
+            actual = CgroupLimiter._leer(ruta).split() if os.path.exists(ruta) else []
+            valor = ' '.join(actual + [valor.lstrip('+')])
+        CgroupLimiter._escribir(ruta, valor)
+
+
+@pytest.fixture
+def jerarquia(tmp_path):
+    base = tmp_path / 'cgroup'
+    os.makedirs(base)
+    (base / 'cgroup.controllers').write_text('cpuset cpu io memory pids\n')
+    return base
+
+
+def test_grupo_por_sesion(jerarquia):
+    limites = CgroupFalso(activado=True, memoria=512 * 1024 ** 2, cpu_peso=50, io_peso=200, ruta=str(jerarquia))
+    assert limites.modo() == 'cgroup'
+    assert (jerarquia / 'cgroup.subtree_control').read_text().split() == ['memory', 'cpu', 'io']
+    grupo = jerarquia / CgroupLimiter.nombre_grupo('a/b')
+    os.makedirs(grupo)
+    for fichero in ('memory.max', 'cpu.weight', 'io.weight'):
+        (grupo / fichero).write_text('')
+
+    comando = limites.envolver('a/b', COMANDO)
+    assert comando[-len(COMANDO):] == COMANDO
+    assert (grupo / 'memory.max').read_text() == str(512 * 1024 ** 2)
+    assert (grupo / 'cpu.weight').read_text() == '50'
+    assert (grupo / 'io.weight').read_text() == 'default 200'
+    # La shell intermedia se mete en el grupo y hace exec: el PID anotado es el del programa
+    salida = subprocess.run(comando, capture_output=True, text=True, check=True)
+    assert (grupo / 'cgroup.procs').read_text().strip() == salida.stdout.strip()
+
+    limites.liberar('a/b')
+    assert os.path.isdir(grupo)  # Aún tiene ficheros: en un cgroup real, procesos
+
+
+def test_sin_cgroup_solo_prioridad_de_cpu(tmp_path):
+    limites = CgroupFalso(activado=True, memoria=512 * 1024 ** 2, cpu_peso=50, ruta=str(tmp_path / 'no-es-cgroup'))
+    assert limites.modo() == 'nice'
+    # Sin RLIMIT_DATA: Chrome no arrancaría con un límite de espacio de direcciones realista
+    assert limites.envolver('a', COMANDO) == ['nice', '-n', '10', *COMANDO]
+    limites.cpu_peso = 100
+    assert limites.envolver('a', COMANDO) == COMANDO
+    assert subprocess.run(limites.envolver('a', COMANDO), capture_output=True).returncode == 0
+
+
+def test_desactivado():
+    limites = CgroupLimiter(activado=False, memoria=512 * 1024 ** 2, cpu_peso=10)
+    assert limites.modo() is None
+    assert limites.envolver('a', COMANDO) == COMANDO
@@ -0,0 +1,76 @@
+import os
+import signal
+import subprocess
+import sys
+import time
+
+import pytest
+
+from core import ResourceMonitor
+
+pytestmark = pytest.mark.skipif(not ResourceMonitor().disponible, reason="Requiere /proc (Linux)")
+
+# Un proceso principal con dos hijos en su grupo de procesos; uno de ellos gasta CPU
+SESION = """
+import subprocess, sys, time
+hijos = [subprocess.Popen([sys.executable, '-c', 'while True: pass']),
+         subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(60)'])]
+print('listo', flush=True)
+time.sleep(60)
+"""
+
+
+@pytest.fixture
+def sesion():
+    proceso = subprocess.Popen([sys.executable, '-c', SESION], stdout=subprocess.PIPE, start_new_session=True)
+    assert proceso.stdout.readline().strip() == b'listo'
+    yield proceso.pid
+    os.killpg(proceso.pid, signal.SIGKILL)
+    proceso.wait()
+
+
+def test_suma_los_procesos_del_grupo(sesion):
+    monitor = ResourceMonitor()
+    primera = monitor.muestrear({'s': sesion})['s']
+    assert primera['procesos'] == 3
+    assert primera['rss'] > 0 and primera['cpu'] == 0.0
+    time.sleep(0.5)
+    segunda = monitor.muestrear({'s': sesion})['s']
+    # El hijo que gira ocupa casi un núcleo
+    assert segunda['cpu'] > 50
+    assert [m['procesos'] for m in monitor.historia('s')] == [3, 3]
+
+    # La sesión se cerró: su historial desaparece
+    assert monitor.muestrear({}) == {}
+    assert monitor.historia('s') == []
+
+
+def test_pss_none_hasta_la_primera_lectura(sesion, monkeypatch):
+    monitor = ResourceMonitor(cada_pss=2)
+    leer = monitor._pss_proceso
+    lecturas = []
+
+    def sin_permiso(pid):
+        lecturas.append(pid)
+        raise PermissionError(pid)
+
+    monkeypatch.setattr(monitor, '_pss_proceso', sin_permiso)
+    muestra = monitor.muestrear({'s': sesion})['s']
+    assert muestra['pss'] is None and muestra['rss'] > 0
+    assert len(lecturas) == 3
+    # Sin ninguna lectura válida se reintenta en el siguiente muestreo
+    monkeypatch.setattr(monitor, '_pss_proceso', lambda pid: lecturas.append(pid) or leer(pid))
+    lecturas.clear()
+    muestra = monitor.muestrear({'s': sesion})['s']
+    assert len(lecturas) == 3 and muestra['pss'] > 0
+    pss = muestra['pss']
+
+    # Una lectura fallida no pierde el último valor
+    lecturas.clear()
+    monkeypatch.setattr(monitor, '_pss_proceso', sin_permiso)
+    assert monitor.muestrear({'s': sesion})['s']['pss'] == pss
+    assert len(lecturas) == 3
+    # Fuera de turno se conserva sin leer smaps_rollup
+    lecturas.clear()
+    assert monitor.muestrear({'s': sesion})['s']['pss'] == pss
+    assert lecturas == []
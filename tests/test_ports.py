@@ -0,0 +1,45 @@
+import socket
+
+import pytest
+
+from core import PortAllocator
+
+
+def test_reserva_estable_y_unica_por_sesion():
+    puertos = PortAllocator()
+    a = puertos.reservar('a')
+    b = puertos.reservar('b')
+    assert a != b
+    assert puertos.reservar('a') == a
+    assert puertos.puerto('b') == b
+    # El puerto es realmente utilizable en el host configurado
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.bind(('127.0.0.1', a))
+
+
+def test_salta_puertos_ya_reservados(monkeypatch):
+    puertos = PortAllocator()
+    ofrecidos = iter([9000, 9000, 9001])
+    monkeypatch.setattr(puertos, '_puerto_libre', lambda: next(ofrecidos))
+    assert puertos.reservar('a') == 9000
+    assert puertos.reservar('b') == 9001
+
+
+def test_sin_puertos_libres_lanza_oserror(monkeypatch):
+    puertos = PortAllocator()
+    puertos.asignar('a', 9000)
+    monkeypatch.setattr(puertos, '_puerto_libre', lambda: 9000)
+    with pytest.raises(OSError):
+        puertos.reservar('b')
+
+
+def test_asignar_y_liberar():
+    puertos = PortAllocator()
+    puertos.asignar('a', 9000)
+    puertos.asignar('a', 9001)  # Reasignar suelta el puerto anterior
+    assert puertos.puerto('a') == 9001
+    puertos.asignar('b', 9000)
+    assert puertos.liberar('a') == 9001
+    assert puertos.liberar('a') is None
+    assert puertos.puerto('a') is None
+    assert puertos.puerto('b') == 9000
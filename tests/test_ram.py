@@ -0,0 +1,120 @@
+import os
+import shutil
+import sqlite3
+import subprocess
+
+import pytest
+
+import core
+from conftest import CHROME_FALSO
+from core import RamDiskStager, SessionManager
+
+
+@pytest.fixture
+def ram(tmp_path):
+    return RamDiskStager(str(tmp_path / 'ram'), ruta_manifiesto=str(tmp_path / 'ram.json'))
+
+
+def test_punto_de_control_omite_sqlite_en_uso(tmp_path, ram):
+    disco = tmp_path / 'perfil'
+    os.makedirs(disco / 'Default')
+    sqlite3.connect(str(disco / 'Default' / 'History')).close()
+    copia = ram.preparar('s', str(disco))
+
+    # Chrome escribe en RAM: una base de datos con su diario y un fichero normal
+    conexion = sqlite3.connect(os.path.join(copia, 'Default', 'History'))
+    conexion.execute("PRAGMA journal_mode=WAL")
+    conexion.execute("CREATE TABLE urls (url TEXT)")
+    conexion.execute("INSERT INTO urls VALUES ('https://example.com/')")
+    conexion.commit()
+    with open(os.path.join(copia, 'Default', 'Preferences'), 'w') as f:
+        f.write('{}')
+    assert os.path.exists(os.path.join(copia, 'Default', 'History-wal'))
+
+    resultado = ram.sincronizar('s')
+    assert resultado['omitidos'] >= 2
+    assert (disco / 'Default' / 'Preferences').read_text() == '{}'
+    assert not (disco / 'Default' / 'History-wal').exists()
+    assert (disco / 'Default' / 'History').stat().st_size == 0  # La versión anterior, intacta
+
+    conexion.close()  # Chrome se cierra
+    resultado = ram.devolver('s')
+    assert resultado['omitidos'] == 0
+    with sqlite3.connect(str(disco / 'Default' / 'History')) as copiada:
+        assert copiada.execute("SELECT url FROM urls").fetchall() == [('https://example.com/',)]
+    assert ram.preparadas() == {}
+
+
+def test_lanzamiento_fallido_descarta_la_copia(storage):
+    manager = SessionManager(config={'chrome_ruta': str(storage / 'no-existe'), 'ram_ruta': str(storage / 'ram')})
+    try:
+        manager.crear('a')
+        resultado, = manager.lanzar(['a'], en_ram=True, intervalo=0)
+        assert resultado['estado'] == 'error'
+        assert manager.ram.preparadas() == {}
+        assert not os.path.exists(storage / 'ram' / 'a')
+    finally:
+        manager.cerrar()
+
+
+def test_limite_cuenta_las_caches_en_ram(tmp_path, monkeypatch):
+    monkeypatch.setattr(RamDiskStager, 'CACHE', 1000)
+    ram = RamDiskStager(str(tmp_path / 'ram'), limite=5000, ruta_manifiesto=str(tmp_path / 'ram.json'))
+    disco = tmp_path / 'a'
+    os.makedirs(disco / 'Default')
+    (disco / 'Default' / 'Preferences').write_bytes(b'x' * 1000)
+    shutil.copytree(disco, tmp_path / 'b')
+    copia = ram.preparar('a', str(disco))
+    assert ram.uso() == 2000  # Perfil + reserva para cachés
+
+    # Chrome llena sus cachés en tmpfs más allá de lo reservado
+    os.makedirs(os.path.join(copia, 'Default', 'Code Cache'))
+    with open(os.path.join(copia, 'Default', 'Code Cache', 'js'), 'wb') as f:
+        f.write(b'x' * 2500)
+    assert ram.uso() == 2000  # Aún sin punto de control
+    # Por la reserva cabría (2000 + 2000), pero ya ocupa 3500
+    with pytest.raises(ValueError):
+        ram.preparar('b', str(tmp_path / 'b'))
+    assert set(ram.preparadas()) == {'a'}
+
+    ram.sincronizar('a')
+    assert ram.uso() == 3500
+    assert not (disco / 'Default' / 'Code Cache').exists()
+    assert ram.preparadas()['a']['tamano'] == 1000
+
+    # Chrome vacía su caché: vuelve a caber
+    shutil.rmtree(os.path.join(copia, 'Default', 'Code Cache'))
+    ram.sincronizar('a')
+    assert ram.uso() == 2000
+    ram.preparar('b', str(tmp_path / 'b'))
+    assert ram.uso() == 4000
+
+
+def test_flags_limitan_la_cache_http(ram):
+    assert ram.flags([]) == [f"--disk-cache-size={RamDiskStager.CACHE}"]
+    assert ram.flags(['--disk-cache-size=1024']) == []
+    assert ram.flags(['--disk-cache-size=1024', f"--disk-cache-size={RamDiskStager.CACHE * 2}"]) == [
+        f"--disk-cache-size={RamDiskStager.CACHE}"]
+    assert ram.flags(['--disk-cache-size=0']) == [f"--disk-cache-size={RamDiskStager.CACHE}"]
+
+
+def test_lanzar_en_ram_limita_la_cache_http(storage, monkeypatch):
+    comandos = []
+    popen = subprocess.Popen
+    monkeypatch.setattr(core.subprocess, 'Popen', lambda comando, **kwargs: comandos.append(comando) or popen(comando, **kwargs))
+    manager = SessionManager(config={'chrome_ruta': CHROME_FALSO, 'ram_ruta': str(storage / 'ram')})
+    try:
+        manager.crear_varias(['a', 'b'])
+        manager.configurar_arranque(['b'], preset='low-memory')
+        resultados = manager.lanzar(['a', 'b'], en_ram=True, intervalo=0, timeout=10)
+        assert [r['estado'] for r in resultados] == ['ok', 'ok']
+        flags = {}
+        for comando in comandos:
+            perfil, = [a.split('=', 1)[1] for a in comando if a.startswith('--user-data-dir=')]
+            flags[perfil] = [a for a in comando if a.startswith('--disk-cache-size=')]
+        assert flags[str(storage / 'ram' / 'a')] == [f"--disk-cache-size={RamDiskStager.CACHE}"]
+        assert flags[str(storage / 'ram' / 'b')] == ['--disk-cache-size=67108864']  # El del preset ya es menor o igual
+    finally:
+        for nombre in list(manager.process_registry.sesiones):
+            manager.process_registry.detener(nombre, timeout=2)
+        manager.cerrar()
@@ -0,0 +1,22 @@
+import core
+from core import IdleReaper
+
+
+def muestra(cpu):
+    return {'cpu': cpu, 'rss': 0, 'pss': None, 'lectura': 0.0, 'escritura': 0.0, 'procesos': 1}
+
+
+def test_ventana_de_inactividad(monkeypatch):
+    reloj = [1000.0]
+    monkeypatch.setattr(core.time, 'monotonic', lambda: reloj[0])
+    reaper = IdleReaper()
+    # Recién vistas: cuentan como activas aunque no usen CPU
+    reaper.observar({'a': muestra(0.0), 'b': muestra(0.0), 'c': muestra(0.0)}, umbral_cpu=1.0)
+    reloj[0] += 100
+    reaper.observar({'a': muestra(0.5), 'b': muestra(5.0), 'c': muestra(0.0)}, umbral_cpu=1.0, conexiones={'c': 1})
+    assert reaper.inactivas(60) == {'a': 100}
+    reloj[0] += 30
+    reaper.observar({'a': muestra(0.0), 'b': muestra(0.0)}, umbral_cpu=1.0)
+    # 'c' se cerró y se olvida; 'b' lleva 30 s sin actividad
+    assert reaper.inactivas(60) == {'a': 130}
+    assert reaper.inactivas(30) == {'a': 130, 'b': 30}
@@ -0,0 +1,80 @@
+import json
+import os
+import socket
+import subprocess
+import sys
+
+from core import ProcessRegistry
+
+
+def pid_muerto():
+    proceso = subprocess.Popen([sys.executable, '-c', ''])
+    proceso.wait()
+    return proceso.pid
+
+
+def perfil_abierto(ruta, pid, puerto=None):
+    """
+    Perfil con el SingletonLock que deja Chrome al abrirlo (y DevToolsActivePort si hay puerto).
+    """
+    os.makedirs(ruta, exist_ok=True)
+    os.symlink(f"{socket.gethostname()}-{pid}", os.path.join(ruta, 'SingletonLock'))
+    if puerto:
+        with open(os.path.join(ruta, 'DevToolsActivePort'), 'w') as f:
+            f.write(f"{puerto}\n/devtools/browser/x\n")
+
+
+def escribir_registro(ruta, sesiones):
+    with open(ruta, 'w', encoding='utf-8') as f:
+        json.dump(sesiones, f)
+
+
+def entrada(pid, perfil):
+    return {'pid': pid, 'pgid': pid, 'port': None, 'perfil': perfil, 'inicio': None}
+
+
+def test_reconciliar_poda_pids_obsoletos(tmp_path):
+    ruta = str(tmp_path / 'running.json')
+    vivo = str(tmp_path / 'vivo')
+    perfil_abierto(vivo, os.getpid())
+    reutilizado = str(tmp_path / 'reutilizado')
+    perfil_abierto(reutilizado, pid_muerto())
+    escribir_registro(ruta, {
+        'muerta': entrada(pid_muerto(), str(tmp_path / 'muerta')),
+        # PID vivo, pero el perfil lo bloqueó otro proceso: PID reutilizado
+        'reutilizada': entrada(os.getpid(), reutilizado),
+        'viva': entrada(os.getpid(), vivo),
+    })
+    registro = ProcessRegistry(ruta).cargar()
+    iniciadas, detenidas = registro.reconciliar()
+    assert iniciadas == []
+    assert sorted(detenidas) == ['muerta', 'reutilizada']
+    assert list(registro.sesiones) == ['viva']
+    with open(ruta, encoding='utf-8') as f:
+        assert list(json.load(f)) == ['viva']
+
+
+def test_reconciliar_adopta_perfiles_abiertos_fuera(tmp_path):
+    perfil = str(tmp_path / 'externa')
+    perfil_abierto(perfil, os.getpid(), puerto=9333)
+    cerrado = str(tmp_path / 'cerrada')
+    os.makedirs(cerrado)
+    registro = ProcessRegistry(str(tmp_path / 'running.json')).cargar()
+    iniciadas, detenidas = registro.reconciliar({'externa': perfil, 'cerrada': cerrado})
+    assert (iniciadas, detenidas) == (['externa'], [])
+    assert registro.info('externa')['pid'] == os.getpid()
+    assert registro.info('externa')['port'] == 9333
+    # Persistido para el siguiente arranque del gestor
+    assert ProcessRegistry(registro.ruta).cargar().en_ejecucion('externa')
+
+
+def test_reconciliar_incorpora_registros_de_otro_proceso(tmp_path):
+    ruta = str(tmp_path / 'running.json')
+    perfil = str(tmp_path / 'cli')
+    perfil_abierto(perfil, os.getpid())
+    registro = ProcessRegistry(ruta).cargar()
+    assert registro.reconciliar() == ([], [])
+    escribir_registro(ruta, {'cli': entrada(os.getpid(), perfil)})
+    os.utime(ruta, ns=(0, 1))  # Garantiza un mtime distinto del leído
+    assert registro.reconciliar() == (['cli'], [])
+    assert registro.reconciliar() == ([], [])
@@ -0,0 +1,70 @@
+import os
+
+import pytest
+
+from core import SessionManager
+
+
+@pytest.fixture
+def manager(storage):
+    manager = SessionManager(config={'chrome_ruta': 'chrome', 'raices_almacenamiento': []})
+    yield manager
+    manager.cerrar()
+
+
+def test_una_sola_raiz_no_estima_el_tamano(manager, monkeypatch):
+    monkeypatch.setattr(manager, '_tamano_estimado', lambda plantilla=None: pytest.fail("Escaneo innecesario"))
+    manager.crear_varias(['a', 'b'])
+    assert os.path.isdir(manager.ruta('b'))
+
+
+def test_varias_raices_estiman_una_vez(manager, monkeypatch, storage):
+    otra = str(storage / 'otra')
+    os.makedirs(otra)
+    manager.config['raices_almacenamiento'] = [otra]
+    llamadas = []
+    monkeypatch.setattr(manager, '_tamano_estimado', lambda plantilla=None: llamadas.append(plantilla) or 0)
+    manager.crear('solo')
+    assert llamadas == []  # Una sola sesión: el estimado no cambia la elección
+    manager.crear_varias(['a', 'b'])
+    assert llamadas == [None]
+
+
+def test_fallo_en_la_segunda_raiz_deshace_todo(manager, monkeypatch, storage):
+    import core
+    otra = str(storage / 'otra')
+    os.makedirs(otra)
+    manager.config['raices_almacenamiento'] = [otra]
+    plantilla = storage / 'Storage' / 'Templates' / 'base'
+    os.makedirs(plantilla / 'Default')
+    (plantilla / 'Default' / 'Preferences').write_text('{}')
+    monkeypatch.setattr(manager, 'elegir_raices', lambda cantidad, estimado: [core.RUTA_SESIONES, otra])
+
+    clonar = core.ProfileCloner.clonar
+
+    def clonar_y_fallar(self, origen, destinos):
+        if destinos[0].startswith(otra):
+            raise OSError("Disco lleno")
+        return clonar(self, origen, destinos)
+
+    monkeypatch.setattr(core.ProfileCloner, 'clonar', clonar_y_fallar)
+    with pytest.raises(OSError):
+        manager.crear_varias(['a', 'b'], plantilla='base')
+    assert not os.path.lexists(core.ruta_sesion('a'))
+    assert not os.path.lexists(core.ruta_sesion('b', otra))
+    assert manager.store.listar() == {}
+
+    # Sin plantilla: la carpeta ya creada en la primera raíz también se elimina
+    makedirs = os.makedirs
+
+    def makedirs_y_fallar(ruta, *args, **kwargs):
+        if ruta.startswith(otra):
+            raise OSError("Disco lleno")
+        return makedirs(ruta, *args, **kwargs)
+
+    monkeypatch.setattr(core.os, 'makedirs', makedirs_y_fallar)
+    with pytest.raises(OSError):
+        manager.crear_varias(['a', 'b'])
+    monkeypatch.undo()
+    assert not os.path.lexists(core.ruta_sesion('a'))
+    assert manager.store.listar() == {}
@@ -0,0 +1,72 @@
+import os
+import threading
+
+from core import DirectorySizer
+
+
+def test_medir_directorio(tmp_path):
+    os.makedirs(tmp_path / 'perfil' / 'Default')
+    (tmp_path / 'perfil' / 'Default' / 'History').write_bytes(b'x' * 5000)
+    assert DirectorySizer().medir_directorio(str(tmp_path / 'perfil')) >= 5000
+
+
+def test_medir_directorio_cancelado(tmp_path):
+    os.makedirs(tmp_path / 'perfil')
+    sizer = DirectorySizer()
+    sizer.cancelar()
+    assert sizer.medir_directorio(str(tmp_path / 'perfil')) is None
+
+
+def test_error_en_al_completar_no_bloquea(tmp_path):
+    for nombre in ('a', 'b', 'c'):
+        os.makedirs(tmp_path / nombre / 'Default')
+    rutas = {nombre: str(tmp_path / nombre) for nombre in ('a', 'b', 'c')}
+
+    def al_completar(clave, tamano):
+        raise RuntimeError(clave)
+
+    errores = []
+
+    def medir():
+        try:
+            DirectorySizer(sesiones_simultaneas=1).medir(rutas, al_completar)
+        except RuntimeError as e:
+            errores.append(e)
+
+    hilo = threading.Thread(target=medir)
+    hilo.start()
+    hilo.join(10)
+    assert not hilo.is_alive()  # Antes se quedaba esperando para siempre
+    assert len(errores) == 1
+
+
+def test_enlaces_duros_una_vez_por_raiz(tmp_path):
+    os.makedirs(tmp_path / 'a')
+    (tmp_path / 'a' / 'uno').write_bytes(b'x' * 4000)
+    os.link(tmp_path / 'a' / 'uno', tmp_path / 'a' / 'dos')
+    os.makedirs(tmp_path / 'b' / 'sub')
+    (tmp_path / 'b' / 'sub' / 'tres').write_bytes(b'y' * 1000)
+    tamanos = DirectorySizer().medir({'a': str(tmp_path / 'a'), 'b': str(tmp_path / 'b')})
+    assert tamanos == {'a': 4000, 'b': 1000}
+
+
+def test_las_raices_terminan_de_forma_progresiva(tmp_path):
+    rutas = {}
+    for nombre in ('a', 'b', 'c', 'd'):
+        os.makedirs(tmp_path / nombre / 'Default')
+        (tmp_path / nombre / 'Default' / 'History').write_bytes(b'x' * 100)
+        rutas[nombre] = str(tmp_path / nombre)
+    orden = []
+    DirectorySizer(sesiones_simultaneas=1).medir(rutas, al_completar=lambda clave, tamano: orden.append((clave, tamano)))
+    # Una raíz a la vez: se reportan en el orden recibido, cada una en cuanto termina
+    assert orden == [('a', 100), ('b', 100), ('c', 100), ('d', 100)]
+
+
+def test_cancelar_a_mitad_de_escaneo(tmp_path):
+    rutas = {}
+    for nombre in ('a', 'b', 'c'):
+        os.makedirs(tmp_path / nombre)
+        rutas[nombre] = str(tmp_path / nombre)
+    sizer = DirectorySizer(sesiones_simultaneas=1)
+    tamanos = sizer.medir(rutas, al_completar=lambda clave, tamano: sizer.cancelar())
+    assert list(tamanos) == ['a']
@@ -0,0 +1,71 @@
+import json
+import sqlite3
+
+import pytest
+
+from core import SessionStore
+
+
+def abrir(tmp_path):
+    return SessionStore(str(tmp_path / 'sessions.db'), str(tmp_path / 'sessions.json')).abrir()
+
+
+def test_migra_una_base_antigua_conservando_datos(tmp_path):
+    # Base creada por una versión con solo las dos primeras migraciones
+    conexion = sqlite3.connect(str(tmp_path / 'sessions.db'))
+    for sql in SessionStore.MIGRACIONES[:2]:
+        conexion.execute(sql)
+    conexion.execute("PRAGMA user_version = 2")
+    conexion.execute("INSERT INTO sessions (name, created, tags, template) VALUES ('a', '2024-01-01 00:00:00', '[\"x\"]', 'base')")
+    conexion.commit()
+    conexion.close()
+
+    store = abrir(tmp_path)
+    try:
+        version = store.conexion.execute("PRAGMA user_version").fetchone()[0]
+        assert version == len(SessionStore.MIGRACIONES)
+        datos = store.obtener('a')
+        assert datos['tags'] == ['x'] and datos['template'] == 'base'
+        assert datos['root'] is None and datos['preset'] is None and datos['start_urls'] is None
+        store.registrar_lanzamiento('a', {'total': 1.5})
+        assert store.lanzamientos()['a'][0]['total'] == 1.5
+    finally:
+        store.cerrar()
+    # Reabrir una base ya al día no vuelve a aplicar migraciones
+    abrir(tmp_path).cerrar()
+
+
+def test_importa_sessions_json_una_sola_vez(tmp_path):
+    with open(tmp_path / 'sessions.json', 'w', encoding='utf-8') as f:
+        json.dump({'a': '2023-05-01 12:00:00', 'b': '2023-06-01 12:00:00'}, f)
+    store = abrir(tmp_path)
+    try:
+        assert store.listar() == {'a': '2023-05-01 12:00:00', 'b': '2023-06-01 12:00:00'}
+    finally:
+        store.cerrar()
+    assert not (tmp_path / 'sessions.json').exists()
+    assert (tmp_path / 'sessions.json.migrated').exists()
+
+
+def test_campos_json_y_altas_atomicas(tmp_path):
+    store = abrir(tmp_path)
+    try:
+        store.agregar('a', tags=['t'], launch_flags=['--x'], start_urls=['https://example.com'])
+        store.actualizar('a', suspended={'fecha': 'f', 'pestanas': 2}, preset='ligero')
+        datos = store.obtener('a')
+        assert datos['tags'] == ['t'] and datos['launch_flags'] == ['--x']
+        assert datos['start_urls'] == ['https://example.com']
+        assert store.suspendidas() == {'a': {'fecha': 'f', 'pestanas': 2}}
+        assert store.presets() == {'a': 'ligero'}
+        store.actualizar('a', suspended=None)
+        assert store.suspendidas() == {}
+
+        # Un nombre repetido anula todo el lote
+        with pytest.raises(ValueError):
+            store.agregar_varias(['b', 'a', 'c'], raices={'b': '/otra'})
+        assert set(store.listar()) == {'a'}
+        store.agregar_varias(['b', 'c'], raices={'b': '/otra'})
+        assert store.raices() == {'b': '/otra'}
+        assert store.eliminar('b') and not store.eliminar('b')
+    finally:
+        store.cerrar()
@@ -0,0 +1,67 @@
+import os
+import threading
+
+from core import SessionManager, SessionTrash
+
+
+def perfil(ruta, ficheros=3, tamano=1000):
+    os.makedirs(os.path.join(ruta, 'Default'), exist_ok=True)
+    for i in range(ficheros):
+        with open(os.path.join(ruta, 'Default', f'f{i}'), 'wb') as f:
+            f.write(b'x' * tamano)
+
+
+def test_mover_libera_el_nombre_al_instante(tmp_path):
+    sesiones = tmp_path / 'Sessions'
+    papelera = SessionTrash(ruta=str(tmp_path / 'Trash'), ruta_sesiones=str(sesiones))
+    perfil(str(sesiones / 'a'))
+    destino = papelera.mover('a')
+    assert not os.path.exists(sesiones / 'a')
+    assert os.path.isfile(os.path.join(destino, 'Default', 'f0'))
+    assert papelera.pendientes() == [destino]
+    assert papelera.mover('inexistente') is None
+    # El nombre puede reutilizarse mientras el antiguo perfil espera en la papelera
+    perfil(str(sesiones / 'a'))
+    assert papelera.mover('a') != destino
+    assert len(papelera.pendientes()) == 2
+
+
+def test_purga_interrumpida_se_reanuda(tmp_path):
+    sesiones = tmp_path / 'Sessions'
+    papelera = SessionTrash(ruta=str(tmp_path / 'Trash'), ruta_sesiones=str(sesiones))
+    perfil(str(sesiones / 'a'), ficheros=10)
+    papelera.mover('a')
+    cancelado = threading.Event()
+    avances = []
+
+    def al_progresar(hechos, total):
+        avances.append((hechos, total))
+        if hechos:
+            cancelado.set()
+
+    liberados = papelera.purgar(al_progresar=al_progresar, cancelado=cancelado)
+    assert 0 < liberados < 10000
+    assert papelera.pendientes()
+
+    # Tras un reinicio, otra instancia retoma lo que quedó pendiente
+    reanudada = SessionTrash(ruta=str(tmp_path / 'Trash'), ruta_sesiones=str(sesiones))
+    avances.clear()
+    assert liberados + reanudada.purgar(al_progresar=lambda hechos, total: avances.append((hechos, total))) == 10000
+    assert reanudada.pendientes() == []
+    assert avances[-1][0] == avances[-1][1]
+
+
+def test_borrar_sesion_y_purgar(storage):
+    manager = SessionManager(config={'chrome_ruta': 'chrome', 'raices_almacenamiento': []})
+    try:
+        manager.crear('a')
+        perfil(manager.ruta('a'))
+        assert not manager.papelera_pendiente()
+        manager.borrar('a')
+        assert not manager.store.existe('a')
+        assert not os.path.exists(manager.ruta('a'))
+        assert manager.papelera_pendiente()
+        assert manager.purgar() == 3000
+        assert not manager.papelera_pendiente()
+    finally:
+        manager.cerrar()
@@ -0,0 +1,74 @@
+import pytest
+
+import core
+from conftest import CHROME_FALSO
+from core import SessionManager, WarmPool
+
+MB = 1024 ** 2
+
+
+def test_objetivo_segun_uso_reciente_y_ram():
+    warm = WarmPool()
+    assert warm.objetivo(0, recientes=5) == 0
+    assert warm.objetivo(3, recientes=0) == 1  # Al menos una si hay sesiones designadas
+    assert warm.objetivo(3, recientes=2) == 2
+    assert warm.objetivo(3, recientes=10) == 3
+    # 1000 MB libres dejando 400 de reserva: caben dos instancias de 300 MB
+    assert warm.objetivo(3, recientes=10, disponible=1000 * MB, reserva=400 * MB, estimado=300 * MB) == 2
+    assert warm.objetivo(3, recientes=10, disponible=300 * MB, reserva=400 * MB) == 0
+
+
+def test_medias_por_tipo_de_arranque():
+    warm = WarmPool(historial=3)
+    assert warm.medias() == {}
+    warm.anotar('a', None, False)  # Sin ventana medida: no cuenta
+    warm.anotar('a', 4.0, False)
+    warm.anotar('b', 0.2, True)
+    warm.anotar('c', 0.4, True)
+    assert warm.medias() == {False: 4.0, True: pytest.approx(0.3)}
+    warm.anotar('d', 2.0, False)  # El historial conserva los 3 últimos
+    assert warm.medias() == {False: 2.0, True: pytest.approx(0.3)}
+
+
+@pytest.fixture
+def manager(storage, monkeypatch):
+    monkeypatch.setattr(core, 'memoria_disponible', lambda: None)
+    manager = SessionManager(config={'chrome_ruta': CHROME_FALSO, 'precalentar_maximo': 2})
+    yield manager
+    for nombre in list(manager.process_registry.sesiones):
+        manager.process_registry.detener(nombre, timeout=2)
+    manager.cerrar()
+
+
+def test_candidatas_por_uso_reciente(manager):
+    nombres = ['vieja', 'media', 'reciente', 'archivada', 'sin_ventana', 'otra']
+    manager.crear_varias(nombres)
+    for nombre, uso in (('vieja', '2020-01-01 00:00:00'), ('media', '2021-01-01 00:00:00'),
+                        ('reciente', '2022-01-01 00:00:00'), ('archivada', '2023-01-01 00:00:00'),
+                        ('sin_ventana', '2023-01-01 00:00:00'), ('otra', '2023-01-01 00:00:00')):
+        manager.store.actualizar(nombre, last_used=uso)
+    manager.store.actualizar('archivada', archive='archivada.tar.gz')
+    manager.configurar_arranque(['sin_ventana'], preset='headless-batch')
+    # 'otra' no está designada
+    manager.config['precalentar_sesiones'] = ['vieja', 'media', 'reciente', 'archivada', 'sin_ventana']
+    informe = manager.precalentar(simular=True)
+    assert informe == {'objetivo': 1, 'lanzadas': ['reciente'], 'cerradas': [], 'errores': {}}
+    manager.config['precalentar_sesiones'] = []
+    assert manager.precalentar(simular=True)['objetivo'] == 0
+
+
+def test_precalentar_y_entregar(manager):
+    manager.crear_varias(['a', 'b', 'c'])
+    manager.config['precalentar_sesiones'] = ['a', 'b']
+    # Las tres cuentan como usadas en la última hora (recién creadas), pero el máximo es 2
+    informe = manager.precalentar()
+    assert informe['errores'] == {} and sorted(informe['lanzadas']) == ['a', 'b']
+    assert manager.precalentadas() == {'a', 'b'}
+    assert manager.entregar('a') < 5
+    assert manager.precalentadas() == {'b'}
+    assert manager.process_registry.en_ejecucion('a')
+    assert True in manager.warm.medias()
+    # Sin sesiones designadas sobra la que sigue sin ventana
+    manager.config['precalentar_sesiones'] = []
+    assert manager.precalentar()['cerradas'] == ['b']
+    assert manager.precalentadas() == set()